@@ -0,0 +1,176 @@
+# app/cli.py
+# Comandos de mantenimiento disponibles con `flask <grupo> <comando>`
+
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.utils.saldos import recalcular_saldo, verificar_saldo
+from app.utils.resumen import recalcular_resumen, verificar_resumen
+from app.utils.importacion import MODOS, leer_archivo, importar_personas
+from app.utils.generador import Generador, hay_datos, vaciar
+from app.utils.trabajos import ejecutor
+from app.utils.vencimientos import TAMANO_LOTE, marcar_vencidas
+
+# --------------------- Saldo de Fondos ---------------------
+fondos_cli = AppGroup('fondos', help='Totales acumulados de ingresos y egresos.')
+
+
+@fondos_cli.command('reconstruir')
+def reconstruir_fondos():
+    """Recalcula Saldo_Fondos desde Ingresos y Egresos completos."""
+    anterior, nuevo = recalcular_saldo()
+    click.echo(f'Ingresos: Q{nuevo[0]:.2f}  Egresos: Q{nuevo[1]:.2f}  Disponible: Q{nuevo[0] - nuevo[1]:.2f}')
+    if anterior is None:
+        click.echo('La fila de saldo no existía; se creó.')
+    elif anterior != nuevo:
+        click.echo(f'Corregido: antes Ingresos Q{anterior[0]:.2f}, Egresos Q{anterior[1]:.2f}.')
+    else:
+        click.echo('Los totales ya estaban correctos.')
+
+
+@fondos_cli.command('verificar')
+def verificar_fondos():
+    """Compara Saldo_Fondos con las sumas reales; sale con código 1 si difieren."""
+    guardado, real = verificar_saldo()
+    if guardado != real:
+        click.echo(f'Diferencia: guardado={guardado}, real={real}. Ejecute `flask fondos reconstruir`.', err=True)
+        raise SystemExit(1)
+    click.echo(f'OK. Ingresos Q{real[0]:.2f}, Egresos Q{real[1]:.2f}.')
+
+
+# --------------------- Resumen mensual ---------------------
+resumen_cli = AppGroup('resumen', help='Ingresos, egresos y pagos por mes (Resumen_Mensual).')
+
+
+def _totales_mes(totales):
+    if totales is None:
+        return 'sin fila'
+    return f'Ingresos Q{totales[0]:.2f}, Egresos Q{totales[1]:.2f}, {totales[2]} pagos'
+
+
+def _mostrar_diferencias(diferencias, err=False):
+    for (anio, mes), guardado, real in diferencias:
+        click.echo(f'{anio}-{mes:02d}: guardado {_totales_mes(guardado)}; real {_totales_mes(real)}', err=err)
+
+
+@resumen_cli.command('reconstruir')
+def reconstruir_resumen():
+    """Recalcula Resumen_Mensual desde Ingresos, Egresos y Pagos completos."""
+    diferencias, meses = recalcular_resumen()
+    click.echo(f'{meses} meses con movimientos.')
+    if diferencias:
+        click.echo(f'Meses corregidos: {len(diferencias)}')
+        _mostrar_diferencias(diferencias)
+    else:
+        click.echo('El resumen ya estaba correcto.')
+
+
+@resumen_cli.command('verificar')
+def verificar_resumen_cmd():
+    """Compara Resumen_Mensual con las tablas; sale con código 1 si difieren."""
+    diferencias = verificar_resumen()
+    if diferencias:
+        _mostrar_diferencias(diferencias, err=True)
+        click.echo(f'{len(diferencias)} meses difieren. Ejecute `flask resumen reconstruir`.', err=True)
+        raise SystemExit(1)
+    click.echo('OK. El resumen mensual coincide con las tablas.')
+
+
+# --------------------- Personas ---------------------
+personas_cli = AppGroup('personas', help='Padrón de personas.')
+
+
+@personas_cli.command('importar')
+@click.argument('archivo', type=click.Path(exists=True, dir_okay=False))
+@click.option('--modo', type=click.Choice(MODOS), default='todo_o_nada', show_default=True)
+@click.option('--bloque', type=int, default=1000, show_default=True, help='Filas por INSERT.')
+def importar_personas_cmd(archivo, modo, bloque):
+    """Importa personas desde un .csv o .json."""
+    filas = leer_archivo(archivo)
+    insertados, errores, segundos = importar_personas(filas, modo, bloque)
+    for error in errores:
+        click.echo(f"Fila {error['fila']}: {' '.join(error['errores'])}", err=True)
+    velocidad = len(filas) / segundos if segundos else 0
+    click.echo(f'{insertados} insertadas, {len(errores)} rechazadas de {len(filas)} '
+               f'en {segundos:.2f}s ({velocidad:.0f} filas/s).')
+    if errores and modo == 'todo_o_nada':
+        raise SystemExit(1)
+
+
+# --------------------- Cuotas ---------------------
+cuotas_cli = AppGroup('cuotas', help='Cuotas y su estado por persona (Persona_Cuota).')
+
+
+@cuotas_cli.command('vencer')
+@click.option('--completo', is_flag=True, help='Revisa todas las cuotas vencidas, no solo las del último corte.')
+@click.option('--lote', type=click.IntRange(1), default=TAMANO_LOTE, show_default=True,
+              help='Rango de ID_Persona por UPDATE.')
+def vencer_cuotas(completo, lote):
+    """Marca 'Vencido' las asignaciones sin completar de cuotas que ya pasaron su fecha límite."""
+    barrido = marcar_vencidas(completo=completo, tamano_lote=lote)
+    ventana = f"desde {barrido['Desde']}" if barrido['Desde'] else 'completo'
+    click.echo(f"Corte {barrido['Fecha_Corte']} ({ventana}): {barrido['Cuotas']} cuotas vencidas, "
+               f"{barrido['Filas']} asignaciones marcadas en {barrido['Lotes']} lotes, {barrido['Segundos']:.3f}s.")
+
+
+# --------------------- Trabajos en segundo plano ---------------------
+trabajos_cli = AppGroup('trabajos', help='Cola de trabajos (tabla Trabajos, /api/jobs).')
+
+
+@trabajos_cli.command('ejecutar')
+@click.option('--hilos', type=click.IntRange(1), default=None, help='Trabajos simultáneos (por defecto TRABAJOS_HILOS).')
+def ejecutar_trabajos(hilos):
+    """Ejecuta trabajos de la cola en este proceso hasta Ctrl+C."""
+    app = current_app._get_current_object()
+    if hilos:
+        app.config['TRABAJOS_HILOS'] = hilos
+    if not app.config['TRABAJOS_HILOS']:
+        click.echo('TRABAJOS_HILOS es 0; use --hilos.', err=True)
+        raise SystemExit(1)
+    ejecutor.iniciar(app)
+    click.echo(f"Ejecutando trabajos con {app.config['TRABAJOS_HILOS']} hilos (Ctrl+C para salir).")
+    try:
+        while ejecutor.activo:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        click.echo('Deteniendo; se esperan los trabajos en curso...')
+    ejecutor.detener()
+
+
+# --------------------- Datos sintéticos ---------------------
+@click.command('seed')
+@click.option('--personas', type=int, default=1000, show_default=True)
+@click.option('--semilla', type=int, default=2025, show_default=True, help='Misma semilla, mismos datos.')
+@click.option('--fecha-base', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Fecha de referencia de cuotas y pagos (por defecto hoy).')
+@click.option('--derechos', type=click.IntRange(1, 6), default=4, show_default=True)
+@click.option('--cuotas-por-derecho', type=click.IntRange(1, 24), default=6, show_default=True)
+@click.option('--bloque', type=int, default=5000, show_default=True, help='Personas por transacción.')
+@click.option('--vaciar', 'vaciar_antes', is_flag=True, help='Borra el padrón existente antes de generar.')
+def seed(personas, semilla, fecha_base, derechos, cuotas_por_derecho, bloque, vaciar_antes):
+    """Genera un padrón sintético con cuotas, pagos, ingresos y egresos."""
+    if vaciar_antes:
+        vaciar()
+    elif hay_datos():
+        click.echo('La base ya tiene personas; use --vaciar para reemplazarlas.', err=True)
+        raise SystemExit(1)
+    generador = Generador(
+        personas, semilla, fecha_base.date() if fecha_base else None, derechos,
+        cuotas_por_derecho, bloque, progreso=lambda mensaje: click.echo(mensaje, err=True)
+    )
+    conteos, segundos = generador.generar()
+    filas = sum(conteos.values())
+    click.echo(', '.join(f'{tabla}: {n}' for tabla, n in conteos.items()))
+    click.echo(f'{filas} filas en {segundos:.1f}s ({filas / segundos:.0f} filas/s).' if segundos else f'{filas} filas.')
+
+
+def registrar_comandos(app):
+    app.cli.add_command(fondos_cli)
+    app.cli.add_command(resumen_cli)
+    app.cli.add_command(personas_cli)
+    app.cli.add_command(cuotas_cli)
+    app.cli.add_command(trabajos_cli)
+    app.cli.add_command(seed)
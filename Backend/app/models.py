@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from datetime import date
+from decimal import Decimal
 from app.extensions import db
 
 # --------------------- Personas ---------------------
@@ -39,7 +40,9 @@ class Persona(db.Model):
         1) Crea la relación PersonaDerecho
         2) Por cada cuota vinculada al derecho, crea un registro PersonaCuota
         """
-        from app.models import PersonaDerecho, DerechoCuota, PersonaCuota
+        from app.models import PersonaDerecho, PersonaCuota
+        from app.utils.referencias import referencias
+        from app.utils.vencimientos import estado_inicial
 
         # 1) Asignar el derecho
         pd = PersonaDerecho(
@@ -50,14 +53,13 @@ class Persona(db.Model):
         )
         db.session.add(pd)
 
-        # 2) Generar las cuotas automáticas
-        enlaces = DerechoCuota.query.filter_by(ID_Derecho=id_derecho).all()
-        for enlace in enlaces:
+        # 2) Generar las cuotas automáticas (cuotas del derecho desde el caché)
+        for id_cuota, cuota in referencias.cuotas_para_asignar(id_derecho).items():
             pc = PersonaCuota(
                 ID_Persona = self.id_persona,
-                ID_Cuota   = enlace.ID_Cuota,
+                ID_Cuota   = id_cuota,
                 Fecha_Asig = fecha_asig,
-                Estado     = 'Pendiente'
+                Estado     = estado_inicial(cuota.Fecha_Limite)
             )
             db.session.add(pc)
 
@@ -106,7 +108,7 @@ class Cuota(db.Model):
     ID_Cuota     = db.Column('ID_Cuota',     db.Integer, primary_key=True)
     Descripcion  = db.Column('Descripcion',  db.String(100), nullable=False, unique=True)
     Monto        = db.Column('Monto',        db.Numeric(9, 2), nullable=False)
-    Fecha_Limite = db.Column('Fecha_Limite', db.Date,          nullable=False)
+    Fecha_Limite = db.Column('Fecha_Limite', db.Date,          nullable=False, index=True)
 
     # Relaciones
     derechos_asociados = db.relationship(
@@ -139,15 +141,59 @@ class DerechoCuota(db.Model):
 # --------------------- Persona_Cuota intermedia ---------------------
 class PersonaCuota(db.Model):
     __tablename__ = 'Persona_Cuota'
+    # Cubre el barrido de vencimientos y la morosidad: filtran por Estado,
+    # recorren por ID_Persona y solo leen ID_Cuota y Total_Pagado
+    __table_args__ = (
+        db.Index('ix_Persona_Cuota_Estado_Persona', 'Estado', 'ID_Persona', 'ID_Cuota', 'Total_Pagado'),
+    )
     ID_Persona = db.Column('ID_Persona', db.Integer, db.ForeignKey('Personas.ID_Persona'), primary_key=True)
     ID_Cuota   = db.Column('ID_Cuota',   db.Integer, db.ForeignKey('Cuotas.ID_Cuota'),     primary_key=True)
     Fecha_Asig = db.Column('Fecha_Asig', db.Date,    nullable=False)
+    # Pendiente, Completado (Total_Pagado cubre el monto) o Vencido (pasó la
+    # Fecha_Limite sin completarse; ver app/utils/vencimientos.py)
     Estado     = db.Column('Estado',     db.String(20), nullable=False, default='Pendiente')
+    # Acumulado de Pagos de esta persona para esta cuota (se mantiene en acumular_pago)
+    Total_Pagado = db.Column('Total_Pagado', db.Numeric(9, 2), nullable=False, default=0, server_default='0')
 
     # Relaciones
     persona = db.relationship('Persona', back_populates='cuotas_asignadas')
     cuota   = db.relationship('Cuota',   back_populates='personas_asignadas')
 
+    @staticmethod
+    def estado_por_total(total, id_cuota):
+        """
+        CASE del Estado para un acumulado `total` de la cuota `id_cuota`
+        (valor, columna o bindparam): Completado si cubre el monto; si no,
+        Vencido cuando la Fecha_Limite ya pasó y Pendiente antes.
+        """
+        monto  = db.select(Cuota.Monto).where(Cuota.ID_Cuota == id_cuota).scalar_subquery()
+        limite = db.select(Cuota.Fecha_Limite).where(Cuota.ID_Cuota == id_cuota).scalar_subquery()
+        return db.case(
+            (total >= monto, 'Completado'),
+            (limite < date.today(), 'Vencido'),
+            else_='Pendiente'
+        )
+
+    @staticmethod
+    def acumular_pago(id_persona, id_cuota, delta):
+        """
+        Suma `delta` (negativo al revertir un pago) a Total_Pagado con un
+        UPDATE atómico y recalcula el Estado contra Cuota.Monto y
+        Cuota.Fecha_Limite en la misma sentencia. No hace commit: corre en
+        la transacción de quien llama.
+        Devuelve las filas afectadas (0 si la persona no tiene la cuota asignada).
+        """
+        nuevo_total = PersonaCuota.Total_Pagado + Decimal(str(delta))
+        return db.session.execute(
+            db.update(PersonaCuota)
+            .where(PersonaCuota.ID_Persona == id_persona, PersonaCuota.ID_Cuota == id_cuota)
+            .values(
+                Total_Pagado = nuevo_total,
+                Estado       = PersonaCuota.estado_por_total(nuevo_total, id_cuota)
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
     def __repr__(self):
         return f"<PersonaCuota Persona={self.ID_Persona} Cuota={self.ID_Cuota} Estado={self.Estado}>"
 
@@ -168,6 +214,20 @@ class Pago(db.Model):
 
     @staticmethod
     def registrar_pago(id_persona, id_cuota, fecha_pago, monto_pagado):
+        """
+        Registra el pago con su ingreso y lo acumula en PersonaCuota, en una
+        transacción. Antes del commit comprueba que la cuota no quedó
+        sobrepagada por otro pago simultáneo (ver app/utils/concurrencia.py);
+        si pasó, lanza ConflictoConcurrencia sin guardar nada.
+        """
+        from app.utils.concurrencia import bloquear_personas, verificar_acumulados, verificar_pagos_sueltos
+
+        # Acumula el pago en PersonaCuota y actualiza su estado; el UPDATE
+        # bloquea la fila hasta el commit
+        asignada = PersonaCuota.acumular_pago(id_persona, id_cuota, monto_pagado)
+        if not asignada:
+            bloquear_personas([id_persona])
+
         pago = Pago(
             ID_Persona   = id_persona,
             ID_Cuota     = id_cuota,
@@ -178,11 +238,6 @@ class Pago(db.Model):
         db.session.add(pago)
         db.session.flush()
 
-        # Actualiza el estado en PersonaCuota
-        pc = PersonaCuota.query.get((id_persona, id_cuota))
-        if pc:
-            pc.Estado = 'Completado' if monto_pagado >= pc.cuota.Monto else 'Pendiente'
-
         # Genera ingreso asociado
         ingreso = Ingreso(
             Fecha        = fecha_pago,
@@ -190,6 +245,12 @@ class Pago(db.Model):
             ID_Pago      = pago.ID_Pago
         )
         db.session.add(ingreso)
+        db.session.flush()
+
+        if asignada:
+            verificar_acumulados([(id_persona, id_cuota)])
+        else:
+            verificar_pagos_sueltos([(id_persona, id_cuota)])
         db.session.commit()
         return pago
 
@@ -221,3 +282,102 @@ class Egreso(db.Model):
 
     def __repr__(self):
         return f"<Egreso Q{self.Monto} Fecha={self.Fecha}>"
+
+# --------------------- Saldo de Fondos ---------------------
+class SaldoFondos(db.Model):
+    """
+    Totales acumulados de Ingresos y Egresos (una sola fila, ID_Saldo=1).
+    Se actualiza en la misma transacción que cada alta, cambio o baja de
+    Ingreso/Egreso (ver app/utils/saldos.py), así los totales y la
+    validación de fondos son una lectura por llave primaria.
+    """
+    __tablename__ = 'Saldo_Fondos'
+    ID_Saldo       = db.Column('ID_Saldo',       db.Integer, primary_key=True, autoincrement=False)
+    Total_Ingresos = db.Column('Total_Ingresos', db.Numeric(14, 2), nullable=False, default=0)
+    Total_Egresos  = db.Column('Total_Egresos',  db.Numeric(14, 2), nullable=False, default=0)
+
+    @property
+    def disponible(self):
+        return self.Total_Ingresos - self.Total_Egresos
+
+    def __repr__(self):
+        return f"<SaldoFondos Ingresos=Q{self.Total_Ingresos} Egresos=Q{self.Total_Egresos}>"
+
+
+class ResumenMensual(db.Model):
+    """
+    Ingresos, egresos y número de pagos de cada mes (por Fecha y
+    Fecha_Pago). Se actualiza en la misma transacción que cada alta, cambio
+    o baja (ver app/utils/resumen.py); el reporte mensual lee solo esta tabla.
+    """
+    __tablename__ = 'Resumen_Mensual'
+    Anio     = db.Column('Anio',     db.Integer, primary_key=True, autoincrement=False)
+    Mes      = db.Column('Mes',      db.Integer, primary_key=True, autoincrement=False)
+    Ingresos = db.Column('Ingresos', db.Numeric(14, 2), nullable=False, default=0)
+    Egresos  = db.Column('Egresos',  db.Numeric(14, 2), nullable=False, default=0)
+    Pagos    = db.Column('Pagos',    db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ResumenMensual {self.Anio}-{self.Mes:02d} Ingresos=Q{self.Ingresos} Egresos=Q{self.Egresos}>"
+
+
+class BarridoVencimientos(db.Model):
+    """
+    Una fila por ejecución de marcar_vencidas (app/utils/vencimientos.py):
+    las cuotas con Fecha_Limite anterior a Fecha_Corte ya quedaron
+    revisadas, así el siguiente barrido empieza ahí. Guarda también cuánto
+    tardó y cuántas filas cambió.
+    """
+    __tablename__ = 'Barrido_Vencimientos'
+    ID_Barrido  = db.Column('ID_Barrido',  db.Integer, primary_key=True)
+    Fecha_Corte = db.Column('Fecha_Corte', db.Date, nullable=False)
+    Desde       = db.Column('Desde',       db.Date)              # None: barrido completo
+    Inicio      = db.Column('Inicio',      db.DateTime, nullable=False)
+    Segundos    = db.Column('Segundos',    db.Numeric(10, 3), nullable=False)
+    Cuotas      = db.Column('Cuotas',      db.Integer, nullable=False)   # cuotas vencidas en la ventana
+    Filas       = db.Column('Filas',       db.Integer, nullable=False)   # asignaciones que pasaron a Vencido
+    Lotes       = db.Column('Lotes',       db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<BarridoVencimientos {self.Fecha_Corte} Filas={self.Filas} {self.Segundos}s>"
+
+
+class VersionTabla(db.Model):
+    """
+    Contador de cambios por tabla. Se incrementa en la misma transacción
+    que cualquier alta, cambio o baja (ver app/utils/versiones.py) y sirve
+    para construir los ETag de las rutas GET sin leer las filas.
+    """
+    __tablename__ = 'Version_Tabla'
+    Tabla   = db.Column('Tabla',   db.String(50), primary_key=True)
+    Version = db.Column('Version', db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<VersionTabla {self.Tabla}={self.Version}>"
+
+
+class Trabajo(db.Model):
+    """
+    Trabajo en segundo plano (importaciones, reportes, reconstrucciones).
+    La fila es el único estado compartido: la encola POST /api/jobs y la
+    reclama y actualiza el ejecutor de algún proceso (ver app/utils/trabajos.py).
+    """
+    __tablename__ = 'Trabajos'
+    ID_Trabajo = db.Column('ID_Trabajo', db.Integer, primary_key=True)
+    Tipo       = db.Column('Tipo',       db.String(50), nullable=False)
+    Estado     = db.Column('Estado',     db.String(20), nullable=False, default='Pendiente', index=True)
+    Parametros = db.Column('Parametros', db.Text, nullable=False, default='{}')
+    Resultado  = db.Column('Resultado',  db.Text)       # JSON
+    Error      = db.Column('Error',      db.Text)
+    Progreso   = db.Column('Progreso',   db.Integer, nullable=False, default=0)   # 0-100
+    Mensaje    = db.Column('Mensaje',    db.String(200))
+    Cancelar   = db.Column('Cancelar',   db.Boolean, nullable=False, default=False)
+    Intentos   = db.Column('Intentos',   db.Integer, nullable=False, default=0)
+    Proceso    = db.Column('Proceso',    db.String(100))  # equipo:pid que lo ejecuta
+    Creado     = db.Column('Creado',     db.DateTime, nullable=False)
+    Iniciado   = db.Column('Iniciado',   db.DateTime)
+    Terminado  = db.Column('Terminado',  db.DateTime)
+    Latido     = db.Column('Latido',     db.DateTime)   # última señal de vida del ejecutor
+
+    def __repr__(self):
+        return f"<Trabajo {self.ID_Trabajo} {self.Tipo} {self.Estado} {self.Progreso}%>"
@@ -3,12 +3,14 @@
 # Todas las rutas unificadas en un solo archivo
 # Prefijo común: /api
 
-from flask import Blueprint, request, jsonify
+from datetime import date, datetime
+
+from flask import Blueprint, Response, abort, current_app, request, jsonify, send_file, url_for
 from app.extensions import db
 from app.models import (
     Persona, Derecho, PersonaDerecho,
     Cuota, DerechoCuota, PersonaCuota,
-    Pago, Ingreso, Egreso
+    Pago, Ingreso, Egreso, Trabajo
 )
 
 
@@ -21,38 +23,75 @@ from app.utils.validaciones import (
     validar_ingreso,
     validar_egreso
 )
+from app.utils.paginacion import respuesta_coleccion
+from app.utils.saldos import obtener_saldo
+from app.utils.resumen import MESES_POR_DEFECTO, MAXIMO_MESES, leer_periodo, reporte_mensual, sumar_meses
+from app.utils.importacion import MODOS, leer_filas, importar_pagos, importar_personas
+from app.utils.asignaciones import (
+    ids_por_filtro, leer_asignacion, asignar_derecho_masivo, propagar_cuota, retirar_cuota
+)
+from app.utils.pool import metricas_pool
+from app.utils.metricas import metricas, gauges, iniciar_medicion, terminar_medicion
+from app.utils.referencias import referencias
+from app.utils.versiones import condicional
+from app.utils.consultas import ESTADOS_CUOTA, cuotas_agregadas, morosidad, personas_con_derechos
+from app.utils.vencimientos import estado_inicial, recalcular_estados
+from app.utils import estado_financiero, trabajos
+from app.utils.concurrencia import (
+    ConflictoConcurrencia, FondosInsuficientes, bloquear_personas, con_reintentos,
+    verificar_acumulados, verificar_fondos, verificar_pagos_sueltos
+)
+from app.utils.serializadores import (
+    PERSONA, DERECHO, CUOTA, PERSONA_DERECHO, PAGO, INGRESO, EGRESO, TRABAJO, respuesta_json
+)
 
 
 api = Blueprint('api', __name__, url_prefix='/api')
 
+# Latencia y SQL por petición (ver app/utils/metricas.py y GET /api/_metrics)
+api.before_request(iniciar_medicion)
+api.after_request(terminar_medicion)
+
+
+@api.errorhandler(ConflictoConcurrencia)
+def conflicto_concurrencia(error):
+    """Se agotaron los reintentos (ver app/utils/concurrencia.py): el cliente puede repetir."""
+    return jsonify({'errores': [str(error)]}), 409
+
+
+@api.errorhandler(FondosInsuficientes)
+def fondos_insuficientes(error):
+    """Un cambio o una baja dejaría el saldo negativo; no se guardó nada."""
+    return jsonify({'errores': [str(error)]}), 409
+
+
+def _con_fechas(datos, *claves):
+    """
+    Copia de `datos` con las fechas 'YYYY-MM-DD' convertidas a date.
+    SQL Server acepta el texto, SQLite no (ver perfiles en app/config.py);
+    lo que no es una fecha válida se deja igual para que lo rechace el validador.
+    """
+    datos = dict(datos or {})
+    for clave in claves:
+        if isinstance(datos.get(clave), str):
+            try:
+                datos[clave] = date.fromisoformat(datos[clave])
+            except ValueError:
+                pass
+    return datos
+
 # --------------------- Personas ---------------------
+# Listas y detalle leen solo columnas con select(); ver app/utils/serializadores.py
 @api.route('/personas', methods=['GET'])
+@condicional('Personas')
 def get_personas():
-    personas = Persona.query.all()
-    return jsonify([{
-        'ID_Persona': p.id_persona,
-        'DPI': p.dpi,
-        'Nombre': p.nombre,
-        'Direccion': p.direccion,
-        'Telefono': p.telefono,
-        'Email': p.email,
-        'Rol': p.rol,
-        'Estado': p.estado
-    } for p in personas]), 200
+    # ?limit=&after= para paginar, ?stream=1 para enviar fila por fila, ?formato=csv para exportar
+    return respuesta_coleccion(PERSONA.consulta(), PERSONA.columnas_pk, PERSONA)
 
 @api.route('/personas/<int:id>', methods=['GET'])
+@condicional('Personas')
 def get_persona(id):
-    p = Persona.query.get_or_404(id)
-    return jsonify({
-        'ID_Persona': p.id_persona,
-        'DPI': p.dpi,
-        'Nombre': p.nombre,
-        'Direccion': p.direccion,
-        'Telefono': p.telefono,
-        'Email': p.email,
-        'Rol': p.rol,
-        'Estado': p.estado
-    }), 200
+    return respuesta_json(PERSONA.uno_o_404(id))
 
 @api.route('/personas', methods=['POST'])
 def post_persona():
@@ -83,6 +122,31 @@ def post_persona():
 
 
 
+@api.route('/personas/lote', methods=['POST'])
+def post_personas_lote():
+    """
+    Importa un padrón de personas (arreglo JSON o CSV en el campo 'archivo').
+    ?modo=todo_o_nada (por defecto) u ?modo=omitir_invalidos.
+    """
+    modo = request.args.get('modo', 'todo_o_nada')
+    if modo not in MODOS:
+        return jsonify({'errores': [f"modo debe ser uno de: {', '.join(MODOS)}."]}), 400
+    filas, errores = leer_filas(request)
+    if errores:
+        return jsonify({'errores': errores}), 400
+
+    insertados, errores_filas, segundos = importar_personas(filas, modo)
+    resultado = {
+        'insertados': insertados,
+        'rechazados': len(errores_filas),
+        'errores': errores_filas,
+        'segundos': round(segundos, 3),
+        'filas_por_segundo': round(len(filas) / segundos, 1) if segundos else None
+    }
+    if errores_filas and modo == 'todo_o_nada':
+        return jsonify({'mensaje': 'No se registró ninguna persona', **resultado}), 400
+    return jsonify({'mensaje': 'Personas registradas', **resultado}), 201
+
 @api.route('/personas/<int:id>', methods=['PUT'])
 def put_persona(id):
     datos = request.get_json()
@@ -133,14 +197,14 @@ def delete_persona(id):
 
 # --------------------- Derechos ---------------------
 @api.route('/derechos', methods=['GET'])
+@condicional('Derechos')
 def get_derechos():
-    lista = Derecho.query.all()
-    return jsonify([{'ID_Derecho': d.ID_Derecho, 'Nombre': d.Nombre} for d in lista]), 200
+    return respuesta_coleccion(DERECHO.consulta(), DERECHO.columnas_pk, DERECHO)
 
 @api.route('/derechos/<int:id>', methods=['GET'])
+@condicional('Derechos')
 def get_derecho(id):
-    d = Derecho.query.get_or_404(id)
-    return jsonify({'ID_Derecho': d.id_derecho, 'Nombre': d.nombre}), 200
+    return respuesta_json(DERECHO.uno_o_404(id))
 
 @api.route('/derechos', methods=['POST'])
 def post_derecho():
@@ -148,16 +212,16 @@ def post_derecho():
     errores = validar_derecho({'Nombre': datos.get('Nombre')})
     if errores:
         return jsonify({'errores': errores}), 400
-    d = Derecho(nombre=datos['Nombre'])
+    d = Derecho(Nombre=datos['Nombre'])
     db.session.add(d)
     db.session.commit()
-    return jsonify({'mensaje':'Derecho creado','ID_Derecho': d.id_derecho}),201
+    return jsonify({'mensaje':'Derecho creado','ID_Derecho': d.ID_Derecho}),201
 
 @api.route('/derechos/<int:id>', methods=['PUT'])
 def put_derecho(id):
     obj = Derecho.query.get_or_404(id)
     d = request.get_json()
-    if 'Nombre' in d: obj.nombre = d['Nombre']
+    if 'Nombre' in d: obj.Nombre = d['Nombre']
     db.session.commit()
     return jsonify({'mensaje': 'Derecho actualizado'}), 200
 
@@ -168,33 +232,38 @@ def delete_derecho(id):
     db.session.commit()
     return jsonify({'mensaje': 'Derecho eliminado'}), 200
 
+@api.route('/derechos/<int:id>/asignar-masivo', methods=['POST'])
+def asignar_derecho_masivo_route(id):
+    """
+    Asigna el derecho a muchas personas en una transacción.
+    Cuerpo: {'ID_Personas': [...]} o {'Filtro': {'Estado': ..., 'Rol': ..., 'Nombre': ..., 'DPI': ...}},
+    más 'Fecha_Inicio' (por defecto hoy) y 'Fecha_Fin' opcional.
+    """
+    Derecho.query.get_or_404(id)
+    ids, filtro, fecha_inicio, fecha_fin, errores = leer_asignacion(request.get_json() or {})
+    if errores:
+        return jsonify({'errores': errores}), 400
+
+    if ids is None:
+        ids = ids_por_filtro(filtro)
+    resultado = asignar_derecho_masivo(id, ids, fecha_inicio, fecha_fin)
+    return jsonify({'mensaje': 'Asignación masiva completada', 'ID_Derecho': id, **resultado}), 201
+
 # --------------------- Cuotas ---------------------
+
 @api.route('/cuotas', methods=['GET'])
+@condicional('Cuotas')
 def get_cuotas():
-    lista = Cuota.query.all()
-    return jsonify([
-    {
-        'ID_Cuota': c.ID_Cuota,
-        'Descripcion': c.Descripcion,
-        'Monto': float(c.Monto),
-        'Fecha_Limite': str(c.Fecha_Limite)
-    }
-        for c in lista
-    ]), 200
+    return respuesta_coleccion(CUOTA.consulta(), CUOTA.columnas_pk, CUOTA)
 
 @api.route('/cuotas/<int:id>', methods=['GET'])
+@condicional('Cuotas')
 def get_cuota(id):
-    c = Cuota.query.get_or_404(id)
-    return jsonify({
-        'ID_Cuota': c.id_cuota,
-        'Descripcion': c.descripcion,
-        'Monto': float(c.monto),
-        'Fecha_Limite': str(c.fecha_limite)
-    }), 200
+    return respuesta_json(CUOTA.uno_o_404(id))
 
 @api.route('/cuotas', methods=['POST'])
 def post_cuota():
-    datos = request.get_json()
+    datos = _con_fechas(request.get_json(), 'Fecha_Limite')
     errores = validar_cuota({
         'Descripcion': datos.get('Descripcion'),
         'Monto': datos.get('Monto'),
@@ -202,14 +271,14 @@ def post_cuota():
     })
     if errores:
         return jsonify({'errores': errores}), 400
-    c = Cuota(descripcion=datos['Descripcion'], monto=datos['Monto'], fecha_limite=datos['Fecha_Limite'])
+    c = Cuota(Descripcion=datos['Descripcion'], Monto=datos['Monto'], Fecha_Limite=datos['Fecha_Limite'])
     db.session.add(c)
     db.session.commit()
-    return jsonify({'mensaje':'Cuota creada','ID_Cuota': c.id_cuota}),201
+    return jsonify({'mensaje':'Cuota creada','ID_Cuota': c.ID_Cuota}),201
 
 @api.route('/cuotas/<int:id>', methods=['PUT'])
 def put_cuota(id):
-    datos = request.get_json()
+    datos = _con_fechas(request.get_json(), 'Fecha_Limite')
     errores = validar_cuota({
         'Descripcion': datos.get('Descripcion'),
         'Monto': datos.get('Monto'),
@@ -218,9 +287,14 @@ def put_cuota(id):
     if errores:
         return jsonify({'errores': errores}),400
     c = Cuota.query.get_or_404(id)
-    for key, attr in [('Descripcion','descripcion'),('Monto','monto'),('Fecha_Limite','fecha_limite')]:
+    anterior = (c.Monto, c.Fecha_Limite)
+    for key in ['Descripcion', 'Monto', 'Fecha_Limite']:
         if datos.get(key) is not None:
-            setattr(c, attr, datos[key])
+            setattr(c, key, datos[key])
+    # Otro monto o fecha límite cambia el estado de cada asignación
+    if (c.Monto, c.Fecha_Limite) != anterior:
+        db.session.flush()
+        recalcular_estados(id)
     db.session.commit()
     return jsonify({'mensaje':'Cuota actualizada'}),200
 
@@ -231,28 +305,132 @@ def delete_cuota(id):
     db.session.commit()
     return jsonify({'mensaje': 'Cuota eliminada'}), 200
 
-# Opcionales: /cuotas/estado, /cuotas/con-pagos (igual que antes)
+# --------------------- Resumen de Cuotas ---------------------
+def _filtrar_cuotas_agregadas(consulta, estado):
+    """Aplica ?desde=&hasta= (sobre Fecha_Limite) y ?Estado=. Devuelve (consulta, errores)."""
+    errores = []
+    try:
+        if request.args.get('desde'):
+            desde = datetime.strptime(request.args['desde'], '%Y-%m-%d').date()
+            consulta = consulta.where(Cuota.Fecha_Limite >= desde)
+        if request.args.get('hasta'):
+            hasta = datetime.strptime(request.args['hasta'], '%Y-%m-%d').date()
+            consulta = consulta.where(Cuota.Fecha_Limite <= hasta)
+    except ValueError:
+        errores.append('desde y hasta deben ser YYYY-MM-DD.')
+    filtro_estado = request.args.get('Estado')
+    if filtro_estado:
+        if filtro_estado not in ESTADOS_CUOTA:
+            errores.append(f"Estado debe ser uno de: {', '.join(ESTADOS_CUOTA)}.")
+        else:
+            consulta = consulta.where(estado == filtro_estado)
+    return consulta, errores
+
+def _cuota_con_pagos_a_dict(f):
+    monto     = float(f.Monto)
+    pagado    = float(f.PagosRealizados)
+    pendiente = max(monto * f.Participantes - pagado, 0.0)
+    return {
+        'ID_Cuota': f.ID_Cuota,
+        'Descripcion': f.Descripcion,
+        'Monto': monto,
+        'Fecha_Limite': f.Fecha_Limite.isoformat(),
+        'PagosRealizados': pagado,
+        'MontoPendiente': pendiente,
+        'Participantes': f.Participantes,
+        'Estado': f.Estado
+    }
+
+def _cuota_estado_mejorado_a_dict(f):
+    datos = _cuota_con_pagos_a_dict(f)
+    esperado = datos['Monto'] * f.Participantes
+    datos.update({
+        'MontoEsperado': esperado,
+        'NumeroPagos': f.NumeroPagos,
+        'ParticipantesCompletados': f.Completados,
+        'ParticipantesVencidos': f.Vencidos,
+        'PorcentajeRecaudado': round(datos['PagosRealizados'] * 100 / esperado, 2) if esperado else 0.0
+    })
+    return datos
+
+def _respuesta_cuotas_agregadas(serializar):
+    consulta, estado = cuotas_agregadas()
+    consulta, errores = _filtrar_cuotas_agregadas(consulta, estado)
+    if errores:
+        return jsonify({'errores': errores}), 400
+    return respuesta_coleccion(
+        consulta, [Cuota.ID_Cuota], serializar,
+        llave=lambda f: [f.ID_Cuota]
+    )
+
+@api.route('/cuotas/con-pagos', methods=['GET'])
+@condicional('Cuotas', 'Pagos', 'Persona_Cuota')
+def cuotas_con_pagos():
+    return _respuesta_cuotas_agregadas(_cuota_con_pagos_a_dict)
+
+@api.route('/cuotas/estado/mejorado', methods=['GET'])
+@condicional('Cuotas', 'Pagos', 'Persona_Cuota')
+def cuotas_estado_mejorado():
+    return _respuesta_cuotas_agregadas(_cuota_estado_mejorado_a_dict)
 
 # --------------------- Asignación Derechos → PersonaCuota ---------------------
 @api.route('/persona_derecho', methods=['GET'])
+@condicional('Persona_Derecho')
 def list_persona_derecho():
-    lista = PersonaDerecho.query.all()
-    return jsonify([{
-        'ID_Persona': pd.id_persona,
-        'ID_Derecho': pd.id_derecho,
-        'Fecha_Inicio': str(pd.fecha_inicio),
-        'Fecha_Fin': str(pd.fecha_fin) if pd.fecha_fin else None
-    } for pd in lista]), 200
+    # Llave compuesta: el cursor guarda (ID_Persona, ID_Derecho)
+    return respuesta_coleccion(PERSONA_DERECHO.consulta(), PERSONA_DERECHO.columnas_pk, PERSONA_DERECHO)
+
+def _detalle_combinado_a_dict(f):
+    return {
+        'ID_Persona': f.ID_Persona,
+        'Nombre': f.Nombre,
+        'DPI': f.DPI,
+        'Email': f.Email,
+        'Telefono': f.Telefono,
+        'Rol': f.Rol,
+        'Estado': f.Estado,
+        'ID_Derecho': f.ID_Derecho,
+        'Descripcion_Derecho': f.Derecho if f.ID_Derecho else 'Sin derechos',
+        'Fecha_Inicio': f.Fecha_Inicio.isoformat() if f.Fecha_Inicio else None,
+        'Fecha_Fin': f.Fecha_Fin.isoformat() if f.Fecha_Fin else None
+    }
+
+@api.route('/persona_derecho/detalle_combinado', methods=['GET'])
+@condicional('Personas', 'Persona_Derecho', 'Derechos')
+def detalle_combinado():
+    """
+    Personas con sus derechos (y las que no tienen ninguno) en una sola
+    consulta: Personas LEFT JOIN Persona_Derecho LEFT JOIN Derechos.
+    Filtros opcionales: Nombre, DPI, Derecho, Estado, Rol.
+    Admite ?limit=&after= y ?stream=1 igual que las demás colecciones.
+    """
+    consulta = personas_con_derechos()
+
+    # Filtros en SQL: el DPI por prefijo aprovecha su índice único
+    args = request.args
+    if args.get('Nombre'):
+        consulta = consulta.where(Persona.nombre.contains(args['Nombre'], autoescape=True))
+    if args.get('DPI'):
+        consulta = consulta.where(Persona.dpi.startswith(args['DPI'], autoescape=True))
+    if args.get('Derecho'):
+        consulta = consulta.where(Derecho.Nombre.contains(args['Derecho'], autoescape=True))
+    if args.get('Estado'):
+        consulta = consulta.where(Persona.estado == args['Estado'])
+    if args.get('Rol'):
+        consulta = consulta.where(Persona.rol == args['Rol'])
+
+    # Quien no tiene derechos aparece con ID_Derecho NULL; se ordena como 0
+    return respuesta_coleccion(
+        consulta,
+        [Persona.id_persona, db.func.coalesce(PersonaDerecho.ID_Derecho, 0)],
+        _detalle_combinado_a_dict,
+        llave=lambda f: [f.ID_Persona, f.ID_Derecho or 0]
+    )
 
 @api.route('/persona_derecho/<int:pe>/<int:de>', methods=['GET'])
+@condicional('Persona_Derecho')
 def get_persona_derecho(pe, de):
-    pd = PersonaDerecho.query.get_or_404((pe, de))
-    return jsonify({
-        'ID_Persona': pd.id_persona,
-        'ID_Derecho': pd.id_derecho,
-        'Fecha_Inicio': str(pd.fecha_inicio),
-        'Fecha_Fin': str(pd.fecha_fin) if pd.fecha_fin else None
-    }), 200
+    return respuesta_json(PERSONA_DERECHO.uno_o_404(pe, de))
 
 
 
@@ -260,9 +438,9 @@ def get_persona_derecho(pe, de):
 @api.route('/persona_derecho/<int:pe>/<int:de>', methods=['PUT'])
 def put_persona_derecho(pe, de):
     pd = PersonaDerecho.query.get_or_404((pe, de))
-    d = request.get_json()
-    if 'Fecha_Inicio' in d: pd.fecha_inicio = d['Fecha_Inicio']
-    if 'Fecha_Fin' in d: pd.fecha_fin = d['Fecha_Fin']
+    d = _con_fechas(request.get_json(), 'Fecha_Inicio', 'Fecha_Fin')
+    if 'Fecha_Inicio' in d: pd.Fecha_Inicio = d['Fecha_Inicio']
+    if 'Fecha_Fin' in d: pd.Fecha_Fin = d['Fecha_Fin']
     db.session.commit()
     return jsonify({'mensaje': 'Asignación actualizada'}), 200
 
@@ -274,178 +452,221 @@ def delete_persona_derecho(pe, de):
     return jsonify({'mensaje': 'Asignación eliminada'}), 200
 
 # --------------------- Pagos ---------------------
+
 @api.route('/pagos', methods=['GET'])
+@condicional('Pagos')
 def get_pagos():
-    pagos = Pago.query.all()
-    return jsonify([{
-        'ID_Pago': p.id_pago,
-        'ID_Persona': p.id_persona,
-        'ID_Cuota': p.id_cuota,
-        'Fecha_Pago': str(p.fecha_pago),
-        'Monto_Pagado': float(p.monto_pagado),
-        'Estado': p.estado
-    } for p in pagos]), 200
+    return respuesta_coleccion(PAGO.consulta(), PAGO.columnas_pk, PAGO)
 
 @api.route('/pagos/<int:id>', methods=['GET'])
+@condicional('Pagos')
 def get_pago(id):
-    p = Pago.query.get_or_404(id)
-    return jsonify({
-        'ID_Pago': p.id_pago,
-        'ID_Persona': p.id_persona,
-        'ID_Cuota': p.id_cuota,
-        'Fecha_Pago': str(p.fecha_pago),
-        'Monto_Pagado': float(p.monto_pagado),
-        'Estado': p.estado
-    }), 200
+    return respuesta_json(PAGO.uno_o_404(id))
 
 @api.route('/pagos', methods=['POST'])
+@con_reintentos
 def post_pago():
-    datos = request.get_json()
+    datos = _con_fechas(request.get_json(), 'Fecha_Pago')
     errores = validar_pago(datos)
     if errores:
         return jsonify({'errores': errores}),400
     pago = Pago.registrar_pago(
         datos['ID_Persona'], datos['ID_Cuota'], datos['Fecha_Pago'], datos['Monto_Pagado']
     )
-    return jsonify({'mensaje':'Pago registrado','ID_Pago': pago.id_pago}),201
+    return jsonify({'mensaje':'Pago registrado','ID_Pago': pago.ID_Pago}),201
+
+@api.route('/pagos/lote', methods=['POST'])
+def post_pagos_lote():
+    """
+    Registra muchos pagos (arreglo JSON o CSV en el campo 'archivo').
+    ?modo=todo_o_nada (por defecto) no inserta nada si alguna fila falla;
+    ?modo=omitir_invalidos inserta las válidas y reporta las demás.
+    """
+    modo = request.args.get('modo', 'todo_o_nada')
+    if modo not in MODOS:
+        return jsonify({'errores': [f"modo debe ser uno de: {', '.join(MODOS)}."]}), 400
+    filas, errores = leer_filas(request)
+    if errores:
+        return jsonify({'errores': errores}), 400
+
+    insertados, errores_filas = importar_pagos(filas, modo)
+    if errores_filas and modo == 'todo_o_nada':
+        return jsonify({'mensaje': 'No se registró ningún pago', 'insertados': 0, 'errores': errores_filas}), 400
+    return jsonify({
+        'mensaje': 'Pagos registrados',
+        'insertados': insertados,
+        'rechazados': len(errores_filas),
+        'errores': errores_filas
+    }), 201
 
 @api.route('/pagos/<int:id>', methods=['PUT'])
+@con_reintentos
 def put_pago(id):
     p = Pago.query.get_or_404(id)
-    d = request.get_json()
-    for key, attr in [('ID_Persona','id_persona'),('ID_Cuota','id_cuota'),('Fecha_Pago','fecha_pago'),('Monto_Pagado','monto_pagado'),('Estado','estado')]:
-        if key in d: setattr(p, attr, d[key])
+    d = _con_fechas(request.get_json(), 'Fecha_Pago')
+    # Se revierte el pago en su asignación original y el resultado se valida
+    # como un alta: el acumulado que lee validar_pago ya no incluye este pago
+    PersonaCuota.acumular_pago(p.ID_Persona, p.ID_Cuota, -p.Monto_Pagado)
+    errores = validar_pago({
+        clave: d.get(clave, getattr(p, clave))
+        for clave in ('ID_Persona', 'ID_Cuota', 'Fecha_Pago', 'Monto_Pagado')
+    }, anterior=p)
+    if errores:
+        db.session.rollback()
+        return jsonify({'errores': errores}), 400
+
+    for key in ['ID_Persona', 'ID_Cuota', 'Fecha_Pago', 'Monto_Pagado', 'Estado']:
+        if key in d: setattr(p, key, d[key])
+    # Sin fila en Persona_Cuota (pago suelto) se hace como en registrar_pago:
+    # se bloquea la persona y después se comprueba la suma de sus pagos
+    asignada = PersonaCuota.acumular_pago(p.ID_Persona, p.ID_Cuota, p.Monto_Pagado)
+    if not asignada:
+        bloquear_personas([p.ID_Persona])
+    # El ingreso del pago lo sigue, como en registrar_pago: el flush ajusta
+    # Saldo_Fondos y Resumen_Mensual con la diferencia
+    for ingreso in p.ingresos:
+        ingreso.Monto, ingreso.Fecha = p.Monto_Pagado, p.Fecha_Pago
+    db.session.flush()
+    if asignada:
+        verificar_acumulados([(p.ID_Persona, p.ID_Cuota)])
+    else:
+        verificar_pagos_sueltos([(p.ID_Persona, p.ID_Cuota)])
+    verificar_fondos(reintentar=False)
     db.session.commit()
     return jsonify({'mensaje': 'Pago actualizado'}), 200
 
 @api.route('/pagos/<int:id>', methods=['DELETE'])
+@con_reintentos
 def delete_pago(id):
     p = Pago.query.get_or_404(id)
+    PersonaCuota.acumular_pago(p.ID_Persona, p.ID_Cuota, -p.Monto_Pagado)
     db.session.delete(p)
+    # La baja arrastra el ingreso del pago: el saldo tampoco puede quedar negativo
+    db.session.flush()
+    verificar_fondos(reintentar=False)
     db.session.commit()
     return jsonify({'mensaje': 'Pago eliminado'}), 200
 
 @api.route('/pagos/cuota/<int:cuota_id>', methods=['GET'])
+@condicional('Persona_Cuota', 'Cuotas')
 def estado_cuota(cuota_id):
     persona_id = request.args.get('ID_Persona')
     if not persona_id:
         return jsonify({'error': 'ID_Persona requerido'}), 400
-    pc = PersonaCuota.query.get((int(persona_id), cuota_id))
+    # Una lectura por llave primaria: la asignación trae su cuota y el acumulado
+    pc = db.session.get(
+        PersonaCuota, (int(persona_id), cuota_id),
+        options=[db.joinedload(PersonaCuota.cuota)]
+    )
     if not pc:
         return jsonify({'error': 'Asignación no encontrada'}), 404
-    total_pagado = (db.session.query(db.func.sum(Pago.monto_pagado)).filter(Pago.id_persona == persona_id, Pago.id_cuota == cuota_id).scalar() or 0)
 
-    restante = pc.cuota.monto - total_pagado
-    return jsonify({'ID_Cuota':cuota_id, 'PagosRealizados':float(total_pagado), 'MontoRestante':float(restante), 'Estado':pc.estado}), 200
+    restante = pc.cuota.Monto - pc.Total_Pagado
+    return jsonify({'ID_Cuota':cuota_id, 'PagosRealizados':float(pc.Total_Pagado), 'MontoRestante':float(restante), 'Estado':pc.Estado}), 200
 
 # --------------------- Ingresos ---------------------
+
 @api.route('/ingresos', methods=['GET'])
+@condicional('Ingresos')
 def get_ingresos():
-    ingresos = Ingreso.query.all()
-    return jsonify([{
-        'ID_Ingreso': i.id_ingreso,
-        'Fecha': str(i.fecha),
-        'Monto': float(i.monto),
-        'Fuente': i.fuente,
-        'Observaciones': i.observaciones,
-        'ID_Pago': i.id_pago
-    } for i in ingresos]), 200
+    return respuesta_coleccion(INGRESO.consulta(), INGRESO.columnas_pk, INGRESO)
 
 @api.route('/ingresos/<int:id>', methods=['GET'])
+@condicional('Ingresos')
 def get_ingreso(id):
-    i = Ingreso.query.get_or_404(id)
-    return jsonify({
-        'ID_Ingreso': i.id_ingreso,
-        'Fecha': str(i.fecha),
-        'Monto': float(i.monto),
-        'Fuente': i.fuente,
-        'Observaciones': i.observaciones,
-        'ID_Pago': i.id_pago
-    }), 200
+    return respuesta_json(INGRESO.uno_o_404(id))
 
 @api.route('/ingresos', methods=['POST'])
 def post_ingreso():
-    datos = request.get_json()
+    datos = _con_fechas(request.get_json(), 'Fecha')
     errores = validar_ingreso(datos)
     if errores:
         return jsonify({'errores': errores}),400
     ing = Ingreso(
-        fecha=datos['Fecha'], monto=datos['Monto'], fuente=datos.get('Fuente'),
-        observaciones=datos.get('Observaciones'), id_pago=datos.get('ID_Pago')
+        Fecha=datos['Fecha'], Monto=datos['Monto'], Fuente=datos.get('Fuente'),
+        Observaciones=datos.get('Observaciones'), ID_Pago=datos.get('ID_Pago')
     )
     db.session.add(ing)
     db.session.commit()
-    return jsonify({'mensaje':'Ingreso creado','ID_Ingreso': ing.id_ingreso}),201
+    return jsonify({'mensaje':'Ingreso creado','ID_Ingreso': ing.ID_Ingreso}),201
 
 @api.route('/ingresos/<int:id>', methods=['PUT'])
+@con_reintentos
 def put_ingreso(id):
     ing = Ingreso.query.get_or_404(id)
-    d = request.get_json()
-    for key, attr in [('Fecha','fecha'),('Monto','monto'),('Fuente','fuente'),('Observaciones','observaciones')]:
-        if key in d: setattr(ing, attr, d[key])
+    d = _con_fechas(request.get_json(), 'Fecha')
+    for key in ['Fecha', 'Monto', 'Fuente', 'Observaciones']:
+        if key in d: setattr(ing, key, d[key])
+    db.session.flush()
+    verificar_fondos(reintentar=False)
     db.session.commit()
     return jsonify({'mensaje':'Ingreso actualizado'}),200
 
 @api.route('/ingresos/<int:id>', methods=['DELETE'])
+@con_reintentos
 def delete_ingreso(id):
     ing = Ingreso.query.get_or_404(id)
     db.session.delete(ing)
+    db.session.flush()
+    verificar_fondos(reintentar=False)
     db.session.commit()
     return jsonify({'mensaje':'Ingreso eliminado'}),200
 
 @api.route('/ingresos/total', methods=['GET'])
+@condicional('Ingresos')
 def total_ingresos():
-    total = db.session.query(db.func.sum(Ingreso.monto)).scalar() or 0
-    return jsonify({'total_ingresos': float(total)}), 200
+    saldo = obtener_saldo()
+    return jsonify({'total_ingresos': float(saldo.Total_Ingresos)}), 200
 
 # --------------------- Egresos ---------------------
+
 @api.route('/egresos', methods=['GET'])
+@condicional('Egresos')
 def get_egresos():
-    lista = Egreso.query.all()
-    return jsonify([{
-        'ID_Egreso': e.id_egreso,
-        'Fecha': str(e.fecha),
-        'Monto': float(e.monto),
-        'Descripcion': e.descripcion
-    } for e in lista]),200
+    return respuesta_coleccion(EGRESO.consulta(), EGRESO.columnas_pk, EGRESO)
 
 @api.route('/egresos/<int:id>', methods=['GET'])
+@condicional('Egresos')
 def get_egreso(id):
-    e = Egreso.query.get_or_404(id)
-    return jsonify({
-        'ID_Egreso': e.id_egreso,
-        'Fecha': str(e.fecha),
-        'Monto': float(e.monto),
-        'Descripcion': e.descripcion
-    }),200
+    return respuesta_json(EGRESO.uno_o_404(id))
 
 @api.route('/egresos', methods=['POST'])
+@con_reintentos
 def post_egreso():
-    datos = request.get_json()
+    datos = _con_fechas(request.get_json(), 'Fecha')
     errores = validar_egreso(datos)
     if errores:
         return jsonify({'errores': errores}), 400
 
     eg = Egreso(
-        fecha=datos['Fecha'],
-        monto=datos['Monto'],
-        descripcion=datos['Descripcion']
+        Fecha=datos['Fecha'],
+        Monto=datos['Monto'],
+        Descripcion=datos['Descripcion']
     )
     db.session.add(eg)
+    # El flush descuenta el saldo (UPDATE con bloqueo de fila); si otro
+    # egreso se adelantó desde la validación, se repite con el saldo nuevo
+    db.session.flush()
+    verificar_fondos()
     db.session.commit()
-    return jsonify({'mensaje':'Egreso creado','ID_Egreso': eg.id_egreso}),201
+    return jsonify({'mensaje':'Egreso creado','ID_Egreso': eg.ID_Egreso}),201
 
 
 @api.route('/egresos/<int:id>', methods=['PUT'])
+@con_reintentos
 def put_egreso(id):
     eg = Egreso.query.get_or_404(id)
-    d = request.get_json()
-    for key, attr in [('Fecha','fecha'),('Monto','monto'),('Descripcion','descripcion')]:
-        if key in d: setattr(eg, attr, d[key])
+    d = _con_fechas(request.get_json(), 'Fecha')
+    for key in ['Fecha', 'Monto', 'Descripcion']:
+        if key in d: setattr(eg, key, d[key])
+    # El flush ajusta el saldo con la fila bloqueada; el valor leído es el definitivo
+    db.session.flush()
+    verificar_fondos(reintentar=False)
     db.session.commit()
     return jsonify({'mensaje':'Egreso actualizado'}),200
 
 @api.route('/egresos/<int:id>', methods=['DELETE'])
+@con_reintentos
 def delete_egreso(id):
     eg = Egreso.query.get_or_404(id)
     db.session.delete(eg)
@@ -453,18 +674,159 @@ def delete_egreso(id):
     return jsonify({'mensaje':'Egreso eliminado'}),200
 
 @api.route('/fondos/disponibles', methods=['GET'])
+@condicional('Ingresos', 'Egresos')
 def fondos_disponibles():
-    total_i = db.session.query(db.func.sum(Ingreso.monto)).scalar() or 0
-    total_e = db.session.query(db.func.sum(Egreso.monto)).scalar() or 0
-    return jsonify({'fondos_disponibles': float(total_i - total_e)}),200
+    saldo = obtener_saldo()
+    return jsonify({'fondos_disponibles': float(saldo.disponible)}),200
 
 @api.route('/egresos/total', methods=['GET'])
+@condicional('Egresos')
 def total_egresos():
-    total = db.session.query(db.func.sum(Egreso.monto)).scalar() or 0
-    return jsonify({'total_egresos': float(total)}),200
+    saldo = obtener_saldo()
+    return jsonify({'total_egresos': float(saldo.Total_Egresos)}),200
+
+# --------------------- Reportes ---------------------
+@api.route('/reportes/mensual', methods=['GET'])
+@condicional('Ingresos', 'Egresos', 'Pagos')
+def get_reporte_mensual():
+    """
+    Ingresos, egresos, pagos y saldo al cierre por mes, desde Resumen_Mensual.
+    ?desde=AAAA-MM&hasta=AAAA-MM (por defecto, los últimos 36 meses).
+    """
+    hoy = date.today()
+    try:
+        hasta = leer_periodo(request.args['hasta']) if 'hasta' in request.args else (hoy.year, hoy.month)
+        desde = (leer_periodo(request.args['desde']) if 'desde' in request.args
+                 else sumar_meses(*hasta, 1 - MESES_POR_DEFECTO))
+    except ValueError as e:
+        return jsonify({'errores': [f"Periodo inválido '{e}': use el formato AAAA-MM."]}), 400
+    meses = (hasta[0] - desde[0]) * 12 + hasta[1] - desde[1] + 1
+    if meses < 1:
+        return jsonify({'errores': ['desde no puede ser posterior a hasta.']}), 400
+    if meses > MAXIMO_MESES:
+        return jsonify({'errores': [f'El periodo no puede pasar de {MAXIMO_MESES} meses.']}), 400
+
+    filas = reporte_mensual(desde, hasta)
+    return respuesta_json({
+        'desde': filas[0]['periodo'],
+        'hasta': filas[-1]['periodo'],
+        'meses': filas,
+        'totales': {
+            'ingresos': round(sum(f['ingresos'] for f in filas), 2),
+            'egresos': round(sum(f['egresos'] for f in filas), 2),
+            'pagos': sum(f['pagos'] for f in filas),
+        },
+    })
+
+def _morosidad_a_dict(f):
+    return {
+        'ID_Persona': f.ID_Persona,
+        'Nombre': f.Nombre,
+        'DPI': f.DPI,
+        'Telefono': f.Telefono,
+        'Deuda': float(f.Deuda),
+        'DeudaVencida': float(f.DeudaVencida),
+        'CuotasPendientes': f.CuotasPendientes,
+        'CuotasVencidas': f.CuotasVencidas,
+        'VencimientoMasAntiguo': f.VencimientoMasAntiguo.isoformat() if f.VencimientoMasAntiguo else None
+    }
+
+@api.route('/reportes/morosidad', methods=['GET'])
+@condicional('Personas', 'Cuotas', 'Persona_Cuota', 'Derecho_Cuota')
+def get_reporte_morosidad():
+    """
+    Personas con cuotas sin completar, de mayor a menor deuda pendiente,
+    con la parte vencida aparte; agrupadas en SQL (ver
+    app.utils.consultas.morosidad). ?ID_Derecho= limita a las cuotas
+    de ese derecho. Admite ?limit=&after=, ?stream=1 y ?formato=csv; el
+    cursor guarda (deuda, ID_Persona).
+    """
+    id_derecho = request.args.get('ID_Derecho')
+    if id_derecho is not None:
+        try:
+            id_derecho = int(id_derecho)
+        except ValueError:
+            return jsonify({'errores': ['ID_Derecho debe ser un entero.']}), 400
+
+    consulta, deuda = morosidad(id_derecho)
+    # Deuda descendente como "-deuda" ascendente, que es lo que pagina respuesta_coleccion
+    return respuesta_coleccion(
+        consulta, [-deuda, Persona.id_persona], _morosidad_a_dict,
+        llave=lambda f: [-float(f.Deuda), f.ID_Persona]
+    )
+
+@api.route('/reportes/estado-financiero', methods=['GET'])
+def get_estado_financiero():
+    """
+    Estado financiero completo en ?formato=pdf (por defecto) o csv.
+    Se genera en otro hilo y queda en disco mientras los datos no cambien:
+    si ya existe se envía de inmediato; si no termina dentro de
+    REPORTES_ESPERA segundos se responde 202 y el cliente vuelve a pedirlo.
+    """
+    formato = request.args.get('formato', 'pdf')
+    if formato not in estado_financiero.FORMATOS:
+        return jsonify({'errores': [f"formato debe ser uno de: {', '.join(estado_financiero.FORMATOS)}."]}), 400
+
+    app = current_app._get_current_object()
+    ruta, trabajo = estado_financiero.solicitar_estado(app, formato)
+    if trabajo is not None:
+        try:
+            trabajo.result(timeout=app.config['REPORTES_ESPERA'])
+        except TimeoutError:
+            return jsonify({'estado': 'generando', 'mensaje': 'El reporte se está generando; intente de nuevo.'}), \
+                202, {'Retry-After': '2'}
+    return send_file(
+        ruta, mimetype=estado_financiero.FORMATOS[formato], as_attachment=True,
+        download_name=f'estado_financiero_{date.today().isoformat()}.{formato}', max_age=0
+    )
 
 
 
+# --------------------- Trabajos en segundo plano ---------------------
+# Operaciones largas guardadas en la tabla Trabajos (ver app/utils/trabajos.py)
+@api.route('/jobs', methods=['POST'])
+def post_trabajo():
+    """
+    Encola un trabajo: {'Tipo': ..., 'Parametros': {...}} (tipos en
+    app/utils/tareas.py). Responde 202 con el estado y la cabecera
+    Location; el avance y el resultado se consultan en GET /jobs/<id>.
+    """
+    datos = request.get_json(silent=True) or {}
+    id_trabajo, errores = trabajos.encolar(datos.get('Tipo'), datos.get('Parametros', {}))
+    if errores:
+        return jsonify({'errores': errores}), 400
+    respuesta = respuesta_json(trabajos.detalle(id_trabajo), 202)
+    respuesta.headers['Location'] = url_for('api.get_trabajo', id=id_trabajo)
+    return respuesta
+
+@api.route('/jobs', methods=['GET'])
+def get_trabajos():
+    # ?Estado= y ?Tipo= filtran; ?limit=&after= como las demás listas
+    consulta = TRABAJO.consulta()
+    estado, tipo = request.args.get('Estado'), request.args.get('Tipo')
+    if estado:
+        if estado not in trabajos.ESTADOS:
+            return jsonify({'errores': [f"Estado debe ser uno de: {', '.join(trabajos.ESTADOS)}."]}), 400
+        consulta = consulta.where(Trabajo.Estado == estado)
+    if tipo:
+        consulta = consulta.where(Trabajo.Tipo == tipo)
+    return respuesta_coleccion(consulta, TRABAJO.columnas_pk, TRABAJO)
+
+@api.route('/jobs/<int:id>', methods=['GET'])
+def get_trabajo(id):
+    return respuesta_json(trabajos.detalle(id))
+
+@api.route('/jobs/<int:id>/cancelar', methods=['POST'])
+def cancelar_trabajo(id):
+    """Un trabajo pendiente se cancela al momento; uno en ejecución, en su siguiente punto de control."""
+    estado = trabajos.cancelar(id)
+    if estado is None:
+        abort(404)
+    if estado in (trabajos.COMPLETADO, trabajos.FALLIDO):
+        return jsonify({'errores': [f'El trabajo ya terminó ({estado}).']}), 409
+    return respuesta_json(trabajos.detalle(id))
+
+
 # --------------------- Vincular Derecho ↔ Cuota ---------------------
 @api.route('/derechos/<int:id_derecho>/vincular-cuota', methods=['POST'])
 def vincular_cuota_a_derecho(id_derecho):
@@ -488,14 +850,16 @@ def vincular_cuota_a_derecho(id_derecho):
     if existe:
         return jsonify({'errores': ['Esta cuota ya está vinculada a este derecho.']}), 400
 
-    # 3) Crear la relación
+    # 3) Crear la relación y, si se pide, asignar la cuota a los titulares actuales
     enlace = DerechoCuota(ID_Derecho=id_derecho, ID_Cuota=id_cuota)
     db.session.add(enlace)
+    asignadas = propagar_cuota(id_derecho, id_cuota) if datos.get('Propagar') else 0
     db.session.commit()
     return jsonify({
         'mensaje': 'Cuota vinculada al derecho exitosamente',
         'ID_Derecho': id_derecho,
-        'ID_Cuota': id_cuota
+        'ID_Cuota': id_cuota,
+        'cuotas_asignadas': asignadas
     }), 201
 
 
@@ -515,17 +879,35 @@ def post_derecho_cuota():
 
     enlace = DerechoCuota(ID_Derecho=id_d, ID_Cuota=id_c)
     db.session.add(enlace)
+    # Opcional: 'Propagar': true asigna la cuota a quienes ya tienen el derecho
+    asignadas = propagar_cuota(id_d, id_c) if datos.get('Propagar') else 0
     db.session.commit()
     return jsonify({
         'mensaje':'Vinculación creada',
         'ID_Derecho': id_d,
-        'ID_Cuota': id_c
+        'ID_Cuota': id_c,
+        'cuotas_asignadas': asignadas
     }), 201
 
 
+@api.route('/derecho_cuota/<int:id_d>/<int:id_c>', methods=['DELETE'])
+def delete_derecho_cuota(id_d, id_c):
+    """
+    Quita el vínculo Derecho ↔ Cuota. Con ?propagar=1 también retira la
+    cuota (sin pagos) a los titulares del derecho, en un solo DELETE.
+    """
+    enlace = DerechoCuota.query.get_or_404((id_d, id_c))
+    retiradas = 0
+    if request.args.get('propagar', '').lower() in ('1', 'true', 'si', 'sí'):
+        retiradas = retirar_cuota(id_d, id_c)
+    db.session.delete(enlace)
+    db.session.commit()
+    return jsonify({'mensaje': 'Vinculación eliminada', 'cuotas_retiradas': retiradas}), 200
+
+
 @api.route('/persona_derecho', methods=['POST'])
 def post_persona_derecho():
-    datos = request.get_json()
+    datos = _con_fechas(request.get_json(), 'Fecha_Inicio', 'Fecha_Fin')
     # 1) Validar datos básicos
     errores = validar_persona_derecho(datos)
     if errores:
@@ -544,15 +926,14 @@ def post_persona_derecho():
     db.session.add(pd)
 
     # 4) **Parte NUEVA**: por cada cuota vinculada al derecho,
-    #    creamos un PersonaCuota con estado 'Pendiente'
-    #    Suponemos que en PersonaDerecho tienes relación con Derecho:
-    #    pd.derecho → instancia de Derecho
-    for enlace in pd.derecho.cuotas_asociadas:
+    #    creamos un PersonaCuota con estado 'Pendiente' ('Vencido' si ya pasó su fecha)
+    #    Las cuotas del derecho salen del caché de referencias (solo se lee Version_Tabla)
+    for id_cuota, cuota in referencias.cuotas_para_asignar(datos['ID_Derecho']).items():
         pc = PersonaCuota(
-            ID_Persona = persona.ID_Persona,
-            ID_Cuota   = enlace.ID_Cuota,
+            ID_Persona = persona.id_persona,
+            ID_Cuota   = id_cuota,
             Fecha_Asig = datos['Fecha_Inicio'],
-            Estado     = 'Pendiente'
+            Estado     = estado_inicial(cuota.Fecha_Limite)
         )
         db.session.add(pc)
 
@@ -562,10 +943,27 @@ def post_persona_derecho():
     # 6) Responder con éxito
     return jsonify({
         'mensaje': 'Asignación creada y cuotas preasignadas',
-        'ID_Persona': persona.ID_Persona,
+        'ID_Persona': persona.id_persona,
         'ID_Derecho': datos['ID_Derecho']
     }), 201
 
     
 
 
+# --------------------- Métricas ---------------------
+@api.route('/_metrics/pool', methods=['GET'])
+def metricas_de_pool():
+    """Uso del pool de conexiones: saturación, espera de checkout y conexiones."""
+    return jsonify(metricas_pool(db.engine)), 200
+
+@api.route('/_metrics/cache', methods=['GET'])
+def metricas_de_cache():
+    """Aciertos, fallos e invalidaciones del caché de referencias."""
+    return jsonify(referencias.estadisticas()), 200
+
+@api.route('/_metrics', methods=['GET'])
+def metricas_prometheus():
+    """Latencias, respuestas y SQL por endpoint, más pool y caché, en formato Prometheus."""
+    extras = gauges('cocode_db_pool', metricas_pool(db.engine), 'Pool de conexiones (ver /api/_metrics/pool).')
+    extras += gauges('cocode_cache_referencias', referencias.estadisticas(), 'Caché de referencias (ver /api/_metrics/cache).')
+    return Response(metricas.texto_prometheus(extras), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,39 @@
+# app/utils/__init__.py
+# Utilidades compartidas por los módulos de app/utils
+
+from sqlalchemy import insert, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+TAMANO_BLOQUE_IN = 1000   # SQL Server admite ~2100 parámetros por sentencia
+
+
+def en_bloques(valores, tamano=TAMANO_BLOQUE_IN):
+    """Parte una secuencia en listas de `tamano` elementos."""
+    valores = list(valores)
+    for i in range(0, len(valores), tamano):
+        yield valores[i:i + tamano]
+
+
+def insertar_si_falta(session, tabla, valores):
+    """
+    INSERT de una fila que otra transacción puede estar insertando a la vez:
+    si su llave primaria ya existe no hace nada, en lugar de fallar por
+    llave duplicada. ON CONFLICT DO NOTHING en SQLite y PostgreSQL; en SQL
+    Server, INSERT ... SELECT WHERE NOT EXISTS con UPDLOCK, HOLDLOCK, que
+    bloquea la llave hasta el commit. Devuelve True si insertó la fila.
+    """
+    dialecto = session.get_bind().dialect.name
+    llave = list(tabla.primary_key.columns)
+    if dialecto in ('sqlite', 'postgresql'):
+        modulo = sqlite if dialecto == 'sqlite' else postgresql
+        sentencia = modulo.insert(tabla).values(**valores).on_conflict_do_nothing(index_elements=llave)
+    else:
+        existente = select(literal(1)).select_from(tabla)\
+            .where(*(columna == valores[columna.name] for columna in llave))\
+            .with_hint(tabla, 'WITH (UPDLOCK, HOLDLOCK)', 'mssql')
+        sentencia = insert(tabla).from_select(
+            list(valores),
+            select(*(literal(valor, tabla.c[clave].type) for clave, valor in valores.items()))
+            .where(~existente.exists())
+        )
+    return session.execute(sentencia).rowcount == 1
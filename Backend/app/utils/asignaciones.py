@@ -0,0 +1,168 @@
+# app/utils/asignaciones.py
+# Asignación de derechos y cuotas por conjuntos (muchas personas a la vez)
+
+from datetime import date, datetime
+
+from sqlalchemy import and_, exists, insert, literal, or_, select
+
+from app.extensions import db
+from app.models import Persona, PersonaDerecho, Cuota, DerechoCuota, PersonaCuota
+from app.utils import en_bloques
+from app.utils.referencias import referencias
+from app.utils.vencimientos import estado_inicial
+
+
+def ids_por_filtro(filtro):
+    """ID de las personas que cumplen el filtro (Estado, Rol, Nombre, DPI)."""
+    consulta = select(Persona.id_persona)
+    if filtro.get('Estado'):
+        consulta = consulta.where(Persona.estado == filtro['Estado'])
+    if filtro.get('Rol'):
+        consulta = consulta.where(Persona.rol == filtro['Rol'])
+    if filtro.get('Nombre'):
+        consulta = consulta.where(Persona.nombre.contains(filtro['Nombre'], autoescape=True))
+    if filtro.get('DPI'):
+        consulta = consulta.where(Persona.dpi.startswith(filtro['DPI'], autoescape=True))
+    return list(db.session.execute(consulta).scalars())
+
+
+def leer_asignacion(datos):
+    """
+    Valida el cuerpo de una asignación masiva: {'ID_Personas': [...]} o
+    {'Filtro': {...}}, más 'Fecha_Inicio' (por defecto hoy) y 'Fecha_Fin'.
+    Devuelve (ids, filtro, fecha_inicio, fecha_fin, errores).
+    """
+    errores = []
+    fechas = {}
+    for clave in ('Fecha_Inicio', 'Fecha_Fin'):
+        if datos.get(clave):
+            try:
+                fechas[clave] = datetime.strptime(datos[clave], '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                errores.append(f'{clave} debe ser YYYY-MM-DD.')
+
+    ids = datos.get('ID_Personas')
+    filtro = datos.get('Filtro')
+    if ids is None and filtro is None:
+        errores.append('Envíe ID_Personas o Filtro.')
+    elif ids is not None and (not isinstance(ids, list) or not all(isinstance(i, int) for i in ids)):
+        errores.append('ID_Personas debe ser una lista de enteros.')
+    elif filtro is not None and not isinstance(filtro, dict):
+        errores.append('Filtro debe ser un objeto.')
+    return ids, filtro, fechas.get('Fecha_Inicio', date.today()), fechas.get('Fecha_Fin'), errores
+
+
+def asignar_derecho_masivo(id_derecho, ids_persona, fecha_inicio, fecha_fin=None):
+    """
+    Asigna un derecho (y sus cuotas) a muchas personas con un solo commit.
+    Las cuotas del derecho salen del caché de referencias; los pares que
+    ya existen se omiten. Devuelve un diccionario con los conteos.
+    """
+    ids_persona = set(ids_persona)
+    refs = referencias.cuotas_para_asignar(id_derecho)
+    cuotas = list(refs)
+
+    existentes, con_derecho, con_cuota = set(), set(), set()
+    for bloque in en_bloques(ids_persona):
+        existentes.update(db.session.execute(
+            select(Persona.id_persona).where(Persona.id_persona.in_(bloque))
+        ).scalars())
+        con_derecho.update(db.session.execute(
+            select(PersonaDerecho.ID_Persona)
+            .where(PersonaDerecho.ID_Derecho == id_derecho, PersonaDerecho.ID_Persona.in_(bloque))
+        ).scalars())
+        if cuotas:
+            con_cuota.update(db.session.execute(
+                select(PersonaCuota.ID_Persona, PersonaCuota.ID_Cuota)
+                .where(PersonaCuota.ID_Persona.in_(bloque), PersonaCuota.ID_Cuota.in_(cuotas))
+            ).tuples())
+
+    nuevas_pd = [
+        {'ID_Persona': id_p, 'ID_Derecho': id_derecho, 'Fecha_Inicio': fecha_inicio, 'Fecha_Fin': fecha_fin}
+        for id_p in sorted(existentes - con_derecho)
+    ]
+    estados = {id_c: estado_inicial(ref.Fecha_Limite) for id_c, ref in refs.items()}
+    nuevas_pc = [
+        {'ID_Persona': id_p, 'ID_Cuota': id_c, 'Fecha_Asig': fecha_inicio, 'Estado': estados[id_c]}
+        for id_p in sorted(existentes) for id_c in cuotas
+        if (id_p, id_c) not in con_cuota
+    ]
+
+    try:
+        for bloque in en_bloques(nuevas_pd):
+            db.session.execute(insert(PersonaDerecho), bloque)
+        for bloque in en_bloques(nuevas_pc):
+            db.session.execute(insert(PersonaCuota), bloque)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return {
+        'personas_solicitadas': len(ids_persona),
+        'personas_no_encontradas': len(ids_persona - existentes),
+        'derechos_asignados': len(nuevas_pd),
+        'ya_tenian_derecho': len(con_derecho),
+        'cuotas_asignadas': len(nuevas_pc)
+    }
+
+
+def propagar_cuota(id_derecho, id_cuota, fecha_asig=None):
+    """
+    Asigna la cuota a todos los titulares vigentes del derecho
+    (Fecha_Fin nula o futura) con un solo INSERT ... SELECT que omite a
+    quienes ya la tienen. No hace commit. Devuelve las filas insertadas.
+    La fecha límite se lee de la sesión (quien llama ya cargó la cuota).
+    """
+    cuota = db.session.get(Cuota, id_cuota)
+    if cuota is None:
+        return 0
+    fecha_asig = fecha_asig or date.today()
+    pd = PersonaDerecho.__table__
+    pc = PersonaCuota.__table__
+    titulares = select(
+        pd.c.ID_Persona,
+        literal(id_cuota),
+        literal(fecha_asig, type_=pc.c.Fecha_Asig.type),
+        literal(estado_inicial(cuota.Fecha_Limite)),
+        literal(0, type_=pc.c.Total_Pagado.type)
+    ).where(
+        pd.c.ID_Derecho == id_derecho,
+        or_(pd.c.Fecha_Fin.is_(None), pd.c.Fecha_Fin > date.today()),
+        ~exists().where(pc.c.ID_Persona == pd.c.ID_Persona, pc.c.ID_Cuota == id_cuota)
+    )
+    resultado = db.session.execute(
+        pc.insert().from_select(
+            ['ID_Persona', 'ID_Cuota', 'Fecha_Asig', 'Estado', 'Total_Pagado'], titulares
+        )
+    )
+    return resultado.rowcount
+
+
+def retirar_cuota(id_derecho, id_cuota):
+    """
+    Inverso de propagar_cuota, con un solo DELETE: quita la cuota a los
+    titulares del derecho que todavía no han pagado nada y que no la
+    reciben por otro derecho vinculado. No hace commit.
+    Devuelve las filas eliminadas.
+    """
+    pd = PersonaDerecho.__table__
+    pc = PersonaCuota.__table__
+    dc = DerechoCuota.__table__
+    otro_pd = pd.alias('otro_pd')
+    por_otro_derecho = exists().where(
+        otro_pd.c.ID_Persona == pc.c.ID_Persona,
+        otro_pd.c.ID_Derecho != id_derecho,
+        dc.c.ID_Derecho == otro_pd.c.ID_Derecho,
+        dc.c.ID_Cuota == id_cuota
+    )
+    titulares = select(pd.c.ID_Persona).where(pd.c.ID_Derecho == id_derecho)
+    resultado = db.session.execute(
+        pc.delete().where(and_(
+            pc.c.ID_Cuota == id_cuota,
+            pc.c.Total_Pagado == 0,
+            pc.c.ID_Persona.in_(titulares),
+            ~por_otro_derecho
+        ))
+    )
+    return resultado.rowcount
@@ -0,0 +1,149 @@
+# app/utils/concurrencia.py
+# Escrituras de dinero seguras con varios workers: cada operación valida,
+# escribe y después comprueba el invariante sobre las filas que su UPDATE
+# dejó bloqueadas (acumulado de la cuota, saldo de fondos). Si otra
+# transacción se adelantó se deshace todo y se repite desde la validación.
+
+import logging
+import random
+import time
+from functools import wraps
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+
+from app.extensions import db
+from app.models import Persona, Cuota, PersonaCuota, Pago, SaldoFondos
+from app.utils import en_bloques
+from app.utils.saldos import ID_SALDO, cambio_disponible
+
+INTENTOS = 5
+ESPERA_BASE = 0.02   # segundos; se duplica en cada intento, con variación aleatoria
+
+logger = logging.getLogger(__name__)
+
+
+class ConflictoConcurrencia(Exception):
+    """Otra transacción cambió lo que se había validado; la operación se repite."""
+
+
+class FondosInsuficientes(Exception):
+    """
+    El cambio dejaría el saldo negativo. No se repite: el saldo leído con
+    la fila bloqueada ya es el definitivo. Las rutas responden 409.
+    """
+
+
+def es_conflicto(error):
+    """
+    Errores que se resuelven repitiendo la transacción: ConflictoConcurrencia,
+    escritor concurrente en SQLite, interbloqueo o tiempo de bloqueo en
+    SQL Server (1205, 1222) y fallas de serialización en PostgreSQL.
+    """
+    if isinstance(error, ConflictoConcurrencia):
+        return True
+    if not isinstance(error, DBAPIError) or error.orig is None:
+        return False
+    original = error.orig
+    texto = str(original).lower()
+    if 'database is locked' in texto or 'database table is locked' in texto:
+        return True
+    if getattr(original, 'pgcode', None) in ('40001', '40P01'):
+        return True
+    estado = str(original.args[0]) if getattr(original, 'args', None) else ''
+    return estado == '40001' or '(1205)' in texto or '(1222)' in texto
+
+
+def con_reintentos(funcion):
+    """
+    Repite `funcion` (validación y escritura completas) si choca con otra
+    transacción. Tras INTENTOS fallidos se propaga el error; las rutas
+    responden 409 para ConflictoConcurrencia.
+    """
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        for intento in range(1, INTENTOS + 1):
+            try:
+                return funcion(*args, **kwargs)
+            except Exception as e:
+                db.session.rollback()
+                if not es_conflicto(e) or intento == INTENTOS:
+                    raise
+                logger.info(f'{funcion.__name__}: conflicto de concurrencia (intento {intento}): {e}')
+                time.sleep(ESPERA_BASE * 2 ** (intento - 1) * random.uniform(0.5, 1.5))
+    return envoltura
+
+
+# --------------------- Comprobaciones después de escribir ---------------------
+# SQL Server no admite IN sobre tuplas: se filtra por personas y cuotas
+# y los pares se comparan en Python.
+
+def _agrupar(pares):
+    pares = set(pares)
+    return pares, sorted({p for p, _ in pares}), sorted({c for _, c in pares})
+
+
+def verificar_acumulados(pares):
+    """
+    Tras acumular pagos en Persona_Cuota: ningún Total_Pagado de `pares`
+    (ID_Persona, ID_Cuota) puede superar el monto de su cuota. Las filas ya
+    están bloqueadas por el UPDATE, así que se lee el valor definitivo.
+    """
+    pares, personas, cuotas = _agrupar(pares)
+    for bloque in en_bloques(personas):
+        for par in db.session.execute(
+            select(PersonaCuota.ID_Persona, PersonaCuota.ID_Cuota)
+            .join(Cuota, Cuota.ID_Cuota == PersonaCuota.ID_Cuota)
+            .where(PersonaCuota.ID_Persona.in_(bloque), PersonaCuota.ID_Cuota.in_(cuotas),
+                   PersonaCuota.Total_Pagado > Cuota.Monto)
+        ).tuples():
+            if par in pares:
+                raise ConflictoConcurrencia(f'Pagos simultáneos exceden la cuota {par}.')
+
+
+def bloquear_personas(ids_persona):
+    """
+    Bloqueo de fila (FOR UPDATE / UPDLOCK) de las personas, para pagos de
+    cuotas sin fila en Persona_Cuota: no hay acumulado que bloquear. Debe
+    hacerse antes de insertar los pagos; SQLite lo ignora (un solo escritor).
+    """
+    for bloque in en_bloques(sorted(set(ids_persona))):
+        db.session.execute(
+            select(Persona.id_persona).where(Persona.id_persona.in_(bloque)).with_for_update()
+        ).all()
+
+
+def verificar_pagos_sueltos(pares):
+    """Tras bloquear_personas e insertar: la suma de pagos de cada par no supera la cuota."""
+    pares, personas, cuotas = _agrupar(pares)
+    for bloque in en_bloques(personas):
+        for par in db.session.execute(
+            select(Pago.ID_Persona, Pago.ID_Cuota)
+            .join(Cuota, Cuota.ID_Cuota == Pago.ID_Cuota)
+            .where(Pago.ID_Persona.in_(bloque), Pago.ID_Cuota.in_(cuotas))
+            .group_by(Pago.ID_Persona, Pago.ID_Cuota, Cuota.Monto)
+            .having(func.sum(Pago.Monto_Pagado) > Cuota.Monto)
+        ).tuples():
+            if par in pares:
+                raise ConflictoConcurrencia(f'Pagos simultáneos exceden la cuota {par}.')
+
+
+def verificar_fondos(reintentar=True):
+    """
+    Tras el flush de un cambio de Ingresos o Egresos: si la transacción
+    bajó el disponible, el saldo no puede quedar negativo. Un cambio que lo
+    sube o no lo mueve se acepta aunque el saldo ya fuera negativo. El
+    UPDATE de Saldo_Fondos (ajustar_saldo) ya tiene la fila bloqueada. Con
+    `reintentar` (egresos nuevos, ya validados contra el saldo) se trata
+    como carrera y se repite; si no, FondosInsuficientes.
+    """
+    if cambio_disponible(db.session) >= 0:
+        return
+    tabla = SaldoFondos.__table__
+    disponible = db.session.execute(
+        select(tabla.c.Total_Ingresos - tabla.c.Total_Egresos).where(tabla.c.ID_Saldo == ID_SALDO)
+    ).scalar()
+    if disponible is not None and disponible < 0:
+        if reintentar:
+            raise ConflictoConcurrencia('Egresos simultáneos exceden los fondos disponibles.')
+        raise FondosInsuficientes(f'Fondos insuficientes: el cambio dejaría un saldo de Q{disponible:.2f}.')
@@ -0,0 +1,122 @@
+# app/utils/consultas.py
+# Consultas agregadas compartidas por las rutas y los reportes
+
+from datetime import date
+
+from app.extensions import db
+from app.models import Persona, Derecho, PersonaDerecho, Cuota, DerechoCuota, PersonaCuota, Pago
+
+ESTADOS_CUOTA = ('Completado', 'Pendiente', 'Vencido')
+
+
+def cuotas_agregadas():
+    """
+    Una sola consulta para todas las cuotas: Cuotas LEFT JOIN (Pagos
+    agrupados por cuota) LEFT JOIN (Persona_Cuota agrupada por cuota).
+    El estado se calcula en SQL para poder filtrarlo allí mismo.
+    Devuelve (consulta, expresión del estado).
+    """
+    pagos = db.select(
+        Pago.ID_Cuota.label('ID_Cuota'),
+        db.func.sum(Pago.Monto_Pagado).label('total'),
+        db.func.count(Pago.ID_Pago).label('cantidad')
+    ).group_by(Pago.ID_Cuota).subquery()
+
+    asignaciones = db.select(
+        PersonaCuota.ID_Cuota.label('ID_Cuota'),
+        db.func.count().label('participantes'),
+        db.func.sum(db.case((PersonaCuota.Estado == 'Completado', 1), else_=0)).label('completados'),
+        db.func.sum(db.case((PersonaCuota.Estado == 'Vencido', 1), else_=0)).label('vencidos')
+    ).group_by(PersonaCuota.ID_Cuota).subquery()
+
+    pagado        = db.func.coalesce(pagos.c.total, 0)
+    participantes = db.func.coalesce(asignaciones.c.participantes, 0)
+    esperado      = Cuota.Monto * participantes
+    estado = db.case(
+        (db.and_(participantes > 0, pagado >= esperado), 'Completado'),
+        (Cuota.Fecha_Limite < date.today(), 'Vencido'),
+        else_='Pendiente'
+    )
+
+    consulta = db.select(
+        Cuota.ID_Cuota.label('ID_Cuota'),
+        Cuota.Descripcion.label('Descripcion'),
+        Cuota.Monto.label('Monto'),
+        Cuota.Fecha_Limite.label('Fecha_Limite'),
+        pagado.label('PagosRealizados'),
+        db.func.coalesce(pagos.c.cantidad, 0).label('NumeroPagos'),
+        participantes.label('Participantes'),
+        db.func.coalesce(asignaciones.c.completados, 0).label('Completados'),
+        db.func.coalesce(asignaciones.c.vencidos, 0).label('Vencidos'),
+        estado.label('Estado')
+    ).select_from(Cuota)\
+     .outerjoin(pagos, pagos.c.ID_Cuota == Cuota.ID_Cuota)\
+     .outerjoin(asignaciones, asignaciones.c.ID_Cuota == Cuota.ID_Cuota)
+    return consulta, estado
+
+
+def personas_con_derechos():
+    """
+    Personas con sus derechos (y las que no tienen ninguno, con ID_Derecho
+    NULL): Personas LEFT JOIN Persona_Derecho LEFT JOIN Derechos.
+    """
+    return db.select(
+        Persona.id_persona.label('ID_Persona'),
+        Persona.nombre.label('Nombre'),
+        Persona.dpi.label('DPI'),
+        Persona.email.label('Email'),
+        Persona.telefono.label('Telefono'),
+        Persona.rol.label('Rol'),
+        Persona.estado.label('Estado'),
+        PersonaDerecho.ID_Derecho.label('ID_Derecho'),
+        Derecho.Nombre.label('Derecho'),
+        PersonaDerecho.Fecha_Inicio.label('Fecha_Inicio'),
+        PersonaDerecho.Fecha_Fin.label('Fecha_Fin')
+    ).select_from(Persona)\
+     .outerjoin(PersonaDerecho, PersonaDerecho.ID_Persona == Persona.id_persona)\
+     .outerjoin(Derecho, Derecho.ID_Derecho == PersonaDerecho.ID_Derecho)
+
+
+def morosidad(id_derecho=None):
+    """
+    Deuda por persona en una sola consulta agrupada sobre las asignaciones
+    sin completar ('Pendiente' y 'Vencido', índice de Persona_Cuota.Estado):
+    saldo pendiente (Monto - Total_Pagado) de todas ellas y, aparte, la
+    parte vencida, cuántas cuotas vencidas hay y el vencimiento más antiguo.
+    `id_derecho` limita a las cuotas vinculadas a ese derecho.
+    Devuelve (consulta, expresión de la deuda) para ordenar y paginar.
+    """
+    saldo   = Cuota.Monto - PersonaCuota.Total_Pagado
+    vencida = PersonaCuota.Estado == 'Vencido'
+    tipo    = PersonaCuota.Total_Pagado.type
+    pendientes = db.select(
+        PersonaCuota.ID_Persona.label('ID_Persona'),
+        # Redondeada en SQL: SQLite suma en coma flotante y el cursor compara por igualdad
+        db.func.round(db.func.sum(saldo), 2, type_=tipo).label('deuda'),
+        db.func.round(db.func.sum(db.case((vencida, saldo), else_=0)), 2, type_=tipo).label('deuda_vencida'),
+        db.func.count().label('cuotas'),
+        db.func.sum(db.case((vencida, 1), else_=0)).label('vencidas'),
+        db.func.min(db.case((vencida, Cuota.Fecha_Limite))).label('mas_antigua')
+    ).select_from(PersonaCuota)\
+     .join(Cuota, Cuota.ID_Cuota == PersonaCuota.ID_Cuota)\
+     .where(PersonaCuota.Estado.in_(('Pendiente', 'Vencido')))\
+     .group_by(PersonaCuota.ID_Persona)
+    if id_derecho is not None:
+        pendientes = pendientes.where(PersonaCuota.ID_Cuota.in_(
+            db.select(DerechoCuota.ID_Cuota).where(DerechoCuota.ID_Derecho == id_derecho)
+        ))
+    pendientes = pendientes.subquery()
+
+    consulta = db.select(
+        Persona.id_persona.label('ID_Persona'),
+        Persona.nombre.label('Nombre'),
+        Persona.dpi.label('DPI'),
+        Persona.telefono.label('Telefono'),
+        pendientes.c.deuda.label('Deuda'),
+        pendientes.c.deuda_vencida.label('DeudaVencida'),
+        pendientes.c.cuotas.label('CuotasPendientes'),
+        pendientes.c.vencidas.label('CuotasVencidas'),
+        pendientes.c.mas_antigua.label('VencimientoMasAntiguo')
+    ).select_from(pendientes)\
+     .join(Persona, Persona.id_persona == pendientes.c.ID_Persona)
+    return consulta, pendientes.c.deuda
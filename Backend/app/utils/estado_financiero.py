@@ -0,0 +1,267 @@
+# app/utils/estado_financiero.py
+# Estado financiero descargable (PDF o CSV) generado en el servidor.
+# Las filas se leen por bloques (yield_per) y se escriben directamente al
+# archivo; la generación corre en un hilo aparte y el resultado queda en
+# disco con el nombre derivado de las versiones de las tablas, así una
+# descarga repetida sin cambios en los datos se sirve del archivo.
+
+import csv
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Ingreso, Egreso
+from app.utils import pdf
+from app.utils.consultas import cuotas_agregadas, personas_con_derechos
+from app.utils.resumen import reporte_mensual, sumar_meses
+from app.utils.saldos import obtener_saldo
+from app.utils.versiones import versiones
+
+VERSION_FORMATO = 2   # subir cuando cambie el contenido o el diseño del reporte
+FORMATOS = {'pdf': 'application/pdf', 'csv': 'text/csv'}
+PREFIJO = 'estado_financiero'
+FILAS_POR_LECTURA = 1000
+MESES_RESUMEN = 12
+
+# Tablas que alimentan el reporte: si ninguna cambió, el archivo sirve
+TABLAS = ('Personas', 'Derechos', 'Persona_Derecho', 'Cuotas', 'Persona_Cuota', 'Pagos', 'Ingresos', 'Egresos')
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------- Columnas ---------------------
+# (título, ancho relativo en el PDF, tipo): el tipo decide el formato
+# El módulo csv ya escribe None como vacío y las fechas en ISO: solo se convierte el dinero
+FORMATOS_CSV = {
+    'texto': None,
+    'entero': None,
+    'dinero': lambda v: f'{float(v or 0):.2f}',
+    'fecha': None,
+}
+
+COLUMNAS_MENSUAL = (('Periodo', 10, 'texto'), ('Ingresos', 16, 'dinero'), ('Egresos', 16, 'dinero'),
+                    ('Pagos', 8, 'entero'), ('Saldo al cierre', 18, 'dinero'))
+COLUMNAS_CUOTAS = (('ID', 6, 'entero'), ('Descripción', 34, 'texto'), ('Monto', 11, 'dinero'),
+                   ('Fecha límite', 12, 'fecha'), ('Participantes', 13, 'entero'), ('Completados', 12, 'entero'),
+                   ('Recaudado', 14, 'dinero'), ('Pendiente', 14, 'dinero'), ('Estado', 10, 'texto'))
+COLUMNAS_PERSONAS = (('ID', 7, 'entero'), ('Nombre', 32, 'texto'), ('DPI', 14, 'texto'), ('Teléfono', 11, 'texto'),
+                     ('Rol', 14, 'texto'), ('Estado', 9, 'texto'), ('Derecho', 26, 'texto'),
+                     ('Inicio', 11, 'fecha'), ('Fin', 11, 'fecha'))
+COLUMNAS_INGRESOS = (('ID', 8, 'entero'), ('Fecha', 11, 'fecha'), ('Monto', 13, 'dinero'), ('Fuente', 30, 'texto'),
+                     ('Pago', 8, 'entero'), ('Observaciones', 60, 'texto'))
+COLUMNAS_EGRESOS = (('ID', 8, 'entero'), ('Fecha', 11, 'fecha'), ('Monto', 13, 'dinero'),
+                    ('Descripción', 100, 'texto'))
+
+
+# --------------------- Salidas ---------------------
+class SalidaCSV:
+    """Una sección tras otra: fila de título, encabezados, datos y una fila vacía."""
+
+    def __init__(self, archivo, titulo):
+        self.escritor = csv.writer(archivo)
+        self.escritor.writerow([titulo])
+
+    def titulo(self, texto):
+        pass
+
+    def seccion(self, texto):
+        self.escritor.writerow([])
+        self.escritor.writerow([texto])
+
+    def pares(self, filas):
+        for etiqueta, valor, tipo in filas:
+            convertir = FORMATOS_CSV[tipo]
+            self.escritor.writerow([etiqueta, convertir(valor) if convertir else valor])
+
+    def tabla(self, columnas, filas):
+        self.escritor.writerow([titulo for titulo, _, _ in columnas])
+        conversiones = [(i, FORMATOS_CSV[tipo]) for i, (_, _, tipo) in enumerate(columnas) if FORMATOS_CSV[tipo]]
+        for fila in filas:
+            fila = list(fila)
+            for i, convertir in conversiones:
+                fila[i] = convertir(fila[i])
+            self.escritor.writerow(fila)
+
+    def cerrar(self):
+        pass
+
+
+def _abrir(ruta, formato, titulo):
+    if formato == 'pdf':
+        archivo = open(ruta, 'wb')
+        return archivo, pdf.DocumentoPDF(archivo, titulo, fuente=current_app.config['REPORTES_FUENTE'])
+    # BOM para que Excel reconozca UTF-8 (tildes y eñes)
+    archivo = open(ruta, 'w', encoding='utf-8-sig', newline='')
+    return archivo, SalidaCSV(archivo, titulo)
+
+
+# --------------------- Contenido ---------------------
+def _leer(consulta):
+    """
+    Filas por bloques de FILAS_POR_LECTURA sin cargar el resultado completo.
+    Son columnas sueltas: se ejecutan en la conexión (Core), sin la capa ORM.
+    """
+    return db.session.connection().execute(consulta.execution_options(yield_per=FILAS_POR_LECTURA))
+
+
+def escribir_estado(salida, hoy):
+    """Secciones del estado financiero, en el orden del documento."""
+    saldo = obtener_saldo()
+    salida.titulo('Estado financiero - COCODE')
+    salida.pares([('Fecha de corte', hoy, 'fecha'),
+                  ('Generado', datetime.now().strftime('%Y-%m-%d %H:%M'), 'texto')])
+
+    salida.seccion('Balance')
+    salida.pares([('Total de ingresos (Q)', saldo.Total_Ingresos, 'dinero'),
+                  ('Total de egresos (Q)', saldo.Total_Egresos, 'dinero'),
+                  ('Fondos disponibles (Q)', saldo.disponible, 'dinero')])
+
+    salida.seccion(f'Resumen de los últimos {MESES_RESUMEN} meses')
+    hasta = (hoy.year, hoy.month)
+    salida.tabla(COLUMNAS_MENSUAL, (
+        (m['periodo'], m['ingresos'], m['egresos'], m['pagos'], m['saldo_cierre'])
+        for m in reporte_mensual(sumar_meses(*hasta, 1 - MESES_RESUMEN), hasta)
+    ))
+
+    salida.seccion('Estado de cobro por cuota')
+    consulta, _ = cuotas_agregadas()
+    salida.tabla(COLUMNAS_CUOTAS, (
+        (f.ID_Cuota, f.Descripcion, f.Monto, f.Fecha_Limite, f.Participantes, f.Completados,
+         f.PagosRealizados, max(f.Monto * f.Participantes - f.PagosRealizados, 0), f.Estado)
+        for f in _leer(consulta.order_by(consulta.selected_columns.ID_Cuota))
+    ))
+
+    salida.seccion('Personas y derechos')
+    consulta = personas_con_derechos()
+    salida.tabla(COLUMNAS_PERSONAS, (
+        (f.ID_Persona, f.Nombre, f.DPI, f.Telefono, f.Rol, f.Estado,
+         f.Derecho if f.ID_Derecho else 'Sin derechos', f.Fecha_Inicio, f.Fecha_Fin)
+        for f in _leer(consulta.order_by(consulta.selected_columns.ID_Persona,
+                                         consulta.selected_columns.ID_Derecho))
+    ))
+
+    salida.seccion('Ingresos')
+    salida.tabla(COLUMNAS_INGRESOS, _leer(
+        select(Ingreso.ID_Ingreso, Ingreso.Fecha, Ingreso.Monto, Ingreso.Fuente, Ingreso.ID_Pago,
+               Ingreso.Observaciones).order_by(Ingreso.Fecha, Ingreso.ID_Ingreso)
+    ))
+
+    salida.seccion('Egresos')
+    salida.tabla(COLUMNAS_EGRESOS, _leer(
+        select(Egreso.ID_Egreso, Egreso.Fecha, Egreso.Monto, Egreso.Descripcion)
+        .order_by(Egreso.Fecha, Egreso.ID_Egreso)
+    ))
+
+
+# --------------------- Caché en disco ---------------------
+def clave_estado(formato, hoy):
+    """
+    Nombre del archivo para los datos actuales: versiones de las tablas
+    (Version_Tabla), fecha de corte (los estados 'Vencido' dependen de
+    ella) y formato. Los totales de Saldo_Fondos distinguen además una base
+    restaurada o vuelta a sembrar, donde los contadores pueden repetirse.
+    """
+    actuales = versiones(db.session, TABLAS)
+    saldo = obtener_saldo()
+    partes = [str(VERSION_FORMATO), formato, hoy.isoformat(), str(saldo.Total_Ingresos), str(saldo.Total_Egresos)]
+    partes += [f'{t}={actuales.get(t, 0)}' for t in TABLAS]
+    return f"{PREFIJO}_{hoy.isoformat()}_{hashlib.sha1('|'.join(partes).encode()).hexdigest()[:16]}.{formato}"
+
+
+def _limpiar(directorio, conservar):
+    """Borra los reportes más antiguos, dejando los `conservar` más recientes."""
+    archivos = sorted(
+        (e for e in os.scandir(directorio) if e.name.startswith(PREFIJO) and not e.name.endswith('.tmp')),
+        key=lambda e: e.stat().st_mtime, reverse=True
+    )
+    for entrada in archivos[conservar:]:
+        try:
+            os.remove(entrada.path)
+        except OSError:
+            pass   # otro worker lo borró o lo está sirviendo
+
+
+def _generar(app, ruta, formato, hoy):
+    """Escribe el reporte en un temporal y lo renombra: nunca se sirve un archivo a medias."""
+    inicio = datetime.now()
+    with app.app_context():
+        try:
+            descriptor, temporal = tempfile.mkstemp(prefix=PREFIJO, suffix='.tmp', dir=os.path.dirname(ruta))
+            os.close(descriptor)
+            try:
+                archivo, salida = _abrir(temporal, formato, 'Estado financiero - COCODE')
+                with archivo:
+                    escribir_estado(salida, hoy)
+                    salida.cerrar()
+                os.replace(temporal, ruta)
+            except BaseException:
+                os.remove(temporal)
+                raise
+        finally:
+            db.session.remove()
+        _limpiar(os.path.dirname(ruta), app.config['REPORTES_CONSERVAR'])
+    logger.info(f'Estado financiero generado: {os.path.basename(ruta)} '
+                f'en {(datetime.now() - inicio).total_seconds():.2f}s')
+    return ruta
+
+
+class GeneradorReportes:
+    """
+    Hilos de generación del proceso. Si llegan varias peticiones por el
+    mismo archivo mientras se genera, todas esperan el mismo trabajo.
+    """
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self._ejecutor = None
+        self._en_curso = {}   # ruta -> Future
+
+    def solicitar(self, app, ruta, formato, hoy):
+        """Future del archivo `ruta`: el trabajo en curso o uno nuevo."""
+        if not app.config['REPORTES_HILOS']:
+            # Sin hilos (SQLite en memoria: cada hilo vería otra base vacía)
+            trabajo = Future()
+            trabajo.set_result(_generar(app, ruta, formato, hoy))
+            return trabajo
+        with self._candado:
+            trabajo = self._en_curso.get(ruta)
+            if trabajo is None:
+                if self._ejecutor is None:
+                    self._ejecutor = ThreadPoolExecutor(app.config['REPORTES_HILOS'], thread_name_prefix='reportes')
+                trabajo = self._ejecutor.submit(_generar, app, ruta, formato, hoy)
+                self._en_curso[ruta] = trabajo
+                trabajo.add_done_callback(lambda _: self._terminado(ruta))
+            return trabajo
+
+    def _terminado(self, ruta):
+        with self._candado:
+            self._en_curso.pop(ruta, None)
+
+
+generador = GeneradorReportes()
+
+
+def directorio_reportes(app):
+    directorio = app.config['REPORTES_DIRECTORIO'] or os.path.join(app.instance_path, 'reportes')
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def solicitar_estado(app, formato):
+    """
+    (ruta, None) si el archivo de los datos actuales ya existe; si no,
+    (ruta, trabajo) con la generación en curso en otro hilo.
+    """
+    hoy = date.today()
+    ruta = os.path.join(directorio_reportes(app), clave_estado(formato, hoy))
+    if os.path.exists(ruta):
+        return ruta, None
+    return ruta, generador.solicitar(app, ruta, formato, hoy)
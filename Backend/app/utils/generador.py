@@ -0,0 +1,270 @@
+# app/utils/generador.py
+# Datos sintéticos para pruebas de carga y benchmarks (`flask seed`).
+# Con la misma semilla y la misma fecha base se generan exactamente las
+# mismas filas. Todo se escribe con INSERT por lote de Core, por bloques.
+
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import delete, insert, select
+
+from app.extensions import db
+from app.models import (
+    Persona, Derecho, PersonaDerecho, Cuota, DerechoCuota,
+    PersonaCuota, Pago, Ingreso, Egreso
+)
+from app.utils.saldos import ajustar_saldo, obtener_saldo
+from app.utils.resumen import acumular, ajustar_resumen
+from app.utils.vencimientos import estado_inicial
+from app.utils.validaciones import ROLES_UNICOS
+
+CERO = Decimal('0')
+
+# Municipios por departamento (01 Guatemala … 22 Jutiapa), para los dígitos 10-13 del DPI
+MUNICIPIOS = (17, 8, 16, 16, 13, 14, 30, 8, 24, 21, 9, 30, 32, 12, 8, 17, 14, 5, 11, 11, 7, 17)
+
+NOMBRES = ('María', 'José', 'Juan', 'Ana', 'Luis', 'Carmen', 'Carlos', 'Rosa', 'Pedro', 'Marta',
+           'Jorge', 'Sofía', 'Miguel', 'Lucía', 'Manuel', 'Elena', 'Francisco', 'Julia', 'Diego', 'Olga')
+APELLIDOS = ('López', 'García', 'Pérez', 'Hernández', 'Morales', 'Méndez', 'Castillo', 'Ramírez',
+             'Cruz', 'Ortiz', 'Reyes', 'Ajú', 'Xicará', 'Chávez', 'Juárez', 'Gómez', 'Tzul', 'Coc')
+
+# (Nombre, monto de cada cuota)
+DERECHOS = (
+    ('Agua potable', Decimal('50')), ('Energía eléctrica', Decimal('35')),
+    ('Drenaje', Decimal('25')), ('Recolección de basura', Decimal('15')),
+    ('Alumbrado público', Decimal('10')), ('Salón comunal', Decimal('100')),
+)
+MESES = ('enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio',
+         'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre')
+
+# Destino de cada asignación ya exigible: pagada completa, abono parcial o sin pago
+PROBABILIDAD_COMPLETA = 0.6
+PROBABILIDAD_PARCIAL = 0.2
+PROPORCION_EGRESOS = Decimal('0.6')   # los egresos nunca pasan del 60 % de lo recaudado
+
+# Orden de borrado respetando las llaves foráneas
+TABLAS_VACIAR = (Ingreso, Pago, PersonaCuota, PersonaDerecho, DerechoCuota, Egreso, Cuota, Derecho, Persona)
+
+
+def dpi(serie, departamento, municipio):
+    """
+    CUI de 13 dígitos: 8 de serie, verificador (módulo 11 con pesos 2..9),
+    departamento y municipio. None si la serie da verificador 10 (no existe).
+    """
+    digitos = f'{serie:08d}'
+    verificador = sum(int(d) * peso for d, peso in zip(digitos, range(2, 10))) % 11
+    if verificador == 10:
+        return None
+    return f'{digitos}{verificador}{departamento:02d}{municipio:02d}'
+
+
+class Generador:
+    """
+    Genera el padrón en bloques de `bloque` personas: cada bloque inserta
+    sus personas, derechos, asignaciones de cuota, pagos e ingresos y hace
+    commit, así la memoria no crece con el tamaño.
+    """
+
+    def __init__(self, personas, semilla=2025, fecha_base=None, derechos=4,
+                 cuotas_por_derecho=6, bloque=5000, progreso=None):
+        self.personas = personas
+        self.azar = random.Random(semilla)
+        self.fecha_base = fecha_base or date.today()
+        self.derechos = min(derechos, len(DERECHOS))
+        self.cuotas_por_derecho = cuotas_por_derecho
+        self.bloque = bloque
+        self.progreso = progreso or (lambda mensaje: None)
+        self.conteos = dict.fromkeys(
+            ('personas', 'derechos', 'cuotas', 'derecho_cuota', 'persona_derecho',
+             'persona_cuota', 'pagos', 'ingresos', 'egresos'), 0)
+        self.recaudado = CERO
+        self._serie = 10_000_000
+
+    # ----- utilidades -----
+    def _insertar(self, modelo, filas, conteo):
+        for i in range(0, len(filas), self.bloque):
+            db.session.execute(insert(modelo), filas[i:i + self.bloque])
+        self.conteos[conteo] += len(filas)
+
+    def _insertar_con_ids(self, modelo, columna, filas, conteo):
+        """
+        Como _insertar, pero devuelve el ID asignado a cada fila, en el orden
+        de `filas` (RETURNING / OUTPUT). No se deducen del máximo: las
+        identidades de SQL Server pueden saltar valores.
+        """
+        ids = []
+        for i in range(0, len(filas), self.bloque):
+            ids += db.session.execute(
+                insert(modelo).returning(columna, sort_by_parameter_order=True), filas[i:i + self.bloque]
+            ).scalars().all()
+        self.conteos[conteo] += len(filas)
+        return ids
+
+    def _siguiente_dpi(self):
+        while True:
+            self._serie += 1
+            departamento = self.azar.randrange(len(MUNICIPIOS)) + 1
+            valor = dpi(self._serie, departamento, self.azar.randrange(MUNICIPIOS[departamento - 1]) + 1)
+            if valor:
+                return valor
+
+    # ----- catálogos -----
+    def _catalogos(self):
+        """Derechos y sus cuotas mensuales, la mitad ya vencidas respecto de la fecha base."""
+        nombres = [nombre for nombre, _ in DERECHOS[:self.derechos]]
+        self._insertar(Derecho, [{'Nombre': nombre} for nombre in nombres], 'derechos')
+        ids_derecho = dict(db.session.execute(
+            select(Derecho.Nombre, Derecho.ID_Derecho).where(Derecho.Nombre.in_(nombres))
+        ).all())
+
+        cuotas = []
+        for nombre, monto in DERECHOS[:self.derechos]:
+            for k in range(self.cuotas_por_derecho):
+                # Día 28 de cada mes, antes y después de la fecha base
+                meses = k - self.cuotas_por_derecho // 2
+                limite = _sumar_meses(self.fecha_base.replace(day=28), meses)
+                cuotas.append({'Descripcion': f'{nombre} {MESES[limite.month - 1]} {limite.year}',
+                               'Monto': monto, 'Fecha_Limite': limite, '_derecho': nombre})
+        self._insertar(Cuota, [{k: v for k, v in c.items() if k != '_derecho'} for c in cuotas], 'cuotas')
+        ids_cuota = dict(db.session.execute(
+            select(Cuota.Descripcion, Cuota.ID_Cuota).where(Cuota.Descripcion.in_([c['Descripcion'] for c in cuotas]))
+        ).all())
+
+        self.cuotas_de = {ids_derecho[n]: [] for n in nombres}   # ID_Derecho -> [(ID_Cuota, Monto, Fecha_Limite)]
+        for c in cuotas:
+            self.cuotas_de[ids_derecho[c['_derecho']]].append((ids_cuota[c['Descripcion']], c['Monto'], c['Fecha_Limite']))
+        self._insertar(DerechoCuota, [
+            {'ID_Derecho': id_d, 'ID_Cuota': id_c} for id_d, lista in self.cuotas_de.items() for id_c, _, _ in lista
+        ], 'derecho_cuota')
+        self.ids_derecho = list(self.cuotas_de)
+        db.session.commit()
+
+    # ----- padrón -----
+    def _personas(self, inicio, cantidad):
+        filas = []
+        for i in range(inicio, inicio + cantidad):
+            nombre = f'{self.azar.choice(NOMBRES)} {self.azar.choice(APELLIDOS)} {self.azar.choice(APELLIDOS)}'
+            filas.append({
+                'dpi': self._siguiente_dpi(),
+                'nombre': nombre,
+                'direccion': f'{self.azar.randrange(1, 30)}a. calle {self.azar.randrange(1, 40)}-{self.azar.randrange(1, 99):02d}, zona {self.azar.randrange(1, 19)}',
+                'telefono': f'{self.azar.choice("3457")}{self.azar.randrange(10 ** 7):07d}',
+                'email': f'{nombre.split()[0].lower()}{i}@correo.com'.translate(_SIN_TILDES),
+                # Los roles únicos los ocupan las primeras personas, una cada uno
+                'rol': ROLES_UNICOS[i] if i < len(ROLES_UNICOS) else 'Sin rol',
+                'estado': 'Inactivo' if self.azar.random() < 0.03 else 'Activo',
+            })
+        return self._insertar_con_ids(Persona, Persona.id_persona, filas, 'personas')
+
+    def _pagos_de(self, id_persona, id_cuota, monto, limite):
+        """Pagos de una asignación según su destino; devuelve (pagos, total)."""
+        if limite > self.fecha_base + timedelta(days=30):
+            return [], CERO   # aún no se cobra
+        destino = self.azar.random()
+        if destino < PROBABILIDAD_COMPLETA:
+            # Completa en uno o dos abonos
+            partes = [monto] if self.azar.random() < 0.7 else [(monto / 2).quantize(Decimal('0.01'))] * 2
+            partes[-1] = monto - sum(partes[:-1])
+        elif destino < PROBABILIDAD_COMPLETA + PROBABILIDAD_PARCIAL:
+            partes = [(monto * Decimal(self.azar.choice((20, 40, 50, 75))) / 100).quantize(Decimal('0.01'))]
+        else:
+            return [], CERO
+        pagos = []
+        for parte in partes:
+            fecha = min(limite + timedelta(days=self.azar.randrange(-30, 16)), self.fecha_base)
+            pagos.append({'ID_Persona': id_persona, 'ID_Cuota': id_cuota, 'Fecha_Pago': fecha,
+                          'Monto_Pagado': parte, 'Estado': 'Pendiente'})
+        return pagos, sum(partes)
+
+    def _bloque(self, inicio, cantidad):
+        ids = self._personas(inicio, cantidad)
+        asignacion = self.fecha_base - timedelta(days=400)
+        persona_derecho, persona_cuota, pagos = [], [], []
+        for id_persona in ids:
+            # Todos tienen el primer derecho; cada uno de los demás con 40 % de probabilidad
+            derechos = [self.ids_derecho[0]] + [d for d in self.ids_derecho[1:] if self.azar.random() < 0.4]
+            for id_derecho in derechos:
+                persona_derecho.append({'ID_Persona': id_persona, 'ID_Derecho': id_derecho,
+                                        'Fecha_Inicio': asignacion, 'Fecha_Fin': None})
+                for id_cuota, monto, limite in self.cuotas_de[id_derecho]:
+                    nuevos, total = self._pagos_de(id_persona, id_cuota, monto, limite)
+                    pagos += nuevos
+                    persona_cuota.append({'ID_Persona': id_persona, 'ID_Cuota': id_cuota, 'Fecha_Asig': asignacion,
+                                          'Estado': 'Completado' if total >= monto else estado_inicial(limite),
+                                          'Total_Pagado': total})
+        self._insertar(PersonaDerecho, persona_derecho, 'persona_derecho')
+        self._insertar(PersonaCuota, persona_cuota, 'persona_cuota')
+
+        # Resumen y saldo antes de los inserts por lote (no pasan por el flush, ver ajustar_saldo)
+        total, deltas = sum((p['Monto_Pagado'] for p in pagos), CERO), {}
+        for p in pagos:
+            acumular(deltas, p['Fecha_Pago'], ingresos=p['Monto_Pagado'], pagos=1)
+        ajustar_resumen(db.session, deltas)
+        ajustar_saldo(db.session, total, CERO)
+        ids_pago = self._insertar_con_ids(Pago, Pago.ID_Pago, pagos, 'pagos')
+        self._insertar(Ingreso, [
+            {'Fecha': p['Fecha_Pago'], 'Monto': p['Monto_Pagado'], 'Fuente': 'Pago de cuota', 'ID_Pago': id_pago}
+            for p, id_pago in zip(pagos, ids_pago)
+        ], 'ingresos')
+        self.recaudado += total
+        db.session.commit()
+
+    def _egresos(self):
+        """Un egreso por cada 20 personas, sin pasar de PROPORCION_EGRESOS de los fondos disponibles."""
+        limite = obtener_saldo().disponible * PROPORCION_EGRESOS
+        filas, total = [], CERO
+        conceptos = ('Compra de cloro', 'Reparación de tubería', 'Pago de guardián', 'Papelería',
+                     'Mantenimiento de bomba', 'Limpieza de tanque', 'Energía del pozo')
+        for i in range(max(self.personas // 20, 1)):
+            monto = Decimal(self.azar.randrange(50, 1500))
+            if total + monto > limite:
+                break
+            total += monto
+            filas.append({'Fecha': self.fecha_base - timedelta(days=self.azar.randrange(365)), 'Monto': monto,
+                          'Descripcion': f'{self.azar.choice(conceptos)} #{i + 1}'})
+        deltas = {}
+        for e in filas:
+            acumular(deltas, e['Fecha'], egresos=e['Monto'])
+        ajustar_resumen(db.session, deltas)
+        ajustar_saldo(db.session, CERO, total)
+        self._insertar(Egreso, filas, 'egresos')
+        db.session.commit()
+
+    def generar(self):
+        """Escribe todo y devuelve (conteos, segundos)."""
+        inicio = time.perf_counter()
+        try:
+            self._catalogos()
+            for desde in range(0, self.personas, self.bloque):
+                self._bloque(desde, min(self.bloque, self.personas - desde))
+                self.progreso(f"{self.conteos['personas']}/{self.personas} personas, {self.conteos['pagos']} pagos")
+            self._egresos()
+        except Exception:
+            db.session.rollback()
+            raise
+        return self.conteos, time.perf_counter() - inicio
+
+
+_SIN_TILDES = str.maketrans('áéíóúñÁÉÍÓÚÑ', 'aeiounAEIOUN')
+
+
+def _sumar_meses(fecha, meses):
+    total = fecha.year * 12 + fecha.month - 1 + meses
+    return fecha.replace(year=total // 12, month=total % 12 + 1)
+
+
+def hay_datos():
+    return db.session.execute(select(Persona.id_persona).limit(1)).first() is not None
+
+
+def vaciar():
+    """Borra todas las tablas del padrón y reinicia el saldo y el resumen mensual."""
+    from app.utils.saldos import recalcular_saldo
+    from app.utils.resumen import recalcular_resumen
+    for modelo in TABLAS_VACIAR:
+        db.session.execute(delete(modelo))
+    db.session.commit()
+    recalcular_saldo()
+    recalcular_resumen()
@@ -0,0 +1,166 @@
+# app/utils/importacion.py
+# Importación masiva (JSON o CSV) con validación por conjuntos e inserción por lotes
+
+import csv
+import io
+import json
+import time
+from decimal import Decimal
+
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import Persona, Cuota, PersonaCuota, Pago, Ingreso
+from app.utils import TAMANO_BLOQUE_IN, en_bloques
+from app.utils.saldos import ajustar_saldo
+from app.utils.resumen import acumular, ajustar_resumen
+from app.utils.concurrencia import (
+    INTENTOS, bloquear_personas, con_reintentos, verificar_acumulados, verificar_pagos_sueltos
+)
+from app.utils.validaciones import (
+    ContextoValidacion, validar_lote, revisar_pago, revisar_persona
+)
+
+MODOS = ('todo_o_nada', 'omitir_invalidos')
+
+
+def leer_filas(peticion):
+    """
+    Obtiene las filas de la petición: archivo CSV en el campo 'archivo',
+    cuerpo text/csv, o JSON (arreglo de objetos).
+    Devuelve (filas, errores).
+    """
+    if 'archivo' in peticion.files:
+        texto = peticion.files['archivo'].read().decode('utf-8-sig')
+        return list(csv.DictReader(io.StringIO(texto))), []
+    if peticion.mimetype == 'text/csv':
+        texto = peticion.get_data().decode('utf-8-sig')
+        return list(csv.DictReader(io.StringIO(texto))), []
+    datos = peticion.get_json(silent=True)
+    if not isinstance(datos, list) or not all(isinstance(f, dict) for f in datos):
+        return [], ['Se esperaba un arreglo JSON de objetos o un archivo CSV.']
+    return datos, []
+
+
+def leer_archivo(ruta):
+    """Filas de un archivo .json (arreglo de objetos) o .csv, para la CLI."""
+    if ruta.lower().endswith('.json'):
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+    with open(ruta, encoding='utf-8-sig', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+@con_reintentos
+def importar_pagos(filas, modo='todo_o_nada'):
+    """
+    Valida e inserta un lote de pagos con sus ingresos en una sola
+    transacción. Devuelve (insertados, errores_por_fila); si el modo es
+    'todo_o_nada' y alguna fila falla, no se inserta nada.
+    Si otro proceso pagó las mismas cuotas entre la validación y el commit,
+    se repite todo con los acumulados nuevos (ver app/utils/concurrencia.py).
+    """
+    # Personas, montos de cuota y acumulados: un IN por bloque para todo el lote
+    ctx = ContextoValidacion.para_pagos(filas)
+    validos, errores = validar_lote(revisar_pago, filas, ctx)
+    if not validos or (errores and modo == 'todo_o_nada'):
+        return 0, errores
+    for pago in validos:
+        pago['Estado'] = 'Pendiente'
+
+    deltas, sueltos = {}, set()
+    for p in validos:
+        par = (p['ID_Persona'], p['ID_Cuota'])
+        if par in ctx.asignados:
+            deltas[par] = deltas.get(par, Decimal('0')) + p['Monto_Pagado']
+        else:
+            sueltos.add(par)
+
+    try:
+        # 1) Acumulados y estado de Persona_Cuota, una sentencia por lote.
+        #    Va primero: el UPDATE bloquea las filas hasta el commit (en orden
+        #    fijo, para que dos lotes no se bloqueen mutuamente)
+        if deltas:
+            tabla = PersonaCuota.__table__
+            nuevo_total = tabla.c.Total_Pagado + bindparam('b_delta')
+            db.session.execute(
+                tabla.update()
+                .where(tabla.c.ID_Persona == bindparam('b_persona'), tabla.c.ID_Cuota == bindparam('b_cuota'))
+                .values(
+                    Total_Pagado=nuevo_total,
+                    Estado=PersonaCuota.estado_por_total(nuevo_total, bindparam('b_cuota'))
+                ),
+                [{'b_persona': p, 'b_cuota': c, 'b_delta': d} for (p, c), d in sorted(deltas.items())]
+            )
+        bloquear_personas(p for p, _ in sueltos)
+
+        # 2) Los inserts por lote no pasan por el flush: el resumen mensual y
+        #    el saldo se ajustan aquí, antes de escribir (ver ajustar_saldo)
+        meses = {}
+        for p in validos:
+            acumular(meses, p['Fecha_Pago'], ingresos=p['Monto_Pagado'], pagos=1)
+        ajustar_resumen(db.session, meses)
+        ajustar_saldo(db.session, sum(p['Monto_Pagado'] for p in validos), Decimal('0'))
+
+        # 3) Pagos en un solo executemany, recuperando los ID en orden
+        ids_pago = db.session.execute(
+            insert(Pago).returning(Pago.ID_Pago, sort_by_parameter_order=True),
+            validos
+        ).scalars().all()
+
+        # 4) Ingresos asociados, también en lote
+        db.session.execute(insert(Ingreso), [
+            {'Fecha': p['Fecha_Pago'], 'Monto': p['Monto_Pagado'], 'ID_Pago': id_pago}
+            for p, id_pago in zip(validos, ids_pago)
+        ])
+
+        # 5) Ninguna cuota quedó sobrepagada por un pago simultáneo
+        verificar_acumulados(deltas)
+        verificar_pagos_sueltos(sueltos)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(validos), errores
+
+
+# --------------------- Personas ---------------------
+def importar_personas(filas, modo='todo_o_nada', tamano_bloque=TAMANO_BLOQUE_IN):
+    """
+    Valida e inserta un padrón de personas en una sola transacción.
+    - DPI repetidos dentro del archivo y contra la base: una consulta IN por bloque.
+    - Roles únicos: una consulta para los ocupados, los conflictos se resuelven en memoria.
+    - Inserción por bloques con executemany.
+    Devuelve (insertados, errores_por_fila, segundos).
+    """
+    inicio = time.perf_counter()
+    filas = [{'Rol': 'Sin rol', 'Estado': 'Activo', **{k: v for k, v in f.items() if v not in (None, '')}}
+             for f in filas]
+    limpias, errores = validar_lote(revisar_persona, filas, ContextoValidacion.para_personas(filas))
+    for intento in range(1, INTENTOS + 1):
+        if not limpias or (errores and modo == 'todo_o_nada'):
+            return 0, errores, time.perf_counter() - inicio
+
+        validas = [{
+            'dpi': p['DPI'], 'nombre': p['Nombre'], 'direccion': p['Direccion'],
+            'telefono': p['Telefono'], 'email': p['Email'], 'rol': p['Rol'], 'estado': p['Estado']
+        } for p in limpias]
+        try:
+            for bloque in en_bloques(validas, tamano_bloque):
+                db.session.execute(insert(Persona), bloque)
+            db.session.commit()
+            return len(validas), errores, time.perf_counter() - inicio
+        except IntegrityError:
+            # Otra transacción registró alguno de los DPI después de la
+            # validación: se valida de nuevo y esas filas salen como error de
+            # su fila. Si la validación no rechaza ninguna fila más, la causa
+            # es otra y se propaga.
+            db.session.rollback()
+            rechazadas = len(errores)
+            limpias, errores = validar_lote(revisar_persona, filas, ContextoValidacion.para_personas(filas))
+            if len(errores) == rechazadas or intento == INTENTOS:
+                raise
+        except Exception:
+            db.session.rollback()
+            raise
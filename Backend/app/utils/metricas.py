@@ -0,0 +1,159 @@
+# app/utils/metricas.py
+# Latencia por endpoint, códigos de estado y SQL por petición, en formato
+# de texto de Prometheus. Las cifras son del proceso (un worker).
+
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_SQL = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class _Histograma:
+    """Histograma acumulativo al estilo Prometheus (buckets, suma y conteo)."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.cuentas = [0] * len(buckets)
+        self.suma = 0.0
+        self.conteo = 0
+
+    def observar(self, valor):
+        self.suma += valor
+        self.conteo += 1
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                self.cuentas[i] += 1
+
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.latencia = defaultdict(lambda: _Histograma(BUCKETS_LATENCIA))
+            self.sql_sentencias = defaultdict(lambda: _Histograma(BUCKETS_SQL))
+            self.sql_segundos = defaultdict(float)
+            self.respuestas = defaultdict(int)
+
+    def registrar(self, endpoint, metodo, estado, segundos, sentencias, segundos_sql):
+        clave = (endpoint, metodo)
+        with self._lock:
+            self.latencia[clave].observar(segundos)
+            self.sql_sentencias[clave].observar(sentencias)
+            self.sql_segundos[clave] += segundos_sql
+            self.respuestas[(endpoint, metodo, str(estado))] += 1
+
+    # ----- exposición -----
+    def texto_prometheus(self, extras=()):
+        """Todas las series en formato de texto 0.0.4; `extras` son líneas ya formateadas."""
+        lineas = []
+        with self._lock:
+            self._histogramas(lineas, 'cocode_http_request_duration_seconds',
+                              'Latencia de las peticiones a /api por endpoint.', self.latencia)
+            self._histogramas(lineas, 'cocode_sql_statements_per_request',
+                              'Sentencias SQL ejecutadas por petición.', self.sql_sentencias)
+            lineas += ['# HELP cocode_sql_duration_seconds_total Tiempo en SQL por endpoint.',
+                       '# TYPE cocode_sql_duration_seconds_total counter']
+            for (endpoint, metodo), total in sorted(self.sql_segundos.items()):
+                lineas.append(f'cocode_sql_duration_seconds_total{_etiquetas(endpoint=endpoint, method=metodo)} {total:.6f}')
+            lineas += ['# HELP cocode_http_requests_total Respuestas por endpoint y código de estado.',
+                       '# TYPE cocode_http_requests_total counter']
+            for (endpoint, metodo, estado), total in sorted(self.respuestas.items()):
+                lineas.append(f'cocode_http_requests_total{_etiquetas(endpoint=endpoint, method=metodo, status=estado)} {total}')
+        lineas += list(extras)
+        return '\n'.join(lineas) + '\n'
+
+    @staticmethod
+    def _histogramas(lineas, nombre, ayuda, series):
+        lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} histogram']
+        for (endpoint, metodo), h in sorted(series.items()):
+            for limite, cuenta in zip(h.buckets, h.cuentas):
+                lineas.append(f'{nombre}_bucket{_etiquetas(endpoint=endpoint, method=metodo, le=_numero(limite))} {cuenta}')
+            lineas.append(f'{nombre}_bucket{_etiquetas(endpoint=endpoint, method=metodo, le="+Inf")} {h.conteo}')
+            lineas.append(f'{nombre}_sum{_etiquetas(endpoint=endpoint, method=metodo)} {h.suma:.6f}')
+            lineas.append(f'{nombre}_count{_etiquetas(endpoint=endpoint, method=metodo)} {h.conteo}')
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _etiquetas(**valores):
+    partes = []
+    for clave, valor in valores.items():
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{clave}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+def gauges(prefijo, valores, ayuda):
+    """Líneas de gauges numéricos (p. ej. métricas del pool o del caché)."""
+    lineas = []
+    for clave, valor in valores.items():
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            continue
+        lineas += [f'# HELP {prefijo}_{clave} {ayuda}', f'# TYPE {prefijo}_{clave} gauge',
+                   f'{prefijo}_{clave} {valor}']
+    return lineas
+
+
+metricas = Metricas()
+
+
+# --------------------- SQL por petición ---------------------
+def instrumentar_sql(engine):
+    """Cuenta sentencias y tiempo en SQL de la petición en curso."""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _antes(conexion, cursor, sentencia, parametros, contexto, executemany):
+        conexion.info.setdefault('metricas_inicio', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _despues(conexion, cursor, sentencia, parametros, contexto, executemany):
+        inicio = conexion.info['metricas_inicio'].pop()
+        if has_request_context() and 'metricas_inicio' in g:
+            g.metricas_sql_n += 1
+            g.metricas_sql_t += time.perf_counter() - inicio
+
+    @event.listens_for(engine, 'handle_error')
+    def _error(contexto):
+        # La sentencia falló: after_cursor_execute no se llamará
+        if contexto.connection is not None:
+            pila = contexto.connection.info.get('metricas_inicio')
+            if pila:
+                pila.pop()
+
+
+# --------------------- Ganchos del blueprint ---------------------
+def iniciar_medicion():
+    g.metricas_inicio = time.perf_counter()
+    g.metricas_sql_n = 0
+    g.metricas_sql_t = 0.0
+
+
+def terminar_medicion(respuesta):
+    """
+    Registra la petición y, si METRICAS_SERVER_TIMING está activo, agrega
+    Server-Timing. En respuestas en streaming se mide hasta el primer byte.
+    """
+    if 'metricas_inicio' not in g or request.endpoint is None:
+        return respuesta
+    segundos = time.perf_counter() - g.metricas_inicio
+    # Se agrupa por la regla (/api/personas/<int:id>), no por la URL concreta
+    endpoint = request.url_rule.rule if request.url_rule else request.endpoint
+    if not endpoint.startswith('/api/_metrics'):
+        metricas.registrar(endpoint, request.method, respuesta.status_code,
+                           segundos, g.metricas_sql_n, g.metricas_sql_t)
+    if current_app.config.get('METRICAS_SERVER_TIMING'):
+        respuesta.headers['Server-Timing'] = (
+            f'app;dur={segundos * 1000:.1f}, '
+            f'sql;dur={g.metricas_sql_t * 1000:.1f};desc="{g.metricas_sql_n} sentencias"'
+        )
+    return respuesta
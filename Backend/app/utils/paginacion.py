@@ -0,0 +1,175 @@
+# app/utils/paginacion.py
+# Paginación por llave (keyset) y respuestas JSON en streaming para las colecciones
+
+import base64
+import binascii
+import csv
+import io
+import json
+
+from flask import Response, jsonify, request, stream_with_context
+from sqlalchemy import and_, or_
+
+from app.extensions import db
+from app.utils.serializadores import a_json, respuesta_json
+
+LIMITE_MAXIMO = 1000        # Tope de filas por página
+TAMANO_LOTE_STREAM = 500    # Filas que trae el cursor del servidor en cada viaje
+FORMATOS = ('json', 'csv')
+
+
+def codificar_cursor(valores):
+    """
+    Convierte los valores de la llave primaria de la última fila en un
+    cursor opaco (base64 URL-safe de una lista JSON).
+    """
+    crudo = json.dumps(list(valores), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor, cantidad):
+    """
+    Inverso de codificar_cursor. Lanza ValueError si el cursor no es válido
+    o no tiene tantos valores como columnas tiene la llave.
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError('Cursor inválido.')
+    if not isinstance(valores, list) or len(valores) != cantidad:
+        raise ValueError('Cursor inválido.')
+    return valores
+
+
+def filtro_despues_de(columnas, valores):
+    """
+    Condición "fila > cursor" sobre una llave (posiblemente compuesta).
+    Se expande a (a > x) OR (a = x AND b > y) ... porque SQL Server
+    no admite comparación de tuplas.
+    """
+    condiciones = []
+    for i, columna in enumerate(columnas):
+        iguales = [columnas[j] == valores[j] for j in range(i)]
+        condiciones.append(and_(*iguales, columna > valores[i]))
+    return or_(*condiciones)
+
+
+def _leer_parametros():
+    """
+    Lee ?limit=, ?after=, ?stream= y ?formato= de la petición.
+    Devuelve (limite, cursor, stream, formato, errores).
+    """
+    errores = []
+    limite = request.args.get('limit')
+    if limite is not None:
+        try:
+            limite = int(limite)
+            if limite <= 0:
+                raise ValueError
+        except ValueError:
+            errores.append('limit debe ser un entero positivo.')
+            limite = None
+        else:
+            limite = min(limite, LIMITE_MAXIMO)
+    cursor = request.args.get('after') or None
+    stream = request.args.get('stream', '').lower() in ('1', 'true', 'si', 'sí')
+    formato = request.args.get('formato', 'json').lower()
+    if formato not in FORMATOS:
+        errores.append(f"formato debe ser uno de: {', '.join(FORMATOS)}.")
+    return limite, cursor, stream, formato, errores
+
+
+def _filas(consulta):
+    """Filas desde un cursor del servidor, de TAMANO_LOTE_STREAM en TAMANO_LOTE_STREAM."""
+    return db.session.execute(consulta.execution_options(yield_per=TAMANO_LOTE_STREAM))
+
+
+def _generar_json(consulta, serializar):
+    """Produce el arreglo JSON fila por fila desde un cursor del servidor."""
+    yield b'['
+    primero = True
+    for fila in _filas(consulta):
+        if not primero:
+            yield b','
+        yield a_json(serializar(fila))
+        primero = False
+    yield b']'
+
+
+def _generar_csv(consulta, serializar):
+    """CSV con encabezado (claves del serializador) enviado por lotes de filas."""
+    buffer = io.StringIO()
+    escritor = None
+    for fila in _filas(consulta):
+        datos = serializar(fila)
+        if escritor is None:
+            escritor = csv.DictWriter(buffer, fieldnames=getattr(serializar, 'claves', list(datos)))
+            escritor.writeheader()
+        escritor.writerow(datos)
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if escritor is None and hasattr(serializar, 'claves'):
+        csv.writer(buffer).writerow(serializar.claves)
+    yield buffer.getvalue()
+
+
+def respuesta_coleccion(consulta, columnas_pk, serializar, llave=None):
+    """
+    Responde una colección ordenada por su llave primaria.
+    `consulta` es un select() de columnas y `serializar(fila)` la convierte
+    a diccionario (normalmente un Serializador, ver app.utils.serializadores).
+    `llave(fila)` obtiene los valores del cursor; por defecto se usa
+    serializar.llave.
+
+    - Sin parámetros: lista JSON completa (comportamiento original).
+    - ?limit=N[&after=CURSOR]: página por llave, devuelve
+      {'datos': [...], 'siguiente': CURSOR | None}.
+    - ?stream=1[&after=CURSOR]: arreglo JSON enviado fila por fila con
+      yield_per, la memoria se mantiene plana sin importar el tamaño.
+    - ?formato=csv[&limit=N&after=CURSOR]: exportación CSV en streaming,
+      con las mismas columnas que el JSON.
+    """
+    limite, cursor, stream, formato, errores = _leer_parametros()
+    if cursor:
+        try:
+            valores = decodificar_cursor(cursor, len(columnas_pk))
+        except ValueError as e:
+            errores.append(str(e))
+        else:
+            consulta = consulta.where(filtro_despues_de(columnas_pk, valores))
+    if errores:
+        return jsonify({'errores': errores}), 400
+
+    consulta = consulta.order_by(*columnas_pk)
+
+    if formato == 'csv':
+        if limite is not None:
+            consulta = consulta.limit(limite)
+        return Response(
+            stream_with_context(_generar_csv(consulta, serializar)),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=export.csv'}
+        )
+
+    if stream:
+        return Response(
+            stream_with_context(_generar_json(consulta, serializar)),
+            mimetype='application/json'
+        )
+
+    if limite is None:
+        return respuesta_json([serializar(fila) for fila in db.session.execute(consulta)])
+
+    # Se pide una fila extra para saber si existe otra página
+    filas = db.session.execute(consulta.limit(limite + 1)).all()
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = codificar_cursor((llave or serializar.llave)(filas[-1]))
+    return respuesta_json({
+        'datos': [serializar(fila) for fila in filas],
+        'siguiente': siguiente
+    })
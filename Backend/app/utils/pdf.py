@@ -0,0 +1,164 @@
+# app/utils/pdf.py
+# Reportes tabulares en PDF con reportlab (canvas): título, secciones,
+# pares etiqueta: valor y tablas. Las celdas se parten en varias líneas
+# dentro del ancho de su columna, el encabezado de la tabla se repite en
+# cada página y cada página lleva pie con su número. Misma interfaz que
+# SalidaCSV de app/utils/estado_financiero.py.
+
+import os
+
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+ANCHO, ALTO = landscape(A4)
+MARGEN = 36
+TAMANO_TABLA = 7.5
+INTERLINEA = 10
+SEPARACION = 4         # puntos libres a la derecha de cada columna
+FUENTES_ESTANDAR = ('Helvetica', 'Helvetica-Bold')
+
+
+def _dinero(valor):
+    return f'{float(valor or 0):,.2f}'
+
+
+# Texto de cada tipo de columna (ver las columnas en estado_financiero.py)
+FORMATOS = {
+    'texto': lambda v: '' if v is None else str(v),
+    'entero': lambda v: '' if v is None else str(v),
+    'dinero': _dinero,
+    'fecha': lambda v: v.isoformat() if v else '',
+}
+A_LA_DERECHA = ('entero', 'dinero')
+
+
+def registrar_fuente(ruta):
+    """
+    Fuente TrueType (se incrusta) para texto fuera de cp1252, que es lo
+    único que cubren las fuentes estándar de PDF. Devuelve (normal, negrita):
+    la misma fuente para ambas.
+    """
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    if nombre not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(nombre, ruta))
+    return nombre, nombre
+
+
+class DocumentoPDF:
+    """
+    Uso:
+        with open(ruta, 'wb') as archivo:
+            doc = DocumentoPDF(archivo, 'Título')
+            doc.titulo('...'); doc.tabla(columnas, filas)
+            doc.cerrar()
+    `fuente` es la ruta de un .ttf; sin ella se usa Helvetica.
+    """
+
+    def __init__(self, archivo, titulo, pie=None, fuente=None):
+        self.lienzo = canvas.Canvas(archivo, pagesize=(ANCHO, ALTO), pageCompression=1)
+        self.lienzo.setTitle(titulo)
+        self.lienzo.setCreator('SISTEMA_COCODE')
+        self.pie = pie or titulo
+        self.normal, self.negrita = registrar_fuente(fuente) if fuente else FUENTES_ESTANDAR
+        self.paginas = 0
+        self.y = None              # None: no hay página abierta
+        self._encabezado = None    # se dibuja al empezar cada página dentro de una tabla
+
+    # --------------------- Páginas ---------------------
+    def _cerrar_pagina(self):
+        if self.y is None:
+            return
+        self.paginas += 1
+        self.lienzo.setFont(self.normal, 7)
+        self.lienzo.drawString(MARGEN, MARGEN / 2, f'{self.pie} - página {self.paginas}')
+        self.lienzo.showPage()
+        self.y = None
+
+    def espacio(self, alto):
+        """Garantiza `alto` puntos libres; si no caben, empieza otra página."""
+        if self.y is not None and self.y - alto >= MARGEN:
+            return
+        self._cerrar_pagina()
+        self.y = ALTO - MARGEN
+        if self._encabezado:
+            self._encabezado()
+
+    def _linea(self, texto, fuente, tamano, alto):
+        self.espacio(alto)
+        self.y -= alto
+        self.lienzo.setFont(fuente, tamano)
+        self.lienzo.drawString(MARGEN, self.y, texto)
+
+    def salto(self, alto=INTERLINEA):
+        if self.y is not None:
+            self.y -= alto
+
+    # --------------------- Interfaz de salida ---------------------
+    def titulo(self, texto):
+        self._linea(texto, self.negrita, 16, 24)
+
+    def seccion(self, texto):
+        self.espacio(60)   # el título no queda solo al pie de la página
+        self.salto(6)
+        self._linea(texto, self.negrita, 12, 20)
+
+    def pares(self, filas):
+        for etiqueta, valor, tipo in filas:
+            self._linea(f'{etiqueta}: {FORMATOS[tipo](valor)}', self.normal, 10, 14)
+
+    def tabla(self, columnas, filas):
+        """
+        `columnas`: (título, ancho relativo, tipo); el ancho útil de la
+        página se reparte en proporción. `filas`: valores sin formato.
+        """
+        util = ANCHO - 2 * MARGEN
+        total = sum(ancho for _, ancho, _ in columnas)
+        anchos = [util * ancho / total for _, ancho, _ in columnas]
+        inicios = [MARGEN + sum(anchos[:i]) for i in range(len(anchos))]
+        derecha = [tipo in A_LA_DERECHA for _, _, tipo in columnas]
+        formatos = [FORMATOS[tipo] for _, _, tipo in columnas]
+
+        def fila(celdas, fuente):
+            lineas = [self._partir(celda, fuente, ancho - SEPARACION) for celda, ancho in zip(celdas, anchos)]
+            alto = max(map(len, lineas)) * INTERLINEA
+            self.espacio(alto)
+            self.lienzo.setFont(fuente, TAMANO_TABLA)
+            for x, ancho, a_la_derecha, partes in zip(inicios, anchos, derecha, lineas):
+                for i, parte in enumerate(partes, 1):
+                    if a_la_derecha:
+                        self.lienzo.drawRightString(x + ancho - SEPARACION, self.y - i * INTERLINEA, parte)
+                    else:
+                        self.lienzo.drawString(x, self.y - i * INTERLINEA, parte)
+            self.y -= alto
+
+        def encabezado():
+            self._encabezado = None   # el encabezado no vuelve a llamarse a sí mismo
+            fila([t for t, _, _ in columnas], self.negrita)
+            self.lienzo.line(MARGEN, self.y - 2, ANCHO - MARGEN, self.y - 2)
+            self.y -= 4
+            self._encabezado = encabezado
+
+        self.espacio(4 * INTERLINEA)
+        encabezado()
+        hay_filas = False
+        for valores in filas:
+            hay_filas = True
+            fila([f(v) for f, v in zip(formatos, valores)], self.normal)
+        self._encabezado = None
+        if not hay_filas:
+            self._linea('(sin registros)', self.normal, TAMANO_TABLA, INTERLINEA)
+
+    def _partir(self, texto, fuente, ancho):
+        """Líneas de `texto` que caben en `ancho`; casi todas las celdas caben en una."""
+        if not texto or pdfmetrics.stringWidth(texto, fuente, TAMANO_TABLA) <= ancho:
+            return [texto]
+        return simpleSplit(texto, fuente, TAMANO_TABLA, ancho) or [texto]
+
+    def cerrar(self):
+        if self.y is None and not self.paginas:
+            self.espacio(0)
+        self._cerrar_pagina()
+        self.lienzo.save()
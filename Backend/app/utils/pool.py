@@ -0,0 +1,135 @@
+# app/utils/pool.py
+# Ajustes por conexión (WAL en SQLite, tiempo límite de sentencias) y
+# métricas del pool para dimensionarlo según la carga
+
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class _Contadores:
+    """Contadores de un pool, compartidos por todos los hilos del proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.checkouts = 0
+            self.espera_total = 0.0
+            self.espera_maxima = 0.0
+            self.agotados = 0
+            self.abiertas = 0
+            self.cerradas = 0
+            self.invalidadas = 0
+
+    def sumar(self, **valores):
+        with self._lock:
+            for campo, valor in valores.items():
+                setattr(self, campo, getattr(self, campo) + valor)
+
+    def registrar_espera(self, segundos):
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+
+
+class PoolMedido(QueuePool):
+    """QueuePool que mide cuánto espera cada checkout por una conexión libre."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.contadores = _Contadores()
+
+    def recreate(self):
+        # engine.dispose() crea un pool nuevo: los contadores se conservan
+        nuevo = super().recreate()
+        nuevo.contadores = self.contadores
+        return nuevo
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super().connect()
+        except PoolTimeoutError:
+            self.contadores.sumar(agotados=1)
+            raise
+        self.contadores.registrar_espera(time.perf_counter() - inicio)
+        return conexion
+
+
+def _contadores(engine):
+    """Contadores del pool del motor; None si el pool no es PoolMedido."""
+    return getattr(engine.pool, 'contadores', None)
+
+
+def instrumentar_motor(engine, config):
+    """Registra los eventos de conexión del motor. Se llama una vez por motor."""
+    dialecto = engine.dialect.name
+    limite = config['DB_STATEMENT_TIMEOUT']
+
+    @event.listens_for(engine, 'connect')
+    def _al_conectar(dbapi_conexion, registro):
+        if _contadores(engine):
+            _contadores(engine).sumar(abiertas=1)
+        if dialecto == 'sqlite':
+            cursor = dbapi_conexion.cursor()
+            # WAL: los lectores no bloquean al escritor (ni al revés)
+            if engine.url.database not in (None, '', ':memory:'):
+                cursor.execute('PRAGMA journal_mode=WAL')
+                cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute('PRAGMA foreign_keys=ON')
+            cursor.execute(f'PRAGMA busy_timeout={(limite or 5) * 1000}')
+            cursor.close()
+        elif dialecto == 'mssql' and limite:
+            # pyodbc: tiempo límite de consulta de la conexión, en segundos
+            dbapi_conexion.timeout = limite
+
+    @event.listens_for(engine, 'close')
+    def _al_cerrar(dbapi_conexion, registro):
+        if _contadores(engine):
+            _contadores(engine).sumar(cerradas=1)
+
+    @event.listens_for(engine, 'invalidate')
+    def _al_invalidar(dbapi_conexion, registro, excepcion):
+        if _contadores(engine):
+            _contadores(engine).sumar(invalidadas=1)
+
+
+def metricas_pool(engine):
+    """
+    Estado actual del pool y contadores acumulados desde el arranque.
+    Con SQLite en memoria (una sola conexión) solo se informa el tipo de pool.
+    """
+    pool = engine.pool
+    metricas = {'pool': type(pool).__name__, 'dialecto': engine.dialect.name}
+    contadores = _contadores(engine)
+    if contadores is None:
+        return metricas
+    if isinstance(pool, QueuePool):
+        capacidad = pool.size() + pool._max_overflow
+        en_uso = pool.checkedout()
+        metricas.update({
+            'tamano': pool.size(),
+            'max_overflow': pool._max_overflow,
+            'en_uso': en_uso,
+            'libres': pool.checkedin(),
+            'overflow': pool.overflow(),
+            'saturacion': round(en_uso / capacidad, 3) if capacidad > 0 else None,
+        })
+    promedio = contadores.espera_total / contadores.checkouts if contadores.checkouts else 0.0
+    metricas.update({
+        'checkouts': contadores.checkouts,
+        'espera_promedio_ms': round(promedio * 1000, 3),
+        'espera_maxima_ms': round(contadores.espera_maxima * 1000, 3),
+        'checkouts_agotados': contadores.agotados,
+        'conexiones_abiertas': contadores.abiertas,
+        'conexiones_cerradas': contadores.cerradas,
+        'conexiones_invalidadas': contadores.invalidadas,
+    })
+    return metricas
@@ -0,0 +1,280 @@
+# app/utils/referencias.py
+# Caché en memoria del proceso para datos de referencia pequeños y muy leídos:
+# Derechos, Cuotas (monto y fecha límite) y el mapa Derecho → Cuotas
+
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from sqlalchemy import event, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import Derecho, Cuota, DerechoCuota
+from app.utils import en_bloques
+from app.utils.versiones import versiones
+
+CuotaRef = namedtuple('CuotaRef', 'Monto Fecha_Limite')
+
+TODAS = '*'  # marca de invalidación de toda una tabla (sentencias por lote)
+
+logger = logging.getLogger(__name__)
+
+
+class _MapaLRU:
+    """Diccionario acotado: al llenarse descarta la entrada menos usada."""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        with self._lock:
+            if clave not in self._datos:
+                return False, None
+            self._datos.move_to_end(clave)
+            return True, self._datos[clave]
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def quitar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+class CacheReferencias:
+    """
+    Lecturas por llave de Derechos, Cuotas y Derecho_Cuota.
+    - Invalidación precisa: lo que cambia una sesión se anota al hacer flush
+      y se descarta del caché cuando esa sesión hace commit.
+    - Cada `vigencia` segundos se comparan los contadores de Version_Tabla
+      para descartar lo que otros procesos hayan cambiado; las escrituras
+      los comparan siempre (cuotas_para_asignar).
+    """
+    TABLAS = ('Derechos', 'Cuotas', 'Derecho_Cuota')
+
+    def __init__(self, maximo=5000, vigencia=30):
+        self.configurar(maximo, vigencia)
+
+    def configurar(self, maximo, vigencia):
+        self.maximo = maximo
+        self.vigencia = vigencia
+        self._mapas = {tabla: _MapaLRU(maximo) for tabla in self.TABLAS}
+        self._versiones = None
+        self._revisado = 0.0
+        self._lock = threading.Lock()
+        self.aciertos = self.fallos = self.invalidaciones = 0
+
+    # ----- lecturas -----
+    def derecho(self, id_derecho):
+        """Nombre del derecho, o None si no existe."""
+        return self._leer('Derechos', [id_derecho], self._cargar_derechos).get(id_derecho)
+
+    def cuota(self, id_cuota):
+        """CuotaRef(Monto, Fecha_Limite), o None si no existe."""
+        return self._leer('Cuotas', [id_cuota], self._cargar_cuotas).get(id_cuota)
+
+    def cuotas(self, ids_cuota):
+        """{ID_Cuota: CuotaRef} de las cuotas que existen; los faltantes se leen con IN."""
+        return self._leer('Cuotas', ids_cuota, self._cargar_cuotas)
+
+    def cuotas_de_derecho(self, id_derecho):
+        """Tupla con los ID_Cuota vinculados al derecho (vacía si no tiene)."""
+        return self._leer('Derecho_Cuota', [id_derecho], self._cargar_enlaces).get(id_derecho, ())
+
+    def cuotas_para_asignar(self, id_derecho):
+        """
+        {ID_Cuota: CuotaRef} de las cuotas del derecho, en orden, para las
+        escrituras que las asignan: compara Version_Tabla antes de leer, sin
+        esperar la vigencia, y omite las cuotas que ya no existen.
+        """
+        self._revisar_versiones(forzar=True)
+        ids = self.cuotas_de_derecho(id_derecho)
+        refs = self.cuotas(ids)
+        return {id_c: refs[id_c] for id_c in ids if id_c in refs}
+
+    def _leer(self, tabla, claves, cargar):
+        self._revisar_versiones()
+        mapa = self._mapas[tabla]
+        encontrados, faltantes = {}, []
+        for clave in claves:
+            hay, valor = mapa.obtener(clave)
+            if hay:
+                encontrados[clave] = valor
+            else:
+                faltantes.append(clave)
+        self._contar(aciertos=len(encontrados), fallos=len(faltantes))
+        if faltantes:
+            cargados = cargar(faltantes)
+            # Lo que la sesión actual cambió y no ha confirmado no se guarda
+            pendientes = _pendientes(db.session).get(tabla, set())
+            for clave, valor in cargados.items():
+                if pendientes != TODAS and clave not in pendientes:
+                    mapa.guardar(clave, valor)
+            encontrados.update(cargados)
+        return encontrados
+
+    # ----- carga desde la base -----
+    @staticmethod
+    def _cargar_derechos(ids):
+        cargados = {}
+        for bloque in en_bloques(ids):
+            cargados.update(db.session.execute(
+                select(Derecho.ID_Derecho, Derecho.Nombre).where(Derecho.ID_Derecho.in_(bloque))
+            ).all())
+        return cargados
+
+    @staticmethod
+    def _cargar_cuotas(ids):
+        cargados = {}
+        for bloque in en_bloques(ids):
+            for id_c, monto, fecha in db.session.execute(
+                select(Cuota.ID_Cuota, Cuota.Monto, Cuota.Fecha_Limite).where(Cuota.ID_Cuota.in_(bloque))
+            ):
+                cargados[id_c] = CuotaRef(monto, fecha)
+        return cargados
+
+    @staticmethod
+    def _cargar_enlaces(ids):
+        # Un derecho sin cuotas también se guarda (tupla vacía)
+        enlaces = {id_d: [] for id_d in ids}
+        for bloque in en_bloques(ids):
+            for id_d, id_c in db.session.execute(
+                select(DerechoCuota.ID_Derecho, DerechoCuota.ID_Cuota)
+                .where(DerechoCuota.ID_Derecho.in_(bloque))
+                .order_by(DerechoCuota.ID_Derecho, DerechoCuota.ID_Cuota)
+            ):
+                enlaces[id_d].append(id_c)
+        return {id_d: tuple(ids_c) for id_d, ids_c in enlaces.items()}
+
+    def precargar(self):
+        """Carga las tres tablas completas (tres consultas). Se usa al arrancar."""
+        derechos = dict(db.session.execute(select(Derecho.ID_Derecho, Derecho.Nombre)).all())
+        cuotas = {
+            id_c: CuotaRef(monto, fecha) for id_c, monto, fecha in
+            db.session.execute(select(Cuota.ID_Cuota, Cuota.Monto, Cuota.Fecha_Limite))
+        }
+        enlaces = {id_d: [] for id_d in derechos}
+        for id_d, id_c in db.session.execute(
+            select(DerechoCuota.ID_Derecho, DerechoCuota.ID_Cuota)
+            .order_by(DerechoCuota.ID_Derecho, DerechoCuota.ID_Cuota)
+        ):
+            enlaces.setdefault(id_d, []).append(id_c)
+        self._versiones = versiones(db.session, self.TABLAS)
+        self._revisado = time.monotonic()
+        for tabla, valores in (('Derechos', derechos), ('Cuotas', cuotas),
+                               ('Derecho_Cuota', {d: tuple(c) for d, c in enlaces.items()})):
+            for clave, valor in valores.items():
+                self._mapas[tabla].guardar(clave, valor)
+        return {tabla: len(mapa) for tabla, mapa in self._mapas.items()}
+
+    # ----- invalidación -----
+    def invalidar(self, tabla, claves=TODAS):
+        mapa = self._mapas[tabla]
+        if claves == TODAS:
+            mapa.limpiar()
+        else:
+            for clave in claves:
+                mapa.quitar(clave)
+        self._contar(invalidaciones=1)
+
+    def _revisar_versiones(self, forzar=False):
+        """Descarta las tablas que otro proceso cambió desde la última revisión."""
+        if not forzar and time.monotonic() - self._revisado < self.vigencia:
+            return
+        self._revisado = time.monotonic()
+        actuales = versiones(db.session, self.TABLAS)
+        if self._versiones is not None:
+            for tabla in self.TABLAS:
+                if actuales.get(tabla) != self._versiones.get(tabla):
+                    self.invalidar(tabla)
+        self._versiones = actuales
+
+    def _contar(self, **valores):
+        with self._lock:
+            for campo, valor in valores.items():
+                setattr(self, campo, getattr(self, campo) + valor)
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / consultas, 3) if consultas else None,
+            'invalidaciones': self.invalidaciones,
+            'entradas': {tabla: len(mapa) for tabla, mapa in self._mapas.items()},
+            'maximo': self.maximo,
+            'vigencia_s': self.vigencia,
+        }
+
+
+referencias = CacheReferencias()
+
+
+def precargar_referencias():
+    """Precarga al arrancar; si la base aún no está lista solo se registra."""
+    try:
+        logger.info(f"Caché de referencias precargado: {referencias.precargar()}")
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.warning(f"No se pudo precargar el caché de referencias: {e}")
+
+
+# --------------------- Eventos de sesión ---------------------
+def _pendientes(session):
+    """{tabla: set de llaves | TODAS} cambiadas por la sesión y aún sin commit."""
+    return session.info.setdefault('referencias_pendientes', {})
+
+
+def _anotar(session, tabla, claves):
+    pendientes = _pendientes(session)
+    if claves == TODAS or pendientes.get(tabla) == TODAS:
+        pendientes[tabla] = TODAS
+    else:
+        pendientes.setdefault(tabla, set()).update(claves)
+
+
+@event.listens_for(Session, 'after_flush')
+def _anotar_flush(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Derecho):
+            _anotar(session, 'Derechos', [obj.ID_Derecho])
+            _anotar(session, 'Derecho_Cuota', [obj.ID_Derecho])
+        elif isinstance(obj, Cuota):
+            _anotar(session, 'Cuotas', [obj.ID_Cuota])
+        elif isinstance(obj, DerechoCuota):
+            _anotar(session, 'Derecho_Cuota', [obj.ID_Derecho] if obj.ID_Derecho else TODAS)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _anotar_sentencia(estado):
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        tabla = getattr(estado.statement, 'table', None)
+        if tabla is not None and tabla.name in CacheReferencias.TABLAS:
+            _anotar(estado.session, tabla.name, TODAS)
+
+
+@event.listens_for(Session, 'after_commit')
+def _aplicar_invalidaciones(session):
+    for tabla, claves in session.info.pop('referencias_pendientes', {}).items():
+        referencias.invalidar(tabla, claves)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_pendientes(session):
+    session.info.pop('referencias_pendientes', None)
@@ -0,0 +1,178 @@
+# app/utils/registro.py
+# Registro (logging) fuera del hilo de la petición: los hilos solo encolan
+# el registro (QueueHandler) y un QueueListener en segundo plano lo escribe
+# en consola y en archivo rotativo, como JSON de una línea.
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import time
+import traceback
+import uuid
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request
+
+CABECERA_ID = 'X-Request-ID'
+_ID_VALIDO = re.compile(r'[A-Za-z0-9._-]{1,64}')
+
+# Atributos de `extra=` que se copian al JSON
+CAMPOS_EXTRA = ('metodo', 'ruta', 'endpoint', 'estado', 'duracion_ms', 'sql_sentencias', 'sql_ms')
+
+_oyente = None   # QueueListener activo (uno por proceso)
+
+
+# --------------------- Formato ---------------------
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro: ts, nivel, logger, mensaje, id_peticion y extras."""
+
+    def format(self, registro):
+        datos = {
+            'ts': datetime.fromtimestamp(registro.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': registro.levelname,
+            'logger': registro.name,
+            'mensaje': registro.getMessage(),
+            'modulo': registro.module,
+            'linea': registro.lineno,
+        }
+        if getattr(registro, 'id_peticion', None):
+            datos['id_peticion'] = registro.id_peticion
+        for campo in CAMPOS_EXTRA:
+            if hasattr(registro, campo):
+                datos[campo] = getattr(registro, campo)
+        if registro.exc_info:
+            datos['excepcion'] = self.formatException(registro.exc_info)
+        elif registro.exc_text:
+            datos['excepcion'] = registro.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class FormatoTexto(logging.Formatter):
+    """Formato legible para consola en desarrollo, con el id de la petición."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+
+    def format(self, registro):
+        linea = super().format(registro)
+        if getattr(registro, 'id_peticion', None):
+            linea = f'{linea} [{registro.id_peticion}]'
+        if getattr(registro, 'exc_text', None) and not registro.exc_info and registro.exc_text not in linea:
+            linea = f'{linea}\n{registro.exc_text}'
+        return linea
+
+
+FORMATOS = {'json': FormatoJSON, 'texto': FormatoTexto}
+
+
+class ColaRegistro(logging.handlers.QueueHandler):
+    """
+    QueueHandler que deja el registro listo para otro hilo: resuelve el
+    mensaje, convierte la excepción a texto y anota el id de la petición
+    (el contexto de Flask solo existe en el hilo que atiende la petición).
+    """
+
+    def prepare(self, registro):
+        registro = logging.makeLogRecord(registro.__dict__)
+        registro.msg = registro.getMessage()
+        registro.args = None
+        if registro.exc_info:
+            registro.exc_text = ''.join(traceback.format_exception(*registro.exc_info)).rstrip()
+            registro.exc_info = None
+        if not getattr(registro, 'id_peticion', None) and has_request_context():
+            registro.id_peticion = g.get('id_peticion')
+        return registro
+
+
+# --------------------- Configuración ---------------------
+def _manejadores(config):
+    formato = FORMATOS[config['LOG_FORMATO']]()
+    manejadores = [logging.StreamHandler()]
+    archivo = config['LOG_ARCHIVO']
+    if archivo:
+        if config['LOG_ROTACION'] == 'tiempo':
+            manejadores.append(logging.handlers.TimedRotatingFileHandler(
+                archivo, when=config['LOG_ROTAR_CUANDO'], backupCount=config['LOG_RESPALDOS'],
+                encoding='utf-8', delay=True))
+        else:
+            manejadores.append(logging.handlers.RotatingFileHandler(
+                archivo, maxBytes=config['LOG_MAX_BYTES'], backupCount=config['LOG_RESPALDOS'],
+                encoding='utf-8', delay=True))
+    for manejador in manejadores:
+        manejador.setFormatter(formato)
+    return manejadores
+
+
+def configurar_registro(app):
+    """
+    Reemplaza los manejadores del logger raíz por una cola. Se puede llamar
+    más de una vez (pruebas): el oyente anterior se detiene primero y sus
+    manejadores se cierran.
+    """
+    global _oyente
+    config = app.config
+    detener_registro()
+
+    cola = queue.SimpleQueue()
+    raiz = logging.getLogger()
+    for manejador in list(raiz.handlers):
+        raiz.removeHandler(manejador)
+    raiz.addHandler(ColaRegistro(cola))
+    raiz.setLevel(config['LOG_NIVEL'])
+    for nombre, nivel in config['LOG_NIVELES'].items():
+        logging.getLogger(nombre).setLevel(nivel)
+
+    _oyente = logging.handlers.QueueListener(cola, *_manejadores(config), respect_handler_level=True)
+    _oyente.start()
+
+    # Los ganchos se registran una sola vez aunque se reconfigure la misma app
+    if asignar_id_peticion not in app.before_request_funcs.get(None, []):
+        app.before_request(asignar_id_peticion)
+        app.after_request(registrar_peticion)
+
+
+def detener_registro():
+    """Vacía la cola y detiene el hilo escritor (también al salir del proceso)."""
+    global _oyente
+    if _oyente is not None:
+        _oyente.stop()
+        for manejador in _oyente.handlers:
+            manejador.close()
+        _oyente = None
+
+
+atexit.register(detener_registro)
+
+
+# --------------------- Peticiones ---------------------
+registro_peticiones = logging.getLogger('app.peticiones')
+
+
+def asignar_id_peticion():
+    """Usa el X-Request-ID del cliente o del proxy si es válido; si no, genera uno."""
+    recibido = request.headers.get(CABECERA_ID, '')
+    g.id_peticion = recibido if _ID_VALIDO.fullmatch(recibido) else uuid.uuid4().hex
+    g.registro_inicio = time.perf_counter()
+
+
+def registrar_peticion(respuesta):
+    """Una línea por petición con método, ruta, estado, latencia y SQL."""
+    if 'id_peticion' not in g:
+        return respuesta
+    respuesta.headers[CABECERA_ID] = g.id_peticion
+    if registro_peticiones.isEnabledFor(logging.INFO):
+        extra = {
+            'metodo': request.method,
+            'ruta': request.path,
+            'endpoint': request.url_rule.rule if request.url_rule else None,
+            'estado': respuesta.status_code,
+            'duracion_ms': round((time.perf_counter() - g.registro_inicio) * 1000, 2),
+        }
+        if 'metricas_sql_n' in g:
+            extra['sql_sentencias'] = g.metricas_sql_n
+            extra['sql_ms'] = round(g.metricas_sql_t * 1000, 2)
+        registro_peticiones.info(f'{request.method} {request.path} {respuesta.status_code}', extra=extra)
+    return respuesta
@@ -0,0 +1,253 @@
+# app/utils/resumen.py
+# Resumen mensual mantenido de forma incremental (tabla Resumen_Mensual):
+# ingresos, egresos y número de pagos por año y mes. El reporte por periodo
+# lee una fila por mes en lugar de recorrer Ingresos, Egresos y Pagos.
+
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import and_, event, extract, func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.extensions import db
+from app.models import Pago, Ingreso, Egreso, ResumenMensual
+from app.utils import insertar_si_falta
+from app.utils.versiones import marcar_versiones
+
+CERO = Decimal('0')
+MESES_POR_DEFECTO = 36   # últimos 3 años, incluido el mes actual
+MAXIMO_MESES = 240
+
+# Columna de fecha de cada tabla del resumen (de Pagos solo se cuentan filas)
+FECHAS = {Ingreso: 'Fecha', Egreso: 'Fecha', Pago: 'Fecha_Pago'}
+
+
+def _a_decimal(valor):
+    return Decimal(str(valor)) if valor is not None else CERO
+
+
+def _mes(fecha):
+    return fecha.year, fecha.month
+
+
+def _mes_siguiente(anio, mes):
+    return (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def sumar_meses(anio, mes, meses):
+    total = anio * 12 + mes - 1 + meses
+    return total // 12, total % 12 + 1
+
+
+def acumular(deltas, fecha, ingresos=CERO, egresos=CERO, pagos=0):
+    """Suma a `deltas` ({(año, mes): [ingresos, egresos, pagos]}) el movimiento de `fecha`."""
+    delta = deltas.setdefault(_mes(fecha), [CERO, CERO, 0])
+    delta[0] += ingresos
+    delta[1] += egresos
+    delta[2] += pagos
+
+
+# --------------------- Mantenimiento incremental ---------------------
+def _sumar_mes(conexion, anio, mes):
+    """Totales reales de un mes, filtrando por rango de fechas (sargable)."""
+    inicio, fin = date(anio, mes, 1), date(*_mes_siguiente(anio, mes), 1)
+    totales = []
+    for modelo, agregado in ((Ingreso, func.sum(Ingreso.Monto)), (Egreso, func.sum(Egreso.Monto)),
+                             (Pago, func.count(Pago.ID_Pago))):
+        columna = getattr(modelo, FECHAS[modelo])
+        totales.append(conexion.execute(
+            select(agregado).where(columna >= inicio, columna < fin)
+        ).scalar())
+    return _a_decimal(totales[0]), _a_decimal(totales[1]), totales[2] or 0
+
+
+def ajustar_resumen(session, deltas):
+    """
+    Suma los deltas a la fila de cada mes con un UPDATE atómico, dentro de
+    la transacción de `session`. Como ajustar_saldo: las inserciones por
+    lote con Core deben llamarla explícitamente y ANTES de escribir sus
+    filas (un mes sin fila se siembra con los totales de las tablas, que
+    no deben incluir todavía el delta).
+    """
+    tabla = ResumenMensual.__table__
+    # Orden fijo para que dos transacciones no se bloqueen mutuamente
+    for (anio, mes), (ingresos, egresos, pagos) in sorted(deltas.items()):
+        if not ingresos and not egresos and not pagos:
+            continue
+        sumar = tabla.update()\
+            .where(tabla.c.Anio == anio, tabla.c.Mes == mes)\
+            .values(
+                Ingresos=tabla.c.Ingresos + ingresos,
+                Egresos=tabla.c.Egresos + egresos,
+                Pagos=tabla.c.Pagos + pagos
+            )
+        if session.execute(sumar).rowcount == 0:
+            # Como en ajustar_saldo: si otra transacción sembró el mes a la
+            # vez, el INSERT no hace nada y el UPDATE suma sobre su fila
+            total_i, total_e, total_p = _sumar_mes(session, anio, mes)
+            insertar_si_falta(session, tabla, {
+                'Anio': anio, 'Mes': mes, 'Ingresos': total_i, 'Egresos': total_e, 'Pagos': total_p
+            })
+            session.execute(sumar)
+
+
+def _original(obj, atributo):
+    """Valor tal como está en la base (antes de cambios no guardados)."""
+    historial = get_history(obj, atributo)
+    if historial.deleted:
+        return historial.deleted[0]
+    return getattr(obj, atributo)
+
+
+def _movimiento(deltas, obj, fecha, monto, signo):
+    if fecha is None:
+        return   # el INSERT fallará por la columna NOT NULL
+    if isinstance(obj, Pago):
+        acumular(deltas, fecha, pagos=signo)
+    elif isinstance(obj, Ingreso):
+        acumular(deltas, fecha, ingresos=signo * _a_decimal(monto))
+    else:
+        acumular(deltas, fecha, egresos=signo * _a_decimal(monto))
+
+
+@event.listens_for(Ingreso.Fecha, 'set', active_history=True)
+@event.listens_for(Egreso.Fecha, 'set', active_history=True)
+@event.listens_for(Pago.Fecha_Pago, 'set', active_history=True)
+@event.listens_for(Ingreso.Monto, 'set', active_history=True)
+@event.listens_for(Egreso.Monto, 'set', active_history=True)
+def _cargar_valor_anterior(target, value, oldvalue, initiator):
+    """Como en saldos.py: carga la fecha y el monto anteriores para saber qué sale de cada mes."""
+
+
+@event.listens_for(Session, 'before_flush', insert=True)
+def _acumular_resumen(session, flush_context, instances):
+    """
+    Altas, cambios de monto o de fecha y bajas de Ingresos, Egresos y Pagos
+    en el mismo flush. Se registra primero (insert=True) para que el mes se
+    bloquee siempre antes que Saldo_Fondos.
+    """
+    deltas = {}
+
+    for obj in session.new:
+        if type(obj) in FECHAS:
+            _movimiento(deltas, obj, getattr(obj, FECHAS[type(obj)]), getattr(obj, 'Monto', None), 1)
+
+    for obj in session.dirty:
+        if type(obj) in FECHAS:
+            campo = FECHAS[type(obj)]
+            monto = 'Monto' if type(obj) is not Pago else None
+            if not get_history(obj, campo).has_changes() and not (monto and get_history(obj, monto).has_changes()):
+                continue
+            # El monto sale del mes original y entra, con su valor nuevo, al mes actual
+            _movimiento(deltas, obj, _original(obj, campo), _original(obj, monto) if monto else None, -1)
+            _movimiento(deltas, obj, getattr(obj, campo), getattr(obj, monto) if monto else None, 1)
+
+    for obj in session.deleted:
+        if type(obj) in FECHAS:
+            monto = 'Monto' if type(obj) is not Pago else None
+            _movimiento(deltas, obj, _original(obj, FECHAS[type(obj)]),
+                        _original(obj, monto) if monto else None, -1)
+
+    ajustar_resumen(session, deltas)
+
+
+# --------------------- Reconstrucción ---------------------
+def _resumen_real(conexion):
+    """{(año, mes): (ingresos, egresos, pagos)} agrupando las tablas completas."""
+    real = {}
+    for posicion, modelo, agregado in ((0, Ingreso, func.sum(Ingreso.Monto)),
+                                       (1, Egreso, func.sum(Egreso.Monto)),
+                                       (2, Pago, func.count(Pago.ID_Pago))):
+        columna = getattr(modelo, FECHAS[modelo])
+        anio, mes = extract('year', columna), extract('month', columna)
+        for a, m, total in conexion.execute(select(anio, mes, agregado).group_by(anio, mes)):
+            fila = real.setdefault((int(a), int(m)), [CERO, CERO, 0])
+            fila[posicion] = _a_decimal(total) if posicion < 2 else total
+    return {mes: tuple(fila) for mes, fila in real.items()}
+
+
+def _resumen_guardado(conexion):
+    return {
+        (f.Anio, f.Mes): (_a_decimal(f.Ingresos), _a_decimal(f.Egresos), f.Pagos)
+        for f in conexion.execute(select(ResumenMensual.__table__))
+    }
+
+
+def _diferencias(guardado, real):
+    return sorted(
+        (mes, guardado.get(mes), real.get(mes))
+        for mes in guardado.keys() | real.keys()
+        if guardado.get(mes) != real.get(mes)
+    )
+
+
+def recalcular_resumen():
+    """
+    Reconstruye Resumen_Mensual agrupando Ingresos, Egresos y Pagos.
+    Devuelve (diferencias, meses): las diferencias son tuplas
+    ((año, mes), guardado, real) de los meses corregidos.
+    """
+    real = _resumen_real(db.session)
+    diferencias = _diferencias(_resumen_guardado(db.session), real)
+    db.session.execute(ResumenMensual.__table__.delete())
+    if real:
+        db.session.execute(ResumenMensual.__table__.insert(), [
+            {'Anio': a, 'Mes': m, 'Ingresos': i, 'Egresos': e, 'Pagos': p}
+            for (a, m), (i, e, p) in sorted(real.items())
+        ])
+    # El reporte pudo cambiar sin tocar las tablas: invalida sus ETag
+    marcar_versiones(db.session, ['Ingresos', 'Egresos', 'Pagos'])
+    db.session.commit()
+    return diferencias, len(real)
+
+
+def verificar_resumen():
+    """Meses cuyo resumen no coincide con las tablas: [((año, mes), guardado, real)]."""
+    return _diferencias(_resumen_guardado(db.session), _resumen_real(db.session))
+
+
+# --------------------- Reporte ---------------------
+def leer_periodo(texto):
+    """'YYYY-MM' -> (año, mes); ValueError si no es válido."""
+    anio, _, mes = texto.partition('-')
+    if len(anio) != 4 or len(mes) != 2 or not anio.isdigit() or not mes.isdigit() or not 1 <= int(mes) <= 12:
+        raise ValueError(texto)
+    return int(anio), int(mes)
+
+
+def reporte_mensual(desde, hasta):
+    """
+    Una entrada por mes entre `desde` y `hasta` ((año, mes), inclusive),
+    con ceros en los meses sin movimientos y el saldo al cierre de cada
+    uno. Dos consultas sobre Resumen_Mensual, sin importar el volumen.
+    """
+    tabla = ResumenMensual.__table__
+    despues_de_inicio = or_(tabla.c.Anio > desde[0], and_(tabla.c.Anio == desde[0], tabla.c.Mes >= desde[1]))
+    antes_de_fin = or_(tabla.c.Anio < hasta[0], and_(tabla.c.Anio == hasta[0], tabla.c.Mes <= hasta[1]))
+
+    saldo = _a_decimal(db.session.execute(
+        select(func.sum(tabla.c.Ingresos - tabla.c.Egresos)).where(~despues_de_inicio)
+    ).scalar())
+    filas = {
+        (f.Anio, f.Mes): f
+        for f in db.session.execute(select(tabla).where(despues_de_inicio, antes_de_fin))
+    }
+
+    meses, actual = [], desde
+    while actual <= hasta:
+        fila = filas.get(actual)
+        ingresos = _a_decimal(fila.Ingresos) if fila else CERO
+        egresos = _a_decimal(fila.Egresos) if fila else CERO
+        saldo += ingresos - egresos
+        meses.append({
+            'periodo': f'{actual[0]}-{actual[1]:02d}',
+            'anio': actual[0],
+            'mes': actual[1],
+            'ingresos': float(ingresos),
+            'egresos': float(egresos),
+            'pagos': fila.Pagos if fila else 0,
+            'saldo_cierre': float(saldo),
+        })
+        actual = _mes_siguiente(*actual)
+    return meses
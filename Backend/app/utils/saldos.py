@@ -0,0 +1,163 @@
+# app/utils/saldos.py
+# Saldo de fondos mantenido de forma incremental (tabla Saldo_Fondos)
+
+from decimal import Decimal
+
+from sqlalchemy import event, select, func
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.extensions import db
+from app.models import Ingreso, Egreso, SaldoFondos
+from app.utils import insertar_si_falta
+from app.utils.versiones import marcar_versiones
+
+ID_SALDO = 1
+CERO = Decimal('0')
+
+
+def _a_decimal(valor):
+    return Decimal(str(valor)) if valor is not None else CERO
+
+
+def _sumar_tablas(conexion):
+    """Totales calculados desde cero (recorre Ingresos y Egresos completos)."""
+    total_i = conexion.execute(select(func.sum(Ingreso.__table__.c.Monto))).scalar()
+    total_e = conexion.execute(select(func.sum(Egreso.__table__.c.Monto))).scalar()
+    return _a_decimal(total_i), _a_decimal(total_e)
+
+
+def ajustar_saldo(session, delta_ingresos=CERO, delta_egresos=CERO):
+    """
+    Suma los deltas a la fila de saldo con un UPDATE atómico
+    (Total = Total + delta), dentro de la transacción de `session`.
+    Las inserciones masivas con Core no disparan los eventos del ORM,
+    así que deben llamar a esta función explícitamente y ANTES de escribir
+    sus filas (si la fila de saldo no existe se siembra con SUM, que no
+    debe incluir todavía los montos del delta).
+    """
+    if not delta_ingresos and not delta_egresos:
+        return
+    session.info['cambio_disponible'] = cambio_disponible(session) + delta_ingresos - delta_egresos
+    tabla = SaldoFondos.__table__
+    sumar = tabla.update()\
+        .where(tabla.c.ID_Saldo == ID_SALDO)\
+        .values(
+            Total_Ingresos=tabla.c.Total_Ingresos + delta_ingresos,
+            Total_Egresos=tabla.c.Total_Egresos + delta_egresos
+        )
+    if session.execute(sumar).rowcount == 0:
+        # Primera escritura: se siembra la fila con los totales actuales y
+        # se repite el UPDATE. Si otra transacción la sembró a la vez, el
+        # INSERT no hace nada y el delta se suma a la suya
+        total_i, total_e = _sumar_tablas(session)
+        insertar_si_falta(session, tabla, {
+            'ID_Saldo': ID_SALDO, 'Total_Ingresos': total_i, 'Total_Egresos': total_e
+        })
+        session.execute(sumar)
+
+
+def cambio_disponible(session):
+    """Cuánto movió el disponible la transacción de `session` hasta ahora."""
+    return session.info.get('cambio_disponible', CERO)
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _reiniciar_cambio(session):
+    session.info.pop('cambio_disponible', None)
+
+
+def _monto_original(obj):
+    """Monto tal como está en la base (antes de cambios no guardados)."""
+    historial = get_history(obj, 'Monto')
+    if historial.deleted:
+        return _a_decimal(historial.deleted[0])
+    return _a_decimal(obj.Monto)
+
+
+@event.listens_for(Ingreso.Monto, 'set', active_history=True)
+@event.listens_for(Egreso.Monto, 'set', active_history=True)
+def _cargar_monto_anterior(target, value, oldvalue, initiator):
+    """
+    No hace nada por sí mismo: active_history obliga a cargar el Monto
+    anterior al asignarlo, para que el flush conozca la diferencia
+    aunque el objeto estuviera expirado.
+    """
+
+
+@event.listens_for(Session, 'before_flush')
+def _acumular_saldo(session, flush_context, instances):
+    """
+    Calcula cuánto cambian los totales con lo que está por escribirse
+    (altas, cambios de Monto y bajas, incluidas las cascadas de Pago)
+    y lo aplica en el mismo flush.
+    """
+    deltas = {Ingreso: CERO, Egreso: CERO}
+
+    for obj in session.new:
+        if type(obj) in deltas:
+            deltas[type(obj)] += _a_decimal(obj.Monto)
+
+    for obj in session.dirty:
+        if type(obj) in deltas:
+            historial = get_history(obj, 'Monto')
+            if historial.has_changes() and historial.added:
+                deltas[type(obj)] += _a_decimal(historial.added[0]) - _monto_original(obj)
+
+    for obj in session.deleted:
+        if type(obj) in deltas:
+            deltas[type(obj)] -= _monto_original(obj)
+
+    ajustar_saldo(session, deltas[Ingreso], deltas[Egreso])
+
+
+def obtener_saldo():
+    """
+    Lee la fila de saldo. Si todavía no existe la siembra con SUM en la
+    transacción en curso, sin confirmarla: las lecturas y validaciones no
+    hacen commit, la fila queda guardada con la primera escritura.
+    """
+    saldo = db.session.get(SaldoFondos, ID_SALDO)
+    if saldo is None:
+        total_i, total_e = _sumar_tablas(db.session)
+        insertar_si_falta(db.session, SaldoFondos.__table__, {
+            'ID_Saldo': ID_SALDO, 'Total_Ingresos': total_i, 'Total_Egresos': total_e
+        })
+        saldo = db.session.get(SaldoFondos, ID_SALDO)
+    return saldo
+
+
+def recalcular_saldo():
+    """
+    Reconstruye Saldo_Fondos sumando Ingresos y Egresos completos.
+    Devuelve (anterior, nuevo) como tuplas (ingresos, egresos);
+    anterior es None si la fila no existía.
+    """
+    total_i, total_e = _sumar_tablas(db.session)
+    saldo = db.session.get(SaldoFondos, ID_SALDO)
+    anterior = None
+    if saldo is None:
+        # Otra transacción puede estar sembrando la fila a la vez: la
+        # primera inserta y las demás no fallan por llave duplicada
+        insertar_si_falta(db.session, SaldoFondos.__table__, {
+            'ID_Saldo': ID_SALDO, 'Total_Ingresos': total_i, 'Total_Egresos': total_e
+        })
+    else:
+        anterior = (_a_decimal(saldo.Total_Ingresos), _a_decimal(saldo.Total_Egresos))
+        saldo.Total_Ingresos = total_i
+        saldo.Total_Egresos = total_e
+    # Los totales pudieron cambiar sin tocar las tablas: invalida sus ETag
+    marcar_versiones(db.session, ['Ingresos', 'Egresos'])
+    db.session.commit()
+    return anterior, (total_i, total_e)
+
+
+def verificar_saldo():
+    """Compara la fila de saldo con los totales reales. Devuelve (guardado, real)."""
+    total_i, total_e = _sumar_tablas(db.session)
+    saldo = db.session.get(SaldoFondos, ID_SALDO)
+    guardado = None
+    if saldo is not None:
+        guardado = (_a_decimal(saldo.Total_Ingresos), _a_decimal(saldo.Total_Egresos))
+    return guardado, (total_i, total_e)
@@ -0,0 +1,157 @@
+# app/utils/serializadores.py
+# Una definición por modelo: qué columnas se leen (select de Core, sin
+# hidratar objetos del ORM) y cómo se convierte cada fila a JSON.
+# La misma definición sirve para listas, detalle y exportación.
+
+import json
+from datetime import date, datetime
+
+from flask import Response, abort
+from sqlalchemy import Date, DateTime, Numeric, select
+
+from app.extensions import db
+from app.models import Persona, Derecho, PersonaDerecho, Cuota, Pago, Ingreso, Egreso, Trabajo
+
+try:
+    import orjson
+except ImportError:  # opcional: sin orjson se usa el módulo json estándar
+    orjson = None
+
+
+# --------------------- Codificación JSON ---------------------
+def a_json(datos):
+    """Codifica a bytes UTF-8 con orjson si está instalado."""
+    if orjson is not None:
+        return orjson.dumps(datos)
+    return json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def respuesta_json(datos, estado=200):
+    return Response(a_json(datos), status=estado, mimetype='application/json')
+
+
+# --------------------- Serializador por modelo ---------------------
+def _convertidor(tipo):
+    """Conversión por tipo de columna, elegida una sola vez al definir el serializador."""
+    if isinstance(tipo, Numeric):
+        return float
+    if isinstance(tipo, Date):
+        return date.isoformat
+    if isinstance(tipo, DateTime):
+        return datetime.isoformat
+    return None
+
+
+class Serializador:
+    """
+    Proyección de columnas de un modelo a diccionarios JSON.
+    `campos` son pares (clave JSON, columna) en el orden de salida; `pk` son
+    las claves que forman la llave primaria (orden y cursor de paginación).
+    """
+
+    def __init__(self, campos, pk):
+        self.claves = tuple(clave for clave, _ in campos)
+        self.columnas = tuple(columna.label(clave) for clave, columna in campos)
+        self.columnas_pk = [columna for clave, columna in campos if clave in pk]
+        self._pos_pk = tuple(self.claves.index(clave) for clave in pk)
+        # Solo las posiciones que necesitan conversión (Numeric, Date)
+        self._convertir = tuple(
+            (i, conv) for i, (_, columna) in enumerate(campos)
+            if (conv := _convertidor(columna.type)) is not None
+        )
+
+    def consulta(self):
+        """select() de las columnas del serializador, sin orden ni filtros."""
+        return select(*self.columnas)
+
+    def __call__(self, fila):
+        valores = list(fila)
+        for i, conv in self._convertir:
+            if valores[i] is not None:
+                valores[i] = conv(valores[i])
+        return dict(zip(self.claves, valores))
+
+    def llave(self, fila):
+        """Valores de la llave primaria de una fila, para el cursor."""
+        return [fila[i] for i in self._pos_pk]
+
+    def uno_o_404(self, *ids):
+        """Detalle por llave primaria; 404 si no existe."""
+        consulta = self.consulta().where(*(col == v for col, v in zip(self.columnas_pk, ids)))
+        fila = db.session.execute(consulta).first()
+        if fila is None:
+            abort(404)
+        return self(fila)
+
+
+PERSONA = Serializador([
+    ('ID_Persona', Persona.id_persona),
+    ('DPI', Persona.dpi),
+    ('Nombre', Persona.nombre),
+    ('Direccion', Persona.direccion),
+    ('Telefono', Persona.telefono),
+    ('Email', Persona.email),
+    ('Rol', Persona.rol),
+    ('Estado', Persona.estado),
+], pk=['ID_Persona'])
+
+DERECHO = Serializador([
+    ('ID_Derecho', Derecho.ID_Derecho),
+    ('Nombre', Derecho.Nombre),
+], pk=['ID_Derecho'])
+
+CUOTA = Serializador([
+    ('ID_Cuota', Cuota.ID_Cuota),
+    ('Descripcion', Cuota.Descripcion),
+    ('Monto', Cuota.Monto),
+    ('Fecha_Limite', Cuota.Fecha_Limite),
+], pk=['ID_Cuota'])
+
+PERSONA_DERECHO = Serializador([
+    ('ID_Persona', PersonaDerecho.ID_Persona),
+    ('ID_Derecho', PersonaDerecho.ID_Derecho),
+    ('Fecha_Inicio', PersonaDerecho.Fecha_Inicio),
+    ('Fecha_Fin', PersonaDerecho.Fecha_Fin),
+], pk=['ID_Persona', 'ID_Derecho'])
+
+PAGO = Serializador([
+    ('ID_Pago', Pago.ID_Pago),
+    ('ID_Persona', Pago.ID_Persona),
+    ('ID_Cuota', Pago.ID_Cuota),
+    ('Fecha_Pago', Pago.Fecha_Pago),
+    ('Monto_Pagado', Pago.Monto_Pagado),
+    ('Estado', Pago.Estado),
+], pk=['ID_Pago'])
+
+INGRESO = Serializador([
+    ('ID_Ingreso', Ingreso.ID_Ingreso),
+    ('Fecha', Ingreso.Fecha),
+    ('Monto', Ingreso.Monto),
+    ('Fuente', Ingreso.Fuente),
+    ('Observaciones', Ingreso.Observaciones),
+    ('ID_Pago', Ingreso.ID_Pago),
+], pk=['ID_Ingreso'])
+
+EGRESO = Serializador([
+    ('ID_Egreso', Egreso.ID_Egreso),
+    ('Fecha', Egreso.Fecha),
+    ('Monto', Egreso.Monto),
+    ('Descripcion', Egreso.Descripcion),
+], pk=['ID_Egreso'])
+
+# Parametros y Resultado son JSON en texto: la lista no los lee
+CAMPOS_TRABAJO = [
+    ('ID_Trabajo', Trabajo.ID_Trabajo),
+    ('Tipo', Trabajo.Tipo),
+    ('Estado', Trabajo.Estado),
+    ('Progreso', Trabajo.Progreso),
+    ('Mensaje', Trabajo.Mensaje),
+    ('Cancelar', Trabajo.Cancelar),
+    ('Intentos', Trabajo.Intentos),
+    ('Creado', Trabajo.Creado),
+    ('Iniciado', Trabajo.Iniciado),
+    ('Terminado', Trabajo.Terminado),
+    ('Error', Trabajo.Error),
+]
+TRABAJO = Serializador(CAMPOS_TRABAJO, pk=['ID_Trabajo'])
+TRABAJO_DETALLE = Serializador(CAMPOS_TRABAJO + [('Resultado', Trabajo.Resultado)], pk=['ID_Trabajo'])
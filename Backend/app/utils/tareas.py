@@ -0,0 +1,111 @@
+# app/utils/tareas.py
+# Tipos de trabajo que se encolan con POST /api/jobs (ver app/utils/trabajos.py).
+# Cada tarea recibe (contexto, parametros) y devuelve un resultado JSON; los
+# parámetros son los mismos campos que el cuerpo de la ruta equivalente.
+
+import os
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import Derecho
+from app.utils import estado_financiero
+from app.utils.asignaciones import ids_por_filtro, leer_asignacion, asignar_derecho_masivo
+from app.utils.importacion import MODOS, importar_pagos, importar_personas
+from app.utils.resumen import recalcular_resumen
+from app.utils.saldos import recalcular_saldo
+from app.utils.trabajos import tarea
+from app.utils.vencimientos import marcar_vencidas
+
+
+# --------------------- Importaciones ---------------------
+def _validar_importacion(parametros):
+    """{'Filas': [{...}, ...], 'Modo': 'todo_o_nada' | 'omitir_invalidos'}"""
+    errores = []
+    filas = parametros.get('Filas')
+    if not isinstance(filas, list) or not all(isinstance(f, dict) for f in filas):
+        errores.append('Filas debe ser un arreglo de objetos.')
+    if parametros.get('Modo', 'todo_o_nada') not in MODOS:
+        errores.append(f"Modo debe ser uno de: {', '.join(MODOS)}.")
+    return errores
+
+
+@tarea('importar_personas', validar=_validar_importacion)
+def tarea_importar_personas(contexto, parametros):
+    filas = parametros['Filas']
+    contexto.progreso(0, f'Importando {len(filas)} personas')
+    insertados, errores, segundos = importar_personas(filas, parametros.get('Modo', 'todo_o_nada'))
+    return {'insertados': insertados, 'rechazados': len(errores), 'errores': errores,
+            'segundos': round(segundos, 3)}
+
+
+@tarea('importar_pagos', validar=_validar_importacion)
+def tarea_importar_pagos(contexto, parametros):
+    filas = parametros['Filas']
+    contexto.progreso(0, f'Registrando {len(filas)} pagos')
+    insertados, errores = importar_pagos(filas, parametros.get('Modo', 'todo_o_nada'))
+    return {'insertados': insertados, 'rechazados': len(errores), 'errores': errores}
+
+
+# --------------------- Asignación masiva ---------------------
+def _validar_asignacion(parametros):
+    """{'ID_Derecho': n} más el cuerpo de POST /derechos/<id>/asignar-masivo."""
+    errores = leer_asignacion(parametros)[-1]
+    if not isinstance(parametros.get('ID_Derecho'), int):
+        errores.insert(0, 'ID_Derecho debe ser un entero.')
+    return errores
+
+
+@tarea('asignar_masivo', validar=_validar_asignacion)
+def tarea_asignar_masivo(contexto, parametros):
+    id_derecho = parametros['ID_Derecho']
+    if db.session.get(Derecho, id_derecho) is None:
+        raise ValueError(f'El derecho {id_derecho} no existe.')
+    ids, filtro, fecha_inicio, fecha_fin, _ = leer_asignacion(parametros)
+    if ids is None:
+        contexto.progreso(0, 'Buscando personas')
+        ids = ids_por_filtro(filtro)
+        db.session.commit()   # termina la lectura antes del punto de control
+    contexto.progreso(10, f'Asignando el derecho a {len(ids)} personas')
+    return {'ID_Derecho': id_derecho, **asignar_derecho_masivo(id_derecho, ids, fecha_inicio, fecha_fin)}
+
+
+# --------------------- Reportes y mantenimiento ---------------------
+def _validar_estado(parametros):
+    if parametros.get('Formato', 'pdf') not in estado_financiero.FORMATOS:
+        return [f"Formato debe ser uno de: {', '.join(estado_financiero.FORMATOS)}."]
+    return []
+
+
+@tarea('estado_financiero', validar=_validar_estado)
+def tarea_estado_financiero(contexto, parametros):
+    """Deja el archivo en el caché de disco; GET /reportes/estado-financiero lo sirve al momento."""
+    formato = parametros.get('Formato', 'pdf')
+    contexto.progreso(0, 'Generando el estado financiero')
+    ruta, trabajo = estado_financiero.solicitar_estado(current_app._get_current_object(), formato)
+    if trabajo is not None:
+        trabajo.result()
+    return {'archivo': os.path.basename(ruta),
+            'url': f'/api/reportes/estado-financiero?formato={formato}'}
+
+
+@tarea('marcar_vencidas')
+def tarea_marcar_vencidas(contexto, parametros):
+    """{'Completo': bool}. Cada lote hace commit: cancelar deja el barrido sin registrar y el siguiente lo repite."""
+    return marcar_vencidas(
+        completo=bool(parametros.get('Completo')),
+        progreso=lambda lote, lotes: contexto.progreso(lote * 100 // lotes, f'Lote {lote} de {lotes}')
+    )
+
+
+@tarea('reconstruir_fondos')
+def tarea_reconstruir_fondos(contexto, parametros):
+    anterior, (ingresos, egresos) = recalcular_saldo()
+    return {'ingresos': f'{ingresos:.2f}', 'egresos': f'{egresos:.2f}',
+            'corregido': anterior is not None and anterior != (ingresos, egresos)}
+
+
+@tarea('reconstruir_resumen')
+def tarea_reconstruir_resumen(contexto, parametros):
+    diferencias, meses = recalcular_resumen()
+    return {'meses': meses, 'meses_corregidos': [f'{a}-{m:02d}' for (a, m), _, _ in diferencias]}
@@ -0,0 +1,395 @@
+# app/utils/trabajos.py
+# Trabajos en segundo plano sin broker externo. Cada trabajo es una fila de
+# la tabla Trabajos; en cada proceso un hilo revisa la cola, reclama filas
+# pendientes con un UPDATE condicional (solo un proceso gana cada fila) y
+# las ejecuta en un grupo de TRABAJOS_HILOS hilos.
+# - Progreso y cancelación: la tarea llama contexto.progreso(); si se pidió
+#   cancelar, la llamada lanza TrabajoCancelado y se deshace su transacción.
+# - Recuperación: el ejecutor renueva Latido de sus trabajos en cada vuelta.
+#   Un trabajo 'Ejecutando' sin latido por TRABAJOS_VENCIMIENTO segundos
+#   (proceso caído o reiniciado) vuelve a 'Pendiente' mientras le queden
+#   intentos (TRABAJOS_INTENTOS) y si no queda 'Fallido'.
+# - Tareas diarias: los tipos de TRABAJOS_DIARIOS se encolan solos una vez
+#   al día (p. ej. el barrido de cuotas vencidas).
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, insert, select, true, update
+
+from app.extensions import db
+from app.models import Trabajo
+from app.utils.serializadores import TRABAJO_DETALLE, a_json
+
+logger = logging.getLogger(__name__)
+
+PENDIENTE, EJECUTANDO, COMPLETADO, FALLIDO, CANCELADO = ESTADOS = (
+    'Pendiente', 'Ejecutando', 'Completado', 'Fallido', 'Cancelado')
+TERMINADOS = (COMPLETADO, FALLIDO, CANCELADO)
+
+TAREAS = {}   # tipo -> (función, validar)
+_t = Trabajo.__table__
+
+
+class TrabajoCancelado(Exception):
+    """Se pidió cancelar el trabajo; la tarea se detiene en su siguiente punto de control."""
+
+
+def tarea(tipo, validar=None):
+    """
+    Registra una tarea para POST /api/jobs:
+        @tarea('tipo', validar=lambda parametros: [errores])
+        def funcion(contexto, parametros): ... return resultado
+    `validar` se revisa al encolar; el resultado debe poder codificarse en JSON.
+    """
+    def registrar(funcion):
+        TAREAS[tipo] = (funcion, validar)
+        return funcion
+    return registrar
+
+
+def proceso_actual():
+    """Identifica al proceso dueño de un trabajo: 'equipo:pid'."""
+    return f'{socket.gethostname()}:{os.getpid()}'[:100]
+
+
+def _ahora():
+    return datetime.now()
+
+
+class Contexto:
+    """Lo que recibe la tarea en ejecución: su ID y el punto de control."""
+
+    def __init__(self, id_trabajo, proceso):
+        self.id_trabajo = id_trabajo
+        self.proceso = proceso
+
+    def progreso(self, porcentaje, mensaje=None):
+        """
+        Guarda el avance (0-100) en una transacción propia, visible aunque la
+        tarea aún no haga commit. Lanza TrabajoCancelado si se pidió cancelar
+        o si el trabajo ya no pertenece a este proceso (se dio por perdido).
+        En SQLite conviene llamarla fuera de la transacción de escritura de
+        la tarea: el archivo admite un solo escritor.
+        """
+        with db.engine.begin() as conexion:
+            actualizado = conexion.execute(
+                update(_t)
+                .where(_t.c.ID_Trabajo == self.id_trabajo, _t.c.Estado == EJECUTANDO,
+                       _t.c.Proceso == self.proceso, _t.c.Cancelar != true())
+                .values(Progreso=max(0, min(100, int(porcentaje))),
+                        Mensaje=mensaje[:200] if mensaje else None, Latido=_ahora())
+            ).rowcount
+        if not actualizado:
+            raise TrabajoCancelado(self.id_trabajo)
+
+
+# --------------------- Cola ---------------------
+def encolar(tipo, parametros):
+    """
+    Valida y guarda un trabajo nuevo. Devuelve (ID_Trabajo, errores).
+    Con TRABAJOS_HILOS = 0 se ejecuta aquí mismo antes de volver (pruebas,
+    SQLite en memoria); si no, se despierta al ejecutor del proceso.
+    """
+    if tipo not in TAREAS:
+        return None, [f"Tipo debe ser uno de: {', '.join(sorted(TAREAS))}."]
+    if not isinstance(parametros, dict):
+        return None, ['Parametros debe ser un objeto.']
+    validar = TAREAS[tipo][1]
+    errores = validar(parametros) if validar else []
+    if errores:
+        return None, errores
+
+    with db.engine.begin() as conexion:
+        id_trabajo = _insertar(conexion, tipo, parametros)
+
+    app = current_app._get_current_object()
+    if not app.config['TRABAJOS_HILOS']:
+        proceso = proceso_actual()
+        with db.engine.begin() as conexion:
+            reclamado = _reclamar(conexion, id_trabajo, proceso)
+        if reclamado:
+            with app.app_context():   # sesión propia, como en un hilo del ejecutor
+                ejecutar_trabajo(id_trabajo, proceso)
+    elif app.config['TRABAJOS_EN_WEB']:
+        ejecutor.iniciar(app)
+        ejecutor.despertar()
+    return id_trabajo, []
+
+
+def _insertar(conexion, tipo, parametros):
+    return conexion.execute(insert(_t).values(
+        Tipo=tipo, Estado=PENDIENTE, Parametros=a_json(parametros).decode('utf-8'),
+        Progreso=0, Cancelar=False, Intentos=0, Creado=_ahora()
+    )).inserted_primary_key[0]
+
+
+def programar_diarios(tipos, hoy=None):
+    """
+    Encola cada tipo de `tipos` que todavía no tenga un trabajo creado hoy.
+    Si dos procesos coinciden puede quedar uno repetido; las tareas
+    diarias deben ser idempotentes. Devuelve los tipos encolados.
+    """
+    inicio_dia = datetime.combine(hoy or date.today(), datetime.min.time())
+    with db.engine.begin() as conexion:
+        hechos = set(conexion.execute(
+            select(_t.c.Tipo).where(_t.c.Tipo.in_(tipos), _t.c.Creado >= inicio_dia)
+        ).scalars())
+        nuevos = [tipo for tipo in tipos if tipo in TAREAS and tipo not in hechos]
+        for tipo in nuevos:
+            _insertar(conexion, tipo, {})
+    return nuevos
+
+
+def detalle(id_trabajo):
+    """Estado completo de un trabajo con su resultado decodificado; 404 si no existe."""
+    datos = TRABAJO_DETALLE.uno_o_404(id_trabajo)
+    if datos['Resultado'] is not None:
+        datos['Resultado'] = json.loads(datos['Resultado'])
+    return datos
+
+
+def cancelar(id_trabajo):
+    """
+    Pide cancelar un trabajo y devuelve su estado (None si no existe).
+    Pendiente: queda 'Cancelado' de inmediato. Ejecutando: se marca
+    Cancelar y la tarea se detiene en su siguiente contexto.progreso().
+    """
+    with db.engine.begin() as conexion:
+        if conexion.execute(
+            update(_t).where(_t.c.ID_Trabajo == id_trabajo, _t.c.Estado == PENDIENTE)
+            .values(Estado=CANCELADO, Cancelar=True, Terminado=_ahora(), Mensaje='Cancelado')
+        ).rowcount:
+            return CANCELADO
+        conexion.execute(
+            update(_t).where(_t.c.ID_Trabajo == id_trabajo, _t.c.Estado == EJECUTANDO).values(Cancelar=True)
+        )
+        return conexion.execute(select(_t.c.Estado).where(_t.c.ID_Trabajo == id_trabajo)).scalar()
+
+
+def _reclamar(conexion, id_trabajo, proceso):
+    """Pasa un trabajo de 'Pendiente' a 'Ejecutando'; False si otro proceso lo ganó."""
+    ahora = _ahora()
+    return conexion.execute(
+        update(_t).where(_t.c.ID_Trabajo == id_trabajo, _t.c.Estado == PENDIENTE)
+        .values(Estado=EJECUTANDO, Proceso=proceso, Iniciado=ahora, Latido=ahora,
+                Intentos=_t.c.Intentos + 1)
+    ).rowcount == 1
+
+
+def reclamar(proceso, cantidad):
+    """Reclama hasta `cantidad` trabajos pendientes, los más antiguos primero."""
+    if cantidad <= 0:
+        return []
+    with db.engine.begin() as conexion:
+        candidatos = conexion.execute(
+            select(_t.c.ID_Trabajo).where(_t.c.Estado == PENDIENTE)
+            .order_by(_t.c.ID_Trabajo).limit(cantidad)
+        ).scalars().all()
+        return [id_trabajo for id_trabajo in candidatos if _reclamar(conexion, id_trabajo, proceso)]
+
+
+def recuperar_huerfanos(conexion, limite, intentos):
+    """
+    Trabajos 'Ejecutando' sin latido desde antes de `limite`: su proceso se
+    detuvo. Quedan cancelados si se había pedido, pendientes si les quedan
+    intentos y fallidos si no. Devuelve cuántos se recuperaron.
+    """
+    huerfano = (_t.c.Estado == EJECUTANDO, _t.c.Latido < limite)
+    ahora = _ahora()
+    total = conexion.execute(
+        update(_t).where(*huerfano, _t.c.Cancelar == true())
+        .values(Estado=CANCELADO, Terminado=ahora, Mensaje='Cancelado')
+    ).rowcount
+    total += conexion.execute(
+        update(_t).where(*huerfano, _t.c.Intentos >= intentos)
+        .values(Estado=FALLIDO, Terminado=ahora,
+                Error=f'El proceso que lo ejecutaba se detuvo {intentos} veces.')
+    ).rowcount
+    reencolados = conexion.execute(
+        update(_t).where(*huerfano)
+        .values(Estado=PENDIENTE, Proceso=None, Progreso=0, Mensaje='Reintento tras una interrupción')
+    ).rowcount
+    if total or reencolados:
+        logger.warning(f'Trabajos huérfanos: {reencolados} reencolados, {total} terminados')
+    return total + reencolados
+
+
+def purgar(conexion, dias):
+    """Borra los trabajos terminados hace más de `dias` días."""
+    return conexion.execute(
+        delete(_t).where(_t.c.Estado.in_(TERMINADOS), _t.c.Terminado < _ahora() - timedelta(days=dias))
+    ).rowcount
+
+
+# --------------------- Ejecución ---------------------
+def _terminar(id_trabajo, proceso, estado, **valores):
+    """Estado final, solo si el trabajo sigue siendo de este proceso."""
+    with db.engine.begin() as conexion:
+        actualizado = conexion.execute(
+            update(_t).where(_t.c.ID_Trabajo == id_trabajo, _t.c.Estado == EJECUTANDO, _t.c.Proceso == proceso)
+            .values(Estado=estado, Terminado=_ahora(), **valores)
+        ).rowcount
+    if not actualizado:
+        logger.warning(f'Trabajo {id_trabajo}: se dio por perdido antes de terminar; no se guarda {estado}')
+
+
+def ejecutar_trabajo(id_trabajo, proceso):
+    """Corre un trabajo ya reclamado por `proceso` y guarda su estado final."""
+    inicio = time.perf_counter()
+    try:
+        with db.engine.connect() as conexion:
+            tipo, parametros = conexion.execute(
+                select(_t.c.Tipo, _t.c.Parametros).where(_t.c.ID_Trabajo == id_trabajo)
+            ).one()
+        if tipo not in TAREAS:
+            raise ValueError(f'Tipo de trabajo desconocido: {tipo}')
+        resultado = TAREAS[tipo][0](Contexto(id_trabajo, proceso), json.loads(parametros))
+    except TrabajoCancelado:
+        db.session.rollback()
+        _terminar(id_trabajo, proceso, CANCELADO, Mensaje='Cancelado')
+        logger.info(f'Trabajo {id_trabajo} cancelado')
+    except Exception as error:
+        db.session.rollback()
+        logger.exception(f'Trabajo {id_trabajo} falló')
+        _terminar(id_trabajo, proceso, FALLIDO, Error=f'{type(error).__name__}: {error}')
+    else:
+        _terminar(id_trabajo, proceso, COMPLETADO, Progreso=100, Mensaje=None,
+                  Resultado=a_json(resultado).decode('utf-8'))
+        logger.info(f'Trabajo {id_trabajo} ({tipo}) completado en {time.perf_counter() - inicio:.2f}s')
+    finally:
+        db.session.remove()
+
+
+class EjecutorTrabajos:
+    """
+    Hilo de la cola y grupo de hilos de un proceso. Cada vuelta (cada
+    TRABAJOS_INTERVALO segundos, o antes si se encola algo aquí) renueva
+    el latido de sus trabajos, recupera los huérfanos, encola las tareas
+    diarias al cambiar el día y reclama tantos pendientes como hilos
+    libres tenga. El límite total es
+    procesos x TRABAJOS_HILOS.
+    """
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._grupo = None
+        self._en_curso = set()
+        self._ultima_revision = 0.0
+        self._dia_programado = None
+        self.app = None
+        self.proceso = None
+
+    @property
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self, app):
+        """Arranca el hilo de la cola una vez por proceso (o lo reinicia con otra app)."""
+        if self.activo and self.app is app:
+            return
+        with self._candado:
+            if self.activo and self.app is app:
+                return
+        self.detener()
+        with self._candado:
+            self.app = app
+            self.proceso = proceso_actual()
+            self._ultima_revision = 0.0
+            self._dia_programado = None
+            self._detener.clear()
+            self._grupo = ThreadPoolExecutor(app.config['TRABAJOS_HILOS'], thread_name_prefix='trabajos')
+            self._hilo = threading.Thread(target=self._bucle, name='trabajos-cola', daemon=True)
+            self._hilo.start()
+        logger.info(f"Ejecutor de trabajos iniciado en {self.proceso} con {app.config['TRABAJOS_HILOS']} hilos")
+
+    def despertar(self):
+        self._despertar.set()
+
+    def detener(self, esperar=True):
+        """Detiene la cola; con `esperar` también espera a los trabajos en curso."""
+        with self._candado:
+            hilo, grupo = self._hilo, self._grupo
+            self._hilo = self._grupo = None
+        if hilo is None:
+            return
+        self._detener.set()
+        self._despertar.set()
+        hilo.join()
+        grupo.shutdown(wait=esperar)
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            try:
+                with self.app.app_context():
+                    self.revisar()
+            except Exception:
+                logger.exception('Error al revisar la cola de trabajos')
+            self._despertar.wait(self.app.config['TRABAJOS_INTERVALO'])
+            self._despertar.clear()
+
+    def revisar(self):
+        """Una vuelta de la cola (requiere contexto de la app)."""
+        config = self.app.config
+        with self._candado:
+            en_curso = sorted(self._en_curso)
+        with db.engine.begin() as conexion:
+            if en_curso:
+                conexion.execute(
+                    update(_t).where(_t.c.ID_Trabajo.in_(en_curso), _t.c.Estado == EJECUTANDO,
+                                     _t.c.Proceso == self.proceso)
+                    .values(Latido=_ahora())
+                )
+            # La recuperación y la purga no hacen falta en cada vuelta
+            if time.monotonic() - self._ultima_revision >= config['TRABAJOS_VENCIMIENTO'] / 4:
+                self._ultima_revision = time.monotonic()
+                limite = _ahora() - timedelta(seconds=config['TRABAJOS_VENCIMIENTO'])
+                recuperar_huerfanos(conexion, limite, config['TRABAJOS_INTENTOS'])
+                purgar(conexion, config['TRABAJOS_CONSERVAR_DIAS'])
+        if self._dia_programado != date.today():
+            programar_diarios(config['TRABAJOS_DIARIOS'])
+            self._dia_programado = date.today()
+
+        for id_trabajo in reclamar(self.proceso, config['TRABAJOS_HILOS'] - len(en_curso)):
+            with self._candado:
+                self._en_curso.add(id_trabajo)
+            self._grupo.submit(self._ejecutar, id_trabajo)
+
+    def _ejecutar(self, id_trabajo):
+        try:
+            with self.app.app_context():
+                ejecutar_trabajo(id_trabajo, self.proceso)
+        finally:
+            with self._candado:
+                self._en_curso.discard(id_trabajo)
+            self.despertar()   # hay un hilo libre
+
+
+ejecutor = EjecutorTrabajos()
+
+
+def configurar_trabajos(app):
+    """
+    Registra los tipos de trabajo. En los procesos web el ejecutor arranca
+    con la primera petición, así los comandos `flask ...` no toman trabajos;
+    con TRABAJOS_EN_WEB = False solo los ejecuta `flask trabajos ejecutar`.
+    """
+    from app.utils import tareas  # noqa: F401  (registra las tareas; importa este módulo)
+
+    if not (app.config['TRABAJOS_HILOS'] and app.config['TRABAJOS_EN_WEB']):
+        return
+
+    @app.before_request
+    def _iniciar_ejecutor():
+        if not ejecutor.activo:
+            ejecutor.iniciar(app)
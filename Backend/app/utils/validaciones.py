@@ -1,191 +1,446 @@
-
 # app/utils/validaciones.py
 # Validaciones actualizadas para coincidir con los modelos y claves JSON
+#
+# Cada entidad tiene un esquema declarativo (lista de Campo, compilada al
+# importar el módulo) y un ContextoValidacion con los datos de referencia
+# que necesita, precargados para todo el lote con un número constante de
+# consultas. La validación de una sola petición es un lote de una fila:
+# las rutas y las importaciones masivas comparten el mismo código.
 
 import logging
-from app.models import Persona, Derecho, Cuota, Pago, Ingreso, Egreso, PersonaDerecho
+import re
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import func, select
+
+from app.models import Persona, Derecho, Pago, Egreso, PersonaCuota
 from app.extensions import db
-from datetime import datetime
+from app.utils import en_bloques
+from app.utils.saldos import obtener_saldo
+from app.utils.referencias import referencias
 
-# VALIDA DATOS DE PERSONA
-# app/utils/validaciones.py
+# Roles que solo puede ocupar una persona a la vez
+ROLES_UNICOS = ['Presidente', 'Vicepresidente', 'Secretario', 'Tesorero',
+                'Vocal I', 'Vocal II', 'Vocal III']
+
+CERO = Decimal('0')
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------- Conversión de valores ---------------------
+_FORMATO_FECHA = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+def _a_texto(valor):
+    return str(valor).strip()
+
+
+def _a_fecha(valor):
+    if isinstance(valor, date):
+        return valor
+    if isinstance(valor, str) and _FORMATO_FECHA.fullmatch(valor):
+        try:
+            return date.fromisoformat(valor)
+        except ValueError:
+            return None
+    return None
+
+
+def _a_decimal(valor):
+    if isinstance(valor, bool):
+        return None
+    try:
+        numero = Decimal(valor.strip() if isinstance(valor, str) else str(valor))
+    except InvalidOperation:
+        return None
+    return numero if numero.is_finite() else None
+
+
+def _a_entero(valor):
+    if isinstance(valor, bool):
+        return None
+    if isinstance(valor, int):
+        return valor
+    if isinstance(valor, str) and valor.strip().isdigit():
+        return int(valor)
+    return None
+
+
+_CONVERTIDORES = {
+    'texto': _a_texto,
+    'fecha': _a_fecha,
+    'decimal': _a_decimal,
+    'entero': _a_entero,
+}
+
+
+class Campo:
+    """
+    Regla declarativa de un campo. Cada argumento opcional es el mensaje
+    de error de esa comprobación (None = no se comprueba).
+    """
+    __slots__ = ('clave', 'requerido', 'convertir', 'invalido', 'patron', 'opciones', 'positivo', 'prueba')
+
+    def __init__(self, clave, requerido=None, tipo='texto', invalido=None,
+                 patron=None, opciones=None, positivo=None, prueba=None):
+        self.clave     = clave
+        self.requerido = requerido
+        self.convertir = _CONVERTIDORES[tipo]
+        self.invalido  = invalido
+        self.patron    = re.compile(patron) if patron else None
+        self.opciones  = frozenset(opciones) if opciones else None
+        self.positivo  = positivo
+        self.prueba    = prueba
+
+    def revisar(self, datos, limpio, errores):
+        """Valida el campo en `datos`; deja el valor convertido en `limpio`."""
+        valor = datos.get(self.clave)
+        limpio[self.clave] = None
+        if valor is None or valor == '':
+            if self.requerido:
+                errores.append(self.requerido)
+            return
+        convertido = self.convertir(valor)
+        if (convertido is None
+                or (self.patron and not self.patron.fullmatch(convertido))
+                or (self.opciones and convertido not in self.opciones)
+                or (self.prueba and not self.prueba(convertido))):
+            errores.append(self.invalido)
+            return
+        if self.positivo and convertido <= 0:
+            errores.append(self.positivo)
+            return
+        limpio[self.clave] = convertido
+
+
+def aplicar_esquema(esquema, datos):
+    """Aplica una lista de Campo. Devuelve (limpio, errores)."""
+    limpio, errores = {}, []
+    for campo in esquema:
+        campo.revisar(datos, limpio, errores)
+    return limpio, errores
+
+
+# --------------------- Esquemas ---------------------
+_DPI_INVALIDO = 'DPI debe ser un número de 13 dígitos.'
+
+_CAMPOS_PERSONA = [
+    Campo('Nombre'),
+    Campo('Email', invalido='Correo electrónico inválido.', prueba=lambda v: '@' in v and '.' in v),
+    Campo('Estado', invalido='El estado debe ser Activo o Inactivo.', opciones=['Activo', 'Inactivo']),
+    Campo('Telefono', invalido='El teléfono debe ser numérico con una longitud válida.', patron=r'\d{7,15}'),
+    Campo('Direccion'),
+    Campo('Rol'),
+]
+ESQUEMA_PERSONA_ALTA = [
+    Campo('DPI', requerido=_DPI_INVALIDO, invalido=_DPI_INVALIDO, patron=r'\d{13}'),
+    Campo('Nombre', requerido='El nombre es obligatorio.'),
+] + _CAMPOS_PERSONA[1:]
+ESQUEMA_PERSONA_CAMBIO = [
+    Campo('DPI', invalido=_DPI_INVALIDO, patron=r'\d{13}'),
+] + _CAMPOS_PERSONA
+
+ESQUEMA_DERECHO = [
+    Campo('Nombre', requerido='El nombre del derecho es obligatorio.'),
+]
+
+ESQUEMA_CUOTA = [
+    Campo('Descripcion', requerido='La descripción es obligatoria.'),
+    Campo('Monto', requerido='El monto debe ser un número positivo.', tipo='decimal',
+          invalido='El monto debe ser un número positivo.', positivo='El monto debe ser un número positivo.'),
+    Campo('Fecha_Limite', requerido='La fecha límite es obligatoria.', tipo='fecha',
+          invalido='Fecha_Limite debe ser YYYY-MM-DD.'),
+]
+
+ESQUEMA_PAGO = [
+    Campo('ID_Persona', requerido='Persona inválida.', tipo='entero', invalido='Persona inválida.'),
+    Campo('ID_Cuota', requerido='Cuota inválida.', tipo='entero', invalido='Cuota inválida.'),
+    Campo('Fecha_Pago', requerido='La fecha de pago es obligatoria.', tipo='fecha',
+          invalido='Fecha_Pago debe ser YYYY-MM-DD.'),
+    Campo('Monto_Pagado', requerido='El monto pagado debe ser mayor a cero.', tipo='decimal',
+          invalido='El monto pagado debe ser un número válido.', positivo='El monto pagado debe ser mayor a cero.'),
+]
+
+ESQUEMA_INGRESO = [
+    Campo('Fecha', requerido='La fecha es obligatoria.', tipo='fecha', invalido='Fecha debe ser YYYY-MM-DD.'),
+    Campo('Monto', requerido='El monto debe ser positivo.', tipo='decimal',
+          invalido='El monto debe ser un número válido.', positivo='El monto debe ser positivo.'),
+    Campo('Fuente', requerido='La fuente es obligatoria.'),
+]
+
+ESQUEMA_PERSONA_DERECHO = [
+    Campo('ID_Persona', requerido='ID_Persona es obligatorio.', tipo='entero', invalido='ID_Persona es obligatorio.'),
+    Campo('ID_Derecho', requerido='ID_Derecho es obligatorio.', tipo='entero', invalido='ID_Derecho es obligatorio.'),
+    Campo('Fecha_Inicio', requerido='Fecha_Inicio obligatoria.', tipo='fecha', invalido='Fecha_Inicio debe ser YYYY-MM-DD.'),
+    Campo('Fecha_Fin', tipo='fecha', invalido='Fecha_Fin debe ser YYYY-MM-DD.'),
+]
+
+ESQUEMA_EGRESO = [
+    Campo('Monto', requerido='El monto debe ser un número positivo.', tipo='decimal',
+          invalido='El monto debe ser un número válido.', positivo='El monto debe ser un número positivo.'),
+    Campo('Fecha', requerido='La fecha es obligatoria.', tipo='fecha', invalido='Fecha debe ser YYYY-MM-DD.'),
+    Campo('Descripcion', requerido='La descripción es obligatoria.'),
+]
+
+
+# --------------------- Contexto de validación ---------------------
+class ContextoValidacion:
+    """
+    Datos de referencia de un lote, precargados con una consulta por bloque
+    de IN. También recuerda lo ya aceptado en el lote (DPI, roles, pagos,
+    egresos) para que cada fila se valide contra las anteriores.
+    """
+
+    def __init__(self):
+        self.personas  = set()   # ID_Persona existentes
+        self.dpis      = {}      # DPI registrado -> ID_Persona
+        self.dpis_lote = set()   # DPI aceptados en este lote
+        self.roles     = {}      # rol único ocupado -> ID_Persona (None si es del lote)
+        self.derechos  = set()   # Nombre de derechos existentes o aceptados
+        self.cuotas    = {}      # ID_Cuota -> Monto
+        self.pagado    = {}      # (ID_Persona, ID_Cuota) -> total pagado
+        self.asignados = set()   # pares con fila en Persona_Cuota
+        self.egresos   = set()   # (Fecha, Descripcion) existentes o aceptados
+        self.fondos    = None    # disponible, descontando egresos aceptados
+
+    @staticmethod
+    def _valores(filas, clave, convertir):
+        return {v for v in (convertir(f.get(clave)) for f in filas if f.get(clave) not in (None, '')) if v is not None}
+
+    @classmethod
+    def para_personas(cls, filas):
+        ctx = cls()
+        for bloque in en_bloques(cls._valores(filas, 'DPI', _a_texto)):
+            ctx.dpis.update(db.session.execute(
+                select(Persona.dpi, Persona.id_persona).where(Persona.dpi.in_(bloque))
+            ).all())
+        if any(f.get('Rol') in ROLES_UNICOS for f in filas):
+            ctx.roles.update(db.session.execute(
+                select(Persona.rol, Persona.id_persona).where(Persona.rol.in_(ROLES_UNICOS))
+            ).all())
+        return ctx
+
+    @classmethod
+    def para_derechos(cls, filas):
+        ctx = cls()
+        for bloque in en_bloques(cls._valores(filas, 'Nombre', _a_texto)):
+            ctx.derechos.update(db.session.execute(
+                select(Derecho.Nombre).where(Derecho.Nombre.in_(bloque))
+            ).scalars())
+        return ctx
+
+    @classmethod
+    def para_pagos(cls, filas):
+        ctx = cls()
+        ids_persona = cls._valores(filas, 'ID_Persona', _a_entero)
+        ids_cuota   = cls._valores(filas, 'ID_Cuota', _a_entero)
+        for bloque in en_bloques(ids_persona):
+            ctx.personas.update(db.session.execute(
+                select(Persona.id_persona).where(Persona.id_persona.in_(bloque))
+            ).scalars())
+        # Montos de cuota desde el caché de referencias (solo los faltantes van a la base)
+        ctx.cuotas = {id_c: ref.Monto for id_c, ref in referencias.cuotas(ids_cuota).items()}
+        if not ctx.personas or not ctx.cuotas:
+            return ctx
+
+        # Acumulado por par desde Persona_Cuota.Total_Pagado
+        cuotas = list(ctx.cuotas)
+        for bloque in en_bloques(ctx.personas):
+            for id_p, id_c, total in db.session.execute(
+                select(PersonaCuota.ID_Persona, PersonaCuota.ID_Cuota, PersonaCuota.Total_Pagado)
+                .where(PersonaCuota.ID_Persona.in_(bloque), PersonaCuota.ID_Cuota.in_(cuotas))
+            ):
+                ctx.pagado[(id_p, id_c)] = total
+                ctx.asignados.add((id_p, id_c))
+
+        # Pagos sin asignación previa: solo si alguna fila los necesita
+        pares = {(_a_entero(f.get('ID_Persona')), _a_entero(f.get('ID_Cuota'))) for f in filas}
+        sueltos = {p for p, c in pares if p in ctx.personas and c in ctx.cuotas and (p, c) not in ctx.asignados}
+        for bloque in en_bloques(sueltos):
+            for id_p, id_c, total in db.session.execute(
+                select(Pago.ID_Persona, Pago.ID_Cuota, func.sum(Pago.Monto_Pagado))
+                .where(Pago.ID_Persona.in_(bloque), Pago.ID_Cuota.in_(cuotas))
+                .group_by(Pago.ID_Persona, Pago.ID_Cuota)
+            ):
+                ctx.pagado.setdefault((id_p, id_c), total)
+        return ctx
+
+    @classmethod
+    def para_egresos(cls, filas):
+        ctx = cls()
+        fechas = cls._valores(filas, 'Fecha', _a_fecha)
+        for bloque in en_bloques(fechas):
+            ctx.egresos.update(db.session.execute(
+                select(Egreso.Fecha, Egreso.Descripcion).where(Egreso.Fecha.in_(bloque))
+            ).tuples())
+        ctx.fondos = obtener_saldo().disponible
+        return ctx
+
+
+# --------------------- Revisión por entidad ---------------------
+# Cada revisar_* devuelve (limpio, errores) y, si la fila es válida,
+# la registra en el contexto para las filas siguientes del lote.
+
+def revisar_persona(datos, ctx, actualizacion=False):
+    limpio, errores = aplicar_esquema(
+        ESQUEMA_PERSONA_CAMBIO if actualizacion else ESQUEMA_PERSONA_ALTA, datos
+    )
+    id_persona = datos.get('ID_Persona')
+    dpi = limpio['DPI']
+    if dpi:
+        if dpi in ctx.dpis and (not actualizacion or ctx.dpis[dpi] != id_persona):
+            errores.append('El DPI ya está registrado en otra persona.' if actualizacion
+                           else 'El DPI ya está registrado.')
+        elif dpi in ctx.dpis_lote:
+            errores.append('El DPI está repetido en el archivo.')
+
+    rol = limpio['Rol']
+    if rol in ROLES_UNICOS and rol in ctx.roles:
+        if not id_persona or ctx.roles[rol] != id_persona:
+            errores.append(f"El rol '{rol}' ya está asignado a otra persona.")
+
+    if not errores:
+        if dpi:
+            ctx.dpis_lote.add(dpi)
+        if rol in ROLES_UNICOS:
+            ctx.roles[rol] = id_persona
+    return limpio, errores
+
+
+def revisar_derecho(datos, ctx):
+    limpio, errores = aplicar_esquema(ESQUEMA_DERECHO, datos)
+    if limpio['Nombre'] in ctx.derechos:
+        errores.append('Este derecho ya existe.')
+    if not errores:
+        ctx.derechos.add(limpio['Nombre'])
+    return limpio, errores
+
+
+def revisar_cuota(datos, ctx=None):
+    return aplicar_esquema(ESQUEMA_CUOTA, datos)
+
+
+def revisar_pago(datos, ctx):
+    limpio, errores = aplicar_esquema(ESQUEMA_PAGO, datos)
+    id_persona, id_cuota = limpio['ID_Persona'], limpio['ID_Cuota']
+    if id_persona is not None and id_persona not in ctx.personas:
+        errores.append('Persona inválida.')
+    if id_cuota is not None and id_cuota not in ctx.cuotas:
+        errores.append('Cuota inválida.')
+    if errores:
+        return limpio, errores
 
+    # Lógica de saldo: acumulado precargado más lo aceptado en el lote
+    par = (id_persona, id_cuota)
+    monto_cuota = ctx.cuotas[id_cuota]
+    previo = ctx.pagado.get(par, CERO)
+    if previo >= monto_cuota:
+        errores.append('Esta cuota ya está completamente pagada.')
+    elif limpio['Monto_Pagado'] + previo > monto_cuota:
+        errores.append(f'El monto no puede exceder Q{float(monto_cuota - previo)}.')
+    else:
+        ctx.pagado[par] = previo + limpio['Monto_Pagado']
+    return limpio, errores
+
+
+def revisar_ingreso(datos, ctx=None):
+    return aplicar_esquema(ESQUEMA_INGRESO, datos)
+
+
+def revisar_persona_derecho(datos, ctx=None):
+    limpio, errores = aplicar_esquema(ESQUEMA_PERSONA_DERECHO, datos)
+    fi, ff = limpio['Fecha_Inicio'], limpio['Fecha_Fin']
+    if fi and ff and fi > ff:
+        errores.append('Fecha_Inicio no puede ser posterior a Fecha_Fin.')
+    return limpio, errores
+
+
+def revisar_egreso(datos, ctx):
+    limpio, errores = aplicar_esquema(ESQUEMA_EGRESO, datos)
+    if not datos.get('Fecha'):
+        logger.error("Validación fallida en Egreso: Fecha faltante.")
+    if not datos.get('Descripcion'):
+        logger.error("Validación fallida en Egreso: Descripción faltante.")
+
+    # Evitar duplicados exactos por fecha+descripción
+    clave = (limpio['Fecha'], limpio['Descripcion'])
+    if all(clave) and clave in ctx.egresos:
+        errores.append('Ya existe un egreso registrado con esta fecha y descripción.')
+
+    # Fondos disponibles: solo si no hay errores previos
+    if not errores:
+        monto = limpio['Monto']
+        if monto > ctx.fondos:
+            errores.append(
+                f'Fondos insuficientes. Disponible: Q{ctx.fondos:.2f}. '
+                f'Egreso solicitado: Q{monto:.2f}.'
+            )
+            logger.error(
+                f"Validación fallida en Egreso: fondos insuficientes "
+                f"(disp={ctx.fondos}, sol={monto})."
+            )
+        else:
+            ctx.fondos -= monto
+            ctx.egresos.add(clave)
+    return limpio, errores
+
+
+def validar_lote(revisar, filas, ctx=None, **opciones):
+    """
+    Aplica `revisar` a cada fila con el mismo contexto.
+    Devuelve (validas, errores_por_fila) con filas numeradas desde 1.
+    """
+    validas, errores = [], []
+    for numero, fila in enumerate(filas, start=1):
+        limpio, errores_fila = revisar(fila, ctx, **opciones)
+        if errores_fila:
+            errores.append({'fila': numero, 'errores': errores_fila})
+        else:
+            validas.append(limpio)
+    return validas, errores
+
+
+# --------------------- Validadores de una petición ---------------------
 def validar_persona(datos: dict, actualizacion: bool = False) -> list[str]:
     """
     Valida los datos de una persona.
     - Si actualizacion=False (creación), exige DPI presente y único.
     - Si actualizacion=True, solo valida el DPI si viene en datos.
     """
-    errores = []
-    dpi = datos.get('DPI')
-
-    # 1) Validar DPI
-    if not actualizacion:
-        # En creación: DPI obligatorio y único
-        if not dpi or len(dpi) != 13 or not dpi.isdigit():
-            errores.append('DPI debe ser un número de 13 dígitos.')
-        elif Persona.query.filter_by(dpi=dpi).first():
-            errores.append('El DPI ya está registrado.')
-    else:
-        # En actualización: si envían DPI, validarlo
-        if 'DPI' in datos and dpi:
-            if len(dpi) != 13 or not dpi.isdigit():
-                errores.append('DPI debe ser un número de 13 dígitos.')
-            else:
-                # Si cambian el DPI, asegurarse de no colisionar con otro registro
-                id_persona = datos.get('ID_Persona')
-                existente = Persona.query.filter_by(dpi=dpi).first()
-                if existente and existente.id_persona != id_persona:
-                    errores.append('El DPI ya está registrado en otra persona.')
-
-    # 2) Validar email
-    correo = datos.get('Email')
-    if correo and ('@' not in correo or '.' not in correo):
-        errores.append('Correo electrónico inválido.')
-
-    # 3) Validar estado
-    estado = datos.get('Estado')
-    if estado and estado not in ['Activo', 'Inactivo']:
-        errores.append('El estado debe ser Activo o Inactivo.')
-
-    # 4) Validar teléfono
-    telefono = datos.get('Telefono')
-    if telefono and (not telefono.isdigit() or not (7 <= len(telefono) <= 15)):
-        errores.append('El teléfono debe ser numérico con una longitud válida.')
-
-    # 5) Validar rol único
-    rol = datos.get('Rol')
-    roles_unicos = ['Presidente', 'Vicepresidente', 'Secretario', 'Tesorero',
-                    'Vocal I', 'Vocal II', 'Vocal III']
-    if rol in roles_unicos:
-        existente = Persona.query.filter_by(rol=rol).first()
-        # Si es actualización, permitir si es la misma persona
-        if existente and (not datos.get('ID_Persona') or existente.id_persona != datos['ID_Persona']):
-            errores.append(f"El rol '{rol}' ya está asignado a otra persona.")
-
-    return errores
+    return revisar_persona(datos, ContextoValidacion.para_personas([datos]), actualizacion)[1]
 
 
 # VALIDA DATOS DE DERECHO
 def validar_derecho(datos):
-    errores = []
-    nombre = datos.get('Nombre')
-    if not nombre:
-        errores.append('El nombre del derecho es obligatorio.')
-    else:
-        if Derecho.query.filter_by(nombre=nombre).first():
-            errores.append('Este derecho ya existe.')
-    return errores
+    return revisar_derecho(datos, ContextoValidacion.para_derechos([datos]))[1]
 
 # VALIDA DATOS DE CUOTA
 def validar_cuota(datos):
-    errores = []
-    desc = datos.get('Descripcion')
-    if not desc:
-        errores.append('La descripción es obligatoria.')
-    monto = datos.get('Monto')
-    if monto is None or not isinstance(monto, (int, float)) or monto <= 0:
-        errores.append('El monto debe ser un número positivo.')
-    if not datos.get('Fecha_Limite'):
-        errores.append('La fecha límite es obligatoria.')
-    else:
-        # Verifica formato YYYY-MM-DD
-        try:
-            datetime.strptime(datos['Fecha_Limite'], '%Y-%m-%d')
-        except ValueError:
-            errores.append('Fecha_Limite debe ser YYYY-MM-DD.')
-    return errores
+    return revisar_cuota(datos)[1]
 
 # VALIDA DATOS DE PAGO
-def validar_pago(datos):
-    errores = []
-    # Persona
-    id_persona = datos.get('ID_Persona')
-    if not id_persona or not Persona.query.get(id_persona):
-        errores.append('Persona inválida.')
-    # Cuota
-    id_cuota = datos.get('ID_Cuota')
-    cuota = Cuota.query.get(id_cuota)
-    if not cuota:
-        errores.append('Cuota inválida.')
-    # Fecha Pago
-    fecha_pago = datos.get('Fecha_Pago')
-    if not fecha_pago:
-        errores.append('La fecha de pago es obligatoria.')
-    else:
-        try:
-            datetime.strptime(fecha_pago, '%Y-%m-%d')
-        except ValueError:
-            errores.append('Fecha_Pago debe ser YYYY-MM-DD.')
-    # Monto Pagado
-    monto_pagado = datos.get('Monto_Pagado', 0)
-    if monto_pagado <= 0:
-        errores.append('El monto pagado debe ser mayor a cero.')
-    # Lógica de saldo
-    if cuota and id_persona:
-        pagos_previos = db.session.query(db.func.sum(Pago.monto_pagado))\
-            .filter(Pago.id_persona==id_persona, Pago.id_cuota==id_cuota).scalar() or 0
-        if pagos_previos >= cuota.monto:
-            errores.append('Esta cuota ya está completamente pagada.')
-        elif monto_pagado + pagos_previos > cuota.monto:
-            faltante = float(cuota.monto - pagos_previos)
-            errores.append(f'El monto no puede exceder Q{faltante}.')
-    return errores
+def validar_pago(datos, anterior=None):
+    """
+    `anterior` es el pago que se edita. Si no tiene fila en Persona_Cuota
+    su monto sigue en la suma de pagos sueltos y se descuenta; con fila,
+    quien llama ya revirtió el acumulado (ver put_pago).
+    """
+    ctx = ContextoValidacion.para_pagos([datos])
+    if anterior is not None:
+        par = (anterior.ID_Persona, anterior.ID_Cuota)
+        if par not in ctx.asignados and par in ctx.pagado:
+            ctx.pagado[par] -= anterior.Monto_Pagado
+    return revisar_pago(datos, ctx)[1]
 
 # VALIDA DATOS DE INGRESO
 def validar_ingreso(datos):
-    errores = []
-    # Fecha
-    if not datos.get('Fecha'):
-        errores.append('La fecha es obligatoria.')
-    else:
-        try:
-            datetime.strptime(datos['Fecha'], '%Y-%m-%d')
-        except ValueError:
-            errores.append('Fecha debe ser YYYY-MM-DD.')
-    # Monto
-    try:
-        monto = float(datos.get('Monto', 0))
-        if monto <= 0:
-            errores.append('El monto debe ser positivo.')
-    except:
-        errores.append('El monto debe ser un número válido.')
-    # Fuente
-    if not datos.get('Fuente'):
-        errores.append('La fuente es obligatoria.')
-    return errores
-
-
+    return revisar_ingreso(datos)[1]
 
 # VALIDA PERSONA_DERECHO
 def validar_persona_derecho(datos):
-    errores = []
-    # ID_Persona y ID_Derecho
-    if not datos.get('ID_Persona'):
-        errores.append('ID_Persona es obligatorio.')
-    if not datos.get('ID_Derecho'):
-        errores.append('ID_Derecho es obligatorio.')
-    # Fechas inicio/vencimiento
-    fi = datos.get('Fecha_Inicio')
-    ff = datos.get('Fecha_Fin')
-    if not fi:
-        errores.append('Fecha_Inicio obligatoria.')
-    else:
-        try:
-            datetime.strptime(fi, '%Y-%m-%d')
-        except:
-            errores.append('Fecha_Inicio debe ser YYYY-MM-DD.')
-    if ff:
-        try:
-            datetime.strptime(ff, '%Y-%m-%d')
-        except:
-            errores.append('Fecha_Fin debe ser YYYY-MM-DD.')
-    if fi and ff and fi > ff:
-        errores.append('Fecha_Inicio no puede ser posterior a Fecha_Fin.')
-    return errores
-
-
-
+    return revisar_persona_derecho(datos)[1]
 
 
 def validar_egreso(datos: dict) -> list[str]:
@@ -194,51 +449,6 @@ def validar_egreso(datos: dict) -> list[str]:
     1) Monto positivo y numérico.
     2) Fecha obligatoria.
     3) Descripción obligatoria y no duplicada.
-    4) Fondos suficientes: (SUM ingresos) - (SUM egresos existentes).
+    4) Fondos suficientes: se lee el saldo acumulado en Saldo_Fondos.
     """
-    errores = []
-
-    # 1) Validación de Monto
-    try:
-        monto = float(datos.get('Monto', 0))
-        if monto <= 0:
-            errores.append('El monto debe ser un número positivo.')
-    except (TypeError, ValueError):
-        errores.append('El monto debe ser un número válido.')
-
-    # 2) Validación de Fecha
-    if not datos.get('Fecha'):
-        errores.append('La fecha es obligatoria.')
-        logging.error("Validación fallida en Egreso: Fecha faltante.")
-
-    # 3) Validación de Descripción
-    descripcion = datos.get('Descripcion')
-    if not descripcion:
-        errores.append('La descripción es obligatoria.')
-        logging.error("Validación fallida en Egreso: Descripción faltante.")
-    else:
-        # Evitar duplicados exactos por fecha+descripción
-        if datos.get('Fecha') and Egreso.query.filter_by(
-            fecha=datos['Fecha'],
-            descripcion=descripcion
-        ).first():
-            errores.append('Ya existe un egreso registrado con esta fecha y descripción.')
-
-    # 4) Validación de fondos disponibles
-    # Solo procedemos si no hay errores previos
-    if not errores:
-        total_ingresos = db.session.query(db.func.sum(Ingreso.monto)).scalar() or 0
-        total_egresos  = db.session.query(db.func.sum(Egreso.monto)).scalar()  or 0
-        fondos_disp    = total_ingresos - total_egresos
-
-        if monto > fondos_disp:
-            errores.append(
-                f'Fondos insuficientes. Disponible: Q{fondos_disp:.2f}. '
-                f'Egreso solicitado: Q{monto:.2f}.'
-            )
-            logging.error(
-                f"Validación fallida en Egreso: fondos insuficientes "
-                f"(disp={fondos_disp}, sol={monto})."
-            )
-
-    return errores
\ No newline at end of file
+    return revisar_egreso(datos, ContextoValidacion.para_egresos([datos]))[1]
@@ -0,0 +1,92 @@
+# app/utils/vencimientos.py
+# Estado 'Vencido' de Persona_Cuota: asignaciones sin completar cuya cuota
+# pasó su Fecha_Limite. Pagos, asignaciones nuevas y cambios de cuota ya
+# dejan el estado correcto al escribir; lo único que cambia sin que nadie
+# escriba es la fecha, y eso lo cubre el barrido diario (marcar_vencidas).
+
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models import Cuota, PersonaCuota, BarridoVencimientos
+
+PENDIENTE, COMPLETADO, VENCIDO = 'Pendiente', 'Completado', 'Vencido'
+TAMANO_LOTE = 5000   # rango de ID_Persona por UPDATE; cada lote es su propia transacción
+
+
+def estado_inicial(fecha_limite, hoy=None):
+    """Estado de una asignación nueva, sin pagos."""
+    return VENCIDO if fecha_limite < (hoy or date.today()) else PENDIENTE
+
+
+def recalcular_estados(id_cuota):
+    """
+    Reevalúa el estado de todas las asignaciones de una cuota (tras
+    cambiar su Monto o su Fecha_Limite) con un UPDATE. No hace commit.
+    """
+    return db.session.execute(
+        update(PersonaCuota).where(PersonaCuota.ID_Cuota == id_cuota)
+        .values(Estado=PersonaCuota.estado_por_total(PersonaCuota.Total_Pagado, id_cuota))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def ultimo_corte():
+    """Fecha_Corte del último barrido, o None si nunca se ha ejecutado."""
+    return db.session.execute(select(func.max(BarridoVencimientos.Fecha_Corte))).scalar()
+
+
+def marcar_vencidas(hoy=None, completo=False, tamano_lote=TAMANO_LOTE, progreso=None):
+    """
+    Pasa a 'Vencido' las asignaciones 'Pendiente' de las cuotas que
+    vencieron desde el último barrido (Fecha_Limite en [corte anterior, hoy)):
+    un UPDATE Persona_Cuota ... FROM Cuotas por rango de ID_Persona, con
+    commit por lote para no retener bloqueos. Si no venció ninguna cuota no
+    toca Persona_Cuota. `completo` ignora el corte anterior (reparación).
+    `progreso(lote, lotes)` se llama tras cada commit.
+    Registra el barrido en Barrido_Vencimientos y devuelve sus datos.
+    """
+    reloj, inicio = time.perf_counter(), datetime.now()
+    hoy = hoy or date.today()
+    desde = None if completo else ultimo_corte()
+
+    ventana = [Cuota.Fecha_Limite < hoy]
+    if desde is not None:
+        ventana.append(Cuota.Fecha_Limite >= desde)
+    cuotas = db.session.execute(select(func.count()).select_from(Cuota).where(*ventana)).scalar()
+
+    filas = lotes = 0
+    if cuotas:
+        minimo, maximo = db.session.execute(
+            select(func.min(PersonaCuota.ID_Persona), func.max(PersonaCuota.ID_Persona))
+        ).one()
+        db.session.commit()
+        inicios = range(minimo, maximo + 1, tamano_lote) if minimo is not None else range(0)
+        for lote, desde_persona in enumerate(inicios, 1):
+            filas += db.session.execute(
+                update(PersonaCuota)
+                .where(PersonaCuota.ID_Cuota == Cuota.ID_Cuota, *ventana,
+                       PersonaCuota.Estado == PENDIENTE,
+                       PersonaCuota.ID_Persona >= desde_persona,
+                       PersonaCuota.ID_Persona < desde_persona + tamano_lote)
+                .values(Estado=VENCIDO)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+            lotes = lote
+            if progreso:
+                progreso(lote, len(inicios))
+
+    segundos = round(time.perf_counter() - reloj, 3)
+    db.session.add(BarridoVencimientos(
+        Fecha_Corte=hoy, Desde=desde, Inicio=inicio, Segundos=Decimal(str(segundos)),
+        Cuotas=cuotas, Filas=filas, Lotes=lotes
+    ))
+    db.session.commit()
+    return {
+        'Fecha_Corte': hoy.isoformat(), 'Desde': desde.isoformat() if desde else None,
+        'Cuotas': cuotas, 'Filas': filas, 'Lotes': lotes, 'Segundos': segundos
+    }
@@ -0,0 +1,126 @@
+# app/utils/versiones.py
+# Contador de versión por tabla y respuestas GET condicionales (ETag / 304)
+
+import hashlib
+from datetime import date
+from functools import wraps
+
+from flask import request, make_response
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import VersionTabla
+
+# Tablas con contador (las mismas que siembra la migración de Version_Tabla)
+TABLAS = frozenset((
+    'Personas', 'Derechos', 'Persona_Derecho', 'Cuotas', 'Derecho_Cuota',
+    'Persona_Cuota', 'Pagos', 'Ingresos', 'Egresos'
+))
+CACHE_CONTROL = 'private, no-cache'  # el navegador guarda, pero siempre revalida
+
+
+def incrementar_versiones(session, tablas):
+    """
+    Suma 1 a la versión de cada tabla con un UPDATE atómico dentro de la
+    transacción de `session`; si la fila no existe la crea. No hace commit.
+    """
+    tabla = VersionTabla.__table__
+    # Orden fijo para que dos transacciones no se bloqueen mutuamente
+    for nombre in sorted(set(tablas) & TABLAS):
+        resultado = session.execute(
+            tabla.update()
+            .where(tabla.c.Tabla == nombre)
+            .values(Version=tabla.c.Version + 1)
+        )
+        if resultado.rowcount == 0:
+            session.execute(tabla.insert().values(Tabla=nombre, Version=1))
+
+
+def marcar_versiones(session, tablas):
+    """
+    Anota las tablas que cambia la transacción de `session`. Sus versiones
+    suben una sola vez, justo antes del commit (ver _versionar_commit).
+    """
+    session.info.setdefault('versiones_pendientes', set()).update(set(tablas) & TABLAS)
+
+
+@event.listens_for(Session, 'before_flush')
+def _versionar_flush(session, flush_context, instances):
+    """Altas, cambios y bajas del ORM (incluidas las cascadas ya cargadas)."""
+    tablas = {type(obj).__tablename__ for obj in session.new}
+    tablas |= {type(obj).__tablename__ for obj in session.deleted}
+    tablas |= {type(obj).__tablename__ for obj in session.dirty if session.is_modified(obj)}
+    marcar_versiones(session, tablas)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _versionar_sentencia(estado):
+    """
+    INSERT/UPDATE/DELETE por lote enviados con session.execute (importaciones,
+    asignación masiva, acumulados): no pasan por el flush.
+    """
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        tabla = getattr(estado.statement, 'table', None)
+        if tabla is not None:
+            marcar_versiones(estado.session, [tabla.name])
+
+
+@event.listens_for(Session, 'before_commit')
+def _versionar_commit(session):
+    """
+    Un UPDATE por tabla y transacción, en orden fijo, al final: las filas de
+    Version_Tabla quedan bloqueadas solo durante el commit y no por cada
+    flush o sentencia. before_commit corre antes del último flush, así que
+    se hace aquí para anotar también lo que este escriba.
+    """
+    session.flush()
+    tablas = session.info.pop('versiones_pendientes', None)
+    if tablas:
+        incrementar_versiones(session, tablas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_versiones(session):
+    session.info.pop('versiones_pendientes', None)
+
+
+def versiones(session, tablas):
+    """{tabla: versión} leído de Version_Tabla en una sola consulta."""
+    return dict(session.execute(
+        select(VersionTabla.Tabla, VersionTabla.Version).where(VersionTabla.Tabla.in_(tablas))
+    ).all())
+
+
+def calcular_etag(session, tablas):
+    """
+    ETag fuerte de la petición actual: ruta con parámetros, fecha del día
+    (los estados 'Vencido' cambian con ella) y versiones de las tablas.
+    """
+    actuales = versiones(session, tablas)
+    partes = [request.full_path, date.today().isoformat()]
+    partes += [f'{t}={actuales.get(t, 0)}' for t in sorted(tablas)]
+    return hashlib.sha1('|'.join(partes).encode('utf-8')).hexdigest()
+
+
+def condicional(*tablas):
+    """
+    Decorador para rutas GET que solo dependen de `tablas`. Si el cliente
+    envía If-None-Match con el ETag vigente responde 304 sin ejecutar la
+    vista (solo se lee Version_Tabla); si no, agrega ETag y Cache-Control.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            etag = calcular_etag(db.session, tablas)
+            if request.if_none_match.contains(etag):
+                respuesta = make_response('', 304)
+            else:
+                respuesta = make_response(vista(*args, **kwargs))
+                if respuesta.status_code != 200:
+                    return respuesta
+            respuesta.set_etag(etag)
+            respuesta.headers['Cache-Control'] = CACHE_CONTROL
+            return respuesta
+        return envoltura
+    return decorador
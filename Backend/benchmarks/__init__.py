@@ -0,0 +1,4 @@
+# benchmarks/
+# Mediciones de rendimiento de la API contra una copia local en SQLite.
+# Uso: python -m benchmarks.ejecutar --niveles 1k,50k
+#      python -m benchmarks.comparar base.json nuevo.json
@@ -0,0 +1,71 @@
+# benchmarks/comparar.py
+# Compara dos resultados de benchmarks.ejecutar y sale con código 1 si hay
+# regresiones: p50/p95 más lentos que la tolerancia, más memoria pico o
+# más sentencias SQL para el mismo escenario y nivel.
+#
+#   python -m benchmarks.comparar base.json nuevo.json --tolerancia 0.15
+
+import argparse
+import json
+import sys
+
+METRICAS_TIEMPO = ('p50_ms', 'p95_ms')
+
+
+def _indexar(informe):
+    return {(r['nivel'], r['escenario']): r for r in informe['resultados']}
+
+
+def comparar(base, nuevo, tolerancia=0.2, minimo_ms=1.0):
+    """
+    Lista de (nivel, escenario, métrica, antes, después, cambio, regresión).
+    Diferencias de tiempo menores que `minimo_ms` no cuentan como regresión
+    (ruido en escenarios de pocos milisegundos).
+    """
+    filas = []
+    antes, despues = _indexar(base), _indexar(nuevo)
+    for clave in sorted(antes.keys() & despues.keys()):
+        a, d = antes[clave], despues[clave]
+        for metrica in METRICAS_TIEMPO:
+            cambio = d[metrica] / a[metrica] - 1 if a[metrica] else 0.0
+            regresion = cambio > tolerancia and d[metrica] - a[metrica] > minimo_ms
+            filas.append((*clave, metrica, a[metrica], d[metrica], cambio, regresion))
+        cambio = d['pico_memoria_kb'] / a['pico_memoria_kb'] - 1 if a['pico_memoria_kb'] else 0.0
+        filas.append((*clave, 'pico_memoria_kb', a['pico_memoria_kb'], d['pico_memoria_kb'],
+                      cambio, cambio > tolerancia and d['pico_memoria_kb'] - a['pico_memoria_kb'] > 64))
+        filas.append((*clave, 'sentencias_sql', a['sentencias_sql'], d['sentencias_sql'],
+                      d['sentencias_sql'] - a['sentencias_sql'], d['sentencias_sql'] > a['sentencias_sql']))
+    return filas
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Compara dos resultados de benchmarks.')
+    parser.add_argument('base')
+    parser.add_argument('nuevo')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='Aumento relativo aceptado (0.2 = 20%%).')
+    parser.add_argument('--minimo-ms', type=float, default=1.0, help='Diferencia absoluta mínima para contar.')
+    parser.add_argument('--todo', action='store_true', help='Muestra también lo que no empeoró.')
+    opciones = parser.parse_args(argumentos)
+
+    with open(opciones.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(opciones.nuevo, encoding='utf-8') as f:
+        nuevo = json.load(f)
+    if base.get('version_datos') != nuevo.get('version_datos'):
+        print('Aviso: los resultados se midieron con datos sembrados distintos.', file=sys.stderr)
+
+    filas = comparar(base, nuevo, opciones.tolerancia, opciones.minimo_ms)
+    regresiones = [f for f in filas if f[-1]]
+    print(f"{base.get('commit')} -> {nuevo.get('commit')}")
+    for nivel, escenario, metrica, antes, despues, cambio, regresion in filas:
+        if not (regresion or opciones.todo):
+            continue
+        cambio_txt = f'{cambio:+d}' if metrica == 'sentencias_sql' else f'{cambio:+.1%}'
+        marca = 'REGRESIÓN' if regresion else ''
+        print(f'{nivel:>6} {escenario:<24} {metrica:<16} {antes:>12} -> {despues:<12} {cambio_txt:>8} {marca}')
+    print(f'{len(regresiones)} regresiones.')
+    return 1 if regresiones else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
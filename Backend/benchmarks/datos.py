@@ -0,0 +1,38 @@
+# benchmarks/datos.py
+# Bases SQLite sembradas por nivel de tamaño con el generador de `flask seed`;
+# se guardan en benchmarks/.cache y se reutilizan mientras VERSION_DATOS no cambie.
+
+import os
+from datetime import date
+
+from app.utils.generador import Generador
+
+VERSION_DATOS = 5   # subir cuando cambie lo que se siembra
+DIRECTORIO_CACHE = os.path.join(os.path.dirname(__file__), '.cache')
+
+NIVELES = {'1k': 1_000, '50k': 50_000, '500k': 500_000}
+
+# Parámetros fijos del generador: mismas filas en cada máquina
+SEMILLA = 2025
+FECHA_BASE = date(2025, 1, 15)
+DERECHOS = 3             # 1 Agua potable (todos), 2 Energía eléctrica, 3 Drenaje
+CUOTAS_POR_DERECHO = 4   # dos meses antes, el mes de la fecha base y el siguiente
+CUOTA_ABIERTA = 4        # Agua potable del mes siguiente (Q50): nadie la ha pagado
+
+
+def tamano_nivel(nivel):
+    """'1k' -> 1000, '2.5m' -> 2500000, '300' -> 300."""
+    if nivel in NIVELES:
+        return NIVELES[nivel]
+    texto = nivel.lower()
+    factor = {'k': 1_000, 'm': 1_000_000}.get(texto[-1:], 1)
+    return int(float(texto.rstrip('km')) * factor)
+
+
+def ruta_base(nivel):
+    return os.path.join(DIRECTORIO_CACHE, f'{nivel}-v{VERSION_DATOS}.sqlite')
+
+
+def sembrar(personas):
+    conteos, _ = Generador(personas, SEMILLA, FECHA_BASE, DERECHOS, CUOTAS_POR_DERECHO).generar()
+    return conteos
@@ -0,0 +1,191 @@
+# benchmarks/ejecutar.py
+# Corre los escenarios contra una copia de la base de cada nivel y escribe
+# un JSON con p50/p95, filas por segundo, memoria pico y sentencias SQL.
+#
+#   python -m benchmarks.ejecutar --niveles 1k,50k --repeticiones 20
+#   python -m benchmarks.ejecutar --niveles 1k --escenarios pagos_lote,pagos_csv
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import sqlalchemy
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Persona, Pago
+from benchmarks.datos import DIRECTORIO_CACHE, VERSION_DATOS, ruta_base, sembrar, tamano_nivel
+from benchmarks.escenarios import ESCENARIOS
+from tests.presupuesto import contar_sql
+
+CALENTAMIENTO = 2
+VERSION_FORMATO = 1
+
+
+def _crear_app(ruta):
+    from app import create_app
+    os.environ['DATABASE_URL'] = f'sqlite:///{ruta}'
+    return create_app('pruebas')
+
+
+def preparar_base(nivel, resembrar=False):
+    """Ruta de la base sembrada del nivel; la crea si no está en caché."""
+    ruta = ruta_base(nivel)
+    if os.path.exists(ruta) and not resembrar:
+        return ruta
+    os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    inicio = time.perf_counter()
+    app = _crear_app(ruta)
+    with app.app_context():
+        db.create_all()
+        conteos = sembrar(tamano_nivel(nivel))
+        db.session.remove()
+        db.engine.dispose()   # cierra el WAL para poder copiar un solo archivo
+    print(f'[{nivel}] base sembrada en {time.perf_counter() - inicio:.1f}s: {conteos}', file=sys.stderr)
+    return ruta
+
+
+def _percentil(valores, p):
+    if len(valores) == 1:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method='inclusive')[p - 1]
+
+
+def medir(escenario, cliente, n, conteos, repeticiones):
+    """Tiempos de `repeticiones` ejecuciones, más una bajo tracemalloc para la memoria y el SQL."""
+    repeticiones = min(repeticiones, escenario.repeticiones or repeticiones)
+    i = 0
+    for _ in range(CALENTAMIENTO):
+        escenario.ejecutar(cliente, i, n)
+        i += 1
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        escenario.ejecutar(cliente, i, n)
+        tiempos.append(time.perf_counter() - inicio)
+        i += 1
+
+    tracemalloc.start()
+    try:
+        with contar_sql(db.engine) as sentencias:
+            escenario.ejecutar(cliente, i, n)
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    filas = escenario.filas_procesadas(conteos)
+    p50 = statistics.median(tiempos)
+    return {
+        'escenario': escenario.nombre,
+        'repeticiones': repeticiones,
+        'p50_ms': round(p50 * 1000, 3),
+        'p95_ms': round(_percentil(tiempos, 95) * 1000, 3),
+        'media_ms': round(statistics.fmean(tiempos) * 1000, 3),
+        'min_ms': round(min(tiempos) * 1000, 3),
+        'max_ms': round(max(tiempos) * 1000, 3),
+        'filas': filas,
+        'filas_s': round(filas / p50, 1) if p50 else None,
+        'pico_memoria_kb': round(pico / 1024, 1),
+        'sentencias_sql': len(sentencias),
+    }
+
+
+def correr_nivel(nivel, escenarios, repeticiones, resembrar=False):
+    base = preparar_base(nivel, resembrar)
+    n = tamano_nivel(nivel)
+    with tempfile.TemporaryDirectory() as directorio:
+        # Las escrituras van a una copia: la base del caché queda intacta
+        trabajo = os.path.join(directorio, 'trabajo.sqlite')
+        shutil.copyfile(base, trabajo)
+        app = _crear_app(trabajo)
+        with app.app_context():
+            from app.utils.referencias import referencias
+            referencias.configurar(app.config['CACHE_REFERENCIAS_MAXIMO'], app.config['CACHE_REFERENCIAS_VIGENCIA'])
+            referencias.precargar()
+            conteos = {
+                'personas': db.session.execute(select(func.count()).select_from(Persona)).scalar(),
+                'pagos': db.session.execute(select(func.count()).select_from(Pago)).scalar(),
+            }
+            db.session.remove()
+            cliente = app.test_client()
+            resultados = []
+            for escenario in escenarios:
+                resultado = {'nivel': nivel, 'personas': n, **medir(escenario, cliente, n, conteos, repeticiones)}
+                resultados.append(resultado)
+                print(f"[{nivel}] {resultado['escenario']:<24} p50 {resultado['p50_ms']:>10.2f} ms"
+                      f"  p95 {resultado['p95_ms']:>10.2f} ms  {resultado['filas_s'] or 0:>12.0f} filas/s"
+                      f"  {resultado['pico_memoria_kb']:>10.0f} KB  {resultado['sentencias_sql']:>3} SQL",
+                      file=sys.stderr)
+            db.session.remove()
+            db.engine.dispose()
+    return resultados
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Benchmarks de la API de COCODE sobre SQLite.')
+    parser.add_argument('--niveles', default='1k', help='Lista separada por comas: 1k,50k,500k o un número.')
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--escenarios', help='Solo estos escenarios (separados por comas).')
+    parser.add_argument('--salida', help='Archivo JSON (por defecto benchmarks/resultados/<fecha>-<commit>.json).')
+    parser.add_argument('--resembrar', action='store_true', help='Vuelve a generar las bases del caché.')
+    opciones = parser.parse_args(argumentos)
+
+    escenarios = ESCENARIOS
+    if opciones.escenarios:
+        nombres = opciones.escenarios.split(',')
+        desconocidos = set(nombres) - {e.nombre for e in ESCENARIOS}
+        if desconocidos:
+            parser.error(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+        escenarios = [e for e in ESCENARIOS if e.nombre in nombres]
+
+    commit = _commit()
+    resultados = []
+    for nivel in opciones.niveles.split(','):
+        resultados += correr_nivel(nivel.strip(), escenarios, opciones.repeticiones, opciones.resembrar)
+
+    informe = {
+        'formato': VERSION_FORMATO,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'entorno': {
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'sqlite': sqlite3.sqlite_version,
+            'plataforma': platform.platform(),
+            'procesador': platform.processor() or platform.machine(),
+        },
+        'version_datos': VERSION_DATOS,
+        'repeticiones': opciones.repeticiones,
+        'resultados': resultados,
+    }
+    salida = opciones.salida or os.path.join(
+        os.path.dirname(__file__), 'resultados',
+        f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'sin-commit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(salida)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/escenarios.py
+# Qué se mide: rutas de la API y rutas internas de lote/validación.
+# `url`, `cuerpo` y `funcion` reciben (i, n): i es el número de repetición
+# (las escrituras tocan filas distintas en cada una) y n las personas del nivel.
+# `filas` es un número o una función de los conteos de la base ({'personas', 'pagos'}).
+
+from datetime import date
+
+from app.extensions import db
+from benchmarks.datos import CUOTA_ABIERTA
+from app.utils.paginacion import codificar_cursor
+from app.utils.validaciones import (
+    ContextoValidacion, validar_lote, revisar_pago, revisar_persona
+)
+
+LOTE = 1000   # filas de las escrituras por lote
+
+
+class Escenario:
+    def __init__(self, nombre, metodo='GET', url=None, cuerpo=None, funcion=None,
+                 filas=1, esperado=200, repeticiones=None):
+        self.nombre = nombre
+        self.metodo = metodo
+        self.url = url
+        self.cuerpo = cuerpo
+        self.funcion = funcion
+        self.filas = filas
+        self.esperado = esperado
+        self.repeticiones = repeticiones   # tope propio (exportaciones completas)
+
+    def filas_procesadas(self, conteos):
+        return self.filas(conteos) if callable(self.filas) else self.filas
+
+    def ejecutar(self, cliente, i, n):
+        """Una repetición; falla si la respuesta no es la esperada."""
+        if self.funcion is not None:
+            try:
+                return self.funcion(i, n)
+            finally:
+                db.session.rollback()
+        url = self.url(i, n) if callable(self.url) else self.url
+        cuerpo = self.cuerpo(i, n) if callable(self.cuerpo) else self.cuerpo
+        respuesta = cliente.open(url, method=self.metodo, json=cuerpo)
+        # Se consume el cuerpo por partes y se descarta: la memoria medida es
+        # la de la app, no la de juntar una exportación completa en el cliente
+        for _ in respuesta.response:
+            pass
+        respuesta.close()
+        if respuesta.status_code != self.esperado:
+            raise AssertionError(f'{self.nombre}: respondió {respuesta.status_code}, se esperaba {self.esperado}')
+
+
+def _persona(i, n):
+    """Recorre las personas saltando para no leer siempre la misma página."""
+    return (i * 7919) % n + 1
+
+
+def _bloque(i, n):
+    """IDs de persona del i-ésimo bloque de LOTE (cíclico)."""
+    inicio = (i * LOTE) % max(n - LOTE, 1)
+    return range(inicio + 1, min(inicio + LOTE, n) + 1)
+
+
+def _pagos_lote(i, n):
+    # Q1 por persona y repetición: la cuota abierta nunca se completa
+    return [{'ID_Persona': p, 'ID_Cuota': CUOTA_ABIERTA, 'Fecha_Pago': str(date.today()), 'Monto_Pagado': 1}
+            for p in _bloque(i, n)]
+
+
+def _personas_lote(i, n):
+    return [{'DPI': str(9_000_000_000_000 + i * LOTE + k), 'Nombre': f'Nueva {i}-{k}',
+             'Direccion': 'Zona 1', 'Telefono': '55500000', 'Email': f'nueva{i}-{k}@correo.com'}
+            for k in range(LOTE)]
+
+
+def _validar_pagos(i, n):
+    filas = _pagos_lote(i, n) * 5
+    validar_lote(revisar_pago, filas, ContextoValidacion.para_pagos(filas))
+
+
+def _validar_personas(i, n):
+    filas = _personas_lote(i, n) * 5
+    validar_lote(revisar_persona, filas, ContextoValidacion.para_personas(filas))
+
+
+ESCENARIOS = [
+    # Lecturas
+    Escenario('personas_pagina', url='/api/personas?limit=1000', filas=lambda c: min(c['personas'], 1000)),
+    Escenario('personas_pagina_media', filas=100,
+              url=lambda i, n: f'/api/personas?limit=100&after={codificar_cursor([n // 2])}'),
+    Escenario('persona_detalle', url=lambda i, n: f'/api/personas/{_persona(i, n)}'),
+    Escenario('personas_stream', url='/api/personas?stream=1', filas=lambda c: c['personas'], repeticiones=5),
+    Escenario('pagos_pagina', url='/api/pagos?limit=1000', filas=lambda c: min(c['pagos'], 1000)),
+    Escenario('pagos_csv', url='/api/pagos?formato=csv', filas=lambda c: c['pagos'], repeticiones=5),
+    Escenario('detalle_combinado_dpi', filas=1,
+              url=lambda i, n: f'/api/persona_derecho/detalle_combinado?DPI={10_000_000 + _persona(i, n)}&limit=100'),
+    Escenario('cuotas_estado_mejorado', url='/api/cuotas/estado/mejorado', filas=lambda c: c['pagos']),
+    Escenario('morosidad_pagina', url='/api/reportes/morosidad?limit=100', filas=100),
+    Escenario('estado_cuota', url=lambda i, n: f'/api/pagos/cuota/1?ID_Persona={_persona(i, n)}'),
+    Escenario('ingresos_total', url='/api/ingresos/total'),
+    Escenario('fondos_disponibles', url='/api/fondos/disponibles'),
+    # Escrituras (cada repetición toca filas distintas)
+    Escenario('pago_registrar', 'POST', url='/api/pagos', esperado=201, cuerpo=lambda i, n: {
+        'ID_Persona': _persona(i, n), 'ID_Cuota': CUOTA_ABIERTA, 'Fecha_Pago': str(date.today()), 'Monto_Pagado': 1}),
+    Escenario('pago_eliminar', 'DELETE', url=lambda i, n: f'/api/pagos/{i + 1}'),
+    Escenario('egreso_registrar', 'POST', url='/api/egresos', esperado=201, cuerpo=lambda i, n: {
+        'Fecha': str(date.today()), 'Monto': 1, 'Descripcion': f'Benchmark {i}'}),
+    Escenario('pagos_lote', 'POST', url='/api/pagos/lote', cuerpo=_pagos_lote, esperado=201, filas=LOTE),
+    Escenario('personas_lote', 'POST', url='/api/personas/lote', cuerpo=_personas_lote, esperado=201, filas=LOTE),
+    Escenario('asignar_masivo', 'POST', url='/api/derechos/3/asignar-masivo', esperado=201, filas=LOTE,
+              cuerpo=lambda i, n: {'ID_Personas': list(_bloque(i, n))}),
+    # Validación de lotes sin HTTP ni escritura
+    Escenario('validar_pagos', funcion=_validar_pagos, filas=5 * LOTE),
+    Escenario('validar_personas', funcion=_validar_personas, filas=5 * LOTE),
+]
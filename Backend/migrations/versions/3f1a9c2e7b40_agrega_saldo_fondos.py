@@ -0,0 +1,36 @@
+"""Agrega tabla Saldo_Fondos con los totales acumulados
+
+Revision ID: 3f1a9c2e7b40
+Revises: 6754d96a8890
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a9c2e7b40'
+down_revision = '6754d96a8890'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('Saldo_Fondos',
+    sa.Column('ID_Saldo', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('Total_Ingresos', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('Total_Egresos', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('ID_Saldo')
+    )
+    # Sembrar la fila única con los totales actuales
+    op.execute(
+        "INSERT INTO Saldo_Fondos (ID_Saldo, Total_Ingresos, Total_Egresos) "
+        "SELECT 1, "
+        "(SELECT COALESCE(SUM(Monto), 0) FROM Ingresos), "
+        "(SELECT COALESCE(SUM(Monto), 0) FROM Egresos)"
+    )
+
+
+def downgrade():
+    op.drop_table('Saldo_Fondos')
@@ -0,0 +1,32 @@
+"""Agrega tabla Version_Tabla con un contador de cambios por tabla
+
+Revision ID: 5b7e0d3f9a21
+Revises: 8d2e4b6a1c93
+Create Date: 2026-10-18 15:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e0d3f9a21'
+down_revision = '8d2e4b6a1c93'
+branch_labels = None
+depends_on = None
+
+TABLAS = ('Personas', 'Derechos', 'Persona_Derecho', 'Cuotas', 'Derecho_Cuota',
+          'Persona_Cuota', 'Pagos', 'Ingresos', 'Egresos')
+
+
+def upgrade():
+    version_tabla = op.create_table('Version_Tabla',
+    sa.Column('Tabla', sa.String(length=50), nullable=False),
+    sa.Column('Version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('Tabla')
+    )
+    op.bulk_insert(version_tabla, [{'Tabla': t, 'Version': 1} for t in TABLAS])
+
+
+def downgrade():
+    op.drop_table('Version_Tabla')
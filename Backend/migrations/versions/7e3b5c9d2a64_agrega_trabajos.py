@@ -0,0 +1,46 @@
+"""Agrega tabla Trabajos para la cola de trabajos en segundo plano
+
+Revision ID: 7e3b5c9d2a64
+Revises: 9c4f2a7d1e58
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e3b5c9d2a64'
+down_revision = '9c4f2a7d1e58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('Trabajos',
+    sa.Column('ID_Trabajo', sa.Integer(), nullable=False),
+    sa.Column('Tipo', sa.String(length=50), nullable=False),
+    sa.Column('Estado', sa.String(length=20), nullable=False),
+    sa.Column('Parametros', sa.Text(), nullable=False),
+    sa.Column('Resultado', sa.Text(), nullable=True),
+    sa.Column('Error', sa.Text(), nullable=True),
+    sa.Column('Progreso', sa.Integer(), nullable=False),
+    sa.Column('Mensaje', sa.String(length=200), nullable=True),
+    sa.Column('Cancelar', sa.Boolean(), nullable=False),
+    sa.Column('Intentos', sa.Integer(), nullable=False),
+    sa.Column('Proceso', sa.String(length=100), nullable=True),
+    sa.Column('Creado', sa.DateTime(), nullable=False),
+    sa.Column('Iniciado', sa.DateTime(), nullable=True),
+    sa.Column('Terminado', sa.DateTime(), nullable=True),
+    sa.Column('Latido', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('ID_Trabajo')
+    )
+    with op.batch_alter_table('Trabajos', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_Trabajos_Estado'), ['Estado'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('Trabajos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_Trabajos_Estado'))
+
+    op.drop_table('Trabajos')
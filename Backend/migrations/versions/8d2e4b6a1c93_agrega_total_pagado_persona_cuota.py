@@ -0,0 +1,39 @@
+"""Agrega Total_Pagado a Persona_Cuota
+
+Revision ID: 8d2e4b6a1c93
+Revises: 3f1a9c2e7b40
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e4b6a1c93'
+down_revision = '3f1a9c2e7b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('Persona_Cuota', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('Total_Pagado', sa.Numeric(precision=9, scale=2), server_default='0', nullable=False))
+
+    # Llenar el acumulado con los pagos existentes y recalcular el estado
+    op.execute(
+        "UPDATE Persona_Cuota SET Total_Pagado = COALESCE(("
+        "SELECT SUM(p.Monto_Pagado) FROM Pagos p "
+        "WHERE p.ID_Persona = Persona_Cuota.ID_Persona AND p.ID_Cuota = Persona_Cuota.ID_Cuota"
+        "), 0)"
+    )
+    op.execute(
+        "UPDATE Persona_Cuota SET Estado = CASE WHEN Total_Pagado >= ("
+        "SELECT c.Monto FROM Cuotas c WHERE c.ID_Cuota = Persona_Cuota.ID_Cuota"
+        ") THEN 'Completado' ELSE 'Pendiente' END"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('Persona_Cuota', schema=None) as batch_op:
+        batch_op.drop_column('Total_Pagado')
@@ -0,0 +1,57 @@
+"""Agrega tabla Resumen_Mensual con ingresos, egresos y pagos por mes
+
+Revision ID: 9c4f2a7d1e58
+Revises: 5b7e0d3f9a21
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4f2a7d1e58'
+down_revision = '5b7e0d3f9a21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    resumen = op.create_table('Resumen_Mensual',
+    sa.Column('Anio', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('Mes', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('Ingresos', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('Egresos', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('Pagos', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('Anio', 'Mes')
+    )
+
+    # Sembrar los meses existentes (EXTRACT se traduce a DATEPART en SQL Server)
+    ingresos = sa.table('Ingresos', sa.column('Fecha', sa.Date), sa.column('Monto', sa.Numeric))
+    egresos = sa.table('Egresos', sa.column('Fecha', sa.Date), sa.column('Monto', sa.Numeric))
+    pagos = sa.table('Pagos', sa.column('Fecha_Pago', sa.Date))
+    cero = sa.literal(0, sa.Numeric(14, 2))
+
+    def por_mes(fecha, *valores):
+        anio, mes = sa.extract('year', fecha), sa.extract('month', fecha)
+        return sa.select(anio.label('Anio'), mes.label('Mes'), *valores).group_by(anio, mes)
+
+    movimientos = sa.union_all(
+        por_mes(ingresos.c.Fecha, sa.func.sum(ingresos.c.Monto).label('Ingresos'),
+                cero.label('Egresos'), sa.literal(0).label('Pagos')),
+        por_mes(egresos.c.Fecha, cero.label('Ingresos'),
+                sa.func.sum(egresos.c.Monto).label('Egresos'), sa.literal(0).label('Pagos')),
+        por_mes(pagos.c.Fecha_Pago, cero.label('Ingresos'), cero.label('Egresos'),
+                sa.func.count().label('Pagos')),
+    ).subquery()
+    op.execute(resumen.insert().from_select(
+        ['Anio', 'Mes', 'Ingresos', 'Egresos', 'Pagos'],
+        sa.select(
+            movimientos.c.Anio, movimientos.c.Mes, sa.func.sum(movimientos.c.Ingresos),
+            sa.func.sum(movimientos.c.Egresos), sa.func.sum(movimientos.c.Pagos)
+        ).group_by(movimientos.c.Anio, movimientos.c.Mes)
+    ))
+
+
+def downgrade():
+    op.drop_table('Resumen_Mensual')
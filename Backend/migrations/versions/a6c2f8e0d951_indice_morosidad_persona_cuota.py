@@ -0,0 +1,31 @@
+"""Índice compuesto de Persona_Cuota (Estado, ID_Persona, ID_Cuota, Total_Pagado) para barrido y morosidad
+
+Revision ID: a6c2f8e0d951
+Revises: d4a8e1f6b3c7
+Create Date: 2026-10-18 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c2f8e0d951'
+down_revision = 'd4a8e1f6b3c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Reemplaza al índice de solo Estado: el compuesto sirve para lo mismo y
+    # además cubre el GROUP BY ID_Persona de GET /api/reportes/morosidad
+    with op.batch_alter_table('Persona_Cuota', schema=None) as batch_op:
+        batch_op.create_index('ix_Persona_Cuota_Estado_Persona',
+                              ['Estado', 'ID_Persona', 'ID_Cuota', 'Total_Pagado'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_Persona_Cuota_Estado'))
+
+
+def downgrade():
+    with op.batch_alter_table('Persona_Cuota', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_Persona_Cuota_Estado'), ['Estado'], unique=False)
+        batch_op.drop_index('ix_Persona_Cuota_Estado_Persona')
@@ -0,0 +1,52 @@
+"""Agrega estado Vencido: índices de Persona_Cuota.Estado y Cuotas.Fecha_Limite y tabla Barrido_Vencimientos
+
+Revision ID: d4a8e1f6b3c7
+Revises: 7e3b5c9d2a64
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8e1f6b3c7'
+down_revision = '7e3b5c9d2a64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('Barrido_Vencimientos',
+    sa.Column('ID_Barrido', sa.Integer(), nullable=False),
+    sa.Column('Fecha_Corte', sa.Date(), nullable=False),
+    sa.Column('Desde', sa.Date(), nullable=True),
+    sa.Column('Inicio', sa.DateTime(), nullable=False),
+    sa.Column('Segundos', sa.Numeric(precision=10, scale=3), nullable=False),
+    sa.Column('Cuotas', sa.Integer(), nullable=False),
+    sa.Column('Filas', sa.Integer(), nullable=False),
+    sa.Column('Lotes', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('ID_Barrido')
+    )
+    with op.batch_alter_table('Persona_Cuota', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_Persona_Cuota_Estado'), ['Estado'], unique=False)
+
+    with op.batch_alter_table('Cuotas', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_Cuotas_Fecha_Limite'), ['Fecha_Limite'], unique=False)
+
+    # Las asignaciones ya vencidas se marcan con el primer barrido
+    # (`flask cuotas vencer`, o el trabajo diario): sin barridos previos
+    # revisa todas las cuotas.
+
+
+def downgrade():
+    # Lo que el barrido marcó vuelve al estado anterior a esta revisión
+    op.execute("UPDATE Persona_Cuota SET Estado = 'Pendiente' WHERE Estado = 'Vencido'")
+
+    with op.batch_alter_table('Cuotas', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_Cuotas_Fecha_Limite'))
+
+    with op.batch_alter_table('Persona_Cuota', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_Persona_Cuota_Estado'))
+
+    op.drop_table('Barrido_Vencimientos')
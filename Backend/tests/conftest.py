@@ -0,0 +1,108 @@
+# tests/conftest.py
+# App con SQLite en memoria (perfil 'pruebas') y datos de ejemplo por tamaño
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert
+
+from app import create_app
+from app.extensions import db
+from app.models import (
+    Persona, Derecho, PersonaDerecho, Cuota, DerechoCuota,
+    PersonaCuota, Pago, Ingreso, Egreso, Trabajo
+)
+from app.utils.referencias import referencias
+from app.utils.saldos import recalcular_saldo
+from app.utils.resumen import recalcular_resumen
+from tests.presupuesto import presupuesto_sql as _presupuesto_sql
+
+HOY = date.today()
+
+
+def sembrar(personas):
+    """
+    Padrón de `personas` personas, todas con el derecho 1 (cuotas 1 y 2)
+    y un pago parcial de la cuota 1 con su ingreso. Hay además un egreso
+    por cada 10 personas y un trabajo pendiente. Se usan inserts por lote: el tamaño no cambia
+    lo que hace cada ruta, solo cuántas filas toca.
+    """
+    db.session.execute(insert(Persona), [
+        {'dpi': str(1000000000000 + i), 'nombre': f'Persona {i}', 'direccion': 'Zona 1',
+         'telefono': '55512345', 'email': f'p{i}@correo.com',
+         'rol': 'Presidente' if i == 0 else 'Sin rol', 'estado': 'Activo'}
+        for i in range(personas)
+    ])
+    db.session.execute(insert(Derecho), [{'Nombre': n} for n in ('Agua potable', 'Luz', 'Drenaje')])
+    db.session.execute(insert(Cuota), [
+        {'Descripcion': 'Cuota agua', 'Monto': Decimal('50'), 'Fecha_Limite': HOY + timedelta(days=30)},
+        {'Descripcion': 'Cuota mantenimiento', 'Monto': Decimal('20'), 'Fecha_Limite': HOY + timedelta(days=60)},
+        {'Descripcion': 'Cuota luz', 'Monto': Decimal('30'), 'Fecha_Limite': HOY - timedelta(days=10)},
+        {'Descripcion': 'Cuota libre', 'Monto': Decimal('10'), 'Fecha_Limite': HOY + timedelta(days=90)},
+    ])
+    db.session.execute(insert(DerechoCuota), [
+        {'ID_Derecho': 1, 'ID_Cuota': 1}, {'ID_Derecho': 1, 'ID_Cuota': 2}, {'ID_Derecho': 2, 'ID_Cuota': 3},
+    ])
+    ids = range(1, personas + 1)
+    db.session.execute(insert(PersonaDerecho), [
+        {'ID_Persona': i, 'ID_Derecho': 1, 'Fecha_Inicio': HOY - timedelta(days=100), 'Fecha_Fin': None} for i in ids
+    ])
+    db.session.execute(insert(PersonaCuota), [
+        {'ID_Persona': i, 'ID_Cuota': c, 'Fecha_Asig': HOY - timedelta(days=100), 'Estado': 'Pendiente',
+         'Total_Pagado': Decimal('20') if c == 1 else Decimal('0')}
+        for i in ids for c in (1, 2)
+    ])
+    db.session.execute(insert(Pago), [
+        {'ID_Persona': i, 'ID_Cuota': 1, 'Fecha_Pago': HOY - timedelta(days=5),
+         'Monto_Pagado': Decimal('20'), 'Estado': 'Pendiente'} for i in ids
+    ])
+    db.session.execute(insert(Ingreso), [
+        {'Fecha': HOY - timedelta(days=5), 'Monto': Decimal('20'), 'Fuente': 'Pago de cuota', 'ID_Pago': i}
+        for i in ids
+    ])
+    db.session.execute(insert(Egreso), [
+        {'Fecha': HOY - timedelta(days=1), 'Monto': Decimal('1'), 'Descripcion': f'Gasto {i}'}
+        for i in range(max(personas // 10, 1))
+    ])
+    db.session.execute(insert(Trabajo), [
+        {'Tipo': 'reconstruir_resumen', 'Estado': 'Pendiente', 'Parametros': '{}', 'Progreso': 0,
+         'Cancelar': False, 'Intentos': 0, 'Creado': datetime.now()}
+    ])
+    db.session.commit()
+    recalcular_saldo()
+    recalcular_resumen()
+
+
+@pytest.fixture
+def app(tmp_path):
+    aplicacion = create_app('pruebas')
+    aplicacion.config['REPORTES_DIRECTORIO'] = str(tmp_path / 'reportes')
+    with aplicacion.app_context():
+        db.create_all()
+        yield aplicacion
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def datos(app, request):
+    """Siembra `request.param` personas (usar con indirect=True) y precarga el caché."""
+    sembrar(getattr(request, 'param', 10))
+    referencias.configurar(5000, vigencia=10 ** 6)
+    referencias.precargar()
+    db.session.remove()
+    return getattr(request, 'param', 10)
+
+
+@pytest.fixture
+def presupuesto_sql(app):
+    """`with presupuesto_sql(n, 'etiqueta'):` falla si el bloque emite más de n sentencias."""
+    def _presupuesto(maximo, etiqueta='bloque'):
+        return _presupuesto_sql(db.engine, maximo, etiqueta)
+    return _presupuesto
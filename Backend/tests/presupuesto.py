@@ -0,0 +1,40 @@
+# tests/presupuesto.py
+# Conteo de sentencias SQL para detectar consultas N+1 en las rutas
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+@contextmanager
+def contar_sql(engine):
+    """Junta en una lista el texto de cada sentencia enviada al motor dentro del bloque."""
+    sentencias = []
+
+    def _registrar(conexion, cursor, sentencia, parametros, contexto, executemany):
+        sentencias.append(sentencia)
+
+    event.listen(engine, 'before_cursor_execute', _registrar)
+    try:
+        yield sentencias
+    finally:
+        event.remove(engine, 'before_cursor_execute', _registrar)
+
+
+class PresupuestoExcedido(AssertionError):
+    pass
+
+
+@contextmanager
+def presupuesto_sql(engine, maximo, etiqueta='bloque'):
+    """
+    Falla con PresupuestoExcedido si el bloque emite más de `maximo`
+    sentencias SQL; el mensaje lista las sentencias para ubicar el N+1.
+    """
+    with contar_sql(engine) as sentencias:
+        yield sentencias
+    if len(sentencias) > maximo:
+        detalle = '\n'.join(f'  {i}. {" ".join(s.split())[:160]}' for i, s in enumerate(sentencias, 1))
+        raise PresupuestoExcedido(
+            f'{etiqueta}: {len(sentencias)} sentencias SQL, presupuesto {maximo}.\n{detalle}'
+        )
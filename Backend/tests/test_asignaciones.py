@@ -0,0 +1,84 @@
+# tests/test_asignaciones.py
+# Asignaciones por conjuntos: derecho masivo (por lista o filtro) con sus
+# cuotas, sin duplicar lo que ya existe, y propagación o retiro de una
+# cuota a los titulares de un derecho al vincularla o desvincularla.
+
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import PersonaCuota, PersonaDerecho
+
+
+def asignaciones(modelo, columna, valor):
+    """{ID_Persona: fila} de `modelo` con `columna` == `valor`."""
+    db.session.remove()
+    return {f.ID_Persona: f for f in db.session.execute(select(modelo).where(columna == valor)).scalars()}
+
+
+def test_asignar_derecho_masivo(cliente, datos):
+    # Derecho 2 trae la cuota 3, vencida hace 10 días
+    respuesta = cliente.post('/api/derechos/2/asignar-masivo', json={
+        'ID_Personas': [1, 2, 3, 999], 'Fecha_Inicio': '2025-01-15'})
+    assert respuesta.status_code == 201
+    cuerpo = respuesta.get_json()
+    del cuerpo['mensaje']
+    assert cuerpo == {
+        'ID_Derecho': 2, 'personas_solicitadas': 4, 'personas_no_encontradas': 1,
+        'derechos_asignados': 3, 'ya_tenian_derecho': 0, 'cuotas_asignadas': 3}
+    titulares = asignaciones(PersonaDerecho, PersonaDerecho.ID_Derecho, 2)
+    assert sorted(titulares) == [1, 2, 3] and {str(f.Fecha_Inicio) for f in titulares.values()} == {'2025-01-15'}
+    cuotas = asignaciones(PersonaCuota, PersonaCuota.ID_Cuota, 3)
+    assert sorted(cuotas) == [1, 2, 3] and {f.Estado for f in cuotas.values()} == {'Vencido'}
+
+    # Repetir no duplica nada
+    cuerpo = cliente.post('/api/derechos/2/asignar-masivo', json={'ID_Personas': [1, 2, 3]}).get_json()
+    assert (cuerpo['derechos_asignados'], cuerpo['ya_tenian_derecho'], cuerpo['cuotas_asignadas']) == (0, 3, 0)
+
+    # Por filtro: 'Persona 1' solo coincide con la persona 2 (los nombres van de 0 a 9)
+    cuerpo = cliente.post('/api/derechos/1/asignar-masivo', json={'Filtro': {'Nombre': 'Persona 1'}}).get_json()
+    assert (cuerpo['personas_solicitadas'], cuerpo['ya_tenian_derecho'], cuerpo['cuotas_asignadas']) == (1, 1, 0)
+    cuerpo = cliente.post('/api/derechos/3/asignar-masivo', json={'Filtro': {'Rol': 'Presidente'}}).get_json()
+    assert (cuerpo['derechos_asignados'], cuerpo['cuotas_asignadas']) == (1, 0)
+    assert list(asignaciones(PersonaDerecho, PersonaDerecho.ID_Derecho, 3)) == [1]
+
+
+def test_asignar_derecho_masivo_rechaza_cuerpos_invalidos(cliente, datos):
+    url = '/api/derechos/2/asignar-masivo'
+    assert cliente.post(url, json={}).get_json()['errores'] == ['Envíe ID_Personas o Filtro.']
+    assert cliente.post(url, json={'ID_Personas': [1, '2']}).get_json()['errores'] == [
+        'ID_Personas debe ser una lista de enteros.']
+    assert cliente.post(url, json={'Filtro': {}, 'Fecha_Inicio': '15/01/2025'}).get_json()['errores'] == [
+        'Fecha_Inicio debe ser YYYY-MM-DD.']
+    assert cliente.post('/api/derechos/99/asignar-masivo', json={'ID_Personas': [1]}).status_code == 404
+    assert asignaciones(PersonaDerecho, PersonaDerecho.ID_Derecho, 2) == {}
+
+
+def test_propagar_y_retirar_cuota(cliente, datos):
+    # La persona 10 ya no es titular del derecho 1; la persona 1 tiene además el derecho 2
+    db.session.get(PersonaDerecho, (10, 1)).Fecha_Fin = date.today() - timedelta(days=1)
+    db.session.commit()
+    assert cliente.post('/api/persona_derecho', json={
+        'ID_Persona': 1, 'ID_Derecho': 2, 'Fecha_Inicio': str(date.today())}).status_code == 201
+
+    # Vincular con Propagar asigna la cuota 4 a los titulares vigentes, como Pendiente
+    respuesta = cliente.post('/api/derechos/1/vincular-cuota', json={'ID_Cuota': 4, 'Propagar': True})
+    assert respuesta.get_json()['cuotas_asignadas'] == 9
+    cuotas = asignaciones(PersonaCuota, PersonaCuota.ID_Cuota, 4)
+    assert sorted(cuotas) == list(range(1, 10)) and {f.Estado for f in cuotas.values()} == {'Pendiente'}
+    # Quien ya la tiene no la recibe otra vez por un segundo derecho
+    respuesta = cliente.post('/api/derecho_cuota', json={'ID_Derecho': 2, 'ID_Cuota': 4, 'Propagar': True})
+    assert respuesta.get_json()['cuotas_asignadas'] == 0
+
+    # Retirar deja la cuota a quien ya pagó algo (persona 2) y a quien la
+    # recibe por otro derecho vinculado (persona 1)
+    assert cliente.post('/api/pagos', json={
+        'ID_Persona': 2, 'ID_Cuota': 4, 'Fecha_Pago': str(date.today()), 'Monto_Pagado': 5}).status_code == 201
+    respuesta = cliente.delete('/api/derecho_cuota/1/4?propagar=1')
+    assert respuesta.get_json()['cuotas_retiradas'] == 7
+    assert sorted(asignaciones(PersonaCuota, PersonaCuota.ID_Cuota, 4)) == [1, 2]
+
+    # Sin ?propagar=1 solo se quita el vínculo
+    assert cliente.delete('/api/derecho_cuota/2/4').get_json()['cuotas_retiradas'] == 0
+    assert sorted(asignaciones(PersonaCuota, PersonaCuota.ID_Cuota, 4)) == [1, 2]
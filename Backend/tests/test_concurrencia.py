@@ -0,0 +1,205 @@
+# tests/test_concurrencia.py
+# Pagos y egresos simultáneos contra una base SQLite en archivo (varias
+# conexiones, como varios workers): ninguna cuota queda sobrepagada y el
+# saldo nunca queda negativo.
+
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app import create_app
+from app.extensions import db
+from app.models import Persona, Cuota, PersonaCuota, Pago, Ingreso, Egreso, SaldoFondos, ResumenMensual
+from app.utils import resumen, saldos
+from app.utils.resumen import verificar_resumen
+from app.utils.saldos import obtener_saldo, recalcular_saldo
+
+HOY = date.today()
+HILOS = 12
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'concurrencia.db'}")
+    aplicacion = create_app('pruebas')
+    with aplicacion.app_context():
+        db.create_all()
+        db.session.execute(insert(Persona), [
+            {'dpi': str(2000000000000 + i), 'nombre': f'Persona {i}', 'rol': 'Sin rol', 'estado': 'Activo'}
+            for i in range(2)
+        ])
+        db.session.execute(insert(Cuota), [
+            {'Descripcion': 'Cuota agua', 'Monto': Decimal('50'), 'Fecha_Limite': HOY + timedelta(days=30)},
+            {'Descripcion': 'Cuota libre', 'Monto': Decimal('30'), 'Fecha_Limite': HOY + timedelta(days=30)},
+        ])
+        # Cuota 1 asignada a la persona 1; la cuota 2 no tiene Persona_Cuota
+        db.session.execute(insert(PersonaCuota), [
+            {'ID_Persona': 1, 'ID_Cuota': 1, 'Fecha_Asig': HOY, 'Estado': 'Pendiente', 'Total_Pagado': Decimal('0')},
+        ])
+        db.session.commit()
+        recalcular_saldo()
+        db.session.remove()
+        yield aplicacion
+        db.session.remove()
+        db.drop_all()
+
+
+def simultaneas(app, peticiones):
+    """Lanza cada (método, url, json) en su hilo, a la vez; devuelve los códigos de estado."""
+    barrera = threading.Barrier(len(peticiones))
+    estados = [None] * len(peticiones)
+
+    def ejecutar(i, metodo, url, cuerpo):
+        cliente = app.test_client()
+        barrera.wait()
+        estados[i] = cliente.open(url, method=metodo, json=cuerpo).status_code
+
+    hilos = [threading.Thread(target=ejecutar, args=(i, *p)) for i, p in enumerate(peticiones)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return estados
+
+
+def pago(persona, cuota, monto=10):
+    return ('POST', '/api/pagos', {'ID_Persona': persona, 'ID_Cuota': cuota,
+                                   'Fecha_Pago': HOY.isoformat(), 'Monto_Pagado': monto})
+
+
+def total_pagos(persona, cuota):
+    return db.session.execute(
+        select(func.coalesce(func.sum(Pago.Monto_Pagado), 0))
+        .where(Pago.ID_Persona == persona, Pago.ID_Cuota == cuota)
+    ).scalar()
+
+
+def test_pagos_simultaneos_no_sobrepagan_la_cuota(app):
+    estados = simultaneas(app, [pago(1, 1)] * HILOS)
+
+    assert set(estados) <= {201, 400}
+    assert estados.count(201) == 5
+    pc = db.session.get(PersonaCuota, (1, 1))
+    assert pc.Total_Pagado == Decimal('50') == total_pagos(1, 1)
+    assert pc.Estado == 'Completado'
+    assert db.session.scalar(select(func.sum(Ingreso.Monto))) == Decimal('50')
+
+
+def test_pagos_simultaneos_de_cuota_sin_asignar(app):
+    estados = simultaneas(app, [pago(2, 2)] * HILOS)
+
+    assert estados.count(201) == 3
+    assert total_pagos(2, 2) == Decimal('30')
+
+
+def test_lotes_simultaneos(app):
+    lote = ('POST', '/api/pagos/lote?modo=omitir_invalidos', [pago(1, 1)[2], pago(2, 2)[2]])
+    estados = simultaneas(app, [lote] * HILOS)
+
+    assert set(estados) <= {201, 400}
+    assert total_pagos(1, 1) == Decimal('50')
+    assert total_pagos(2, 2) == Decimal('30')
+    assert db.session.get(PersonaCuota, (1, 1)).Total_Pagado == Decimal('50')
+    assert obtener_saldo().Total_Ingresos == Decimal('80')
+
+
+def test_egresos_simultaneos_no_dejan_saldo_negativo(app):
+    simultaneas(app, [pago(1, 1, 50), pago(2, 2, 30)])
+    db.session.remove()
+    egresos = [('POST', '/api/egresos', {'Fecha': HOY.isoformat(), 'Monto': 10, 'Descripcion': f'Gasto {i}'})
+               for i in range(HILOS)]
+    estados = simultaneas(app, egresos)
+
+    assert estados.count(201) == 8
+    saldo = obtener_saldo()
+    assert saldo.disponible == Decimal('0')
+    assert db.session.scalar(select(func.sum(Egreso.Monto))) == saldo.Total_Egresos == Decimal('80')
+
+
+def test_cambios_y_bajas_no_sobrepagan_ni_dejan_saldo_negativo(app):
+    cliente = app.test_client()
+    assert cliente.post('/api/pagos', json=pago(1, 1, 20)[2]).status_code == 201
+    assert cliente.post('/api/egresos', json={'Fecha': HOY.isoformat(), 'Monto': 15,
+                                              'Descripcion': 'Gasto'}).status_code == 201
+
+    # Cambios de pago: se validan como un alta, también en una cuota sin asignar
+    respuesta = cliente.put('/api/pagos/1', json={'Monto_Pagado': 500})
+    assert respuesta.status_code == 400 and respuesta.get_json()['errores'] == ['El monto no puede exceder Q50.0.']
+    respuesta = cliente.put('/api/pagos/1', json={'ID_Cuota': 2, 'Monto_Pagado': 31})
+    assert respuesta.status_code == 400 and respuesta.get_json()['errores'] == ['El monto no puede exceder Q30.0.']
+    assert cliente.put('/api/pagos/1', json={'ID_Cuota': 2}).status_code == 200
+    db.session.remove()
+    assert db.session.get(PersonaCuota, (1, 1)).Total_Pagado == 0
+    assert cliente.put('/api/pagos/1', json={'ID_Cuota': 1, 'Monto_Pagado': 50}).status_code == 200
+    db.session.remove()
+    pc = db.session.get(PersonaCuota, (1, 1))
+    assert (pc.Total_Pagado, pc.Estado) == (Decimal('50'), 'Completado')
+
+    # Con 5 disponibles, ningún cambio ni baja puede dejar el saldo negativo
+    disponible = obtener_saldo().disponible
+    assert cliente.put('/api/egresos/1', json={'Monto': 100000}).status_code == 409
+    for metodo, url, cuerpo in [('PUT', '/api/ingresos/1', {'Monto': 1}), ('DELETE', '/api/ingresos/1', None),
+                                ('DELETE', '/api/pagos/1', None)]:
+        respuesta = cliente.open(url, method=metodo, json=cuerpo)
+        assert respuesta.status_code == 409 and 'Fondos insuficientes' in respuesta.get_json()['errores'][0]
+    db.session.remove()
+    assert obtener_saldo().disponible == disponible
+    assert db.session.get(PersonaCuota, (1, 1)).Total_Pagado == Decimal('50')
+
+
+def test_cambios_de_pagos_sin_asignacion(app):
+    """Pagos sin fila en Persona_Cuota: se editan como en registrar_pago."""
+    for monto in (10, 15):
+        Pago.registrar_pago(2, 2, HOY, Decimal(monto))
+    cliente = app.test_client()
+
+    # El monto propio no cuenta contra la cuota: 15 + 10 = 25 <= 30
+    assert cliente.put('/api/pagos/1', json={'Estado': 'Completado'}).status_code == 200
+    assert cliente.put('/api/pagos/1', json={'Monto_Pagado': 15}).status_code == 200
+    respuesta = cliente.put('/api/pagos/1', json={'Monto_Pagado': 16})
+    assert respuesta.status_code == 400 and respuesta.get_json()['errores'] == ['El monto no puede exceder Q15.0.']
+    db.session.remove()
+    assert db.session.execute(
+        select(func.sum(Pago.Monto_Pagado)).where(Pago.ID_Persona == 2, Pago.ID_Cuota == 2)
+    ).scalar() == Decimal('30')
+    assert db.session.get(Ingreso, 1).Monto == Decimal('15')
+    assert db.session.get(PersonaCuota, (2, 2)) is None
+
+    # De suelto a asignado y de vuelta; el acumulado sigue al pago
+    db.session.add(PersonaCuota(ID_Persona=2, ID_Cuota=1, Fecha_Asig=HOY, Estado='Pendiente',
+                                Total_Pagado=Decimal('0')))
+    db.session.commit()
+    assert cliente.put('/api/pagos/2', json={'ID_Cuota': 1}).status_code == 200
+    db.session.remove()
+    assert db.session.get(PersonaCuota, (2, 1)).Total_Pagado == Decimal('15')
+    assert cliente.put('/api/pagos/2', json={'ID_Cuota': 2}).status_code == 200
+    db.session.remove()
+    assert db.session.get(PersonaCuota, (2, 1)).Total_Pagado == 0
+
+
+def test_fila_de_saldo_y_de_mes_sembradas_a_la_vez(app, monkeypatch):
+    """Otra transacción inserta la fila de saldo y la del mes entre el UPDATE y el INSERT."""
+    with db.engine.begin() as conexion:
+        conexion.execute(SaldoFondos.__table__.delete())
+        conexion.execute(ResumenMensual.__table__.delete())
+
+    def adelantarse(original, tabla, llave):
+        def sumar(session, *mes):
+            totales = original(session, *mes)
+            columnas = [c.name for c in tabla.columns if not c.primary_key]
+            session.execute(insert(tabla).values(**llave, **dict(zip(columnas, totales))))
+            return totales
+        return sumar
+
+    monkeypatch.setattr(saldos, '_sumar_tablas', adelantarse(
+        saldos._sumar_tablas, SaldoFondos.__table__, {'ID_Saldo': saldos.ID_SALDO}))
+    monkeypatch.setattr(resumen, '_sumar_mes', adelantarse(
+        resumen._sumar_mes, ResumenMensual.__table__, {'Anio': HOY.year, 'Mes': HOY.month}))
+
+    assert app.test_client().post('/api/pagos', json=pago(1, 1, 20)[2]).status_code == 201
+    db.session.remove()
+    assert obtener_saldo().Total_Ingresos == Decimal('20')
+    assert verificar_resumen() == []
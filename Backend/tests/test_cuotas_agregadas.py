@@ -0,0 +1,105 @@
+# tests/test_cuotas_agregadas.py
+# Resumen de cuotas en una sola consulta: totales pagados, pendiente,
+# participantes y el Estado calculado con CASE, comparados con el cálculo
+# cuota por cuota que hacía el dashboard; filtros y paginación.
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models import Cuota, Pago, PersonaCuota
+
+HOY = date.today()
+
+
+@pytest.fixture
+def pagos(datos):
+    """
+    Cuota 1: pago parcial de todos (20 de 50). Cuota 2: pagada por completo.
+    Cuota 3 (vencida): solo la persona 1, con 10 de 30. Cuota 4: sin nadie.
+    """
+    db.session.execute(insert(Pago), [
+        {'ID_Persona': i, 'ID_Cuota': 2, 'Fecha_Pago': HOY, 'Monto_Pagado': Decimal('20'),
+         'Estado': 'Completado'} for i in range(1, datos + 1)
+    ])
+    db.session.execute(insert(PersonaCuota), [
+        {'ID_Persona': 1, 'ID_Cuota': 3, 'Fecha_Asig': HOY - timedelta(days=40), 'Estado': 'Vencido'}])
+    db.session.execute(insert(Pago), [
+        {'ID_Persona': 1, 'ID_Cuota': 3, 'Fecha_Pago': HOY, 'Monto_Pagado': Decimal('10'), 'Estado': 'Pendiente'}])
+    db.session.query(PersonaCuota).filter_by(ID_Cuota=2).update({'Estado': 'Completado'})
+    db.session.commit()
+    db.session.remove()
+    return datos
+
+
+def calcular_por_cuota():
+    """El cálculo anterior: una consulta de pagos y otra de asignaciones por cuota."""
+    resumen = {}
+    for cuota in db.session.query(Cuota).order_by(Cuota.ID_Cuota):
+        pagos = db.session.query(Pago).filter_by(ID_Cuota=cuota.ID_Cuota).all()
+        asignadas = db.session.query(PersonaCuota).filter_by(ID_Cuota=cuota.ID_Cuota).all()
+        pagado = float(sum(p.Monto_Pagado for p in pagos))
+        esperado = float(cuota.Monto) * len(asignadas)
+        if asignadas and pagado >= esperado:
+            estado = 'Completado'
+        elif cuota.Fecha_Limite < HOY:
+            estado = 'Vencido'
+        else:
+            estado = 'Pendiente'
+        resumen[cuota.ID_Cuota] = {
+            'ID_Cuota': cuota.ID_Cuota, 'Descripcion': cuota.Descripcion, 'Monto': float(cuota.Monto),
+            'Fecha_Limite': str(cuota.Fecha_Limite), 'PagosRealizados': pagado,
+            'MontoPendiente': max(esperado - pagado, 0.0), 'Participantes': len(asignadas), 'Estado': estado,
+            'MontoEsperado': esperado, 'NumeroPagos': len(pagos),
+            'ParticipantesCompletados': sum(a.Estado == 'Completado' for a in asignadas),
+            'ParticipantesVencidos': sum(a.Estado == 'Vencido' for a in asignadas),
+            'PorcentajeRecaudado': round(pagado * 100 / esperado, 2) if esperado else 0.0
+        }
+    return resumen
+
+
+def test_agregados_por_cuota(cliente, pagos):
+    esperado = calcular_por_cuota()
+    mejorado = cliente.get('/api/cuotas/estado/mejorado').get_json()
+    assert mejorado == list(esperado.values())
+
+    resumen = {c['ID_Cuota']: c for c in mejorado}
+    assert [(resumen[i]['PagosRealizados'], resumen[i]['MontoPendiente'], resumen[i]['Estado'])
+            for i in (1, 2, 3, 4)] == [
+        (200.0, 300.0, 'Pendiente'), (200.0, 0.0, 'Completado'), (10.0, 20.0, 'Vencido'), (0.0, 0.0, 'Pendiente')]
+    assert (resumen[2]['ParticipantesCompletados'], resumen[2]['PorcentajeRecaudado']) == (pagos, 100.0)
+    assert (resumen[1]['NumeroPagos'], resumen[3]['Participantes'], resumen[4]['PorcentajeRecaudado']) == (
+        pagos, 1, 0.0)
+    assert [resumen[i]['ParticipantesVencidos'] for i in (1, 2, 3, 4)] == [0, 0, 1, 0]
+
+    campos = ('ID_Cuota', 'Descripcion', 'Monto', 'Fecha_Limite', 'PagosRealizados',
+              'MontoPendiente', 'Participantes', 'Estado')
+    con_pagos = cliente.get('/api/cuotas/con-pagos').get_json()
+    assert con_pagos == [{k: c[k] for k in campos} for c in esperado.values()]
+
+
+def test_filtros_y_paginacion(cliente, pagos):
+    def ids(url):
+        respuesta = cliente.get(url)
+        assert respuesta.status_code == 200, respuesta.get_json()
+        return [c['ID_Cuota'] for c in respuesta.get_json()]
+
+    assert ids('/api/cuotas/con-pagos?Estado=Completado') == [2]
+    assert ids('/api/cuotas/con-pagos?Estado=Vencido') == [3]
+    assert ids('/api/cuotas/con-pagos?Estado=Pendiente') == [1, 4]
+    assert ids(f'/api/cuotas/con-pagos?desde={HOY}') == [1, 2, 4]
+    assert ids(f'/api/cuotas/estado/mejorado?desde={HOY}&hasta={HOY + timedelta(days=60)}&Estado=Pendiente') == [1]
+
+    pagina = cliente.get('/api/cuotas/con-pagos?limit=3').get_json()
+    assert [c['ID_Cuota'] for c in pagina['datos']] == [1, 2, 3]
+    pagina = cliente.get(f"/api/cuotas/con-pagos?limit=3&after={pagina['siguiente']}").get_json()
+    assert ([c['ID_Cuota'] for c in pagina['datos']], pagina['siguiente']) == ([4], None)
+    assert ids('/api/cuotas/con-pagos?stream=1&Estado=Pendiente') == [1, 4]
+
+    respuesta = cliente.get('/api/cuotas/con-pagos?Estado=Pagado&desde=31/01/2025')
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()['errores'] == [
+        'desde y hasta deben ser YYYY-MM-DD.', 'Estado debe ser uno de: Completado, Pendiente, Vencido.']
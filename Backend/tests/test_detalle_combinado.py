@@ -0,0 +1,77 @@
+# tests/test_detalle_combinado.py
+# GET /persona_derecho/detalle_combinado: las mismas filas que arma el
+# navegador uniendo /personas, /persona_derecho y /derechos (incluidas las
+# personas sin derechos), filtros en SQL y páginas por cursor.
+
+from datetime import date
+
+import pytest
+
+from app.extensions import db
+from app.models import Persona, PersonaDerecho
+
+URL = '/api/persona_derecho/detalle_combinado'
+
+
+def unir_en_el_cliente(cliente):
+    """Salida esperada: la unión fila por fila que hacía el frontend."""
+    derechos = {d['ID_Derecho']: d['Nombre'] for d in cliente.get('/api/derechos').get_json()}
+    por_persona = {}
+    for pd in cliente.get('/api/persona_derecho').get_json():
+        por_persona.setdefault(pd['ID_Persona'], []).append(pd)
+    filas = []
+    for p in cliente.get('/api/personas').get_json():
+        base = {clave: p[clave] for clave in ('ID_Persona', 'Nombre', 'DPI', 'Email', 'Telefono', 'Rol', 'Estado')}
+        asignados = sorted(por_persona.get(p['ID_Persona'], []), key=lambda pd: pd['ID_Derecho'])
+        for pd in asignados:
+            filas.append({**base, 'ID_Derecho': pd['ID_Derecho'], 'Descripcion_Derecho': derechos[pd['ID_Derecho']],
+                          'Fecha_Inicio': pd['Fecha_Inicio'], 'Fecha_Fin': pd['Fecha_Fin']})
+        if not asignados:
+            filas.append({**base, 'ID_Derecho': None, 'Descripcion_Derecho': 'Sin derechos',
+                          'Fecha_Inicio': None, 'Fecha_Fin': None})
+    return filas
+
+
+@pytest.fixture
+def padron(datos):
+    """Persona 2 con un segundo derecho (con fin), 4 y 7 sin derechos y 3 inactiva."""
+    db.session.add(PersonaDerecho(ID_Persona=2, ID_Derecho=2, Fecha_Inicio=date(2025, 1, 1),
+                                  Fecha_Fin=date(2025, 12, 31)))
+    for persona in (4, 7):
+        db.session.delete(db.session.get(PersonaDerecho, (persona, 1)))
+    db.session.get(Persona, 3).estado = 'Inactivo'
+    db.session.commit()
+    return datos
+
+
+def test_mismas_filas_que_la_union_en_el_cliente(cliente, padron):
+    filas = cliente.get(URL).get_json()
+    assert filas == unir_en_el_cliente(cliente)
+    assert len(filas) == padron + 1
+    sin_derechos = [f for f in filas if f['ID_Derecho'] is None]
+    assert [(f['ID_Persona'], f['Descripcion_Derecho'], f['Fecha_Inicio']) for f in sin_derechos] == [
+        (4, 'Sin derechos', None), (7, 'Sin derechos', None)]
+
+
+def test_filtros_y_paginas(cliente, padron):
+    def personas(consulta):
+        return [(f['ID_Persona'], f['ID_Derecho']) for f in cliente.get(f'{URL}?{consulta}').get_json()]
+
+    # 'Persona 1' solo coincide con la persona 2 (nombres de 0 a 9), con sus dos derechos
+    assert personas('Nombre=Persona 1') == [(2, 1), (2, 2)]
+    assert personas('DPI=1000000000006') == [(7, None)]
+    assert personas('Derecho=Luz') == [(2, 2)]
+    assert personas('Estado=Inactivo') == [(3, 1)]
+    assert personas('Rol=Presidente&Derecho=Agua') == [(1, 1)]
+    assert personas('Nombre=100%') == []
+
+    # Las páginas (llave ID_Persona, ID_Derecho con NULL como 0) reconstruyen la lista
+    completo, paginas, cursor = cliente.get(URL).get_json(), [], ''
+    while True:
+        cuerpo = cliente.get(f'{URL}?limit=3&after={cursor}').get_json()
+        paginas.extend(cuerpo['datos'])
+        cursor = cuerpo['siguiente']
+        if cursor is None:
+            break
+    assert paginas == completo
+    assert cliente.get(f'{URL}?stream=1&Derecho=Agua').get_json() == [f for f in completo if f['ID_Derecho'] == 1]
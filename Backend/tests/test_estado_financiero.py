@@ -0,0 +1,142 @@
+# tests/test_estado_financiero.py
+# Estado financiero PDF/CSV: contenido, archivo PDF bien formado, caché en
+# disco por versión de datos y generación en otro hilo (202 mientras tanto).
+
+import base64
+import csv
+import io
+import re
+import threading
+import zlib
+
+import pytest
+
+from app.extensions import db
+from app.utils import estado_financiero
+
+URL = '/api/reportes/estado-financiero'
+
+
+def _cadena_pdf(cadena):
+    """Cadena literal de PDF ((...) con escapes \\( \\) \\\\ y octales) a texto."""
+    return re.sub(rb'\\([0-7]{1,3}|.)', lambda m: bytes([int(m.group(1), 8)]) if m.group(1).isdigit()
+                  else m.group(1), cadena).decode('cp1252')
+
+
+def paginas_pdf(contenido):
+    """
+    Comprueba la tabla xref y devuelve, por página, los textos dibujados
+    (uno por línea). Los flujos de reportlab van en ASCII85 y Flate.
+    """
+    assert contenido.startswith(b'%PDF-1.') and contenido.rstrip().endswith(b'%%EOF')
+    inicio_xref = int(re.search(rb'startxref\r?\n(\d+)\r?\n', contenido).group(1))
+    total = int(re.match(rb'xref\r?\n0 (\d+)\r?\n', contenido[inicio_xref:]).group(1))
+    entradas = re.findall(rb'(\d{10}) \d{5} ([nf])', contenido[inicio_xref:])[:total]
+    for numero, (desplazamiento, uso) in enumerate(entradas):
+        if uso == b'n':
+            assert contenido[int(desplazamiento):].startswith(b'%d 0 obj' % numero)
+
+    flujos = [zlib.decompress(base64.a85decode(f.strip().removesuffix(b'~>')))
+              for f in re.findall(rb'stream\r?\n(.*?)endstream', contenido, re.S)]
+    assert int(re.search(rb'/Count (\d+)', contenido).group(1)) == len(flujos)
+    return ['\n'.join(_cadena_pdf(c) for c in re.findall(rb'\(((?:\\.|[^\\)])*)\) Tj', f, re.S))
+            for f in flujos]
+
+
+def secciones_csv(texto):
+    """{título de sección: filas} del CSV."""
+    filas = list(csv.reader(io.StringIO(texto)))
+    secciones, actual = {}, None
+    for anterior, fila in zip([[]] + filas, filas):
+        if not anterior and len(fila) == 1:
+            actual = secciones.setdefault(fila[0], [])
+        elif fila:
+            actual.append(fila)
+    return secciones
+
+
+def test_pdf(cliente, datos):
+    respuesta = cliente.get(URL)
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == 'application/pdf'
+    assert 'attachment' in respuesta.headers['Content-Disposition']
+
+    texto = '\n'.join(paginas_pdf(respuesta.get_data()))
+    for esperado in ('Balance', 'Estado de cobro por cuota', 'Personas y derechos', 'Egresos',
+                     'Persona 7', 'Cuota mantenimiento', 'Descripción'):
+        assert esperado in texto
+
+
+@pytest.mark.parametrize('datos', [200], indirect=True)
+def test_pdf_de_varias_paginas_repite_el_encabezado(cliente, datos):
+    paginas = paginas_pdf(cliente.get(URL).get_data())
+    con_personas = [p.split('\n') for p in paginas if re.search(r'^Persona \d+$', p, re.M)]
+    assert len(con_personas) > 2
+    # Cada celda es un texto aparte: el encabezado va antes de la primera persona de cada página
+    for lineas in con_personas:
+        primera = next(i for i, l in enumerate(lineas) if re.fullmatch(r'Persona \d+', l))
+        assert any(lineas[i:i + 3] == ['ID', 'Nombre', 'DPI'] for i in range(primera))
+
+
+def test_csv(cliente, datos):
+    respuesta = cliente.get(f'{URL}?formato=csv')
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == 'text/csv'
+    secciones = secciones_csv(respuesta.get_data().decode('utf-8-sig'))
+
+    # conftest.sembrar: 10 ingresos de 20 y 1 egreso de 1
+    assert dict(secciones['Balance']) == {
+        'Total de ingresos (Q)': '200.00', 'Total de egresos (Q)': '1.00', 'Fondos disponibles (Q)': '199.00'}
+    personas = secciones['Personas y derechos']
+    assert personas[0][:3] == ['ID', 'Nombre', 'DPI'] and len(personas) == 1 + datos
+    assert len(secciones['Ingresos']) == 1 + datos
+    cuotas = {fila[1]: fila for fila in secciones['Estado de cobro por cuota'][1:]}
+    assert cuotas['Cuota agua'][4:8] == [str(datos), '0', f'{20 * datos:.2f}', f'{30 * datos:.2f}']
+
+
+def test_se_sirve_del_disco_hasta_que_cambian_los_datos(cliente, datos, monkeypatch):
+    generados = []
+    original = estado_financiero.escribir_estado
+    monkeypatch.setattr(estado_financiero, 'escribir_estado',
+                        lambda salida, hoy: generados.append(hoy) or original(salida, hoy))
+
+    primero = cliente.get(URL).get_data()
+    assert cliente.get(URL).get_data() == primero
+    assert len(generados) == 1
+
+    cliente.post('/api/egresos', json={'Fecha': '2025-01-10', 'Monto': 5, 'Descripcion': 'Gasto nuevo'})
+    db.session.remove()
+    assert cliente.get(URL).status_code == 200
+    assert len(generados) == 2
+    assert len(cliente.get(f'{URL}?formato=csv').get_data()) > 0
+    assert len(generados) == 3
+
+
+def test_generacion_en_otro_hilo(app, cliente, datos, monkeypatch):
+    """Mientras el hilo no termina se responde 202; varias peticiones comparten el trabajo."""
+    app.config.update(REPORTES_HILOS=1, REPORTES_ESPERA=0.05)
+    liberar, llamadas = threading.Event(), []
+
+    def generar_lento(app, ruta, formato, hoy):
+        llamadas.append(ruta)
+        liberar.wait(5)
+        with open(ruta, 'wb') as archivo:
+            archivo.write(b'%PDF-1.4 listo')
+        return ruta
+
+    monkeypatch.setattr(estado_financiero, '_generar', generar_lento)
+    try:
+        assert cliente.get(URL).status_code == 202
+        respuesta = cliente.get(URL)
+        assert respuesta.status_code == 202 and respuesta.headers['Retry-After']
+    finally:
+        liberar.set()
+    app.config['REPORTES_ESPERA'] = 5
+    assert cliente.get(URL).get_data() == b'%PDF-1.4 listo'
+    assert len(llamadas) == 1
+
+
+def test_formato_invalido(cliente, datos):
+    respuesta = cliente.get(f'{URL}?formato=xlsx')
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()['errores']
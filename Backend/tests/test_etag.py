@@ -0,0 +1,78 @@
+# tests/test_etag.py
+# GET condicionales: ETag por ruta y versiones de tabla, 304 sin ejecutar la
+# vista mientras no cambie ninguna tabla de la que depende, cambio de ETag
+# con escrituras del ORM y por lote, y una sola subida de versión por tabla
+# y transacción.
+
+from datetime import date
+
+from app.extensions import db
+from app.utils.versiones import TABLAS, versiones
+from tests.presupuesto import contar_sql
+
+HOY = str(date.today())
+
+
+def revalidar(cliente, url, etag):
+    return cliente.get(url, headers={'If-None-Match': f'"{etag}"'})
+
+
+def test_304_hasta_que_cambia_la_tabla(cliente, datos, presupuesto_sql):
+    respuesta = cliente.get('/api/personas')
+    etag = respuesta.get_etag()[0]
+    assert respuesta.status_code == 200 and respuesta.headers['Cache-Control'] == 'private, no-cache'
+
+    # Solo se lee Version_Tabla
+    with presupuesto_sql(1, 'revalidación'):
+        respuesta = revalidar(cliente, '/api/personas', etag)
+    assert respuesta.status_code == 304 and respuesta.get_data() == b''
+    assert respuesta.get_etag()[0] == etag
+    # Otros parámetros son otra representación
+    assert revalidar(cliente, '/api/personas?limit=2', etag).status_code == 200
+
+    # Escribir en otra tabla no invalida; escribir en Personas sí
+    assert cliente.post('/api/egresos', json={'Fecha': HOY, 'Monto': 1, 'Descripcion': 'Cloro'}).status_code == 201
+    assert revalidar(cliente, '/api/personas', etag).status_code == 304
+    assert cliente.put('/api/personas/3', json={'Telefono': '55598765'}).status_code == 200
+    respuesta = revalidar(cliente, '/api/personas', etag)
+    assert respuesta.status_code == 200 and respuesta.get_etag()[0] != etag
+    assert revalidar(cliente, '/api/personas', respuesta.get_etag()[0]).status_code == 304
+
+
+def test_escrituras_por_lote_cambian_el_etag(cliente, datos):
+    urls = ('/api/pagos', '/api/cuotas/con-pagos', '/api/ingresos', '/api/derechos')
+    etags = {url: cliente.get(url).get_etag()[0] for url in urls}
+
+    # El lote inserta Pagos e Ingresos y acumula en Persona_Cuota con Core
+    assert cliente.post('/api/pagos/lote', json=[
+        {'ID_Persona': 2, 'ID_Cuota': 2, 'Fecha_Pago': HOY, 'Monto_Pagado': 5}]).status_code == 201
+    estados = {url: revalidar(cliente, url, etags[url]).status_code for url in urls}
+    assert estados == {'/api/pagos': 200, '/api/cuotas/con-pagos': 200, '/api/ingresos': 200, '/api/derechos': 304}
+
+
+def test_una_version_por_tabla_y_transaccion(cliente, datos):
+    def cambio(metodo, url, cuerpo, estado):
+        antes = versiones(db.session, TABLAS)
+        db.session.remove()
+        with contar_sql(db.engine) as sentencias:
+            assert cliente.open(url, method=metodo, json=cuerpo).status_code == estado
+        despues = versiones(db.session, TABLAS)
+        db.session.remove()
+        subidas = [s for s in sentencias if s.startswith('UPDATE "Version_Tabla"')]
+        # Las subidas van juntas al final, justo antes del COMMIT
+        assert sentencias[len(sentencias) - len(subidas):] == subidas
+        return {t: despues[t] - antes.get(t, 0) for t in despues if despues[t] != antes.get(t, 0)}, len(subidas)
+
+    # Varias sentencias por lote y un flush del ORM sobre las mismas tablas
+    filas = [{'ID_Persona': i, 'ID_Cuota': 2, 'Fecha_Pago': HOY, 'Monto_Pagado': 5} for i in (2, 3)]
+    assert cambio('POST', '/api/pagos/lote', filas, 201) == (
+        {'Persona_Cuota': 1, 'Pagos': 1, 'Ingresos': 1}, 3)
+    assert cambio('PUT', '/api/pagos/1', {'Monto_Pagado': 25}, 200) == (
+        {'Persona_Cuota': 1, 'Pagos': 1, 'Ingresos': 1}, 3)
+    # Lo escrito antes de un rollback no sube versiones
+    assert cambio('PUT', '/api/pagos/1', {'Monto_Pagado': 500}, 400) == ({}, 0)
+
+
+def test_sin_etag_en_errores(cliente, datos):
+    respuesta = cliente.get('/api/personas/999')
+    assert respuesta.status_code == 404 and respuesta.get_etag() == (None, None)
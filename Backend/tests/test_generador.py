@@ -0,0 +1,45 @@
+# tests/test_generador.py
+# `flask seed`: cada ingreso queda ligado a su pago, los acumulados de
+# Persona_Cuota cuadran con los pagos y el saldo y el resumen con las tablas.
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Persona, PersonaCuota, Pago, Ingreso
+from app.utils.generador import Generador
+from app.utils.resumen import verificar_resumen
+from app.utils.saldos import verificar_saldo
+
+
+def test_padron_consistente(app):
+    # Personas previas: los ID nuevos no empiezan en 1
+    db.session.add_all([Persona(dpi=str(1000000000000 + i), nombre=f'Previa {i}', rol='Sin rol', estado='Activo')
+                        for i in range(3)])
+    db.session.commit()
+
+    conteos, _ = Generador(250, bloque=100).generar()
+    assert conteos['personas'] == 250 and conteos['pagos'] == conteos['ingresos'] > 0
+
+    # Cada ingreso corresponde a un pago distinto, con su monto y su fecha
+    descuadres = db.session.execute(
+        select(func.count()).select_from(Ingreso).join(Pago, Pago.ID_Pago == Ingreso.ID_Pago)
+        .where((Ingreso.Monto != Pago.Monto_Pagado) | (Ingreso.Fecha != Pago.Fecha_Pago))
+    ).scalar()
+    ligados = db.session.execute(select(func.count(func.distinct(Ingreso.ID_Pago)))).scalar()
+    assert descuadres == 0 and ligados == conteos['pagos']
+
+    # Total_Pagado de cada asignación es la suma de sus pagos
+    pagos = select(Pago.ID_Persona, Pago.ID_Cuota, func.sum(Pago.Monto_Pagado).label('total'))\
+        .group_by(Pago.ID_Persona, Pago.ID_Cuota).subquery()
+    distintos = db.session.execute(
+        select(func.count()).select_from(PersonaCuota)
+        .outerjoin(pagos, (pagos.c.ID_Persona == PersonaCuota.ID_Persona) & (pagos.c.ID_Cuota == PersonaCuota.ID_Cuota))
+        .where(PersonaCuota.Total_Pagado != func.coalesce(pagos.c.total, 0))
+    ).scalar()
+    assert distintos == 0
+    # Las asignaciones son de las personas generadas, no de las previas
+    assert db.session.execute(select(func.min(PersonaCuota.ID_Persona))).scalar() > 3
+
+    guardado, real = verificar_saldo()
+    assert guardado == real
+    assert verificar_resumen() == []
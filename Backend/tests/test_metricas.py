@@ -0,0 +1,73 @@
+# tests/test_metricas.py
+# Métricas por endpoint: texto de Prometheus (buckets acumulativos, +Inf y
+# etiquetas escapadas), cabecera Server-Timing y exclusión de /api/_metrics.
+
+import re
+
+import pytest
+
+from app.utils.metricas import Metricas, metricas
+
+
+@pytest.fixture(autouse=True)
+def limpiar():
+    metricas.reiniciar()
+    yield
+    metricas.reiniciar()
+
+
+def series(texto, nombre):
+    """{etiquetas: valor} de las líneas de `nombre` (sin # HELP/# TYPE)."""
+    return {m.group(1): float(m.group(2))
+            for m in re.finditer(rf'^{nombre}(\{{.*\}}) (\S+)$', texto, re.MULTILINE)}
+
+
+def test_texto_prometheus():
+    registro = Metricas()
+    for segundos, sentencias in ((0.003, 0), (0.03, 3), (20.0, 150)):
+        registro.registrar('/api/personas', 'GET', 200, segundos, sentencias, 0.001)
+    registro.registrar('/api/personas', 'GET', 404, 0.002, 1, 0.0)
+    texto = registro.texto_prometheus(['cocode_extra 1'])
+
+    assert '# TYPE cocode_http_request_duration_seconds histogram' in texto
+    latencia = series(texto, 'cocode_http_request_duration_seconds_bucket')
+    etiqueta = '{endpoint="/api/personas",method="GET",le="%s"}'
+    # Acumulativos: cada bucket cuenta todo lo que es <= su límite
+    assert [latencia[etiqueta % le] for le in ('0.005', '0.01', '0.025', '0.05', '10.0', '+Inf')] == [2, 2, 2, 3, 3, 4]
+    assert series(texto, 'cocode_http_request_duration_seconds_count') == {
+        '{endpoint="/api/personas",method="GET"}': 4}
+    sentencias = series(texto, 'cocode_sql_statements_per_request_bucket')
+    assert [sentencias[etiqueta % le] for le in ('0', '1', '5', '100', '+Inf')] == [1, 2, 3, 3, 4]
+    assert series(texto, 'cocode_http_requests_total') == {
+        '{endpoint="/api/personas",method="GET",status="200"}': 3,
+        '{endpoint="/api/personas",method="GET",status="404"}': 1}
+    assert texto.endswith('cocode_extra 1\n')
+
+    # Barras invertidas, comillas y saltos de línea se escapan en las etiquetas
+    registro.reiniciar()
+    registro.registrar('/api/a"b\\c\nd', 'GET', 200, 0.1, 1, 0.0)
+    assert 'cocode_http_requests_total{endpoint="/api/a\\"b\\\\c\\nd",method="GET",status="200"} 1' in \
+        registro.texto_prometheus()
+
+
+def test_server_timing(app, cliente, datos):
+    assert 'Server-Timing' not in cliente.get('/api/personas').headers
+
+    app.config['METRICAS_SERVER_TIMING'] = True
+    cabecera = cliente.get('/api/personas/1').headers['Server-Timing']
+    assert re.fullmatch(r'app;dur=\d+\.\d, sql;dur=\d+\.\d;desc="[1-9]\d* sentencias"', cabecera)
+
+
+def test_rutas_de_metricas_no_se_miden(cliente, datos):
+    for url in ('/api/personas', '/api/personas', '/api/personas/999', '/api/_metrics/pool', '/api/_metrics'):
+        cliente.get(url)
+    respuesta = cliente.get('/api/_metrics')
+    assert respuesta.mimetype == 'text/plain'
+    texto = respuesta.get_data(as_text=True)
+
+    assert series(texto, 'cocode_http_requests_total') == {
+        '{endpoint="/api/personas",method="GET",status="200"}': 2,
+        '{endpoint="/api/personas/<int:id>",method="GET",status="404"}': 1}
+    assert 'endpoint="/api/_metrics' not in texto
+    assert series(texto, 'cocode_sql_statements_per_request_count')['{endpoint="/api/personas",method="GET"}'] == 2
+    assert 'cocode_cache_referencias_vigencia_s 1000000' in texto
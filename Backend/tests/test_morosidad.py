@@ -0,0 +1,72 @@
+# tests/test_morosidad.py
+# GET /api/reportes/morosidad: deuda pendiente por persona (con la parte
+# vencida aparte) ordenada de mayor a menor, páginas por cursor sin huecos
+# ni repetidos, y filtro por derecho.
+
+from datetime import date, timedelta
+
+HOY = date.today()
+
+
+def vencer(cliente):
+    """
+    Sobre conftest.sembrar: la cuota 1 (50, pagados 20) vence hace 5 días,
+    la persona 1 recibe el derecho 2 (cuota 3 de 30, vencida hace 10 días)
+    y la persona 2 abona 10 más a la cuota 1.
+    """
+    assert cliente.put('/api/cuotas/1', json={
+        'Descripcion': 'Cuota agua', 'Monto': 50, 'Fecha_Limite': str(HOY - timedelta(days=5))}).status_code == 200
+    assert cliente.post('/api/persona_derecho', json={
+        'ID_Persona': 1, 'ID_Derecho': 2, 'Fecha_Inicio': str(HOY)}).status_code == 201
+    assert cliente.post('/api/pagos', json={
+        'ID_Persona': 2, 'ID_Cuota': 1, 'Fecha_Pago': str(HOY), 'Monto_Pagado': 10}).status_code == 201
+
+
+def test_ranking_por_deuda(cliente, datos):
+    # Antes de vencer nada: cuota 1 (50, pagados 20) y cuota 2 (20) pendientes
+    filas = cliente.get('/api/reportes/morosidad').get_json()
+    assert [f['ID_Persona'] for f in filas] == list(range(1, datos + 1))
+    assert {(f['Deuda'], f['DeudaVencida'], f['CuotasPendientes'], f['CuotasVencidas'], f['VencimientoMasAntiguo'])
+            for f in filas} == {(50.0, 0.0, 2, 0, None)}
+
+    vencer(cliente)
+    filas = cliente.get('/api/reportes/morosidad').get_json()
+    assert [f['ID_Persona'] for f in filas] == [1, *range(3, datos + 1), 2]
+    assert filas[0] == {
+        'ID_Persona': 1, 'Nombre': 'Persona 0', 'DPI': '1000000000000', 'Telefono': '55512345',
+        'Deuda': 80.0, 'DeudaVencida': 60.0, 'CuotasPendientes': 3, 'CuotasVencidas': 2,
+        'VencimientoMasAntiguo': str(HOY - timedelta(days=10))
+    }
+    assert (filas[1]['Deuda'], filas[1]['DeudaVencida'], filas[1]['CuotasVencidas']) == (50.0, 30.0, 1)
+    assert (filas[-1]['Deuda'], filas[-1]['DeudaVencida']) == (40.0, 20.0)
+
+    # Quien completa todas sus cuotas sale del reporte
+    assert cliente.post('/api/pagos', json={
+        'ID_Persona': 3, 'ID_Cuota': 2, 'Fecha_Pago': str(HOY), 'Monto_Pagado': 20}).status_code == 201
+    assert cliente.put('/api/cuotas/1', json={
+        'Descripcion': 'Cuota agua', 'Monto': 20, 'Fecha_Limite': str(HOY - timedelta(days=5))}).status_code == 200
+    filas = cliente.get('/api/reportes/morosidad').get_json()
+    assert 3 not in [f['ID_Persona'] for f in filas]
+
+
+def test_paginas_por_cursor_y_filtro_por_derecho(cliente, datos):
+    vencer(cliente)
+    completo = cliente.get('/api/reportes/morosidad').get_json()
+
+    # Páginas de 3: los empates de deuda se desempatan por ID_Persona
+    paginas, cursor = [], ''
+    while True:
+        cuerpo = cliente.get(f'/api/reportes/morosidad?limit=3&after={cursor}').get_json()
+        paginas.extend(cuerpo['datos'])
+        cursor = cuerpo['siguiente']
+        if cursor is None:
+            break
+    assert paginas == completo
+
+    por_derecho = cliente.get('/api/reportes/morosidad?ID_Derecho=2').get_json()
+    assert [(f['ID_Persona'], f['Deuda'], f['DeudaVencida'], f['CuotasVencidas'])
+            for f in por_derecho] == [(1, 30.0, 30.0, 1)]
+    assert len(cliente.get('/api/reportes/morosidad?ID_Derecho=1').get_json()) == datos
+
+    assert cliente.get('/api/reportes/morosidad?ID_Derecho=x').status_code == 400
+    assert cliente.get('/api/reportes/morosidad?limit=2&after=basura').status_code == 400
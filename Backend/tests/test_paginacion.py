@@ -0,0 +1,73 @@
+# tests/test_paginacion.py
+# Paginación por llave: el cursor ida y vuelta, páginas que reconstruyen la
+# colección en orden sin huecos ni repetidos (llave simple y compuesta) y
+# las variantes ?stream=1 y ?formato=csv.
+
+import csv
+import io
+
+import pytest
+
+from app.utils.paginacion import codificar_cursor, decodificar_cursor
+
+
+def recorrer(cliente, url, limite):
+    """Todas las filas de `url` pidiendo páginas de `limite` por cursor."""
+    filas, cursor, paginas = [], '', 0
+    while True:
+        cuerpo = cliente.get(f'{url}?limit={limite}&after={cursor}').get_json()
+        assert len(cuerpo['datos']) <= limite
+        filas.extend(cuerpo['datos'])
+        paginas += 1
+        cursor = cuerpo['siguiente']
+        if cursor is None:
+            return filas, paginas
+
+
+def test_cursor_ida_y_vuelta():
+    for valores in ([7], [3, 12], [-80.5, 4], ['2025-01-31', 'ñ']):
+        cursor = codificar_cursor(valores)
+        assert '=' not in cursor and '/' not in cursor and '+' not in cursor
+        assert decodificar_cursor(cursor, len(valores)) == valores
+
+    # Base64 inválido, un objeto JSON ({}) en vez de una lista y otra cantidad de valores
+    for invalido in ('basura!', 'e30', codificar_cursor([1, 2])):
+        with pytest.raises(ValueError):
+            decodificar_cursor(invalido, 1)
+
+
+@pytest.mark.parametrize('datos', [23], indirect=True)
+def test_paginas_reconstruyen_la_coleccion(cliente, datos):
+    completo = cliente.get('/api/personas').get_json()
+    assert [p['ID_Persona'] for p in completo] == list(range(1, datos + 1))
+    filas, paginas = recorrer(cliente, '/api/personas', 5)
+    assert filas == completo and paginas == 5
+
+    # Llave compuesta (ID_Persona, ID_Derecho): se agrega un segundo derecho a algunas personas
+    for persona in (2, 3, 11):
+        assert cliente.post('/api/persona_derecho', json={
+            'ID_Persona': persona, 'ID_Derecho': 3, 'Fecha_Inicio': '2025-01-01'}).status_code == 201
+    completo = cliente.get('/api/persona_derecho').get_json()
+    llaves = [(f['ID_Persona'], f['ID_Derecho']) for f in completo]
+    assert llaves == sorted(llaves) and len(llaves) == datos + 3
+    assert recorrer(cliente, '/api/persona_derecho', 4)[0] == completo
+
+    # Un cursor con otra cantidad de valores que la llave se rechaza
+    respuesta = cliente.get(f'/api/persona_derecho?limit=4&after={codificar_cursor([2])}')
+    assert respuesta.status_code == 400
+    assert cliente.get('/api/personas?limit=0').status_code == 400
+
+
+def test_stream_y_csv(cliente, datos):
+    completo = cliente.get('/api/pagos').get_json()
+    assert cliente.get('/api/pagos?stream=1').get_json() == completo
+
+    # Desde un cursor: solo lo que sigue a la primera página
+    primera = cliente.get('/api/pagos?limit=4').get_json()
+    assert cliente.get(f"/api/pagos?stream=1&after={primera['siguiente']}").get_json() == completo[4:]
+
+    respuesta = cliente.get('/api/pagos?formato=csv')
+    assert respuesta.mimetype == 'text/csv'
+    filas = list(csv.DictReader(io.StringIO(respuesta.get_data(as_text=True))))
+    assert [int(f['ID_Pago']) for f in filas] == [p['ID_Pago'] for p in completo]
+    assert cliente.get('/api/pagos?formato=xml').status_code == 400
@@ -0,0 +1,74 @@
+# tests/test_pagos_lote.py
+# POST /pagos/lote: lectura de filas desde un archivo CSV, un cuerpo text/csv
+# (con BOM y números como texto) o JSON, y errores por fila en cada modo.
+
+import io
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Pago, PersonaCuota
+
+HOY = str(date.today())
+
+CSV = (f'ID_Persona,ID_Cuota,Fecha_Pago,Monto_Pagado\r\n'
+       f'2,2,{HOY},5.50\r\n'
+       f'003,2,{HOY}, 7\r\n')
+
+
+def pagos_de_cuota(cuota):
+    db.session.remove()
+    return db.session.execute(
+        select(Pago.ID_Persona, Pago.Monto_Pagado).where(Pago.ID_Cuota == cuota).order_by(Pago.ID_Pago)
+    ).all()
+
+
+def test_archivo_csv(cliente, datos):
+    respuesta = cliente.post('/api/pagos/lote', data={
+        'archivo': (io.BytesIO(b'\xef\xbb\xbf' + CSV.encode()), 'pagos.csv')})
+    assert respuesta.status_code == 201, respuesta.get_json()
+    assert respuesta.get_json()['insertados'] == 2
+    assert pagos_de_cuota(2) == [(2, Decimal('5.50')), (3, Decimal('7'))]
+    assert db.session.get(PersonaCuota, (3, 2)).Total_Pagado == 7
+
+
+def test_cuerpo_text_csv_con_bom(cliente, datos):
+    respuesta = cliente.post('/api/pagos/lote', data=('\ufeff' + CSV).encode(),
+                             content_type='text/csv; charset=utf-8')
+    assert respuesta.status_code == 201, respuesta.get_json()
+    assert pagos_de_cuota(2) == [(2, Decimal('5.50')), (3, Decimal('7'))]
+
+
+def test_errores_por_fila(cliente, datos):
+    filas = [
+        {'ID_Persona': 2, 'ID_Cuota': 2, 'Fecha_Pago': HOY, 'Monto_Pagado': '5'},
+        {'ID_Persona': 999, 'ID_Cuota': 2, 'Fecha_Pago': '31/01/2025', 'Monto_Pagado': 5},
+        {'ID_Persona': 3, 'ID_Cuota': 2, 'Fecha_Pago': HOY, 'Monto_Pagado': 'cinco'},
+        {'ID_Persona': 4, 'ID_Cuota': 2, 'Fecha_Pago': HOY, 'Monto_Pagado': 20},
+        {'ID_Persona': 4, 'ID_Cuota': 2, 'Fecha_Pago': HOY, 'Monto_Pagado': 1},
+    ]
+    esperados = [
+        {'fila': 2, 'errores': ['Fecha_Pago debe ser YYYY-MM-DD.', 'Persona inválida.']},
+        {'fila': 3, 'errores': ['El monto pagado debe ser un número válido.']},
+        {'fila': 5, 'errores': ['Esta cuota ya está completamente pagada.']},
+    ]
+
+    # todo_o_nada (por defecto): no se inserta ninguna fila
+    respuesta = cliente.post('/api/pagos/lote', json=filas)
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()['errores'] == esperados and pagos_de_cuota(2) == []
+
+    respuesta = cliente.post('/api/pagos/lote?modo=omitir_invalidos', json=filas)
+    assert respuesta.status_code == 201
+    cuerpo = respuesta.get_json()
+    assert (cuerpo['insertados'], cuerpo['rechazados'], cuerpo['errores']) == (2, 3, esperados)
+    assert pagos_de_cuota(2) == [(2, Decimal('5')), (4, Decimal('20'))]
+    assert db.session.execute(select(func.count()).select_from(Pago)).scalar() == datos + 2
+
+
+def test_cuerpos_invalidos(cliente, datos):
+    assert cliente.post('/api/pagos/lote?modo=parcial', json=[]).status_code == 400
+    assert cliente.post('/api/pagos/lote', json={'ID_Persona': 1}).get_json()['errores'] == [
+        'Se esperaba un arreglo JSON de objetos o un archivo CSV.']
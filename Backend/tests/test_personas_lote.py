@@ -0,0 +1,108 @@
+# tests/test_personas_lote.py
+# Importación del padrón: DPI repetidos en el archivo y contra la base, roles
+# únicos, los dos modos en POST /personas/lote, un DPI registrado por otra
+# transacción tras la validación y el código de salida de `flask personas importar`.
+
+import json
+
+from sqlalchemy import select
+
+from app.cli import importar_personas_cmd
+from app.extensions import db
+from app.models import Persona
+from app.utils import importacion
+from app.utils.validaciones import ContextoValidacion
+
+# conftest.sembrar: DPI 1000000000000 + i y la persona 0 es Presidente
+FILAS = [
+    {'DPI': '2000000000001', 'Nombre': 'Ana'},
+    {'DPI': '1000000000003', 'Nombre': 'Ya registrada'},
+    {'DPI': '2000000000001', 'Nombre': 'Repetida'},
+    {'DPI': '2000000000002', 'Nombre': 'Beto', 'Rol': 'Tesorero', 'Telefono': '55511111'},
+    {'DPI': '2000000000003', 'Nombre': 'Otro tesorero', 'Rol': 'Tesorero'},
+    {'DPI': '2000000000004', 'Nombre': 'Otro presidente', 'Rol': 'Presidente', 'Email': 'sin-arroba'},
+    {'DPI': '123', 'Nombre': ''},
+]
+ERRORES = [
+    {'fila': 2, 'errores': ['El DPI ya está registrado.']},
+    {'fila': 3, 'errores': ['El DPI está repetido en el archivo.']},
+    {'fila': 5, 'errores': ["El rol 'Tesorero' ya está asignado a otra persona."]},
+    {'fila': 6, 'errores': ['Correo electrónico inválido.', "El rol 'Presidente' ya está asignado a otra persona."]},
+    {'fila': 7, 'errores': ['DPI debe ser un número de 13 dígitos.', 'El nombre es obligatorio.']},
+]
+
+
+def nuevas():
+    db.session.remove()
+    return db.session.execute(
+        select(Persona.nombre, Persona.rol, Persona.estado).where(Persona.dpi.like('2%')).order_by(Persona.dpi)
+    ).all()
+
+
+def test_todo_o_nada(cliente, datos):
+    respuesta = cliente.post('/api/personas/lote', json=FILAS)
+    assert respuesta.status_code == 400
+    cuerpo = respuesta.get_json()
+    assert (cuerpo['insertados'], cuerpo['rechazados'], cuerpo['errores']) == (0, 5, ERRORES)
+    assert nuevas() == []
+
+
+def test_omitir_invalidos(cliente, datos):
+    respuesta = cliente.post('/api/personas/lote?modo=omitir_invalidos', json=FILAS)
+    assert respuesta.status_code == 201
+    cuerpo = respuesta.get_json()
+    assert (cuerpo['insertados'], cuerpo['rechazados'], cuerpo['errores']) == (2, 5, ERRORES)
+    assert nuevas() == [('Ana', 'Sin rol', 'Activo'), ('Beto', 'Tesorero', 'Activo')]
+
+    # Un segundo lote ve lo que insertó el primero
+    cuerpo = cliente.post('/api/personas/lote?modo=omitir_invalidos', json=FILAS[:1]).get_json()
+    assert cuerpo['errores'] == [{'fila': 1, 'errores': ['El DPI ya está registrado.']}]
+
+
+def test_dpi_registrado_tras_la_validacion(cliente, datos, monkeypatch):
+    """La primera validación no ve un DPI que ya está en la base: el INSERT choca con UNIQUE."""
+    original = ContextoValidacion.para_personas
+    llamadas = []
+
+    def desactualizado(filas):
+        ctx = original(filas)
+        if not llamadas:
+            ctx.dpis.pop('1000000000003')
+        llamadas.append(ctx)
+        return ctx
+
+    monkeypatch.setattr(importacion.ContextoValidacion, 'para_personas', desactualizado)
+    filas = [FILAS[0], FILAS[1], FILAS[3]]
+    error = [{'fila': 2, 'errores': ['El DPI ya está registrado.']}]
+
+    respuesta = cliente.post('/api/personas/lote', json=filas)
+    assert respuesta.status_code == 400 and respuesta.get_json()['errores'] == error
+    assert len(llamadas) == 2 and nuevas() == []
+
+    llamadas.clear()
+    respuesta = cliente.post('/api/personas/lote?modo=omitir_invalidos', json=filas)
+    assert respuesta.status_code == 201
+    assert (respuesta.get_json()['insertados'], respuesta.get_json()['errores']) == (2, error)
+    assert nuevas() == [('Ana', 'Sin rol', 'Activo'), ('Beto', 'Tesorero', 'Activo')]
+
+
+def test_comando_importar(app, datos, tmp_path):
+    runner = app.test_cli_runner()
+
+    archivo = tmp_path / 'padron.json'
+    archivo.write_text(json.dumps(FILAS), encoding='utf-8')
+    resultado = runner.invoke(importar_personas_cmd, [str(archivo)])
+    assert resultado.exit_code == 1
+    assert 'Fila 3: El DPI está repetido en el archivo.' in resultado.output
+    assert '0 insertadas, 5 rechazadas de 7' in resultado.output
+    assert nuevas() == []
+
+    resultado = runner.invoke(importar_personas_cmd, [str(archivo), '--modo', 'omitir_invalidos', '--bloque', '1'])
+    assert resultado.exit_code == 0
+    assert '2 insertadas, 5 rechazadas de 7' in resultado.output
+
+    archivo = tmp_path / 'padron.csv'
+    archivo.write_bytes('\ufeffDPI,Nombre,Rol\r\n2000000000009,Carla,Vocal I\r\n'.encode())
+    resultado = runner.invoke(importar_personas_cmd, [str(archivo)])
+    assert resultado.exit_code == 0, resultado.output
+    assert nuevas()[-1] == ('Carla', 'Vocal I', 'Activo')
@@ -0,0 +1,70 @@
+# tests/test_pool.py
+# Opciones del motor por perfil y dialecto, ajustes por conexión de SQLite y
+# métricas del pool (saturación, checkouts agotados) en /api/_metrics/pool.
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app import create_app
+from app.config import PERFILES, opciones_motor
+from app.extensions import db
+from app.utils.pool import PoolMedido
+
+
+def config(perfil, uri):
+    return {**{k: getattr(PERFILES[perfil], k) for k in dir(PERFILES[perfil]) if k.isupper()},
+            'SQLALCHEMY_DATABASE_URI': uri}
+
+
+def test_opciones_por_dialecto():
+    # SQLite en memoria: una sola conexión, sin opciones de pool
+    assert opciones_motor(config('pruebas', 'sqlite://')) == {'pool_pre_ping': True}
+
+    opciones = opciones_motor(config('produccion', 'sqlite:///cocode.db'))
+    assert opciones['poolclass'] is PoolMedido
+    assert (opciones['pool_size'], opciones['max_overflow'], opciones['pool_timeout'], opciones['pool_recycle']) == \
+        (20, 10, 10, 900)
+    assert 'connect_args' not in opciones
+
+    opciones = opciones_motor(config('desarrollo', 'postgresql://u:c@localhost/cocode'))
+    assert opciones['pool_size'] == 5
+    assert opciones['connect_args'] == {'options': '-c statement_timeout=30000'}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'pool.db'}")
+    monkeypatch.setenv('DB_POOL_SIZE', '2')
+    monkeypatch.setenv('DB_MAX_OVERFLOW', '0')
+    monkeypatch.setenv('DB_POOL_TIMEOUT', '1')
+    aplicacion = create_app('pruebas')
+    with aplicacion.app_context():
+        db.create_all()
+        yield aplicacion
+        db.session.remove()
+        db.drop_all()
+
+
+def test_metricas_del_pool(app):
+    with db.engine.connect() as conexion:
+        assert conexion.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert conexion.execute(text('PRAGMA foreign_keys')).scalar() == 1
+
+    # Las dos conexiones del pool ocupadas: la tercera espera y se agota
+    ocupadas = [db.engine.connect() for _ in range(2)]
+    with pytest.raises(PoolTimeoutError):
+        db.engine.connect()
+    metricas = app.test_client().get('/api/_metrics/pool').get_json()
+    for conexion in ocupadas:
+        conexion.close()
+
+    assert metricas['pool'] == 'PoolMedido' and metricas['dialecto'] == 'sqlite'
+    assert (metricas['tamano'], metricas['max_overflow'], metricas['saturacion']) == (2, 0, 1.0)
+    assert metricas['checkouts_agotados'] == 1
+    assert metricas['espera_maxima_ms'] >= metricas['espera_promedio_ms'] >= 0
+    # La petición de métricas no usa la base: las dos conexiones siguen ocupadas
+    assert metricas['en_uso'] == 2 and metricas['conexiones_abiertas'] == 2
+
+    metricas = app.test_client().get('/api/_metrics/pool').get_json()
+    assert (metricas['en_uso'], metricas['libres']) == (0, 2)
@@ -0,0 +1,152 @@
+# tests/test_presupuesto_consultas.py
+# Cada ruta de /api tiene un presupuesto de sentencias SQL que no depende
+# de cuántas filas hay: se mide con padrones de distinto tamaño y el conteo
+# debe ser el mismo. Un N+1 (p. ej. un lazy load por fila) rompe la prueba.
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.extensions import db
+from tests.presupuesto import contar_sql
+
+HOY = date.today()
+TAMANOS = [10, 200, 1000]
+
+# (método, regla) -> (presupuesto, petición, código esperado)
+# Los presupuestos son los conteos medidos: si una ruta baja, se ajusta aquí.
+# La petición es (url, json) y usa los datos de conftest.sembrar:
+# personas 1..N con el derecho 1 (cuotas 1 y 2), un pago de la cuota 1 y el trabajo 1 pendiente.
+RUTAS = {
+    # Personas
+    ('GET', '/api/personas'): (2, ('/api/personas', None), 200),
+    ('GET', '/api/personas/<int:id>'): (2, ('/api/personas/3', None), 200),
+    ('POST', '/api/personas'): (4, ('/api/personas', {
+        'DPI': '2000000000001', 'Nombre': 'Nueva', 'Direccion': 'Zona 2',
+        'Telefono': '55500000', 'Email': 'nueva@correo.com'}), 201),
+    ('POST', '/api/personas/lote'): (3, ('/api/personas/lote', [
+        {'DPI': f'300000000000{i}', 'Nombre': f'Lote {i}', 'Direccion': 'Zona 3',
+         'Telefono': '55500000', 'Email': f'lote{i}@correo.com'} for i in range(5)]), 201),
+    ('PUT', '/api/personas/<int:id>'): (3, ('/api/personas/3', {'Nombre': 'Cambiada'}), 200),
+    ('DELETE', '/api/personas/<int:id>'): (3, ('/api/personas/3', None), 200),
+    # Derechos
+    ('GET', '/api/derechos'): (2, ('/api/derechos', None), 200),
+    ('GET', '/api/derechos/<int:id>'): (2, ('/api/derechos/1', None), 200),
+    ('POST', '/api/derechos'): (4, ('/api/derechos', {'Nombre': 'Seguridad'}), 201),
+    ('PUT', '/api/derechos/<int:id>'): (3, ('/api/derechos/3', {'Nombre': 'Drenaje municipal'}), 200),
+    ('DELETE', '/api/derechos/<int:id>'): (9, ('/api/derechos/1', None), 200),
+    ('POST', '/api/derechos/<int:id>/asignar-masivo'): (10, ('/api/derechos/2/asignar-masivo', {
+        'Filtro': {'Estado': 'Activo'}}), 201),
+    ('POST', '/api/derechos/<int:id_derecho>/vincular-cuota'): (7, ('/api/derechos/1/vincular-cuota', {
+        'ID_Cuota': 4, 'Propagar': True}), 201),
+    # Cuotas
+    ('GET', '/api/cuotas'): (2, ('/api/cuotas', None), 200),
+    ('GET', '/api/cuotas/<int:id>'): (2, ('/api/cuotas/1', None), 200),
+    ('POST', '/api/cuotas'): (3, ('/api/cuotas', {
+        'Descripcion': 'Cuota nueva', 'Monto': 15, 'Fecha_Limite': str(HOY + timedelta(days=20))}), 201),
+    ('PUT', '/api/cuotas/<int:id>'): (5, ('/api/cuotas/4', {
+        'Descripcion': 'Cuota libre', 'Monto': 12, 'Fecha_Limite': str(HOY + timedelta(days=20))}), 200),
+    ('DELETE', '/api/cuotas/<int:id>'): (10, ('/api/cuotas/2', None), 200),
+    ('GET', '/api/cuotas/con-pagos'): (2, ('/api/cuotas/con-pagos', None), 200),
+    ('GET', '/api/cuotas/estado/mejorado'): (2, ('/api/cuotas/estado/mejorado', None), 200),
+    # Derecho ↔ Cuota
+    ('POST', '/api/derecho_cuota'): (7, ('/api/derecho_cuota', {
+        'ID_Derecho': 1, 'ID_Cuota': 4, 'Propagar': True}), 201),
+    ('DELETE', '/api/derecho_cuota/<int:id_d>/<int:id_c>'): (5, ('/api/derecho_cuota/1/2?propagar=1', None), 200),
+    # Persona ↔ Derecho
+    ('GET', '/api/persona_derecho'): (2, ('/api/persona_derecho', None), 200),
+    ('GET', '/api/persona_derecho/detalle_combinado'): (2, ('/api/persona_derecho/detalle_combinado', None), 200),
+    ('GET', '/api/persona_derecho/<int:pe>/<int:de>'): (2, ('/api/persona_derecho/1/1', None), 200),
+    ('POST', '/api/persona_derecho'): (7, ('/api/persona_derecho', {
+        'ID_Persona': 2, 'ID_Derecho': 2, 'Fecha_Inicio': str(HOY)}), 201),
+    ('PUT', '/api/persona_derecho/<int:pe>/<int:de>'): (3, ('/api/persona_derecho/1/1', {
+        'Fecha_Fin': str(HOY + timedelta(days=365))}), 200),
+    ('DELETE', '/api/persona_derecho/<int:pe>/<int:de>'): (3, ('/api/persona_derecho/1/1', None), 200),
+    # Pagos
+    ('GET', '/api/pagos'): (2, ('/api/pagos', None), 200),
+    ('GET', '/api/pagos/<int:id>'): (2, ('/api/pagos/1', None), 200),
+    ('POST', '/api/pagos'): (13, ('/api/pagos', {
+        'ID_Persona': 2, 'ID_Cuota': 1, 'Fecha_Pago': str(HOY), 'Monto_Pagado': 10}), 201),
+    ('POST', '/api/pagos/lote'): (15, ('/api/pagos/lote', [
+        {'ID_Persona': i, 'ID_Cuota': 2, 'Fecha_Pago': str(HOY), 'Monto_Pagado': 5} for i in range(1, 6)]), 201),
+    ('PUT', '/api/pagos/<int:id>'): (16, ('/api/pagos/1', {'Monto_Pagado': 25}), 200),
+    ('DELETE', '/api/pagos/<int:id>'): (11, ('/api/pagos/1', None), 200),
+    ('GET', '/api/pagos/cuota/<int:cuota_id>'): (2, ('/api/pagos/cuota/1?ID_Persona=1', None), 200),
+    # Ingresos
+    ('GET', '/api/ingresos'): (2, ('/api/ingresos', None), 200),
+    ('GET', '/api/ingresos/<int:id>'): (2, ('/api/ingresos/1', None), 200),
+    ('POST', '/api/ingresos'): (5, ('/api/ingresos', {
+        'Fecha': str(HOY), 'Monto': 100, 'Fuente': 'Donación'}), 201),
+    ('PUT', '/api/ingresos/<int:id>'): (6, ('/api/ingresos/1', {'Monto': 30}), 200),
+    ('DELETE', '/api/ingresos/<int:id>'): (6, ('/api/ingresos/1', None), 200),
+    ('GET', '/api/ingresos/total'): (2, ('/api/ingresos/total', None), 200),
+    # Egresos
+    ('GET', '/api/egresos'): (2, ('/api/egresos', None), 200),
+    ('GET', '/api/egresos/<int:id>'): (2, ('/api/egresos/1', None), 200),
+    ('POST', '/api/egresos'): (8, ('/api/egresos', {
+        'Fecha': str(HOY), 'Monto': 5, 'Descripcion': 'Compra de cloro'}), 201),
+    ('PUT', '/api/egresos/<int:id>'): (6, ('/api/egresos/1', {'Monto': 2}), 200),
+    ('DELETE', '/api/egresos/<int:id>'): (5, ('/api/egresos/1', None), 200),
+    ('GET', '/api/egresos/total'): (2, ('/api/egresos/total', None), 200),
+    ('GET', '/api/fondos/disponibles'): (2, ('/api/fondos/disponibles', None), 200),
+    # Reportes
+    ('GET', '/api/reportes/mensual'): (3, ('/api/reportes/mensual', None), 200),
+    ('GET', '/api/reportes/morosidad'): (2, ('/api/reportes/morosidad?ID_Derecho=1&limit=50', None), 200),
+    ('GET', '/api/reportes/estado-financiero'): (9, ('/api/reportes/estado-financiero', None), 200),
+    # Trabajos en segundo plano (en pruebas se ejecutan dentro de la petición)
+    ('POST', '/api/jobs'): (10, ('/api/jobs', {'Tipo': 'reconstruir_fondos'}), 202),
+    ('GET', '/api/jobs'): (1, ('/api/jobs', None), 200),
+    ('GET', '/api/jobs/<int:id>'): (1, ('/api/jobs/1', None), 200),
+    ('POST', '/api/jobs/<int:id>/cancelar'): (2, ('/api/jobs/1/cancelar', None), 200),
+    # Métricas
+    ('GET', '/api/_metrics'): (0, ('/api/_metrics', None), 200),
+    ('GET', '/api/_metrics/pool'): (0, ('/api/_metrics/pool', None), 200),
+    ('GET', '/api/_metrics/cache'): (0, ('/api/_metrics/cache', None), 200),
+}
+
+
+def _ejecutar(cliente, metodo, peticion):
+    url, cuerpo = peticion
+    with contar_sql(db.engine) as sentencias:
+        respuesta = cliente.open(url, method=metodo, json=cuerpo)
+    return respuesta, sentencias
+
+
+def test_todas_las_rutas_tienen_presupuesto(app):
+    declaradas = set(RUTAS)
+    existentes = {
+        (metodo, regla.rule)
+        for regla in app.url_map.iter_rules() if regla.rule.startswith('/api')
+        for metodo in regla.methods - {'HEAD', 'OPTIONS'}
+    }
+    assert existentes - declaradas == set(), 'Rutas sin presupuesto de SQL'
+    assert declaradas - existentes == set(), 'Presupuestos de rutas que ya no existen'
+
+
+@pytest.mark.parametrize('datos', TAMANOS, indirect=True)
+@pytest.mark.parametrize('ruta', sorted(RUTAS), ids=lambda r: f'{r[0]} {r[1]}')
+def test_presupuesto_por_ruta(cliente, datos, presupuesto_sql, ruta):
+    maximo, peticion, esperado = RUTAS[ruta]
+    with presupuesto_sql(maximo, f'{ruta[0]} {ruta[1]} con {datos} personas'):
+        respuesta = cliente.open(peticion[0], method=ruta[0], json=peticion[1])
+    assert respuesta.status_code == esperado, respuesta.get_data(as_text=True)[:500]
+
+
+@pytest.mark.parametrize('ruta', sorted(RUTAS), ids=lambda r: f'{r[0]} {r[1]}')
+def test_conteo_constante_al_crecer(app, ruta):
+    """El mismo escenario con 10 y con 1000 personas emite las mismas sentencias."""
+    from tests.conftest import sembrar
+    from app.utils.referencias import referencias
+
+    conteos = []
+    for tamano in (TAMANOS[0], TAMANOS[-1]):
+        db.drop_all()
+        db.create_all()
+        sembrar(tamano)
+        referencias.configurar(5000, vigencia=10 ** 6)
+        referencias.precargar()
+        db.session.remove()
+        respuesta, sentencias = _ejecutar(app.test_client(), ruta[0], RUTAS[ruta][1])
+        assert respuesta.status_code == RUTAS[ruta][2]
+        conteos.append(len(sentencias))
+    assert conteos[0] == conteos[1], f'{ruta}: {conteos[0]} sentencias con {TAMANOS[0]} filas, {conteos[1]} con {TAMANOS[-1]}'
@@ -0,0 +1,112 @@
+# tests/test_referencias.py
+# Caché de referencias: lecturas sin consultas tras precargar, invalidación
+# al confirmar (no antes ni tras un rollback) de cambios del ORM y por lote,
+# descarte por Version_Tabla de lo que cambian otros procesos y revisión
+# inmediata de versiones en las escrituras que asignan cuotas.
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import delete, insert, select, update
+
+from app.extensions import db
+from app.models import Cuota, Derecho, DerechoCuota, Persona, PersonaCuota
+from app.utils.referencias import referencias
+from app.utils.versiones import incrementar_versiones
+
+
+def test_lecturas_sin_consultas(app, datos, presupuesto_sql):
+    with presupuesto_sql(0, 'caché precargado'):
+        assert referencias.derecho(2) == 'Luz'
+        assert referencias.cuota(1).Monto == 50
+        assert referencias.cuotas_de_derecho(1) == (1, 2)
+        assert referencias.cuotas_de_derecho(3) == ()
+    # Lo que no existe no se guarda: cada lectura lo vuelve a buscar
+    for _ in range(2):
+        with presupuesto_sql(1, 'cuota inexistente'):
+            assert referencias.cuota(99) is None
+
+
+def test_invalidacion_al_confirmar(cliente, datos, presupuesto_sql):
+    # Un cambio sin confirmar no llega al caché; el rollback no invalida nada
+    db.session.get(Cuota, 1).Monto = Decimal('70')
+    db.session.flush()
+    invalidaciones = referencias.invalidaciones
+    assert referencias.cuota(1).Monto == 50
+    db.session.rollback()
+    assert referencias.invalidaciones == invalidaciones and referencias.cuota(1).Monto == 50
+
+    # Cambio confirmado por una ruta: se descarta solo esa cuota
+    assert cliente.put('/api/cuotas/1', json={
+        'Descripcion': 'Cuota agua', 'Monto': 60, 'Fecha_Limite': '2030-01-31'}).status_code == 200
+    with presupuesto_sql(1, 'cuota 1 recargada'):
+        assert referencias.cuota(1) == (60, date(2030, 1, 31))
+        assert referencias.cuota(2).Monto == 20
+
+    # Vincular por la API invalida el mapa del derecho
+    assert cliente.post('/api/derecho_cuota', json={'ID_Derecho': 3, 'ID_Cuota': 4}).status_code == 201
+    assert referencias.cuotas_de_derecho(3) == (4,)
+
+    # Una sentencia por lote invalida la tabla completa
+    db.session.execute(delete(DerechoCuota).where(DerechoCuota.ID_Cuota == 2))
+    db.session.execute(update(Derecho).values(Nombre=Derecho.Nombre + ' (C)'))
+    db.session.commit()
+    assert referencias.cuotas_de_derecho(1) == (1,)
+    assert referencias.derecho(1) == 'Agua potable (C)'
+
+
+def test_cambios_de_otro_proceso_por_version(app, datos):
+    # Otro proceso: escribe con su propia conexión (sin los eventos de esta sesión)
+    with db.engine.begin() as conexion:
+        conexion.execute(update(Cuota).where(Cuota.ID_Cuota == 3).values(Monto=Decimal('35')))
+        incrementar_versiones(conexion, ['Cuotas'])
+    db.session.remove()
+
+    # Dentro de la vigencia se sirve lo guardado; al vencer se compara Version_Tabla
+    assert referencias.cuota(3).Monto == 30
+    referencias.vigencia = 0
+    assert referencias.cuota(3).Monto == 35
+    assert referencias.estadisticas()['entradas']['Derechos'] == 3
+
+
+def test_escrituras_revisan_versiones(cliente, datos):
+    def estados(id_cuota):
+        db.session.remove()
+        return dict(db.session.execute(
+            select(PersonaCuota.ID_Persona, PersonaCuota.Estado).where(PersonaCuota.ID_Cuota == id_cuota)
+        ).all())
+
+    hoy = date.today()
+    assert referencias.cuota(3).Fecha_Limite < hoy and referencias.cuotas_de_derecho(3) == ()
+    db.session.remove()
+    # Otro proceso mueve la fecha de la cuota 3 y vincula la cuota 4 al derecho 3
+    with db.engine.begin() as conexion:
+        conexion.execute(update(Cuota).where(Cuota.ID_Cuota == 3).values(Fecha_Limite=hoy + timedelta(days=5)))
+        conexion.execute(insert(DerechoCuota).values(ID_Derecho=3, ID_Cuota=4))
+        incrementar_versiones(conexion, ['Cuotas', 'Derecho_Cuota'])
+
+    # Dentro de la vigencia, las tres rutas de asignación ya ven el cambio
+    assert cliente.post('/api/persona_derecho', json={
+        'ID_Persona': 1, 'ID_Derecho': 2, 'Fecha_Inicio': str(hoy)}).status_code == 201
+    assert estados(3) == {1: 'Pendiente'}
+    db.session.get(Persona, 2).asignar_derecho(3, hoy)
+    assert cliente.post('/api/derechos/3/asignar-masivo', json={'ID_Personas': [3]}).status_code == 201
+    assert estados(4) == {2: 'Pendiente', 3: 'Pendiente'}
+
+    # Una cuota borrada sin pasar por Version_Tabla sigue en el mapa del
+    # derecho; sin caché de cuotas, cuota() da None y se omite
+    referencias.invalidar('Cuotas')
+    with db.engine.begin() as conexion:
+        for tabla in (PersonaCuota, DerechoCuota, Cuota):
+            conexion.execute(delete(tabla).where(tabla.ID_Cuota == 4))
+    assert referencias.cuotas_de_derecho(3) == (4,)
+    assert cliente.post('/api/persona_derecho', json={
+        'ID_Persona': 4, 'ID_Derecho': 3, 'Fecha_Inicio': str(hoy)}).status_code == 201
+    assert 4 not in estados(4)
+
+    # Propagar lee la fecha límite de la base, no del caché
+    with db.engine.begin() as conexion:
+        conexion.execute(update(Cuota).where(Cuota.ID_Cuota == 3).values(Fecha_Limite=hoy - timedelta(days=1)))
+    assert cliente.post('/api/derecho_cuota', json={
+        'ID_Derecho': 3, 'ID_Cuota': 3, 'Propagar': True}).get_json()['cuotas_asignadas'] == 3
+    assert estados(3) == {1: 'Pendiente', 2: 'Vencido', 3: 'Vencido', 4: 'Vencido'}
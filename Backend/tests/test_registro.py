@@ -0,0 +1,93 @@
+# tests/test_registro.py
+# Registro en JSON fuera del hilo de la petición: X-Request-ID, campos del
+# formato (también la excepción tras pasar por la cola) y reconfiguración
+# sin acumular hilos escritores.
+
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+
+from flask import g
+
+from app import create_app
+from app.utils import registro
+from app.utils.registro import ColaRegistro, FormatoJSON, configurar_registro, detener_registro
+
+
+def test_id_de_peticion(cliente):
+    # Un id válido del cliente o del proxy se conserva
+    assert cliente.get('/api/derechos', headers={'X-Request-ID': 'abc-123.x_Y'}).headers['X-Request-ID'] == \
+        'abc-123.x_Y'
+
+    # Inválido (caracteres, longitud) o ausente: se genera uno nuevo por petición
+    generados = [cliente.get('/api/derechos', headers=cabeceras).headers['X-Request-ID']
+                 for cabeceras in ({'X-Request-ID': 'a b"c'}, {'X-Request-ID': 'x' * 65}, {}, {})]
+    assert all(len(i) == 32 and int(i, 16) >= 0 for i in generados)
+    assert len(set(generados)) == 4
+    # También en los errores
+    assert 'X-Request-ID' in cliente.get('/api/personas/999').headers
+
+
+def test_formato_json_tras_la_cola(app):
+    cola = queue.SimpleQueue()
+    manejador = ColaRegistro(cola)
+    logger = logging.getLogger('pruebas.registro')
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        original = logger.makeRecord(logger.name, logging.ERROR, __file__, 42, 'Fallo en %s: %d', ('pago', 7),
+                                     exc_info=sys.exc_info(), extra={'estado': 500, 'otro': 'no se copia'})
+
+    with app.test_request_context():
+        g.id_peticion = 'pet-1'
+        preparado = manejador.prepare(original)
+
+    # Lo que cruza al otro hilo ya no depende de args, exc_info ni del contexto
+    assert (preparado.args, preparado.exc_info, preparado.id_peticion) == (None, None, 'pet-1')
+    datos = json.loads(FormatoJSON().format(preparado))
+    assert set(datos) == {'ts', 'nivel', 'logger', 'mensaje', 'modulo', 'linea', 'id_peticion', 'estado', 'excepcion'}
+    assert (datos['nivel'], datos['logger'], datos['mensaje'], datos['linea'], datos['estado']) == (
+        'ERROR', 'pruebas.registro', 'Fallo en pago: 7', 42, 500)
+    assert datos['ts'].endswith('+00:00')
+    assert datos['excepcion'].startswith('Traceback') and datos['excepcion'].endswith(
+        'ZeroDivisionError: division by zero')
+
+    # Sin cola, la excepción se formatea directamente
+    assert json.loads(FormatoJSON().format(original))['excepcion'] == datos['excepcion']
+
+
+def test_reconfigurar_no_acumula_hilos(tmp_path, monkeypatch):
+    def escritores():
+        """Hilos vivos de algún QueueListener (su target es QueueListener._monitor)."""
+        return [h for h in threading.enumerate()
+                if isinstance(getattr(getattr(h, '_target', None), '__self__', None), logging.handlers.QueueListener)]
+
+    monkeypatch.setenv('LOG_ARCHIVO', str(tmp_path / 'cocode.log'))
+    monkeypatch.setenv('LOG_NIVEL', 'INFO')
+    for _ in range(3):
+        app = create_app('pruebas')
+        assert len(escritores()) == 1
+        manejadores = logging.getLogger().handlers
+        assert len(manejadores) == 1 and isinstance(manejadores[0], ColaRegistro)
+
+    anterior = registro._oyente
+    app = create_app('pruebas')
+    configurar_registro(app)
+    assert registro._oyente is not anterior and anterior._thread is None
+    archivos = [m for m in anterior.handlers if isinstance(m, logging.FileHandler)]
+    assert len(archivos) == 1 and archivos[0].stream is None
+
+    # El archivo recibe la línea de la petición con su id, al vaciar la cola
+    app.test_client().get('/api/_metrics/pool', headers={'X-Request-ID': 'req-9'})
+    detener_registro()
+    lineas = [json.loads(l) for l in (tmp_path / 'cocode.log').read_text(encoding='utf-8').splitlines()]
+    peticiones = [l for l in lineas if l['logger'] == 'app.peticiones']
+    # Reconfigurar la misma app no duplica los ganchos
+    assert len(peticiones) == 1
+    peticion = peticiones[0]
+    assert (peticion['id_peticion'], peticion['metodo'], peticion['endpoint'], peticion['estado']) == (
+        'req-9', 'GET', '/api/_metrics/pool', 200)
+    assert escritores() == []
@@ -0,0 +1,89 @@
+# tests/test_resumen_mensual.py
+# Resumen_Mensual se mantiene con cada escritura: después de altas, cambios
+# de monto o de fecha y bajas por la API debe coincidir con la reconstrucción.
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.utils.resumen import recalcular_resumen, verificar_resumen, sumar_meses
+
+HOY = date.today()
+MES_PASADO = date(*sumar_meses(HOY.year, HOY.month, -1), 1)
+
+
+def periodo(fecha):
+    return f'{fecha.year}-{fecha.month:02d}'
+
+
+def test_escrituras_por_la_api_mantienen_el_resumen(cliente, datos):
+    assert cliente.post('/api/pagos', json={
+        'ID_Persona': 1, 'ID_Cuota': 2, 'Fecha_Pago': MES_PASADO.isoformat(), 'Monto_Pagado': 5}).status_code == 201
+    assert cliente.post('/api/pagos/lote', json=[
+        {'ID_Persona': 2, 'ID_Cuota': 2, 'Fecha_Pago': HOY.isoformat(), 'Monto_Pagado': 7},
+        {'ID_Persona': 3, 'ID_Cuota': 1, 'Fecha_Pago': MES_PASADO.isoformat(), 'Monto_Pagado': 3},
+    ]).status_code == 201
+    # Cambio de fecha de un pago y de monto y fecha de su ingreso: pasan de mes
+    assert cliente.put('/api/pagos/4', json={'Fecha_Pago': MES_PASADO.isoformat()}).status_code == 200
+    assert cliente.put('/api/ingresos/4', json={'Monto': 12, 'Fecha': MES_PASADO.isoformat()}).status_code == 200
+    # Baja de un pago con su ingreso (cascada)
+    assert cliente.delete('/api/pagos/5').status_code == 200
+    respuesta = cliente.post('/api/egresos', json={
+        'Fecha': MES_PASADO.isoformat(), 'Monto': 4, 'Descripcion': 'Gasto nuevo'})
+    id_egreso = respuesta.get_json()['ID_Egreso']
+    assert cliente.put(f'/api/egresos/{id_egreso}', json={'Monto': 6, 'Fecha': HOY.isoformat()}).status_code == 200
+    assert cliente.delete('/api/egresos/1').status_code == 200
+
+    db.session.remove()
+    assert verificar_resumen() == []
+
+
+def test_reporte_mensual(cliente, datos):
+    desde = date(*sumar_meses(HOY.year, HOY.month, -3), 1)
+    cliente.post('/api/pagos', json={
+        'ID_Persona': 1, 'ID_Cuota': 2, 'Fecha_Pago': desde.isoformat(), 'Monto_Pagado': 5})
+    cuerpo = cliente.get(f'/api/reportes/mensual?desde={periodo(desde)}&hasta={periodo(HOY)}').get_json()
+
+    assert [m['periodo'] for m in cuerpo['meses']] == [
+        periodo(date(*sumar_meses(desde.year, desde.month, i), 1)) for i in range(4)]
+    primero = cuerpo['meses'][0]
+    assert (primero['ingresos'], primero['egresos'], primero['pagos'], primero['saldo_cierre']) == (5.0, 0.0, 1, 5.0)
+    # conftest.sembrar: 10 pagos de 20 hace 5 días y 1 egreso de 1 ayer
+    assert cuerpo['meses'][-1]['saldo_cierre'] == 5 + 200 - 1
+    assert cuerpo['totales'] == {'ingresos': 205.0, 'egresos': 1.0, 'pagos': 11}
+
+
+def test_reporte_por_defecto_son_36_meses(cliente, datos):
+    meses = cliente.get('/api/reportes/mensual').get_json()['meses']
+    assert len(meses) == 36
+    assert meses[-1]['periodo'] == periodo(HOY)
+
+
+@pytest.mark.parametrize('consulta', ['desde=2025-13', 'hasta=25-01', 'desde=2025-05&hasta=2025-04',
+                                      'desde=2000-01&hasta=2025-01'])
+def test_reporte_rechaza_periodos_invalidos(cliente, datos, consulta):
+    respuesta = cliente.get(f'/api/reportes/mensual?{consulta}')
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()['errores']
+
+
+def test_reconstruir_corrige_el_resumen(datos):
+    db.session.execute(db.text('UPDATE "Resumen_Mensual" SET "Pagos" = "Pagos" + 1'))
+    db.session.commit()
+    assert verificar_resumen()
+    diferencias, _ = recalcular_resumen()
+    assert diferencias
+    assert verificar_resumen() == []
+
+
+def test_cambiar_un_pago_mueve_su_ingreso(cliente, datos):
+    # conftest.sembrar: pago 1 de 20 (cuota 1 de 50) con su ingreso 1, hace 5 días
+    disponible = cliente.get('/api/fondos/disponibles').get_json()['fondos_disponibles']
+    assert cliente.put('/api/pagos/1', json={'Monto_Pagado': 45, 'Fecha_Pago': MES_PASADO.isoformat()}).status_code == 200
+
+    ingreso = cliente.get('/api/ingresos/1').get_json()
+    assert (ingreso['Monto'], ingreso['Fecha']) == (45.0, MES_PASADO.isoformat())
+    assert cliente.get('/api/fondos/disponibles').get_json()['fondos_disponibles'] == disponible + 25
+    db.session.remove()
+    assert verificar_resumen() == []
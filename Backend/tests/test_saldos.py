@@ -0,0 +1,106 @@
+# tests/test_saldos.py
+# Saldo_Fondos acumulado: los totales siguen a cada alta, cambio y baja de
+# ingresos, egresos y pagos (también los lotes insertados con Core) y siempre
+# cuadran con la suma de las tablas.
+
+from datetime import date
+
+import pytest
+
+from app.extensions import db
+from app.models import Egreso, SaldoFondos
+from app.utils.saldos import ID_SALDO, obtener_saldo, verificar_saldo
+
+HOY = str(date.today())
+
+
+def totales(cliente):
+    """(ingresos, egresos, disponible) según las rutas, tras comprobar que cuadran con las tablas."""
+    db.session.remove()
+    guardado, real = verificar_saldo()
+    assert guardado == real
+    return (cliente.get('/api/ingresos/total').get_json()['total_ingresos'],
+            cliente.get('/api/egresos/total').get_json()['total_egresos'],
+            cliente.get('/api/fondos/disponibles').get_json()['fondos_disponibles'])
+
+
+def test_totales_tras_altas_cambios_y_bajas(cliente, datos):
+    # conftest.sembrar: 10 ingresos de 20 y un egreso de 1
+    assert totales(cliente) == (200.0, 1.0, 199.0)
+
+    ingreso = cliente.post('/api/ingresos', json={'Fecha': HOY, 'Monto': 50, 'Fuente': 'Donación'}).get_json()
+    assert totales(cliente) == (250.0, 1.0, 249.0)
+    assert cliente.put(f"/api/ingresos/{ingreso['ID_Ingreso']}", json={'Monto': 30}).status_code == 200
+    assert totales(cliente) == (230.0, 1.0, 229.0)
+
+    egreso = cliente.post('/api/egresos', json={'Fecha': HOY, 'Monto': 9, 'Descripcion': 'Tubería'}).get_json()
+    assert totales(cliente) == (230.0, 10.0, 220.0)
+    assert cliente.put(f"/api/egresos/{egreso['ID_Egreso']}", json={'Monto': 4}).status_code == 200
+    assert totales(cliente) == (230.0, 5.0, 225.0)
+
+    assert cliente.delete(f"/api/ingresos/{ingreso['ID_Ingreso']}").status_code == 200
+    assert cliente.delete(f"/api/egresos/{egreso['ID_Egreso']}").status_code == 200
+    assert totales(cliente) == (200.0, 1.0, 199.0)
+
+
+def test_pagos_y_lotes_mueven_el_saldo(cliente, datos):
+    # El pago crea su ingreso y la baja del pago lo arrastra
+    assert cliente.post('/api/pagos', json={
+        'ID_Persona': 1, 'ID_Cuota': 2, 'Fecha_Pago': HOY, 'Monto_Pagado': 20}).status_code == 201
+    assert totales(cliente) == (220.0, 1.0, 219.0)
+    assert cliente.put('/api/pagos/1', json={'Monto_Pagado': 35}).status_code == 200
+    assert totales(cliente) == (235.0, 1.0, 234.0)
+    assert cliente.delete('/api/pagos/1').status_code == 200
+    assert totales(cliente) == (200.0, 1.0, 199.0)
+
+    # El lote inserta con Core: ajusta el saldo sin pasar por el flush del ORM
+    respuesta = cliente.post('/api/pagos/lote', json=[
+        {'ID_Persona': p, 'ID_Cuota': 2, 'Fecha_Pago': HOY, 'Monto_Pagado': 5} for p in (2, 3, 4)])
+    assert respuesta.status_code == 201 and respuesta.get_json()['insertados'] == 3
+    assert totales(cliente) == (215.0, 1.0, 214.0)
+
+
+def test_cambio_rechazado_no_toca_el_saldo(cliente, datos):
+    assert cliente.put('/api/egresos/1', json={'Monto': 500}).status_code == 409
+    assert cliente.delete('/api/ingresos/1').status_code == 200
+    assert totales(cliente) == (180.0, 1.0, 179.0)
+
+
+def test_saldo_negativo_solo_rechaza_lo_que_lo_baja(cliente, datos):
+    # Un egreso registrado sin pasar por las rutas deja el saldo en -101
+    db.session.add(Egreso(Fecha=date.today(), Monto=300, Descripcion='Deuda anterior'))
+    db.session.commit()
+    assert totales(cliente) == (200.0, 301.0, -101.0)
+
+    # Lo que sube el saldo, o no lo mueve, se acepta aunque siga negativo
+    for url, cuerpo in [('/api/ingresos/2', {'Monto': 25}), ('/api/egresos/2', {'Monto': 290}),
+                        ('/api/pagos/1', {'Monto_Pagado': 30}), ('/api/ingresos/3', {'Fuente': 'Cuota'}),
+                        ('/api/pagos/1', {'Estado': 'Completado'})]:
+        assert cliente.put(url, json=cuerpo).status_code == 200, url
+    assert totales(cliente) == (215.0, 291.0, -76.0)
+
+    # Lo que lo baja se rechaza y no toca nada
+    for metodo, url, cuerpo in [('PUT', '/api/ingresos/2', {'Monto': 24}), ('PUT', '/api/egresos/2', {'Monto': 291}),
+                                ('PUT', '/api/pagos/1', {'Monto_Pagado': 29}), ('DELETE', '/api/pagos/1', None),
+                                ('DELETE', '/api/ingresos/3', None)]:
+        assert cliente.open(url, method=metodo, json=cuerpo).status_code == 409, url
+    assert totales(cliente) == (215.0, 291.0, -76.0)
+
+
+@pytest.mark.parametrize('datos', [3], indirect=True)
+def test_fila_de_saldo_se_reconstruye(cliente, datos):
+    # Sin la fila (base anterior al saldo acumulado) la primera lectura la arma con SUM
+    db.session.delete(db.session.get(SaldoFondos, ID_SALDO))
+    db.session.commit()
+    assert obtener_saldo().disponible == 59
+    # ...sin confirmar nada: leer o validar no hace commit
+    db.session.rollback()
+    assert db.session.get(SaldoFondos, ID_SALDO) is None
+    assert cliente.get('/api/fondos/disponibles').get_json()['fondos_disponibles'] == 59
+    assert cliente.post('/api/egresos', json={'Fecha': HOY, 'Monto': 500, 'Descripcion': 'Bomba'}).status_code == 400
+    db.session.remove()
+    assert db.session.get(SaldoFondos, ID_SALDO) is None
+
+    # ...y la primera escritura también, sin contar dos veces su propio monto
+    assert cliente.post('/api/egresos', json={'Fecha': HOY, 'Monto': 9, 'Descripcion': 'Cloro'}).status_code == 201
+    assert totales(cliente) == (60.0, 10.0, 50.0)
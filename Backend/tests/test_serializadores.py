@@ -0,0 +1,60 @@
+# tests/test_serializadores.py
+# Serializadores por modelo: conversión de Numeric y Date, nulos, detalle
+# con uno_o_404, y la misma salida con orjson que con el json estándar.
+
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from werkzeug.exceptions import NotFound
+
+from app.extensions import db
+from app.models import Ingreso, PersonaDerecho
+from app.utils import serializadores
+from app.utils.serializadores import CUOTA, INGRESO, PERSONA_DERECHO, a_json
+
+HOY = date.today()
+
+
+def test_conversion_por_tipo_de_columna(app, datos):
+    db.session.add(Ingreso(Fecha=date(2025, 2, 28), Monto=Decimal('12.50'), Fuente='Rifa'))
+    db.session.commit()
+    fila = db.session.execute(INGRESO.consulta().where(Ingreso.Fuente == 'Rifa')).one()
+    assert INGRESO(fila) == {'ID_Ingreso': datos + 1, 'Fecha': '2025-02-28', 'Monto': 12.5,
+                             'Fuente': 'Rifa', 'Observaciones': None, 'ID_Pago': None}
+    # La llave sale del serializador, en el orden de la llave primaria
+    assert INGRESO.llave(fila) == [datos + 1]
+    assert PERSONA_DERECHO.claves == ('ID_Persona', 'ID_Derecho', 'Fecha_Inicio', 'Fecha_Fin')
+
+
+def test_detalle_uno_o_404(cliente, datos):
+    assert cliente.get('/api/cuotas/3').get_json() == {
+        'ID_Cuota': 3, 'Descripcion': 'Cuota luz', 'Monto': 30.0, 'Fecha_Limite': str(HOY - timedelta(days=10))}
+    assert cliente.get('/api/cuotas/99').status_code == 404
+    assert cliente.get('/api/pagos/1').get_json()['Monto_Pagado'] == 20.0
+
+    # Llave compuesta y fecha nula
+    db.session.add(PersonaDerecho(ID_Persona=1, ID_Derecho=2, Fecha_Inicio=date(2025, 1, 1)))
+    db.session.commit()
+    assert cliente.get('/api/persona_derecho/1/2').get_json() == {
+        'ID_Persona': 1, 'ID_Derecho': 2, 'Fecha_Inicio': '2025-01-01', 'Fecha_Fin': None}
+    assert cliente.get('/api/persona_derecho/1/3').status_code == 404
+
+    with pytest.raises(NotFound):
+        CUOTA.uno_o_404(99)
+
+
+def test_orjson_y_json_estandar_coinciden(cliente, datos, monkeypatch):
+    pytest.importorskip('orjson')
+    datos_json = {'Nombre': 'Pérez', 'Monto': 12.5, 'Fecha': '2025-01-31', 'Nulo': None,
+                  'Lista': [1, 2.25, 'ñ'], 'Activo': True}
+    urls = ('/api/personas', '/api/pagos', '/api/cuotas/1', '/api/personas?stream=1', '/api/ingresos?limit=3')
+
+    con_orjson = [a_json(datos_json)] + [cliente.get(url).get_data() for url in urls]
+    monkeypatch.setattr(serializadores, 'orjson', None)
+    sin_orjson = [a_json(datos_json)] + [cliente.get(url).get_data() for url in urls]
+
+    assert con_orjson == sin_orjson
+    assert json.loads(con_orjson[0]) == datos_json
+    assert 'Pérez'.encode() in con_orjson[0]
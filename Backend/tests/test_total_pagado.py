@@ -0,0 +1,75 @@
+# tests/test_total_pagado.py
+# Persona_Cuota.Total_Pagado: el acumulado y el Estado siguen a cada alta,
+# cambio (también de asignación) y baja de pagos y a los lotes, y siempre
+# coinciden con la suma de Pagos.
+
+from datetime import date
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Pago, PersonaCuota
+
+HOY = str(date.today())
+
+
+def estado(cliente, persona, cuota):
+    """(PagosRealizados, MontoRestante, Estado) de la asignación, tras compararla con SUM de Pagos."""
+    db.session.remove()
+    total = db.session.execute(
+        select(func.coalesce(func.sum(Pago.Monto_Pagado), 0))
+        .where(Pago.ID_Persona == persona, Pago.ID_Cuota == cuota)
+    ).scalar()
+    assert db.session.get(PersonaCuota, (persona, cuota)).Total_Pagado == total
+    cuerpo = cliente.get(f'/api/pagos/cuota/{cuota}?ID_Persona={persona}').get_json()
+    return cuerpo['PagosRealizados'], cuerpo['MontoRestante'], cuerpo['Estado']
+
+
+def pagar(cliente, persona, cuota, monto):
+    return cliente.post('/api/pagos', json={
+        'ID_Persona': persona, 'ID_Cuota': cuota, 'Fecha_Pago': HOY, 'Monto_Pagado': monto})
+
+
+def test_acumulado_tras_altas_cambios_y_bajas(cliente, datos):
+    # conftest.sembrar: cada persona lleva 20 de los 50 de la cuota 1 (pago ID = persona)
+    assert estado(cliente, 1, 1) == (20.0, 30.0, 'Pendiente')
+
+    segundo = pagar(cliente, 1, 1, 30).get_json()['ID_Pago']
+    assert estado(cliente, 1, 1) == (50.0, 0.0, 'Completado')
+    # Sobrepasar el monto de la cuota se rechaza sin tocar el acumulado
+    respuesta = pagar(cliente, 1, 1, 1)
+    assert respuesta.status_code == 400
+    assert estado(cliente, 1, 1) == (50.0, 0.0, 'Completado')
+
+    assert cliente.put(f'/api/pagos/{segundo}', json={'Monto_Pagado': 10}).status_code == 200
+    assert estado(cliente, 1, 1) == (30.0, 20.0, 'Pendiente')
+
+    # Mover el pago a otra cuota lo descuenta de una y lo suma a la otra
+    assert cliente.put(f'/api/pagos/{segundo}', json={'ID_Cuota': 2, 'Monto_Pagado': 20}).status_code == 200
+    assert estado(cliente, 1, 1) == (20.0, 30.0, 'Pendiente')
+    assert estado(cliente, 1, 2) == (20.0, 0.0, 'Completado')
+
+    assert cliente.delete(f'/api/pagos/{segundo}').status_code == 200
+    assert cliente.delete('/api/pagos/1').status_code == 200
+    assert estado(cliente, 1, 1) == (0.0, 50.0, 'Pendiente')
+    assert estado(cliente, 1, 2) == (0.0, 20.0, 'Pendiente')
+
+
+def test_lote_acumula_por_asignacion(cliente, datos):
+    # Dos filas del mismo par en un lote se suman entre sí
+    respuesta = cliente.post('/api/pagos/lote', json=[
+        {'ID_Persona': 2, 'ID_Cuota': 1, 'Fecha_Pago': HOY, 'Monto_Pagado': 10},
+        {'ID_Persona': 2, 'ID_Cuota': 1, 'Fecha_Pago': HOY, 'Monto_Pagado': 20},
+        {'ID_Persona': 3, 'ID_Cuota': 2, 'Fecha_Pago': HOY, 'Monto_Pagado': 5},
+    ])
+    assert respuesta.status_code == 201
+    assert estado(cliente, 2, 1) == (50.0, 0.0, 'Completado')
+    assert estado(cliente, 3, 2) == (5.0, 15.0, 'Pendiente')
+
+    # Un lote que en conjunto sobrepasa la cuota no inserta nada (todo_o_nada)
+    respuesta = cliente.post('/api/pagos/lote', json=[
+        {'ID_Persona': 4, 'ID_Cuota': 1, 'Fecha_Pago': HOY, 'Monto_Pagado': 20},
+        {'ID_Persona': 4, 'ID_Cuota': 1, 'Fecha_Pago': HOY, 'Monto_Pagado': 20},
+    ])
+    assert respuesta.status_code == 400
+    assert estado(cliente, 4, 1) == (20.0, 30.0, 'Pendiente')
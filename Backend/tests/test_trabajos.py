@@ -0,0 +1,156 @@
+# tests/test_trabajos.py
+# Cola de trabajos: encolar y consultar, cancelación (pendiente y en
+# ejecución), límite de hilos y recuperación de trabajos cuyo proceso se
+# detuvo. Las pruebas con hilos usan SQLite en archivo, como varios workers.
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import create_app
+from app.extensions import db
+from app.models import Trabajo
+from app.utils import trabajos
+
+
+def estado(id_trabajo):
+    with db.engine.connect() as conexion:
+        return conexion.execute(select(Trabajo.Estado).where(Trabajo.ID_Trabajo == id_trabajo)).scalar()
+
+
+def esperar(id_trabajo, estados, segundos=10):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        if estado(id_trabajo) in estados:
+            return trabajos.detalle(id_trabajo)
+        time.sleep(0.02)
+    raise AssertionError(f'El trabajo {id_trabajo} sigue {estado(id_trabajo)}')
+
+
+@pytest.fixture
+def app_hilos(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'trabajos.db'}")
+    aplicacion = create_app('pruebas')
+    aplicacion.config.update(TRABAJOS_HILOS=2, TRABAJOS_INTERVALO=0.05,
+                             TRABAJOS_VENCIMIENTO=0.5, TRABAJOS_INTENTOS=3, TRABAJOS_DIARIOS=())
+    with aplicacion.app_context():
+        db.create_all()
+        yield aplicacion
+        trabajos.ejecutor.detener()
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def espera():
+    """Tarea 'prueba_espera': avanza hasta que se libera y cuenta cuántas corren a la vez."""
+    control = {'liberar': threading.Event(), 'iniciadas': 0, 'simultaneas': 0, 'maximo': 0}
+    candado = threading.Lock()
+
+    @trabajos.tarea('prueba_espera')
+    def prueba_espera(contexto, parametros):
+        with candado:
+            control['iniciadas'] += 1
+            control['simultaneas'] += 1
+            control['maximo'] = max(control['maximo'], control['simultaneas'])
+        try:
+            paso = 0
+            while not control['liberar'].wait(0.02):
+                paso = min(paso + 1, 99)
+                contexto.progreso(paso, f'Paso {paso}')
+            return {'pasos': paso}
+        finally:
+            with candado:
+                control['simultaneas'] -= 1
+
+    yield control
+    control['liberar'].set()
+    trabajos.TAREAS.pop('prueba_espera')
+
+
+def test_encolar_y_consultar(cliente, datos):
+    respuesta = cliente.post('/api/jobs', json={'Tipo': 'reconstruir_resumen'})
+    assert respuesta.status_code == 202
+    assert respuesta.headers['Location'].endswith(f"/api/jobs/{respuesta.get_json()['ID_Trabajo']}")
+
+    trabajo = cliente.get(respuesta.headers['Location']).get_json()
+    assert trabajo['Estado'] == 'Completado' and trabajo['Progreso'] == 100
+    assert trabajo['Resultado']['meses_corregidos'] == []
+
+    lista = cliente.get('/api/jobs?Estado=Completado').get_json()
+    assert [t['ID_Trabajo'] for t in lista] == [trabajo['ID_Trabajo']]
+    assert 'Resultado' not in lista[0]
+
+
+def test_errores_al_encolar_y_al_ejecutar(cliente, datos):
+    assert cliente.post('/api/jobs', json={'Tipo': 'no_existe'}).status_code == 400
+    respuesta = cliente.post('/api/jobs', json={'Tipo': 'importar_pagos', 'Parametros': {'Filas': 'x'}})
+    assert respuesta.status_code == 400 and respuesta.get_json()['errores']
+
+    # Validación correcta pero falla al ejecutarse: queda Fallido con el motivo
+    respuesta = cliente.post('/api/jobs', json={'Tipo': 'asignar_masivo',
+                                                'Parametros': {'ID_Derecho': 99, 'ID_Personas': [1]}})
+    trabajo = respuesta.get_json()
+    assert trabajo['Estado'] == 'Fallido' and 'no existe' in trabajo['Error']
+    assert cliente.post(f"/api/jobs/{trabajo['ID_Trabajo']}/cancelar").status_code == 409
+    assert cliente.get('/api/jobs/999').status_code == 404
+
+
+def test_cancelar_pendiente(app_hilos, espera):
+    app_hilos.config['TRABAJOS_EN_WEB'] = False   # nadie toma la cola
+    cliente = app_hilos.test_client()
+    id_trabajo = cliente.post('/api/jobs', json={'Tipo': 'prueba_espera'}).get_json()['ID_Trabajo']
+    assert estado(id_trabajo) == 'Pendiente'
+
+    assert cliente.post(f'/api/jobs/{id_trabajo}/cancelar').get_json()['Estado'] == 'Cancelado'
+    trabajos.ejecutor.iniciar(app_hilos)
+    time.sleep(0.3)
+    assert estado(id_trabajo) == 'Cancelado' and espera['iniciadas'] == 0
+
+
+def test_cancelar_en_ejecucion(app_hilos, espera):
+    cliente = app_hilos.test_client()
+    id_trabajo = cliente.post('/api/jobs', json={'Tipo': 'prueba_espera'}).get_json()['ID_Trabajo']
+    esperar(id_trabajo, {'Ejecutando'})
+    time.sleep(0.1)
+    assert cliente.get(f'/api/jobs/{id_trabajo}').get_json()['Progreso'] > 0
+
+    assert cliente.post(f'/api/jobs/{id_trabajo}/cancelar').get_json()['Cancelar'] is True
+    assert esperar(id_trabajo, {'Cancelado', 'Completado'})['Estado'] == 'Cancelado'
+
+
+def test_limite_de_trabajos_simultaneos(app_hilos, espera):
+    cliente = app_hilos.test_client()
+    ids = [cliente.post('/api/jobs', json={'Tipo': 'prueba_espera'}).get_json()['ID_Trabajo'] for _ in range(5)]
+    esperar(ids[1], {'Ejecutando'})
+    time.sleep(0.3)
+    assert [estado(i) for i in ids].count('Ejecutando') == 2
+
+    espera['liberar'].set()
+    for id_trabajo in ids:
+        assert esperar(id_trabajo, {'Completado'})['Resultado'] is not None
+    assert espera['maximo'] == 2 and espera['iniciadas'] == 5
+
+
+def test_recupera_trabajos_de_un_proceso_detenido(app_hilos, espera):
+    espera['liberar'].set()
+    antes = datetime.now() - timedelta(minutes=5)
+    comun = {'Tipo': 'prueba_espera', 'Estado': 'Ejecutando', 'Parametros': '{}', 'Progreso': 40,
+             'Cancelar': False, 'Proceso': 'otro-equipo:123', 'Creado': antes, 'Iniciado': antes, 'Latido': antes}
+    with db.engine.begin() as conexion:
+        conexion.execute(insert(Trabajo), [
+            {**comun, 'Intentos': 1},                    # se reintenta
+            {**comun, 'Intentos': 3},                    # agotó sus intentos
+            {**comun, 'Intentos': 1, 'Cancelar': True},  # se había pedido cancelar
+            {**comun, 'Intentos': 1, 'Latido': datetime.now() + timedelta(minutes=5)},  # sigue vivo
+        ])
+
+    trabajos.ejecutor.iniciar(app_hilos)
+    reintentado = esperar(1, {'Completado'})
+    assert reintentado['Intentos'] == 2 and reintentado['Resultado'] == {'pasos': 0}
+    assert 'se detuvo 3 veces' in esperar(2, {'Fallido'})['Error']
+    assert esperar(3, {'Cancelado'})
+    assert estado(4) == 'Ejecutando'
@@ -0,0 +1,96 @@
+# tests/test_validaciones.py
+# Motor de validación: mensajes de cada esquema, reglas contra la base y
+# contra las filas anteriores del mismo lote, y consultas constantes por lote.
+
+from datetime import date
+
+from app.utils.validaciones import (
+    ContextoValidacion, validar_lote, revisar_pago, revisar_persona, revisar_egreso,
+    validar_persona, validar_derecho, validar_cuota, validar_pago, validar_ingreso,
+    validar_persona_derecho, validar_egreso
+)
+
+HOY = str(date.today())
+
+
+def test_mensajes_de_esquema(app):
+    assert validar_cuota({}) == ['La descripción es obligatoria.', 'El monto debe ser un número positivo.',
+                                 'La fecha límite es obligatoria.']
+    assert validar_cuota({'Descripcion': 'Agua', 'Monto': '-3', 'Fecha_Limite': '31/01/2025'}) == [
+        'El monto debe ser un número positivo.', 'Fecha_Limite debe ser YYYY-MM-DD.']
+    assert validar_cuota({'Descripcion': 'Agua', 'Monto': '12.50', 'Fecha_Limite': '2025-01-31'}) == []
+
+    assert validar_ingreso({'Fecha': '2025-02-30', 'Monto': 'diez', 'Fuente': ' '}) == [
+        'Fecha debe ser YYYY-MM-DD.', 'El monto debe ser un número válido.']
+    assert validar_ingreso({'Fecha': HOY, 'Monto': True, 'Fuente': 'Rifa'}) == ['El monto debe ser un número válido.']
+    assert validar_persona_derecho({'ID_Persona': 1, 'ID_Derecho': 'uno', 'Fecha_Inicio': '2025-03-01'}) == [
+        'ID_Derecho es obligatorio.']
+    assert validar_persona_derecho({'ID_Persona': 1, 'ID_Derecho': 2, 'Fecha_Inicio': '2025-03-01',
+                                    'Fecha_Fin': '2025-01-01'}) == ['Fecha_Inicio no puede ser posterior a Fecha_Fin.']
+
+
+def test_mensajes_contra_la_base(app, datos):
+    # Persona 0 es Presidente (conftest.sembrar)
+    assert validar_persona({'DPI': '1000000000003', 'Nombre': 'Otra', 'Rol': 'Presidente',
+                            'Email': 'sin-arroba', 'Telefono': '12'}) == [
+        'Correo electrónico inválido.', 'El teléfono debe ser numérico con una longitud válida.',
+        'El DPI ya está registrado.', "El rol 'Presidente' ya está asignado a otra persona."]
+    assert validar_persona({'DPI': '123', 'Nombre': 'Otra'}) == ['DPI debe ser un número de 13 dígitos.']
+    # La misma persona conserva su DPI y su rol al actualizarse
+    assert validar_persona({'ID_Persona': 1, 'DPI': '1000000000000', 'Rol': 'Presidente'}, actualizacion=True) == []
+    assert validar_persona({'ID_Persona': 2, 'DPI': '1000000000000'}, actualizacion=True) == [
+        'El DPI ya está registrado en otra persona.']
+    assert validar_derecho({'Nombre': 'Luz'}) == ['Este derecho ya existe.']
+
+    pago = {'ID_Persona': 1, 'ID_Cuota': 1, 'Fecha_Pago': HOY}
+    assert validar_pago({**pago, 'Monto_Pagado': 31}) == ['El monto no puede exceder Q30.0.']
+    assert validar_pago({**pago, 'Monto_Pagado': 0}) == ['El monto pagado debe ser mayor a cero.']
+    assert validar_pago({**pago, 'ID_Persona': 999, 'ID_Cuota': 99, 'Monto_Pagado': 1}) == [
+        'Persona inválida.', 'Cuota inválida.']
+    assert validar_pago({**pago, 'Monto_Pagado': 30}) == []
+
+    # Saldo sembrado: 200 de ingresos menos 1 de egreso
+    assert validar_egreso({'Fecha': HOY, 'Monto': 500, 'Descripcion': 'Bomba'}) == [
+        'Fondos insuficientes. Disponible: Q199.00. Egreso solicitado: Q500.00.']
+    assert validar_egreso({'Fecha': HOY, 'Monto': 5, 'Descripcion': 'Bomba'}) == []
+
+
+def test_lote_valida_contra_filas_anteriores(app, datos):
+    filas = [{'DPI': '2000000000000', 'Nombre': 'Nueva'},
+             {'DPI': '2000000000000', 'Nombre': 'Repetida'},
+             {'DPI': '2000000000001', 'Nombre': 'Vocal', 'Rol': 'Vocal I'},
+             {'DPI': '2000000000002', 'Nombre': 'Otro vocal', 'Rol': 'Vocal I'}]
+    validas, errores = validar_lote(revisar_persona, filas, ContextoValidacion.para_personas(filas))
+    assert [v['Nombre'] for v in validas] == ['Nueva', 'Vocal']
+    assert errores == [{'fila': 2, 'errores': ['El DPI está repetido en el archivo.']},
+                       {'fila': 4, 'errores': ["El rol 'Vocal I' ya está asignado a otra persona."]}]
+
+    # Los pagos del lote se suman al acumulado de la base (20 de 50)
+    filas = [{'ID_Persona': 1, 'ID_Cuota': 1, 'Fecha_Pago': HOY, 'Monto_Pagado': m} for m in (10, 15, 10, 5)]
+    validas, errores = validar_lote(revisar_pago, filas, ContextoValidacion.para_pagos(filas))
+    assert [v['Monto_Pagado'] for v in validas] == [10, 15, 5]
+    assert errores == [{'fila': 3, 'errores': ['El monto no puede exceder Q5.0.']}]
+    filas.append(dict(filas[0]))
+    assert validar_lote(revisar_pago, filas, ContextoValidacion.para_pagos(filas))[1][-1] == {
+        'fila': 5, 'errores': ['Esta cuota ya está completamente pagada.']}
+
+    # Los egresos aceptados descuentan los fondos de los siguientes
+    filas = [{'Fecha': HOY, 'Monto': 150, 'Descripcion': 'Bomba'},
+             {'Fecha': HOY, 'Monto': 150, 'Descripcion': 'Tanque'},
+             {'Fecha': HOY, 'Monto': 40, 'Descripcion': 'Bomba'}]
+    validas, errores = validar_lote(revisar_egreso, filas, ContextoValidacion.para_egresos(filas))
+    assert [v['Descripcion'] for v in validas] == ['Bomba']
+    assert errores == [
+        {'fila': 2, 'errores': ['Fondos insuficientes. Disponible: Q49.00. Egreso solicitado: Q150.00.']},
+        {'fila': 3, 'errores': ['Ya existe un egreso registrado con esta fecha y descripción.']}]
+
+
+def test_contexto_de_pagos_con_consultas_constantes(app, datos, presupuesto_sql):
+    for personas in (2, 10):
+        filas = [{'ID_Persona': p, 'ID_Cuota': c, 'Fecha_Pago': HOY, 'Monto_Pagado': 1}
+                 for p in range(1, personas + 1) for c in (1, 2, 4)]
+        # Personas y acumulados de Persona_Cuota; las cuotas salen del caché de
+        # referencias y la cuota 4 (sin asignar) suma sus pagos sueltos
+        with presupuesto_sql(3, f'{personas} personas'):
+            ctx = ContextoValidacion.para_pagos(filas)
+        assert validar_lote(revisar_pago, filas, ctx)[1] == []
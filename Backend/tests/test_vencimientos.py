@@ -0,0 +1,84 @@
+# tests/test_vencimientos.py
+# Estado 'Vencido' de Persona_Cuota: barrido incremental por lotes, y
+# pagos, asignaciones y cambios de cuota que dejan el estado correcto.
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import PersonaCuota, BarridoVencimientos
+from app.utils import trabajos
+from app.utils.vencimientos import marcar_vencidas
+from tests.presupuesto import contar_sql
+
+HOY = date.today()
+
+
+def estados(id_cuota):
+    """{Estado: cantidad} de las asignaciones de la cuota."""
+    db.session.remove()
+    return dict(db.session.execute(
+        select(PersonaCuota.Estado, func.count()).where(PersonaCuota.ID_Cuota == id_cuota)
+        .group_by(PersonaCuota.Estado)
+    ).all())
+
+
+@pytest.mark.parametrize('datos', [25], indirect=True)
+def test_barrido_incremental_por_lotes(app, datos):
+    # conftest.sembrar: cuota 1 vence en 30 días (pagada en parte), cuota 2 en 60
+    primero = marcar_vencidas(hoy=HOY)
+    assert primero['Desde'] is None and primero['Filas'] == 0
+
+    segundo = marcar_vencidas(hoy=HOY + timedelta(days=31), tamano_lote=4)
+    assert segundo['Desde'] == HOY.isoformat()
+    assert segundo['Cuotas'] == 1 and segundo['Filas'] == datos and segundo['Lotes'] == 7
+    assert estados(1) == {'Vencido': datos} and estados(2) == {'Pendiente': datos}
+
+    # Sin cuotas nuevas vencidas no se toca Persona_Cuota
+    with contar_sql(db.engine) as sentencias:
+        tercero = marcar_vencidas(hoy=HOY + timedelta(days=31))
+    assert tercero['Cuotas'] == 0 and tercero['Filas'] == 0
+    assert not [s for s in sentencias if 'Persona_Cuota' in s]
+
+    barridos = db.session.execute(select(BarridoVencimientos).order_by(BarridoVencimientos.ID_Barrido)).scalars().all()
+    assert [b.Filas for b in barridos] == [0, datos, 0]
+    assert barridos[-1].Fecha_Corte == HOY + timedelta(days=31) and barridos[-1].Segundos >= 0
+
+
+def test_pagos_asignaciones_y_cambios_de_cuota(cliente, datos):
+    # Cuota 3 (derecho 2) venció hace 10 días: la asignación nace vencida
+    assert cliente.post('/api/persona_derecho', json={
+        'ID_Persona': 1, 'ID_Derecho': 2, 'Fecha_Inicio': str(HOY)}).status_code == 201
+    assert estados(3) == {'Vencido': 1}
+
+    # Completarla la saca de Vencido; revertir el pago la devuelve
+    respuesta = cliente.post('/api/pagos', json={'ID_Persona': 1, 'ID_Cuota': 3,
+                                                 'Fecha_Pago': str(HOY), 'Monto_Pagado': 30})
+    assert estados(3) == {'Completado': 1}
+    cliente.delete(f"/api/pagos/{respuesta.get_json()['ID_Pago']}")
+    assert estados(3) == {'Vencido': 1}
+
+    # Mover la fecha límite recalcula las asignaciones de la cuota
+    def mover(id_cuota, descripcion, monto, dias):
+        assert cliente.put(f'/api/cuotas/{id_cuota}', json={
+            'Descripcion': descripcion, 'Monto': monto, 'Fecha_Limite': str(HOY + timedelta(days=dias))
+        }).status_code == 200
+
+    mover(3, 'Cuota luz', 30, 5)
+    assert estados(3) == {'Pendiente': 1}
+    mover(1, 'Cuota agua', 50, -1)
+    assert estados(1) == {'Vencido': datos}
+
+    cuota = next(c for c in cliente.get('/api/cuotas/estado/mejorado').get_json() if c['ID_Cuota'] == 1)
+    assert cuota['ParticipantesVencidos'] == datos and cuota['Estado'] == 'Vencido'
+
+
+def test_barrido_como_trabajo_diario(cliente, datos):
+    assert trabajos.programar_diarios(['marcar_vencidas']) == ['marcar_vencidas']
+    assert trabajos.programar_diarios(['marcar_vencidas']) == []
+
+    trabajo = cliente.post('/api/jobs', json={'Tipo': 'marcar_vencidas', 'Parametros': {'Completo': True}}).get_json()
+    assert trabajo['Estado'] == 'Completado'
+    assert trabajo['Resultado']['Desde'] is None and trabajo['Resultado']['Cuotas'] == 1
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import api from '../services/api';
 import BuscarPersonas from '../components/busquedaPersona'; // Componente para buscar personas
-import { generarPDF } from '../utils/pdfGenerator';
+import { descargarEstadoFinanciero } from '../utils/pdfGenerator';
 
 const Dashboard = () => {
     const [activeTab, setActiveTab] = useState('resumenPersonas'); // Controla el tab activo
@@ -152,10 +152,18 @@ const Dashboard = () => {
 
                     <button
                         className="btn btn-primary mt-4"
-                        onClick={() => generarPDF(personasConDerechos, cuotas, { ingresos, egresos, saldo })}
+                        onClick={() => descargarEstadoFinanciero('pdf')
+                            .catch(() => console.error('Error al generar el PDF.'))}
                     >
                         Generar PDF
                     </button>
+                    <button
+                        className="btn btn-secondary mt-4 ms-2"
+                        onClick={() => descargarEstadoFinanciero('csv')
+                            .catch(() => console.error('Error al generar el CSV.'))}
+                    >
+                        Descargar CSV
+                    </button>
                 </div>
 
                 
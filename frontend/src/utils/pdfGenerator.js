@@ -1,19 +1,33 @@
-import jsPDF from 'jspdf';
-import 'jspdf-autotable';
+import api from '../services/api';
 
-export const generarPDF = () => {
-    const doc = new jsPDF();
+// El estado financiero se genera en el servidor (GET /reportes/estado-financiero).
+// Mientras se genera, el servidor responde 202 con Retry-After: se vuelve a pedir.
+const MAXIMO_INTENTOS = 30;
 
-    // Crear una tabla simple
-    doc.autoTable({
-        head: [['Columna 1', 'Columna 2', 'Columna 3']],
-        body: [
-            ['Dato 1', 'Dato 2', 'Dato 3'],
-            ['Dato 4', 'Dato 5', 'Dato 6'],
-            ['Dato 7', 'Dato 8', 'Dato 9'],
-        ],
-    });
+const esperar = (segundos) => new Promise(resolve => setTimeout(resolve, segundos * 1000));
 
-    // Guardar el PDF
-    doc.save('Tabla_De_Prueba.pdf');
-};
\ No newline at end of file
+export const descargarEstadoFinanciero = async (formato = 'pdf') => {
+    for (let intento = 0; intento < MAXIMO_INTENTOS; intento++) {
+        const respuesta = await api.get('/reportes/estado-financiero', {
+            params: { formato },
+            responseType: 'blob',
+        });
+        if (respuesta.status === 202) {
+            await esperar(Number(respuesta.headers['retry-after']) || 2);
+            continue;
+        }
+        const fecha = new Date().toISOString().slice(0, 10);
+        const url = URL.createObjectURL(respuesta.data);
+        const enlace = document.createElement('a');
+        enlace.href = url;
+        enlace.download = `estado_financiero_${fecha}.${formato}`;
+        document.body.appendChild(enlace);
+        enlace.click();
+        enlace.remove();
+        URL.revokeObjectURL(url);
+        return;
+    }
+    throw new Error('El reporte tardó demasiado en generarse.');
+};
+
+export const generarPDF = () => descargarEstadoFinanciero('pdf');